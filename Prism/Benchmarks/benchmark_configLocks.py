@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+"""
+Starts processes, which call setConfig on the same config at the same
+time, and reports the lock wait times and the number of lost writes.
+
+usage: python benchmark_configLocks.py [--processes N] [--writes N] [--path PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+import PrismCore
+
+
+logger = logging.getLogger(__name__)
+
+
+def runWorker(path, name, writes, tmpDir):
+    core = PrismCore.PrismCore(app="Standalone", prismArgs=["noUI"])
+    open(os.path.join(tmpDir, name + ".ready"), "w").close()
+    while not os.path.exists(os.path.join(tmpDir, "go")):
+        time.sleep(0.01)
+
+    waits = []
+    for idx in range(writes):
+        core.configs.setConfig("benchmark", "%s_%04d" % (name, idx), idx, configPath=path)
+        waits.append(core.configs.lastLockWait)
+
+    with open(os.path.join(tmpDir, name + ".json"), "w") as f:
+        json.dump({"waits": waits}, f)
+
+
+def benchmarkLockContention(processes=8, writes=50, path=None):
+    tmpDir = tempfile.mkdtemp(prefix="prism_lock_benchmark_")
+    path = path or os.path.join(tmpDir, "contention.yml")
+    goPath = os.path.join(tmpDir, "go")
+    workers = []
+    for idx in range(processes):
+        name = "worker%02d" % idx
+        cmd = [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--worker", name,
+            "--writes", str(writes),
+            "--path", path,
+            "--tmpDir", tmpDir,
+        ]
+        proc = subprocess.Popen(cmd)
+        workers.append((proc, os.path.join(tmpDir, name + ".json")))
+
+    # start writing when all processes are initialized
+    startTime = time.time()
+    while time.time() - startTime < 300:
+        ready = [x for x in os.listdir(tmpDir) if x.endswith(".ready")]
+        if len(ready) == processes or all([proc.poll() is not None for proc, reportPath in workers]):
+            break
+
+        time.sleep(0.1)
+
+    open(goPath, "w").close()
+    startTime = time.time()
+    for proc, reportPath in workers:
+        proc.wait()
+
+    duration = time.time() - startTime
+    waits = []
+    for proc, reportPath in workers:
+        if os.path.exists(reportPath):
+            with open(reportPath, "r") as f:
+                waits += json.load(f)["waits"]
+
+    core = PrismCore.PrismCore(app="Standalone", prismArgs=["noUI"])
+    configData = core.configs.readYaml(path) or {}
+    written = len(configData.get("benchmark") or {})
+    result = OrderedDict([
+        ("processes", processes),
+        ("duration", duration),
+        ("expectedWrites", processes * writes),
+        ("writes", written),
+        ("lostWrites", processes * writes - written),
+        ("meanLockWait", sum(waits) / len(waits) if waits else None),
+        ("maxLockWait", max(waits) if waits else None),
+    ])
+    logger.info(
+        "%s processes: %s of %s writes in %.2fs, lock wait mean %.4fs, max %.4fs"
+        % (processes, written, processes * writes, duration, result["meanLockWait"] or 0, result["maxLockWait"] or 0)
+    )
+    shutil.rmtree(tmpDir, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent config writes.")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=50)
+    parser.add_argument("--path", help="config to write to instead of a temporary one")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--tmpDir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        runWorker(args.path, args.worker, args.writes, args.tmpDir)
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    benchmarkLockContention(processes=args.processes, writes=args.writes, path=args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+"""
+Compares the config read backends on a synthetic project with a large
+shotinfo file and many versioninfo files.
+
+usage: python benchmark_configs.py [--iterations N] [--shots N] [--versions N] [path ...]
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+import PrismCore
+
+
+logger = logging.getLogger(__name__)
+
+
+def createBenchmarkProject(configs, path, shots=500, versions=200):
+    paths = []
+    shotInfo = OrderedDict([("shotRanges", OrderedDict([]))])
+    for shotIdx in range(shots):
+        shotName = "sq%02d-sh%04d" % (shotIdx // 100, shotIdx * 10)
+        shotInfo["shotRanges"][shotName] = [1001, 1001 + shotIdx]
+
+    shotInfoPath = os.path.join(path, "Shotinfo", "shotInfo.yml")
+    configs.writeYaml(path=shotInfoPath, data=shotInfo)
+    paths.append(shotInfoPath)
+
+    for versionIdx in range(versions):
+        versionInfo = OrderedDict([
+            ("information", OrderedDict([
+                ("Version", "v%04d" % (versionIdx + 1)),
+                ("Created by", "benchmark"),
+                ("Creation date", "01.01.20 12:00:00"),
+                ("Source scene", "/project/scene_v%04d.ma" % (versionIdx + 1)),
+                ("Comment", "synthetic version %s" % versionIdx),
+            ])),
+            ("dependencies", ["/project/dep_%s.abc" % x for x in range(10)]),
+        ])
+        versionPath = os.path.join(path, "v%04d" % (versionIdx + 1), "versioninfo.yml")
+        configs.writeYaml(path=versionPath, data=versionInfo)
+        paths.append(versionPath)
+
+    return paths
+
+
+def benchmarkReadBackends(configs, paths, iterations=3):
+    backends = OrderedDict([
+        ("yaml roundtrip", lambda x: configs.readYaml(x, typ="rt")),
+        ("yaml safe", lambda x: configs.readYaml(x, typ="safe")),
+        ("binary cache", lambda x: configs.readConfigFile(x, useBinaryCache=True)),
+    ])
+
+    # fill the binary cache, so that only cached reads are measured
+    for path in paths:
+        configs.readConfigFile(path, useBinaryCache=True)
+
+    results = OrderedDict([])
+    for backend in backends:
+        startTime = time.time()
+        for idx in range(iterations):
+            for path in paths:
+                backends[backend](path)
+
+        results[backend] = (time.time() - startTime) / float(iterations)
+        logger.info("%s: %.4fs for %s configs" % (backend, results[backend], len(paths)))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the config read backends.")
+    parser.add_argument("paths", nargs="*", help="configs to read instead of a synthetic project")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--shots", type=int, default=500)
+    parser.add_argument("--versions", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    core = PrismCore.PrismCore(app="Standalone", prismArgs=["noUI"])
+    paths = args.paths
+    tmpDir = None
+    if not paths:
+        tmpDir = tempfile.mkdtemp(prefix="prism_config_benchmark_")
+        paths = createBenchmarkProject(core.configs, tmpDir, shots=args.shots, versions=args.versions)
+
+    try:
+        benchmarkReadBackends(core.configs, paths, iterations=args.iterations)
+    finally:
+        if tmpDir:
+            for path in paths:
+                try:
+                    os.remove(core.configs.getBinaryCachePath(path))
+                except OSError:
+                    pass
+
+            shutil.rmtree(tmpDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+"""
+Copies files of different sizes with the previous copy, which read the
+whole file into memory to hash it, and with the modes of the streaming copy
+of FileCopy and reports the durations.
+
+usage: python benchmark_fileCopy.py [--sizes MB [MB ...]] [--path FOLDER] [--legacyMaxSize MB]
+"""
+
+import os
+import io
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+import PrismCore
+from PrismUtils import FileCopy
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def legacyCopy(src, dst):
+    with open(src, "rb") as f:
+        srcHash = hashlib.md5(f.read()).hexdigest()
+
+    with open(src, "rb") as fsrc:
+        with open(dst, "wb") as fdst:
+            shutil.copyfileobj(fsrc, fdst, 16 * 1024)
+
+    with open(dst, "rb") as f:
+        dstHash = hashlib.md5(f.read()).hexdigest()
+
+    return srcHash == dstHash
+
+
+def createBenchmarkFile(path, size):
+    chunk = os.urandom(min(size, 16 * MB))
+    with io.open(path, "wb") as f:
+        written = 0
+        while written < size:
+            data = chunk[:size - written]
+            f.write(data)
+            written += len(data)
+
+
+def benchmarkCopy(core, sizes, path=None, legacyMaxSize=4 * 1024 * MB):
+    streamCopy = FileCopy.FileCopy(core)
+    streamCopy.useKernelCopy = False
+    kernelCopy = FileCopy.FileCopy(core)
+    kernelCopy.useKernelCopy = True
+
+    modes = OrderedDict([
+        ("legacy", legacyCopy),
+        ("stream md5", lambda src, dst: streamCopy.copyFile(src, dst, hashMode="md5")),
+        ("stream fast", lambda src, dst: streamCopy.copyFile(src, dst, hashMode="fast")),
+    ])
+    if kernelCopy.getKernelCopyFunctions():
+        modes["kernel md5"] = lambda src, dst: kernelCopy.copyFile(src, dst, hashMode="md5")
+
+    tmpDir = tempfile.mkdtemp(prefix="prism_copy_benchmark_", dir=path)
+    results = OrderedDict([])
+    try:
+        for size in sizes:
+            src = os.path.join(tmpDir, "source_%s.bin" % size)
+            dst = os.path.join(tmpDir, "target_%s.bin" % size)
+            createBenchmarkFile(src, size)
+            results[size] = OrderedDict([])
+            for mode in modes:
+                if mode == "legacy" and legacyMaxSize and size > legacyMaxSize:
+                    logger.info("skipping legacy copy for %s MB" % (size // MB))
+                    continue
+
+                startTime = time.time()
+                modes[mode](src, dst)
+                duration = time.time() - startTime
+                results[size][mode] = duration
+                logger.info(
+                    "%s: %.2fs for %s MB (%.1f MB/s)"
+                    % (mode, duration, size // MB, (size / float(MB)) / max(duration, 0.0001))
+                )
+                os.remove(dst)
+
+            os.remove(src)
+    finally:
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the file copy modes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1024, 10 * 1024], help="file sizes in MB")
+    parser.add_argument("--path", help="folder to copy in, e.g. on a network share")
+    parser.add_argument("--legacyMaxSize", type=int, default=4 * 1024, help="skip the legacy copy above this size in MB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    core = PrismCore.PrismCore(app="Standalone", prismArgs=["noUI"])
+    benchmarkCopy(
+        core,
+        [size * MB for size in args.sizes],
+        path=args.path,
+        legacyMaxSize=args.legacyMaxSize * MB,
+    )
+
+
+if __name__ == "__main__":
+    main()
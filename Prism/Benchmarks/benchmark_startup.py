@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+"""
+Boots PrismCore(app="Standalone") in separate processes, which load a
+fixture project, and reports the average total and phase durations from
+the startup reports of the StartupTracer. A temporary fixture project is
+created, if no project is given. Exits with 1, if the average startup takes
+longer than --maxDuration.
+
+usage: python benchmark_startup.py [--project PATH] [--iterations N] [--maxDuration SECONDS]
+"""
+
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+from collections import OrderedDict
+
+scriptPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts")
+sys.path.insert(0, scriptPath)
+
+
+logger = logging.getLogger(__name__)
+
+
+def createFixtureProject(path):
+    import PrismCore
+
+    core = PrismCore.PrismCore(app="Standalone", prismArgs=["noUI"])
+    core.projects.createProject("startupBenchmark", path)
+
+
+def benchmarkStartup(projectPath, iterations=3):
+    cmd = (
+        "import sys; sys.path.insert(0, %s); import PrismCore; "
+        "PrismCore.PrismCore(app='Standalone', "
+        "prismArgs=['noUI', 'loadProject', 'noProjectBrowser'])"
+    ) % repr(os.path.abspath(scriptPath))
+
+    tmpDir = tempfile.mkdtemp(prefix="prism_startup_benchmark_")
+    reports = []
+    try:
+        for idx in range(iterations):
+            reportPath = os.path.join(tmpDir, "report_%s.json" % idx)
+            env = os.environ.copy()
+            env["prism_project"] = projectPath
+            env["PRISM_STARTUP_REPORT"] = reportPath
+            env["PRISM_TRACE_IMPORTS"] = "1"
+            subprocess.call([sys.executable, "-c", cmd], env=env)
+            if not os.path.exists(reportPath):
+                logger.warning("startup benchmark didn't write a report: %s" % reportPath)
+                continue
+
+            with open(reportPath, "r") as f:
+                reports.append(json.load(f))
+    finally:
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+    if not reports:
+        return
+
+    result = OrderedDict([("iterations", len(reports)), ("total", 0.0), ("phases", OrderedDict([]))])
+    for report in reports:
+        result["total"] += report["total"] / len(reports)
+        for phaseData in report["phases"]:
+            name = phaseData["name"]
+            result["phases"][name] = result["phases"].get(name, 0.0) + (phaseData["duration"] or 0) / len(reports)
+
+    if "changeProject" not in result["phases"]:
+        logger.warning("startup benchmark didn't load the project: %s" % projectPath)
+
+    for name, duration in result["phases"].items():
+        logger.info("  %s: %.3fs" % (name, duration))
+
+    logger.info("startup duration: %.3fs (average of %s runs)" % (result["total"], len(reports)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the startup of PrismCore.")
+    parser.add_argument("--project", help="project to load instead of a temporary fixture project")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--maxDuration", type=float, help="fail, if the average startup is slower")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    projectPath = args.project
+    fixtureDir = None
+    if not projectPath:
+        fixtureDir = tempfile.mkdtemp(prefix="prism_startup_fixture_")
+        projectPath = os.path.join(fixtureDir, "project")
+        createFixtureProject(projectPath)
+
+    try:
+        result = benchmarkStartup(projectPath, iterations=args.iterations)
+    finally:
+        if fixtureDir:
+            shutil.rmtree(fixtureDir, ignore_errors=True)
+
+    if not result:
+        sys.exit(1)
+
+    if args.maxDuration and result["total"] > args.maxDuration:
+        logger.error("startup took %.3fs, the limit is %.3fs" % (result["total"], args.maxDuration))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1233,7 +1233,11 @@ class ExportClass(object):
 
             useMaster = self.core.getConfig("globals", "useMasterVersion", dft=False, config="project")
             if useMaster:
-                self.core.products.updateMasterVersion(outputName)
+                self.core.publishScheduler.runInBackground(
+                    self.core.products.updateMasterVersion,
+                    args=[outputName],
+                    key="masterVersions",
+                )
 
             kwargs = {
                 "state": self,
@@ -1243,6 +1247,7 @@ class ExportClass(object):
                 "outputpath": outputName,
             }
 
+            self.core.publishScheduler.waitForTasks(key="versionInfo")
             self.core.callback("postExport", **kwargs)
 
             self.stateManager.saveStatesToScene()
@@ -1487,7 +1492,11 @@ class ExportClass(object):
             if updateMaster:
                 useMaster = self.core.getConfig("globals", "useMasterVersion", dft=False, config="project")
                 if useMaster:
-                    self.core.products.updateMasterVersion(expandedOutputName)
+                    self.core.publishScheduler.runInBackground(
+                        self.core.products.updateMasterVersion,
+                        args=[expandedOutputName],
+                        key="masterVersions",
+                    )
 
             kwargs = {
                 "state": self,
@@ -1497,6 +1506,7 @@ class ExportClass(object):
                 "outputpath": expandedOutputName,
             }
 
+            self.core.publishScheduler.waitForTasks(key="versionInfo")
             self.core.callback("postExport", **kwargs)
 
             if "Result=Success" in result:
@@ -1269,6 +1269,7 @@ class ImageRenderClass(object):
             "scenefile": fileName,
             "settings": rSettings,
         }
+        self.core.publishScheduler.waitForTasks(key="versionInfo")
         self.core.callback("postRender", **kwargs)
 
         if not self.gb_submit.isHidden() and self.gb_submit.isChecked():
@@ -1305,9 +1306,17 @@ class ImageRenderClass(object):
             return
 
         elif masterAction == "Set as master":
-            self.core.mediaProducts.updateMasterVersion(outputName)
+            self.core.publishScheduler.runInBackground(
+                self.core.mediaProducts.updateMasterVersion,
+                args=[outputName],
+                key="masterVersions",
+            )
         elif masterAction == "Add to master":
-            self.core.mediaProducts.addToMasterVersion(outputName)
+            self.core.publishScheduler.runInBackground(
+                self.core.mediaProducts.addToMasterVersion,
+                args=[outputName],
+                key="masterVersions",
+            )
 
     @err_catcher(name=__name__)
     def undoRenderSettings(self, rSettings):
@@ -418,8 +418,8 @@ class Prism_Photoshop_Functions(object):
         ).replace("\\", "/")
         sources = origin.getImgSources(sourceFolder)
         for curSourcePath in sources:
-
-            if "@@@@" in curSourcePath:
+            placeholder = origin.getFramePlaceholder(curSourcePath)
+            if placeholder:
                 if (
                     "pstart" not in mpb
                     or "pend" not in mpb
@@ -432,9 +432,9 @@ class Prism_Photoshop_Functions(object):
                     firstFrame = mpb["pstart"]
                     lastFrame = mpb["pend"]
 
-                filePath = curSourcePath.replace("@"*self.core.framePadding, "%04d".replace("4", str(self.core.framePadding)) % firstFrame).replace(
-                    "\\", "/"
-                )
+                filePath = origin.replaceFramePlaceholder(
+                    curSourcePath, placeholder, "%0*d" % (len(placeholder), int(firstFrame))
+                ).replace("\\", "/")
             else:
                 filePath = curSourcePath.replace("\\", "/")
                 firstFrame = 0
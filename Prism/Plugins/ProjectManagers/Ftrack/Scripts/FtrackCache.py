@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import logging
+import contextlib
+
+import ftrack_api.cache
+
+from PrismUtils import Lockfile
+
+
+logger = logging.getLogger(__name__)
+
+
+class LockedFileCache(ftrack_api.cache.FileCache):
+    """
+    FileCache, which locks the database for every access.
+
+    The cache file is shared between all Prism processes of a user. anydbm
+    doesn't lock the file and dbm.dumb, which is used on Windows, corrupts
+    its index on concurrent writes. A lookup, which times out waiting for
+    the lock, is a cache miss.
+    """
+
+    def __init__(self, core, path, timeout=5):
+        self.core = core
+        self.lockTimeout = timeout
+        self.lockWait = 0
+        self.accessCount = 0
+        with Lockfile.Lockfile(self.core, path, timeout=self.lockTimeout):
+            super(LockedFileCache, self).__init__(path)
+
+    @contextlib.contextmanager
+    def _database(self):
+        lock = Lockfile.Lockfile(self.core, self.path, timeout=self.lockTimeout)
+        with lock:
+            self.lockWait += lock.waitDuration
+            self.accessCount += 1
+            with super(LockedFileCache, self)._database() as cache:
+                yield cache
+
+    def get(self, key):
+        try:
+            return super(LockedFileCache, self).get(key)
+        except Lockfile.LockfileException:
+            raise KeyError(key)
+
+    def set(self, key, value):
+        try:
+            super(LockedFileCache, self).set(key, value)
+        except Lockfile.LockfileException:
+            logger.debug("ftrack cache is locked, skipped caching %s" % key)
+
+    def remove(self, key):
+        try:
+            super(LockedFileCache, self).remove(key)
+        except Lockfile.LockfileException:
+            raise KeyError(key)
+
+    def keys(self):
+        try:
+            return super(LockedFileCache, self).keys()
+        except Lockfile.LockfileException:
+            return []
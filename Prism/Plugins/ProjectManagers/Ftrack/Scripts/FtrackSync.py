@@ -0,0 +1,497 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import json
+import time
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from PrismUtils.Decorators import err_catcher_plugin as err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class FtrackSync(object):
+    """
+    Syncs Prism assets and shots to Ftrack.
+
+    All projects, folders, sequences, shots and asset builds are prefetched
+    with one projected query each and parents are resolved from these maps.
+    New entities are committed once per batch of "batchSize" entities and
+    thumbnails are uploaded in a thread pool with "maxThreads" threads.
+    """
+
+    def __init__(self, plugin, session, projectName, batchSize=100, maxThreads=4):
+        self.plugin = plugin
+        self.core = plugin.core
+        self.session = session
+        self.projectName = projectName
+        self.batchSize = batchSize
+        self.maxThreads = maxThreads
+        self.local = threading.local()
+        self.threadSessions = []
+        self.lock = threading.Lock()
+        self.errors = []
+        self.pending = []
+
+    @err_catcher(name=__name__)
+    def getCacheStats(self):
+        cache = getattr(self.plugin, "sessionFileCache", None)
+        if not cache:
+            return
+
+        return [cache.accessCount, cache.lockWait]
+
+    @err_catcher(name=__name__)
+    def logCacheStats(self, startStats):
+        stats = self.getCacheStats()
+        if not stats or not startStats:
+            logger.debug("ftrack session cache is disabled")
+            return
+
+        logger.debug(
+            "ftrack session cache: %s accesses, %.2fs waiting for the lock"
+            % (stats[0] - startStats[0], stats[1] - startStats[1])
+        )
+
+    @err_catcher(name=__name__)
+    def query(self, entityType, attributes):
+        query = 'select %s from %s where project.name is "%s"' % (
+            ", ".join(attributes),
+            entityType,
+            self.projectName,
+        )
+        return self.session.query(query).all()
+
+    @err_catcher(name=__name__)
+    def prefetch(self, entityTypes):
+        self.project = self.session.query(
+            'select id, name from Project where name is "%s"' % self.projectName
+        ).first()
+        if not self.project:
+            return False
+
+        self.folders = {}
+        if "Folder" in entityTypes:
+            for folder in self.query("Folder", ["id", "name", "parent_id"]):
+                self.folders[(folder["parent_id"], folder["name"])] = folder
+
+        self.sequences = {}
+        if "Sequence" in entityTypes:
+            for seq in self.query("Sequence", ["id", "name", "parent_id"]):
+                if seq["parent_id"] == self.project["id"]:
+                    self.sequences[seq["name"]] = seq
+
+        self.shots = {}
+        if "Shot" in entityTypes:
+            attrs = [
+                "id",
+                "name",
+                "parent_id",
+                "parent.name",
+                "parent.object_type.name",
+                "thumbnail_id",
+                "custom_attributes",
+            ]
+            for shot in self.query("Shot", attrs):
+                if shot["parent"]["object_type"]["name"] != "Sequence":
+                    shotName = shot["name"]
+                else:
+                    shotName = "%s%s%s" % (
+                        shot["parent"]["name"],
+                        self.core.sequenceSeparator,
+                        shot["name"],
+                    )
+                self.shots[shotName] = shot
+
+        self.assets = {}
+        if "AssetBuild" in entityTypes:
+            attrs = ["id", "name", "parent_id", "description", "thumbnail_id"]
+            for asset in self.query("AssetBuild", attrs):
+                self.assets[asset["name"]] = asset
+
+        return True
+
+    @err_catcher(name=__name__)
+    def commit(self):
+        try:
+            self.session.commit()
+        except Exception as e:
+            logger.warning("ftrack commit failed: %s" % e)
+            self.errors.append(str(e))
+            self.session.rollback()
+            for entities, key in self.pending:
+                entities.pop(key, None)
+
+            self.pending = []
+            return False
+
+        self.pending = []
+        return True
+
+    @err_catcher(name=__name__)
+    def getFolder(self, folders):
+        """
+        Returns the folder for a list of folder names and creates the missing
+        folders. Without folders the project is returned.
+        """
+        parent = self.project
+        for folderName in folders:
+            key = (parent["id"], folderName)
+            if key not in self.folders:
+                self.folders[key] = self.session.create(
+                    "Folder", {"name": folderName, "parent": parent}
+                )
+                self.pending.append([self.folders, key])
+
+            parent = self.folders[key]
+
+        return parent
+
+    @err_catcher(name=__name__)
+    def getSequence(self, seqName):
+        if not seqName:
+            return self.project
+
+        if seqName not in self.sequences:
+            self.sequences[seqName] = self.session.create(
+                "Sequence", {"name": seqName, "parent": self.project}
+            )
+            self.pending.append([self.sequences, seqName])
+
+        return self.sequences[seqName]
+
+    @err_catcher(name=__name__)
+    def getThumbnailRecordPath(self):
+        return os.path.join(
+            os.path.dirname(self.core.userini), "Cache", "ftrack_thumbnails.json"
+        )
+
+    @err_catcher(name=__name__)
+    def getThumbnailRecord(self):
+        path = self.getThumbnailRecordPath()
+        if not os.path.exists(path):
+            return {}
+
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    @err_catcher(name=__name__)
+    def saveThumbnailRecord(self, record):
+        path = self.getThumbnailRecordPath()
+        if not os.path.exists(os.path.dirname(path)):
+            try:
+                os.makedirs(os.path.dirname(path))
+            except Exception:
+                return
+
+        tmpPath = path + ".%s.tmp" % os.getpid()
+        with open(tmpPath, "w") as f:
+            json.dump(record, f)
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        os.rename(tmpPath, path)
+
+    @err_catcher(name=__name__)
+    def needsThumbnail(self, entity, path):
+        """
+        A thumbnail is uploaded when the entity has none or the local preview
+        changed since it was last uploaded from this machine.
+        """
+        if not os.path.exists(path):
+            return False
+
+        if not entity.get("thumbnail_id"):
+            return True
+
+        uploaded = self.thumbnailRecord.get(entity["id"])
+        return uploaded is None or os.path.getmtime(path) > uploaded
+
+    @err_catcher(name=__name__)
+    def getThreadSession(self):
+        """
+        Ftrack sessions aren't thread safe, so every upload thread gets its
+        own session.
+        """
+        if not getattr(self.local, "session", None):
+            import ftrack_api
+
+            args = dict(getattr(self.plugin, "ftrackConnectionArgs", {}))
+            args["auto_connect_event_hub"] = False
+            self.local.session = ftrack_api.Session(**args)
+            self.local.location = None
+            with self.lock:
+                self.threadSessions.append(self.local.session)
+
+        return self.local.session
+
+    def uploadThumbnail(self, thumbnail):
+        entity, path = thumbnail
+        try:
+            session = self.getThreadSession()
+            if not getattr(self.local, "location", None):
+                self.local.location = session.query(
+                    'Location where name is "ftrack.server"'
+                ).one()
+
+            component = session.create_component(
+                path, dict(name="thumbnail"), location=self.local.location
+            )
+        except Exception as e:
+            logger.warning("failed to upload thumbnail %s: %s" % (path, e))
+            with self.lock:
+                self.errors.append(str(e))
+            return
+
+        return [entity, component["id"], path]
+
+    @err_catcher(name=__name__)
+    def uploadThumbnails(self, thumbnails):
+        """
+        Uploads a list of (entity, path) thumbnails and assigns the uploaded
+        components to the entities with a single commit.
+        """
+        if not thumbnails:
+            return []
+
+        if getattr(self.plugin, "ftrackConnectionArgs", None):
+            pool = ThreadPool(max(1, min(self.maxThreads, len(thumbnails))))
+            try:
+                results = pool.map(self.uploadThumbnail, thumbnails)
+            finally:
+                pool.close()
+                pool.join()
+                for session in self.threadSessions:
+                    session.close()
+
+                self.threadSessions = []
+        else:
+            self.local.session = self.session
+            self.local.location = None
+            results = [self.uploadThumbnail(thumbnail) for thumbnail in thumbnails]
+
+        uploaded = []
+        for result in results:
+            if not result:
+                continue
+
+            entity, componentId, path = result
+            entity["thumbnail_id"] = componentId
+            uploaded.append([entity, path])
+
+        if not uploaded or not self.commit():
+            return []
+
+        for entity, path in uploaded:
+            self.thumbnailRecord[entity["id"]] = os.path.getmtime(path)
+
+        self.saveThumbnailRecord(self.thumbnailRecord)
+        return [entity for entity, path in uploaded]
+
+    @err_catcher(name=__name__)
+    def getFrameRange(self, shotName, shotRanges):
+        shotRange = shotRanges.get(shotName)
+        if type(shotRange) == list and len(shotRange) == 2:
+            try:
+                return int(shotRange[0]), int(shotRange[1])
+            except Exception:
+                pass
+
+        return None, None
+
+    @err_catcher(name=__name__)
+    def getShotPreviewPath(self, shotName):
+        return os.path.join(
+            os.path.dirname(self.core.prismIni), "Shotinfo", "%s_preview.jpg" % shotName
+        )
+
+    @err_catcher(name=__name__)
+    def getAssetPreviewPath(self, assetName):
+        return os.path.join(
+            os.path.dirname(self.core.prismIni), "Assetinfo", "%s_preview.jpg" % assetName
+        )
+
+    @err_catcher(name=__name__)
+    def syncShots(self, localShots):
+        """
+        Creates and updates the shots in Ftrack. "localShots" is a list of
+        [prismShotName, sequenceName, shotName]. Returns a dict with the
+        names of the created and updated shots and the duration.
+        """
+        startTime = time.time()
+        cacheStats = self.getCacheStats()
+        result = {"created": [], "updated": [], "duration": 0, "errors": self.errors}
+        if not self.prefetch(["Sequence", "Shot"]):
+            return result
+
+        self.thumbnailRecord = self.getThumbnailRecord()
+        shotRanges = self.core.getConfig("shotRanges", config="shotinfo") or {}
+        newShots = [shot for shot in localShots if shot[0] not in self.shots]
+
+        for idx in range(0, len(newShots), self.batchSize):
+            batch = newShots[idx:idx + self.batchSize]
+            created = []
+            for prismName, seqName, shotName in batch:
+                data = {"name": shotName, "parent": self.getSequence(seqName)}
+                created.append([prismName, self.session.create("Shot", data)])
+
+            if not self.commit():
+                continue
+
+            for prismName, shot in created:
+                self.shots[prismName] = shot
+                result["created"].append(prismName)
+
+        updated = set()
+        thumbnails = []
+        for prismName, seqName, shotName in localShots:
+            shot = self.shots.get(prismName)
+            if not shot:
+                continue
+
+            startFrame, endFrame = self.getFrameRange(prismName, shotRanges)
+            if startFrame is not None:
+                attrs = shot["custom_attributes"]
+                try:
+                    if attrs.get("fstart") != startFrame:
+                        attrs["fstart"] = startFrame
+                        updated.add(prismName)
+
+                    if attrs.get("fend") != endFrame:
+                        attrs["fend"] = endFrame
+                        updated.add(prismName)
+                except Exception as e:
+                    logger.debug("can't set the framerange of %s: %s" % (prismName, e))
+
+            previewPath = self.getShotPreviewPath(prismName)
+            if self.needsThumbnail(shot, previewPath):
+                thumbnails.append([shot, previewPath])
+
+        if updated and not self.commit():
+            updated = set()
+
+        uploaded = [x["id"] for x in self.uploadThumbnails(thumbnails)]
+        for prismName, shot in self.shots.items():
+            if shot["id"] in uploaded:
+                updated.add(prismName)
+
+        result["updated"] = sorted(updated - set(result["created"]))
+        result["duration"] = time.time() - startTime
+        self.logCacheStats(cacheStats)
+        logger.info(
+            "synced %s shots to Ftrack in %.2fs: %s created, %s updated, %s thumbnails"
+            % (
+                len(localShots),
+                result["duration"],
+                len(result["created"]),
+                len(result["updated"]),
+                len(uploaded),
+            )
+        )
+        return result
+
+    @err_catcher(name=__name__)
+    def syncAssets(self, localAssets, descriptions=None):
+        """
+        Creates and updates the assets in Ftrack. "localAssets" is a list of
+        [assetName, assetHierarchy]. The folders of the hierarchy are
+        created as Ftrack folders.
+        """
+        startTime = time.time()
+        cacheStats = self.getCacheStats()
+        result = {"created": [], "updated": [], "duration": 0, "errors": self.errors}
+        if not self.prefetch(["Folder", "AssetBuild"]):
+            return result
+
+        self.thumbnailRecord = self.getThumbnailRecord()
+        descriptions = descriptions or {}
+        newAssets = [asset for asset in localAssets if asset[0] not in self.assets]
+        for idx in range(0, len(newAssets), self.batchSize):
+            batch = newAssets[idx:idx + self.batchSize]
+            created = []
+            for assetName, hierarchy in batch:
+                data = {
+                    "name": assetName,
+                    "parent": self.getFolder(hierarchy.split(os.sep)[:-1]),
+                }
+                if assetName in descriptions:
+                    data["description"] = descriptions[assetName]
+
+                created.append(self.session.create("AssetBuild", data))
+
+            if not self.commit():
+                continue
+
+            for asset in created:
+                self.assets[asset["name"]] = asset
+                result["created"].append(asset["name"])
+
+        updated = set()
+        thumbnails = []
+        for assetName, hierarchy in localAssets:
+            asset = self.assets.get(assetName)
+            if not asset:
+                continue
+
+            if assetName in descriptions and asset["description"] != descriptions[assetName]:
+                asset["description"] = descriptions[assetName]
+                updated.add(assetName)
+
+            previewPath = self.getAssetPreviewPath(assetName)
+            if self.needsThumbnail(asset, previewPath):
+                thumbnails.append([asset, previewPath])
+
+        if updated and not self.commit():
+            updated = set()
+
+        for asset in self.uploadThumbnails(thumbnails):
+            updated.add(asset["name"])
+
+        result["updated"] = sorted(updated - set(result["created"]))
+        result["duration"] = time.time() - startTime
+        self.logCacheStats(cacheStats)
+        logger.info(
+            "synced %s assets to Ftrack in %.2fs: %s created, %s updated"
+            % (len(localAssets), result["duration"], len(result["created"]), len(result["updated"]))
+        )
+        return result
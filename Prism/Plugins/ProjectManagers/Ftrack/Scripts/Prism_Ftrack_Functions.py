@@ -33,6 +33,8 @@
 
 import os
 import sys
+import time
+import logging
 
 try:
     from PySide2.QtCore import *
@@ -53,6 +55,9 @@ else:
 from PrismUtils.Decorators import err_catcher_plugin as err_catcher
 
 
+logger = logging.getLogger(__name__)
+
+
 modulePath = os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), "external_modules")
 sys.path.append(modulePath)
 
@@ -63,6 +68,7 @@ class Prism_Ftrack_Functions(object):
         self.plugin = plugin
 
         self.callbacks = []
+        self.queryCache = {}
         self.registerCallbacks()
 
         # move them into pipline.yml
@@ -154,6 +160,8 @@ class Prism_Ftrack_Functions(object):
         if hasattr(self, "ftrack"):
             del self.ftrack
 
+        self.queryCache = {}
+
     @err_catcher(name=__name__)
     def prismSettings_loadUI(self, origin):
         origin.gb_ftrackAccount = QGroupBox("Publish Ftrack versions with Ftrack account")
@@ -458,10 +466,14 @@ class Prism_Ftrack_Functions(object):
 
                 if (useUserAccount and ftrackUsername and ftrackUserApiKey):
                     try:
+                        self.ftrackConnectionArgs = {
+                            "server_url": ftrackSite,
+                            "api_user": ftrackUsername,
+                            "api_key": ftrackUserApiKey,
+                        }
                         self.session = ftrack_api.Session(
-                            server_url=ftrackSite,
-                            api_user=ftrackUsername,
-                            api_key=ftrackUserApiKey
+                            cache=self.createSessionCache,
+                            **self.ftrackConnectionArgs
                         )
                         authentificated = True
                     except Exception:
@@ -469,10 +481,14 @@ class Prism_Ftrack_Functions(object):
 
             if not authentificated:
                 try:
+                    self.ftrackConnectionArgs = {
+                        "server_url": ftrackSite,
+                        "api_user": ftrackApiUserName,
+                        "api_key": ftrackApiKey,
+                    }
                     self.session = ftrack_api.Session(
-                        server_url=ftrackSite,
-                        api_user=ftrackApiUserName,
-                        api_key=ftrackApiKey
+                        cache=self.createSessionCache,
+                        **self.ftrackConnectionArgs
                     )
                 except Exception as e:
                     QMessageBox.warning(self.core.messageParent, 'Ftrack', 'Could not connect to Ftrack:\n\n%s' % e,)
@@ -511,7 +527,60 @@ class Prism_Ftrack_Functions(object):
         else:
             return [self.session, self.ftrackProjectName, None]
 
-    # Überarbeiten
+    @err_catcher(name=__name__)
+    def createSessionCache(self, session):
+        """
+        Adds a file cache to the ftrack session, so entities, which were
+        fetched in a previous session, don't have to be requeried. The cache
+        can be disabled with "sessioncache" in the ftrack project settings.
+        """
+        import hashlib
+        import ftrack_api.cache
+        import FtrackCache
+
+        if self.core.getConfig('ftrack', 'sessioncache', configPath=self.core.prismIni) is False:
+            return
+
+        key = "%s_%s" % (session.server_url, session.api_user)
+        cacheName = hashlib.md5(key.encode("utf-8")).hexdigest()
+        cachePath = os.path.join(
+            os.path.dirname(self.core.userini), "Cache", "ftrack", cacheName
+        )
+
+        try:
+            if not os.path.exists(os.path.dirname(cachePath)):
+                os.makedirs(os.path.dirname(cachePath))
+
+            fileCache = FtrackCache.LockedFileCache(self.core, cachePath)
+        except Exception as e:
+            logger.debug("couldn't open the ftrack cache %s: %s" % (cachePath, e))
+            return
+
+        self.sessionFileCache = fileCache
+        return ftrack_api.cache.SerialisedCache(
+            fileCache, encode=session.encode, decode=session.decode
+        )
+
+    @err_catcher(name=__name__)
+    def cachedQuery(self, session, query, first=True, maxAge=300):
+        """
+        Returns the result of a query, which was sent in the last "maxAge"
+        seconds, without requerying the server.
+        """
+        key = (query, first)
+        if key in self.queryCache:
+            queryTime, result = self.queryCache[key]
+            if (time.time() - queryTime) < maxAge:
+                return result
+
+        if first:
+            result = session.query(query).first()
+        else:
+            result = session.query(query).all()
+
+        self.queryCache[key] = [time.time(), result]
+        return result
+
     @err_catcher(name=__name__)
     def createFtrackAssets(self, assets=[]):
         session, ftrackProjectName, ftrackUser = self.connectToFtrack(user=True)
@@ -524,84 +593,12 @@ class Prism_Ftrack_Functions(object):
         if session is None:
             return
 
-        ftrackAssets = {}
-
-        for x in session.query('AssetBuild where project.name is "{0}"'.format(ftrackProjectName)):
-            assetName = x['name']
-            ftrackAssets[assetName] = x
-
         aBasePath = self.core.getAssetPath()
         assets = [[os.path.basename(x), x.replace(aBasePath, "")[1:]] for x in assets]
 
-        createdAssets = []
-        updatedAssets = []
-        ftrackFolders = []
-
-        for ftrackFolder in session.query('Folder where project.name is "{0}"'.format(ftrackProjectName)):
-            ftrackFolders.append(ftrackFolder['name'])
-
-        for asset in assets:
-            if asset[0] not in ftrackAssets.keys():
-                folders = asset[1].split(os.sep)[:-1]
-                if not folders:
-                    asset_parent = session.query('Project where name is "{0}"'.format(ftrackProjectName)).first()
-                else:
-
-                    for folder in folders:
-                        if folder == folders[0]:
-                            folder_parent = session.query('Project where name is "{0}"'.format(ftrackProjectName)).first()
-                            x = folder
-                            if folder not in ftrackFolders:
-                                session.create('Folder', {'name': x, 'parent': folder_parent})
-                                session.commit()
-                        else:
-                            folder_parent = session.query('Folder where name is "{0}" and project.name is "{1}"'.format(x, ftrackProjectName)).first()
-                            x = folder
-                            if folder not in ftrackFolders:
-                                session.create('Folder', {'name': x, 'parent': folder_parent})
-                                session.commit()
-
-                    asset_parent = session.query('Folder where name is "{0}" and project.name is "{1}"'.format(x, ftrackProjectName)).first()
-
-                data = {
-                    'name': asset[0],
-                    'parent': asset_parent,
-                }
-
-                result = session.create('AssetBuild', data)
-                session.commit()
-                # result['custom_attributes']['localHierarchy'] = asset[1]
-                # session.commit()
-                createdAssets.append(result)
-
-        if len(createdAssets) > 0 or len(updatedAssets) > 0:
-            msgString = ''
-
-            createdAssetNames = []
-            for i in createdAssets:
-                createdAssetNames.append(i['name'])
-
-            createdAssetNames.sort()
-            updatedAssets.sort()
-
-            if len(createdAssetNames) > 0:
-                msgString += 'The following assets were created:\n\n'
-
-                for i in createdAssetNames:
-                    msgString += i + '\n'
-
-            if len(createdAssetNames) > 0 and len(updatedAssets) > 0:
-                msgString += '\n\n'
-
-            if len(updatedAssets) > 0:
-                msgString += 'The following assets were updated:\n\n'
-
-                for i in updatedAssets:
-                    msgString += i + '\n'
-        else:
-            msgString = 'No assets were created or updated.'
-
-        QMessageBox.information(self.core.messageParent, 'Ftrack Sync', msgString)
+        import FtrackSync
+        result = FtrackSync.FtrackSync(self, session, ftrackProjectName).syncAssets(assets)
+        self.showSyncResult(result, 'assets')
 
     @err_catcher(name=__name__)
     def createFtrackShots(self, shots=[]):
@@ -615,120 +612,49 @@ class Prism_Ftrack_Functions(object):
         if session is None:
             return
 
-        ftrackShots = {}
-        for x in session.query('Shot where project.name is "{0}"'.format(ftrackProjectName)):
-            if x['parent']['object_type']['name'] != 'Sequence':
-                shotName = x['name']
-            else:
-                shotName = "%s%s%s" % (
-                    x['parent']['name'],
-                    self.core.sequenceSeparator,
-                    x['name'],
-                )
-            ftrackShots[shotName] = x
-
-        ftrackSequences = {x['name']: x for x in session.query('Sequence where project.name is "{0}"'.format(ftrackProjectName))}
-
-        createdShots = []
-        updatedShots = []
-
+        localShots = []
         for shot in shots:
             shotName, seqName = self.core.entities.splitShotname(shot)
             if seqName == 'no sequence':
                 seqName = ''
 
-            shotImgPath = os.path.join(
-                os.path.dirname(self.core.prismIni), 'Shotinfo', '%s_preview.jpg' % shot
-            )
-            if os.path.exists(shotImgPath):
-                shotImg = shotImgPath
-            else:
-                shotImg = ''
+            localShots.append([shot, seqName, shotName])
 
-            server_location = session.query('Location where name is "ftrack.server"').first()
+        import FtrackSync
+        FtrackSync.FtrackSync(self, session, ftrackProjectName).syncShots(localShots)
 
-            shotRange = self.core.getConfig('shotRanges', shot, config='shotinfo')
-
-            if type(shotRange) == list and len(shotRange) == 2:
-                startFrame = shotRange[0]
-                endFrame = shotRange[1]
-            else:
-                startFrame = ''
-                endFrame = ''
-
-            shotSeq = {'name': ''}
-            sequence_parent = session.query('Project where name is "{0}"'.format(ftrackProjectName)).first()
-
-            if seqName != '' and shot not in ftrackShots.keys():
-                if seqName in ftrackSequences.keys():
-                    shotSeq = ftrackSequences[seqName]
-                else:
-                    data = {
-                        'parent': sequence_parent,
-                        'name': seqName,
-                    }
+    @err_catcher(name=__name__)
+    def showSyncResult(self, result, entityType):
+        if not result:
+            return
 
-                    shotSeq = session.create('Sequence', data)
-                    session.commit()
-                    ftrackSequences[shotSeq['name']] = shotSeq
+        createdNames = sorted(result['created'])
+        updatedNames = sorted(result['updated'])
 
-            if shot not in ftrackShots.keys():
-                data = {
-                    'parent': sequence_parent,
-                    'name': shotName,
-                }
-                # QMessageBox.warning(self.core.messageParent, 'Debug', str(shotSeq['name']),)
-                if shotSeq['name'] != '':
-                    data['parent'] = shotSeq
+        if len(createdNames) > 0 or len(updatedNames) > 0:
+            msgString = ''
 
-                if shotImg != '':
-                    thumbnail_component = session.create_component(shotImg, dict(name='thumbnail'), location=server_location)
-                    data['thumbnail'] = thumbnail_component
+            if len(createdNames) > 0:
+                msgString += 'The following %s were created:\n\n' % entityType
 
-                result = session.create('Shot', data)
-                session.commit()
-
-                try:
-                    int(startFrame)
-                    result['custom_attributes']['fstart'] = int(startFrame)
-                    session.commit()
-                except Exception:
-                    pass
+                for i in createdNames:
+                    msgString += i + '\n'
 
-                try:
-                    int(startFrame)
-                    result['custom_attributes']['fend'] = int(endFrame)
-                    session.commit()
-                except Exception:
-                    pass
+            if len(createdNames) > 0 and len(updatedNames) > 0:
+                msgString += '\n\n'
 
-                createdShots.append(result)
-            else:
-                result = session.query('Shot where id is "{0}"'.format(ftrackShots[shot[0]]['id'])).first()
-                result['thumbnail'] = thumbnail_component
-                session.commit()
+            if len(updatedNames) > 0:
+                msgString += 'The following %s were updated:\n\n' % entityType
 
-                if len(data.keys()) > 1 or shotImg != "":
-                    try:
-                        if ftrackShots[shot]['custom_attributes']['fstart'] != int(startFrame):
-                            result['custom_attributes']['fstart'] = int(startFrame)
-                            session.commit()
-                    except Exception:
-                        pass
+                for i in updatedNames:
+                    msgString += i + '\n'
+        else:
+            msgString = 'No %s were created or updated.' % entityType
 
-                    try:
-                        if ftrackShots[shot]['custom_attributes']['fend'] != int(endFrame):
-                            result['custom_attributes']['fend'] = int(endFrame)
-                            session.commit()
-                    except Exception:
-                        pass
+        if result['errors']:
+            msgString += '\n\nSome requests failed:\n\n%s' % '\n'.join(result['errors'])
 
-                    if (
-                        [seqName, shotName]
-                        not in [[x['name'], x['parent']] for x in createdShots] and shot not in updatedShots and (len(data.keys()) > 1 or ftrackShots[shot]['thumbnail'] is None)
-                    ):
-                        updatedShots.append(shot)
-    # ----------------
+        QMessageBox.information(self.core.messageParent, 'Ftrack Sync', msgString)
 
     @err_catcher(name=__name__)
     def ftrackPublish(self, origin):
@@ -818,11 +744,11 @@ class Prism_Ftrack_Functions(object):
 
         # QMessageBox.warning(self.core.messageParent, 'path', str(path),)
         # QMessageBox.warning(self.core.messageParent, 'taskName', str(taskName),)
-        ftrackPrj = session.query('Project where name is "{0}"'.format(ftrackProjectName)).first()
+        ftrackPrj = self.cachedQuery(session, 'Project where name is "{0}"'.format(ftrackProjectName))
         ftrackPrjId = ftrackPrj['id']
         ftrackSite = self.core.getConfig('ftrack', 'site', configPath=self.core.prismIni)
         # ftrackUsername = self.core.getConfig('ftrack', 'ftrackusername')
-        user_security_roles = session.query('UserSecurityRole where user.username is "{0}"'.format(ftrackUser)).all()
+        user_security_roles = self.cachedQuery(session, 'UserSecurityRole where user.username is "{0}"'.format(ftrackUser), first=False)
         entity = None
         userRole = None
 
@@ -987,7 +913,6 @@ class Prism_Ftrack_Functions(object):
 
     @err_catcher(name=__name__)
     def LocalAssetsToFtrack(self, origin):
-        # add code here
         session, ftrackProjectName, ftrackUser = self.connectToFtrack(user=True)
 
         if ftrackProjectName is None:
@@ -998,11 +923,6 @@ class Prism_Ftrack_Functions(object):
         if session is None:
             return
 
-        ftrackAssets = {}
-        for x in session.query('AssetBuild where project.name is "{0}"'.format(ftrackProjectName)):
-            assetName = x['name']
-            ftrackAssets[assetName] = x
-
         assets = self.core.entities.getAssetPaths()
         localAssets = [
             [os.path.basename(x), x.replace(origin.aBasePath, '')[1:]]
@@ -1011,108 +931,22 @@ class Prism_Ftrack_Functions(object):
             not in self.core.entities.omittedEntities['asset']
         ]
 
-        createdAssets = []
-        updatedAssets = []
-        ftrackFolders = []
-
-        for ftrackFolder in session.query('Folder where project.name is "{0}"'.format(ftrackProjectName)):
-            ftrackFolders.append(ftrackFolder['name'])
-
+        assetFile = os.path.join(
+            os.path.dirname(self.core.prismIni), 'Assetinfo', 'assetInfo.yml'
+        )
+        assetInfos = self.core.getConfig(configPath=assetFile) or {}
+        descriptions = {}
         for asset in localAssets:
-            assetFile = os.path.join(
-                os.path.dirname(self.core.prismIni), 'Assetinfo', 'assetInfo.yml'
-            )
             description = '< no description >'
-            assetInfos = self.core.getConfig(configPath=assetFile)
-            if not assetInfos:
-                assetInfos = {}
-
             if asset[0] in assetInfos and 'description' in assetInfos[asset[0]]:
                 description = assetInfos[asset[0]]['description']
 
-            assetImgPath = os.path.join(
-                os.path.dirname(self.core.prismIni),
-                'Assetinfo',
-                '%s_preview.jpg' % asset[0],
-            )
-            if os.path.exists(assetImgPath):
-                assetImg = assetImgPath
-            else:
-                assetImg = ""
-
-            server_location = session.query('Location where name is "ftrack.server"').first()
-
-            if asset[0] not in ftrackAssets.keys():
-                folders = asset[1].split(os.sep)[:-1]
-                for folder in folders:
-                    if folder == folders[0]:
-                        folder_parent = session.query('Project where name is "{0}"'.format(ftrackProjectName)).first()
-                        x = folder
-                        if folder not in ftrackFolders:
-                            session.create('Folder', {'name': x, 'parent': folder_parent})
-                            session.commit()
-                    else:
-                        folder_parent = session.query('Folder where name is "{0}" and project.name is "{1}"'.format(x, ftrackProjectName)).first()
-                        x = folder
-                        if folder not in ftrackFolders:
-                            session.create('Folder', {'name': x, 'parent': folder_parent})
-                            session.commit()
-
-                asset_parent = session.query('Folder where name is "{0}" and project.name is "{1}"'.format(x, ftrackProjectName)).first()
-
-                data = {
-                    'name': asset[0],
-                    'parent': asset_parent,
-                    'description': description
-                }
-
-                if assetImg != '':
-                    thumbnail_component = session.create_component(assetImg, dict(name='thumbnail'), location=server_location)
-                    data["thumbnail"] = thumbnail_component
-
-                result = session.create("AssetBuild", data)
-                session.commit()
-                # result['custom_attributes']['localHierarchy'] = asset[1]
-                # session.commit()
-                createdAssets.append(result)
-
-            else:
-                if assetImg != '':
-                    thumbnail_component = session.create_component(assetImg, dict(name='thumbnail'), location=server_location)
-                    result = session.query('AssetBuild where name is "{0}"'.format(asset[0])).first()
-                    result['thumbnail'] = thumbnail_component
-                    result['description'] = description
-                    session.commit()
-                    createdAssets.append(result)
-
-        if len(createdAssets) > 0 or len(updatedAssets) > 0:
-            msgString = ''
-
-            createdAssetNames = []
-            for i in createdAssets:
-                createdAssetNames.append(i['name'])
-
-            createdAssetNames.sort()
-            updatedAssets.sort()
-
-            if len(createdAssetNames) > 0:
-                msgString += 'The following assets were created:\n\n'
-
-                for i in createdAssetNames:
-                    msgString += i + '\n'
-
-            if len(createdAssetNames) > 0 and len(updatedAssets) > 0:
-                msgString += '\n\n'
-
-            if len(updatedAssets) > 0:
-                msgString += 'The following assets were updated:\n\n'
+            descriptions[asset[0]] = description
 
-                for i in updatedAssets:
-                    msgString += i + '\n'
-        else:
-            msgString = 'No assets were created or updated.'
-
-        QMessageBox.information(self.core.messageParent, 'Ftrack Sync', msgString)
+        import FtrackSync
+        sync = FtrackSync.FtrackSync(self, session, ftrackProjectName)
+        result = sync.syncAssets(localAssets, descriptions=descriptions)
+        self.showSyncResult(result, 'assets')
 
     @err_catcher(name=__name__)
     def FtrackShotsToLocal(self, origin):
@@ -1247,26 +1081,11 @@ class Prism_Ftrack_Functions(object):
 
     @err_catcher(name=__name__)
     def LocalShotsToFtrack(self, origin):
-        # add code here
         session, ftrackProjectName, ftrackUser = self.connectToFtrack(user=True)
 
-        if session is None or ftrackProjectName is None or ftrackUser:
+        if session is None or ftrackProjectName is None:
             return
 
-        ftrackShots = {}
-        for x in session.query('Shot where project.name is "{0}"'.format(ftrackProjectName)):
-            if x['parent']['object_type']['name'] is None:
-                shotName = x['name']
-            else:
-                shotName = "%s%s%s" % (
-                    x['parent']['name'],
-                    self.core.sequenceSeparator,
-                    x['name'],
-                )
-            ftrackShots[shotName] = x
-
-        ftrackSequences = {x['name']: x for x in session.query('Sequence where project.name is "{0}"'.format(ftrackProjectName))}
-
         for i in os.walk(origin.sBasePath):
             foldercont = i
             break
@@ -1282,149 +1101,9 @@ class Prism_Ftrack_Functions(object):
 
                 localShots.append([x, seqName, shotName])
 
-        createdShots = []
-        updatedShots = []
-
-        server_location = session.query('Location where name is "ftrack.server"').first()
-
-        for shot in localShots:
-            shotImgPath = os.path.join(
-                os.path.dirname(self.core.prismIni),
-                'Shotinfo',
-                '%s_preview.jpg' % shot[0],
-            )
-            if os.path.exists(shotImgPath):
-                shotImg = shotImgPath
-            else:
-                shotImg = ''
-
-            shotRange = self.core.getConfig('shotRanges', shot[0], config='shotinfo')
-
-            if type(shotRange) == list and len(shotRange) == 2:
-                startFrame = shotRange[0]
-                endFrame = shotRange[1]
-            else:
-                startFrame = ''
-                endFrame = ''
-
-            shotSeq = {'name': ''}
-            sequence_parent = session.query('Project where name is "{0}"'.format(ftrackProjectName)).first()
-
-            if shot[1] != '' and shot[0] not in ftrackShots.keys():
-                if shot[1] in ftrackSequences.keys():
-                    shotSeq = ftrackSequences[shot[1]]
-                else:
-                    data = {
-                        'parent': sequence_parent,
-                        'name': shot[1],
-                    }
-
-                    shotSeq = session.create('Sequence', data)
-                    session.commit()
-                    ftrackSequences[shotSeq['name']] = shotSeq
-
-            if shot[0] not in ftrackShots.keys():
-                data = {
-                    'parent': sequence_parent,
-                    'name': shot[2],
-                }
-
-                if shotSeq['name'] != '':
-                    data['parent'] = shotSeq
-
-                result = session.create('Shot', data)
-                session.commit()
-
-                try:
-                    int(startFrame)
-                    result['custom_attributes']['fstart'] = int(startFrame)
-                    session.commit()
-                except Exception:
-                    pass
-
-                try:
-                    int(startFrame)
-                    result['custom_attributes']['fend'] = int(endFrame)
-                    session.commit()
-                except Exception:
-                    pass
-
-                result['parent'] = shotSeq['name']
-                createdShots.append(result)
-
-            else:
-                result = session.query('Shot where id is "{0}"'.format(ftrackShots[shot[0]]['id'])).first()
-
-                if len(result.keys()) > 1 or shotImg != '':
-                    thumbnail_component = session.create_component(shotImg, dict(name='thumbnail'), location=server_location)
-                    try:
-                        if ftrackShots[shot[0]]['custom_attributes']['fstart'] != int(startFrame):
-                            result['custom_attributes']['fstart'] = int(startFrame)
-                            result['thumbnail'] = thumbnail_component
-                            session.commit()
-                    except Exception:
-                        pass
-
-                    try:
-                        if ftrackShots[shot[0]]['custom_attributes']['fend'] != int(endFrame):
-                            result['custom_attributes']['fend'] = int(endFrame)
-                            session.commit()
-                    except Exception:
-                        pass
-
-                    if (
-                        [shot[1], shot[2]]
-                        not in [[x['name'], x['parent']] for x in createdShots] and shot[0] not in updatedShots and (len(result.keys()) > 1 or ftrackShots[shot[0]]['thumbnail'] is None)
-                    ):
-                        updatedShots.append(shot[0])
-
-            shotSteps = []
-            stepsPath = self.core.getEntityPath(entity='step', shot=shot[0])
-            for k in os.walk(stepsPath):
-                shotSteps = k[1]
-                break
-
-            shotTasks = {}
-            for k in shotSteps:
-                stepPath = self.core.getEntityPath(shot=shot[0], step=k)
-                for m in os.walk(stepPath):
-                    shotTasks[k] = m[1]
-                    break
-
-        if len(createdShots) > 0 or len(updatedShots) > 0:
-            msgString = ""
-
-            createdShotNames = []
-            for i in createdShots:
-                if i['parent'] == "":
-                    createdShotNames.append(i['name'])
-                else:
-                    createdShotNames.append(
-                        "%s%s%s"
-                        % (i['parent'], self.core.sequenceSeparator, i['name'])
-                    )
-
-            createdShotNames.sort()
-            updatedShots.sort()
-
-            if len(createdShotNames) > 0:
-                msgString += 'The following shots were created:\n\n'
-
-                for i in createdShotNames:
-                    msgString += i + '\n'
-
-            if len(createdShotNames) > 0 and len(updatedShots) > 0:
-                msgString += '\n\n'
-
-            if len(updatedShots) > 0:
-                msgString += 'The following shots were updated:\n\n'
-
-                for i in updatedShots:
-                    msgString += i + '\n'
-        else:
-            msgString = 'No shots were created or updated.'
-
-        QMessageBox.information(self.core.messageParent, 'Ftrack Sync', msgString)
+        import FtrackSync
+        result = FtrackSync.FtrackSync(self, session, ftrackProjectName).syncShots(localShots)
+        self.showSyncResult(result, 'shots')
     # --------------
     @err_catcher(name=__name__)
     def onProjectBrowserClose(self, origin):
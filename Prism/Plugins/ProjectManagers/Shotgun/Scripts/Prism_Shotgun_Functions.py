@@ -356,6 +356,10 @@ class Prism_Shotgun_Functions(object):
                         self.sg = shotgun_api3.Shotgun(
                             sgSite, login=sgUsername, password=sgPw
                         )
+                        self.sgConnectionArgs = [
+                            [sgSite],
+                            {"login": sgUsername, "password": sgPw},
+                        ]
                         authentificated = True
                     except:
                         pass
@@ -365,6 +369,10 @@ class Prism_Shotgun_Functions(object):
                     self.sg = shotgun_api3.Shotgun(
                         sgSite, script_name=sgScriptName, api_key=sgApiKey
                     )
+                    self.sgConnectionArgs = [
+                        [sgSite],
+                        {"script_name": sgScriptName, "api_key": sgApiKey},
+                    ]
                 except Exception as e:
                     QMessageBox.warning(
                         self.core.messageParent,
@@ -430,6 +438,17 @@ class Prism_Shotgun_Functions(object):
         if sg is None or sgPrjId is None or sgUserId:
             return
 
+        if not self.createLocalHierarchyField(sg):
+            return
+
+        aBasePath = self.core.getAssetPath()
+        assets = [[os.path.basename(x), x.replace(aBasePath, "")[1:]] for x in assets]
+
+        import ShotgunSync
+        ShotgunSync.ShotgunSync(self, sg, sgPrjId).syncAssets(assets)
+
+    @err_catcher(name=__name__)
+    def createLocalHierarchyField(self, sg):
         if "sg_localhierarchy" not in sg.schema_field_read("Asset"):
             try:
                 sg.schema_field_create("Asset", "text", "localHierarchy", "")
@@ -439,38 +458,9 @@ class Prism_Shotgun_Functions(object):
                     "Create field",
                     'Could not create field "sg_localhierarchy":\n\n%s' % e,
                 )
-                return
-
-        fields = ["id", "code", "tasks"]
-        filters = [["project", "is", {"type": "Project", "id": sgPrjId}]]
-        sgAssets = {}
-        for x in sg.find("Asset", filters, fields):
-            assetName = x["code"]
-            sgAssets[assetName] = x
-
-        fields = ["code", "short_name", "entity_type"]
-        sgSteps = {
-            x["code"]: x
-            for x in sg.find("Step", [], fields)
-            if x["entity_type"] == "Asset"
-        }
-
-        aBasePath = self.core.getAssetPath()
-        assets = [[os.path.basename(x), x.replace(aBasePath, "")[1:]] for x in assets]
+                return False
 
-        createdAssets = []
-        updatedAssets = []
-        for asset in assets:
-            if asset[0] not in sgAssets.keys():
-                data = {
-                    "project": {"type": "Project", "id": sgPrjId},
-                    "code": asset[0],
-                    "sg_status_list": "ip",
-                    "sg_localhierarchy": asset[1],
-                }
-
-                result = sg.create("Asset", data)
-                createdAssets.append(result)
+        return True
 
     @err_catcher(name=__name__)
     def createSgShots(self, shots=[]):
@@ -479,127 +469,16 @@ class Prism_Shotgun_Functions(object):
         if sg is None or sgPrjId is None or sgUserId:
             return
 
-        fields = [
-            "id",
-            "code",
-            "tasks",
-            "image",
-            "sg_cut_in",
-            "sg_cut_out",
-            "sg_sequence",
-        ]
-        filters = [["project", "is", {"type": "Project", "id": sgPrjId}]]
-        sgShots = {}
-        for x in sg.find("Shot", filters, fields):
-            if x["sg_sequence"] is None:
-                shotName = x["code"]
-            else:
-                shotName = "%s%s%s" % (
-                    x["sg_sequence"]["name"],
-                    self.core.sequenceSeparator,
-                    x["code"],
-                )
-            sgShots[shotName] = x
-
-        fields = ["code", "short_name", "entity_type"]
-        sgSteps = {
-            x["code"]: x
-            for x in sg.find("Step", [], fields)
-            if x["entity_type"] == "Shot"
-        }
-
-        fields = ["id", "code"]
-        filters = [["project", "is", {"type": "Project", "id": sgPrjId}]]
-        sgSequences = {x["code"]: x for x in sg.find("Sequence", filters, fields)}
-
-        createdShots = []
-        updatedShots = []
+        localShots = []
         for shot in shots:
             shotName, seqName = self.core.entities.splitShotname(shot)
             if seqName == "no sequence":
                 seqName = ""
 
-            shotImgPath = os.path.join(
-                os.path.dirname(self.core.prismIni), "Shotinfo", "%s_preview.jpg" % shot
-            )
-            if os.path.exists(shotImgPath):
-                shotImg = shotImgPath
-            else:
-                shotImg = ""
-
-            shotRange = self.core.getConfig("shotRanges", shot, config="shotinfo")
-
-            if type(shotRange) == list and len(shotRange) == 2:
-                startFrame = shotRange[0]
-                endFrame = shotRange[1]
-            else:
-                startFrame = ""
-                endFrame = ""
-
-            shotSeq = {"code": ""}
-            if seqName != "" and shot not in sgShots.keys():
-                if seqName in sgSequences.keys():
-                    shotSeq = sgSequences[seqName]
-                else:
-                    data = {
-                        "project": {"type": "Project", "id": sgPrjId},
-                        "code": seqName,
-                        "sg_status_list": "ip",
-                    }
-
-                    shotSeq = sg.create("Sequence", data)
-                    sgSequences[shotSeq["code"]] = shotSeq
-
-            if shot not in sgShots.keys():
-                data = {
-                    "project": {"type": "Project", "id": sgPrjId},
-                    "code": shotName,
-                    "sg_status_list": "ip",
-                    "image": shotImg,
-                }
-
-                if shotSeq["code"] != "":
-                    data["sg_sequence"] = shotSeq
-
-                try:
-                    int(startFrame)
-                    data["sg_cut_in"] = int(startFrame)
-                except:
-                    pass
-
-                try:
-                    int(startFrame)
-                    data["sg_cut_out"] = int(endFrame)
-                except:
-                    pass
-
-                result = sg.create("Shot", data)
-                result["sg_sequence"] = shotSeq["code"]
-                createdShots.append(result)
-            else:
-                data = {"image": shotImg}
-
-                try:
-                    if sgShots[shot]["sg_cut_in"] != int(startFrame):
-                        data["sg_cut_in"] = int(startFrame)
-                except:
-                    pass
+            localShots.append([shot, seqName, shotName])
 
-                try:
-                    if sgShots[shot]["sg_cut_out"] != int(endFrame):
-                        data["sg_cut_out"] = int(endFrame)
-                except:
-                    pass
-
-                if len(data.keys()) > 1 or shotImg != "":
-                    result = sg.update("Shot", sgShots[shot]["id"], data)
-                    if (
-                        [seqName, shotName]
-                        not in [[x["code"], x["sg_sequence"]] for x in createdShots]
-                        and shot not in updatedShots
-                        and (len(data.keys()) > 1 or sgShots[shot]["image"] is None)
-                    ):
-                        updatedShots.append(shot)
+        import ShotgunSync
+        ShotgunSync.ShotgunSync(self, sg, sgPrjId).syncShots(localShots)
 
     @err_catcher(name=__name__)
     def sgPublish(self, origin):
@@ -798,30 +677,8 @@ class Prism_Shotgun_Functions(object):
         if sg is None or sgPrjId is None or sgUserId:
             return
 
-        if "sg_localhierarchy" not in sg.schema_field_read("Asset"):
-            try:
-                sg.schema_field_create("Asset", "text", "localHierarchy", "")
-            except Exception as e:
-                QMessageBox.critical(
-                    self.core.messageParent,
-                    "Create field",
-                    'Could not create field "sg_localhierarchy":\n\n%s' % e,
-                )
-                return
-
-        fields = ["id", "code", "tasks"]
-        filters = [["project", "is", {"type": "Project", "id": sgPrjId}]]
-        sgAssets = {}
-        for x in sg.find("Asset", filters, fields):
-            assetName = x["code"]
-            sgAssets[assetName] = x
-
-        fields = ["code", "short_name", "entity_type"]
-        sgSteps = {
-            x["code"]: x
-            for x in sg.find("Step", [], fields)
-            if x["entity_type"] == "Asset"
-        }
+        if not self.createLocalHierarchyField(sg):
+            return
 
         assets = self.core.entities.getAssetPaths()
         localAssets = [
@@ -831,48 +688,9 @@ class Prism_Shotgun_Functions(object):
             not in self.core.entities.omittedEntities["asset"]
         ]
 
-        createdAssets = []
-        updatedAssets = []
-        for asset in localAssets:
-            if asset[0] not in sgAssets.keys():
-                data = {
-                    "project": {"type": "Project", "id": sgPrjId},
-                    "code": asset[0],
-                    "sg_status_list": "ip",
-                    "sg_localhierarchy": asset[1],
-                }
-
-                result = sg.create("Asset", data)
-                createdAssets.append(result)
-
-        if len(createdAssets) > 0 or len(updatedAssets) > 0:
-            msgString = ""
-
-            createdAssetNames = []
-            for i in createdAssets:
-                createdAssetNames.append(i["code"])
-
-            createdAssetNames.sort()
-            updatedAssets.sort()
-
-            if len(createdAssetNames) > 0:
-                msgString += "The following assets were created:\n\n"
-
-                for i in createdAssetNames:
-                    msgString += i + "\n"
-
-            if len(createdAssetNames) > 0 and len(updatedAssets) > 0:
-                msgString += "\n\n"
-
-            if len(updatedAssets) > 0:
-                msgString += "The following assets were updated:\n\n"
-
-                for i in updatedAssets:
-                    msgString += i + "\n"
-        else:
-            msgString = "No assets were created or updated."
-
-        QMessageBox.information(self.core.messageParent, "Shotgun Sync", msgString)
+        import ShotgunSync
+        result = ShotgunSync.ShotgunSync(self, sg, sgPrjId).syncAssets(localAssets)
+        self.showSyncResult(result, "assets")
 
     @err_catcher(name=__name__)
     def sgShotsToLocal(self, origin):
@@ -1046,39 +864,6 @@ class Prism_Shotgun_Functions(object):
         if sg is None or sgPrjId is None or sgUserId:
             return
 
-        fields = [
-            "id",
-            "code",
-            "tasks",
-            "image",
-            "sg_cut_in",
-            "sg_cut_out",
-            "sg_sequence",
-        ]
-        filters = [["project", "is", {"type": "Project", "id": sgPrjId}]]
-        sgShots = {}
-        for x in sg.find("Shot", filters, fields):
-            if x["sg_sequence"] is None:
-                shotName = x["code"]
-            else:
-                shotName = "%s%s%s" % (
-                    x["sg_sequence"]["name"],
-                    self.core.sequenceSeparator,
-                    x["code"],
-                )
-            sgShots[shotName] = x
-
-        fields = ["code", "short_name", "entity_type"]
-        sgSteps = {
-            x["code"]: x
-            for x in sg.find("Step", [], fields)
-            if x["entity_type"] == "Shot"
-        }
-
-        fields = ["id", "code"]
-        filters = [["project", "is", {"type": "Project", "id": sgPrjId}]]
-        sgSequences = {x["code"]: x for x in sg.find("Sequence", filters, fields)}
-
         for i in os.walk(origin.sBasePath):
             foldercont = i
             break
@@ -1094,140 +879,39 @@ class Prism_Shotgun_Functions(object):
 
                 localShots.append([x, seqName, shotName])
 
-        createdShots = []
-        updatedShots = []
-        for shot in localShots:
-            shotImgPath = os.path.join(
-                os.path.dirname(self.core.prismIni),
-                "Shotinfo",
-                "%s_preview.jpg" % shot[0],
-            )
-            if os.path.exists(shotImgPath):
-                shotImg = shotImgPath
-            else:
-                shotImg = ""
-
-            shotRange = self.core.getConfig("shotRanges", shot[0], config="shotinfo")
-
-            if type(shotRange) == list and len(shotRange) == 2:
-                startFrame = shotRange[0]
-                endFrame = shotRange[1]
-            else:
-                startFrame = ""
-                endFrame = ""
-
-            shotSeq = {"code": ""}
-            if shot[1] != "" and shot[0] not in sgShots.keys():
-                if shot[1] in sgSequences.keys():
-                    shotSeq = sgSequences[shot[1]]
-                else:
-                    data = {
-                        "project": {"type": "Project", "id": sgPrjId},
-                        "code": shot[1],
-                        "sg_status_list": "ip",
-                    }
-
-                    shotSeq = sg.create("Sequence", data)
-                    sgSequences[shotSeq["code"]] = shotSeq
-
-            if shot[0] not in sgShots.keys():
-                data = {
-                    "project": {"type": "Project", "id": sgPrjId},
-                    "code": shot[2],
-                    "sg_status_list": "ip",
-                    "image": shotImg,
-                }
-
-                if shotSeq["code"] != "":
-                    data["sg_sequence"] = shotSeq
-
-                try:
-                    int(startFrame)
-                    data["sg_cut_in"] = int(startFrame)
-                except:
-                    pass
-
-                try:
-                    int(startFrame)
-                    data["sg_cut_out"] = int(endFrame)
-                except:
-                    pass
-
-                result = sg.create("Shot", data)
-                result["sg_sequence"] = shotSeq["code"]
-                createdShots.append(result)
-            else:
-                data = {"image": shotImg}
-
-                try:
-                    if sgShots[shot[0]]["sg_cut_in"] != int(startFrame):
-                        data["sg_cut_in"] = int(startFrame)
-                except:
-                    pass
-
-                try:
-                    if sgShots[shot[0]]["sg_cut_out"] != int(endFrame):
-                        data["sg_cut_out"] = int(endFrame)
-                except:
-                    pass
+        import ShotgunSync
+        result = ShotgunSync.ShotgunSync(self, sg, sgPrjId).syncShots(localShots)
+        self.showSyncResult(result, "shots")
 
-                if len(data.keys()) > 1 or shotImg != "":
-                    try:
-                        result = sg.update("Shot", sgShots[shot[0]]["id"], data)
-                        if (
-                            [shot[1], shot[2]]
-                            not in [[x["code"], x["sg_sequence"]] for x in createdShots]
-                            and shot[0] not in updatedShots
-                            and (len(data.keys()) > 1 or sgShots[shot[0]]["image"] is None)
-                        ):
-                            updatedShots.append(shot[0])
-                    except:
-                        print("failed to update shot: %s" % shot[0])
-
-            shotSteps = []
-            stepsPath = self.core.getEntityPath(entity="step", shot=shot[0])
-            for k in os.walk(stepsPath):
-                shotSteps = k[1]
-                break
+    @err_catcher(name=__name__)
+    def showSyncResult(self, result, entityType):
+        if not result:
+            return
 
-            shotTasks = {}
-            for k in shotSteps:
-                stepPath = self.core.getEntityPath(shot=shot[0], step=k)
-                for m in os.walk(stepPath):
-                    shotTasks[k] = m[1]
-                    break
+        createdNames = sorted(result["created"])
+        updatedNames = sorted(result["updated"])
 
-        if len(createdShots) > 0 or len(updatedShots) > 0:
+        if len(createdNames) > 0 or len(updatedNames) > 0:
             msgString = ""
 
-            createdShotNames = []
-            for i in createdShots:
-                if i["sg_sequence"] == "":
-                    createdShotNames.append(i["code"])
-                else:
-                    createdShotNames.append(
-                        "%s%s%s"
-                        % (i["sg_sequence"], self.core.sequenceSeparator, i["code"])
-                    )
+            if len(createdNames) > 0:
+                msgString += "The following %s were created:\n\n" % entityType
 
-            createdShotNames.sort()
-            updatedShots.sort()
-
-            if len(createdShotNames) > 0:
-                msgString += "The following shots were created:\n\n"
-
-                for i in createdShotNames:
+                for i in createdNames:
                     msgString += i + "\n"
 
-            if len(createdShotNames) > 0 and len(updatedShots) > 0:
+            if len(createdNames) > 0 and len(updatedNames) > 0:
                 msgString += "\n\n"
 
-            if len(updatedShots) > 0:
-                msgString += "The following shots were updated:\n\n"
+            if len(updatedNames) > 0:
+                msgString += "The following %s were updated:\n\n" % entityType
 
-                for i in updatedShots:
+                for i in updatedNames:
                     msgString += i + "\n"
         else:
-            msgString = "No shots were created or updated."
+            msgString = "No %s were created or updated." % entityType
 
-        QMessageBox.information(self.core.messageParent, "Shotgun Sync", msgString)
\ No newline at end of file
+        if result["errors"]:
+            msgString += "\n\nSome requests failed:\n\n%s" % "\n".join(result["errors"])
+
+        QMessageBox.information(self.core.messageParent, "Shotgun Sync", msgString)
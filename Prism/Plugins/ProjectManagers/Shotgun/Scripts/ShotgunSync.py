@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import time
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from PrismUtils.Decorators import err_catcher_plugin as err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShotgunSync(object):
+    """
+    Syncs Prism assets and shots to Shotgun.
+
+    The local entities are compared with the Shotgun entities, which are
+    queried once with only the required fields. Creates and updates are
+    sent as sg.batch requests in chunks of "batchSize" and thumbnails are
+    uploaded in a thread pool with "maxThreads" threads.
+    """
+
+    def __init__(self, plugin, sg, sgPrjId, batchSize=100, maxThreads=4):
+        self.plugin = plugin
+        self.core = plugin.core
+        self.sg = sg
+        self.sgPrjId = sgPrjId
+        self.batchSize = batchSize
+        self.maxThreads = maxThreads
+        self.local = threading.local()
+        self.mainThread = threading.current_thread()
+        self.errors = []
+
+    @property
+    def project(self):
+        return {"type": "Project", "id": self.sgPrjId}
+
+    @err_catcher(name=__name__)
+    def getConnection(self):
+        """
+        Shotgun connections aren't thread safe, so every upload thread gets
+        its own connection.
+        """
+        connectionArgs = getattr(self.plugin, "sgConnectionArgs", None)
+        if not connectionArgs or threading.current_thread() is self.mainThread:
+            return self.sg
+
+        if not getattr(self.local, "sg", None):
+            import shotgun_api3
+            self.local.sg = shotgun_api3.Shotgun(*connectionArgs[0], **connectionArgs[1])
+
+        return self.local.sg
+
+    @err_catcher(name=__name__)
+    def sendBatch(self, requests):
+        """
+        Sends the requests in chunks and returns the results. Chunks, which
+        fail, are recorded in self.errors.
+        """
+        results = []
+        for idx in range(0, len(requests), self.batchSize):
+            chunk = requests[idx:idx + self.batchSize]
+            try:
+                results += self.sg.batch(chunk)
+            except Exception as e:
+                logger.warning("shotgun batch request failed: %s" % e)
+                self.errors.append(str(e))
+                results += [None] * len(chunk)
+
+        return results
+
+    @err_catcher(name=__name__)
+    def uploadThumbnails(self, thumbnails):
+        """
+        Uploads a list of (entityType, entityId, path) thumbnails.
+        """
+        if not thumbnails:
+            return
+
+        pool = ThreadPool(max(1, min(self.maxThreads, len(thumbnails))))
+        try:
+            pool.map(self.uploadThumbnail, thumbnails)
+        finally:
+            pool.close()
+            pool.join()
+
+    def uploadThumbnail(self, thumbnail):
+        entityType, entityId, path = thumbnail
+        try:
+            self.getConnection().upload_thumbnail(entityType, entityId, path)
+        except Exception as e:
+            logger.warning("failed to upload thumbnail %s: %s" % (path, e))
+            self.errors.append(str(e))
+
+    @err_catcher(name=__name__)
+    def getSgShots(self):
+        seqField = "sg_sequence.Sequence.code"
+        fields = ["id", "code", "image", "sg_cut_in", "sg_cut_out", seqField, "updated_at"]
+        sgShots = {}
+        for x in self.sg.find("Shot", [["project", "is", self.project]], fields):
+            if not x[seqField]:
+                shotName = x["code"]
+            else:
+                shotName = "%s%s%s" % (
+                    x[seqField],
+                    self.core.sequenceSeparator,
+                    x["code"],
+                )
+            sgShots[shotName] = x
+
+        return sgShots
+
+    @err_catcher(name=__name__)
+    def getShotPreviewPath(self, shotName):
+        return os.path.join(
+            os.path.dirname(self.core.prismIni), "Shotinfo", "%s_preview.jpg" % shotName
+        )
+
+    @err_catcher(name=__name__)
+    def needsThumbnail(self, sgEntity, path):
+        if not os.path.exists(path):
+            return False
+
+        if not sgEntity or not sgEntity.get("image"):
+            return True
+
+        updated = sgEntity.get("updated_at")
+        if not updated or not hasattr(updated, "timetuple"):
+            return True
+
+        if getattr(updated, "tzinfo", None):
+            import calendar
+            updatedTime = calendar.timegm(updated.utctimetuple())
+        else:
+            updatedTime = time.mktime(updated.timetuple())
+
+        return os.path.getmtime(path) > updatedTime
+
+    @err_catcher(name=__name__)
+    def getFrameRange(self, shotName, shotRanges):
+        shotRange = shotRanges.get(shotName)
+        if type(shotRange) == list and len(shotRange) == 2:
+            try:
+                return int(shotRange[0]), int(shotRange[1])
+            except Exception:
+                pass
+
+        return None, None
+
+    @err_catcher(name=__name__)
+    def syncShots(self, localShots):
+        """
+        Creates and updates the shots in Shotgun. "localShots" is a list of
+        [prismShotName, sequenceName, shotName]. Returns a dict with the
+        names of the created and updated shots and the duration.
+        """
+        startTime = time.time()
+        sgShots = self.getSgShots()
+        fields = ["id", "code"]
+        sgSequences = {
+            x["code"]: x for x in self.sg.find("Sequence", [["project", "is", self.project]], fields)
+        }
+        shotRanges = self.core.getConfig("shotRanges", config="shotinfo") or {}
+
+        # sequences are created first, so the shots can reference them
+        newSequences = sorted(set(
+            shot[1] for shot in localShots
+            if shot[1] and shot[0] not in sgShots and shot[1] not in sgSequences
+        ))
+        requests = [
+            {
+                "request_type": "create",
+                "entity_type": "Sequence",
+                "data": {"project": self.project, "code": seqName, "sg_status_list": "ip"},
+            }
+            for seqName in newSequences
+        ]
+        for result in self.sendBatch(requests):
+            if result:
+                sgSequences[result["code"]] = result
+
+        createRequests = []
+        createdNames = []
+        updateRequests = []
+        updatedNames = []
+        thumbnails = []
+        for prismName, seqName, shotName in localShots:
+            startFrame, endFrame = self.getFrameRange(prismName, shotRanges)
+            previewPath = self.getShotPreviewPath(prismName)
+            sgShot = sgShots.get(prismName)
+            if not sgShot:
+                data = {"project": self.project, "code": shotName, "sg_status_list": "ip"}
+                if seqName:
+                    if seqName not in sgSequences:
+                        continue
+
+                    data["sg_sequence"] = {"type": "Sequence", "id": sgSequences[seqName]["id"]}
+
+                if startFrame is not None:
+                    data["sg_cut_in"] = startFrame
+                    data["sg_cut_out"] = endFrame
+
+                createRequests.append({"request_type": "create", "entity_type": "Shot", "data": data})
+                createdNames.append(prismName)
+                continue
+
+            data = {}
+            if startFrame is not None:
+                if sgShot["sg_cut_in"] != startFrame:
+                    data["sg_cut_in"] = startFrame
+
+                if sgShot["sg_cut_out"] != endFrame:
+                    data["sg_cut_out"] = endFrame
+
+            if data:
+                updateRequests.append({
+                    "request_type": "update",
+                    "entity_type": "Shot",
+                    "entity_id": sgShot["id"],
+                    "data": data,
+                })
+                updatedNames.append(prismName)
+
+            if self.needsThumbnail(sgShot, previewPath):
+                thumbnails.append(["Shot", sgShot["id"], previewPath])
+                if prismName not in updatedNames:
+                    updatedNames.append(prismName)
+
+        created = []
+        for name, result in zip(createdNames, self.sendBatch(createRequests)):
+            if not result:
+                continue
+
+            created.append(name)
+            previewPath = self.getShotPreviewPath(name)
+            if os.path.exists(previewPath):
+                thumbnails.append(["Shot", result["id"], previewPath])
+
+        results = self.sendBatch(updateRequests)
+        failedUpdates = [req["entity_id"] for req, result in zip(updateRequests, results) if not result]
+        updated = [
+            name for name in updatedNames
+            if sgShots[name]["id"] not in failedUpdates
+        ]
+
+        self.uploadThumbnails(thumbnails)
+        duration = time.time() - startTime
+        logger.info(
+            "synced %s shots to Shotgun in %.2fs: %s created, %s updated, %s thumbnails"
+            % (len(localShots), duration, len(created), len(updated), len(thumbnails))
+        )
+        return {"created": created, "updated": updated, "duration": duration, "errors": self.errors}
+
+    @err_catcher(name=__name__)
+    def syncAssets(self, localAssets):
+        """
+        Creates the assets, which don't exist in Shotgun yet. "localAssets"
+        is a list of [assetName, assetHierarchy].
+        """
+        startTime = time.time()
+        fields = ["id", "code"]
+        sgAssets = set(
+            x["code"] for x in self.sg.find("Asset", [["project", "is", self.project]], fields)
+        )
+
+        requests = []
+        for assetName, hierarchy in localAssets:
+            if assetName in sgAssets:
+                continue
+
+            sgAssets.add(assetName)
+            data = {
+                "project": self.project,
+                "code": assetName,
+                "sg_status_list": "ip",
+                "sg_localhierarchy": hierarchy,
+            }
+            requests.append({"request_type": "create", "entity_type": "Asset", "data": data})
+
+        created = [result["code"] for result in self.sendBatch(requests) if result]
+        duration = time.time() - startTime
+        logger.info(
+            "synced %s assets to Shotgun in %.2fs: %s created"
+            % (len(localAssets), duration, len(created))
+        )
+        return {"created": created, "updated": [], "duration": duration, "errors": self.errors}
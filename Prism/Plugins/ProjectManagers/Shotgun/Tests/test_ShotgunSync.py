@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import sys
+import shutil
+import pickle
+import tempfile
+import unittest
+
+testDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(testDir, "..", "..", "..", "..", "Scripts"))
+sys.path.insert(0, os.path.join(testDir, "..", "Scripts"))
+sys.path.insert(0, os.path.join(testDir, "..", "external_modules"))
+
+from shotgun_api3.lib import mockgun
+
+import ShotgunSync
+
+
+def getField(dataType, validTypes=None):
+    return {
+        "data_type": {"value": dataType},
+        "properties": {
+            "default_value": {"value": None},
+            "valid_types": {"value": validTypes or []},
+        },
+    }
+
+
+def getSchema():
+    project = getField("entity", ["Project"])
+    status = getField("status_list")
+    return {
+        "EventLogEntry": {
+            "event_type": getField("text"),
+            "description": getField("text"),
+        },
+        "Project": {
+            "name": getField("text"),
+        },
+        "Sequence": {
+            "code": getField("text"),
+            "project": project,
+            "sg_status_list": status,
+        },
+        "Shot": {
+            "code": getField("text"),
+            "project": project,
+            "sg_sequence": getField("entity", ["Sequence"]),
+            "sg_cut_in": getField("number"),
+            "sg_cut_out": getField("number"),
+            "sg_status_list": status,
+            "image": getField("image"),
+            "updated_at": getField("date_time"),
+        },
+        "Asset": {
+            "code": getField("text"),
+            "project": project,
+            "sg_status_list": status,
+            "sg_localhierarchy": getField("text"),
+        },
+    }
+
+
+class FakeCore(object):
+    def __init__(self, prismIni):
+        self.prismIni = prismIni
+        self.sequenceSeparator = "-"
+        self.shotRanges = {}
+
+    def getConfig(self, cat, config=None):
+        return self.shotRanges
+
+
+class FakePlugin(object):
+    def __init__(self, core):
+        self.core = core
+
+
+class RecordingMockgun(mockgun.Shotgun):
+    def __init__(self, *args, **kwargs):
+        self.batches = []
+        mockgun.Shotgun.__init__(self, *args, **kwargs)
+
+    def batch(self, requests):
+        self.batches.append(len(requests))
+        return mockgun.Shotgun.batch(self, requests)
+
+
+class TestShotgunSync(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schemaDir = tempfile.mkdtemp()
+        schemaPath = os.path.join(cls.schemaDir, "schema.pickle")
+        schemaEntityPath = os.path.join(cls.schemaDir, "schema_entity.pickle")
+        schema = getSchema()
+        with open(schemaPath, "wb") as f:
+            pickle.dump(schema, f, protocol=2)
+
+        with open(schemaEntityPath, "wb") as f:
+            pickle.dump(dict((x, {}) for x in schema), f, protocol=2)
+
+        mockgun.Shotgun.set_schema_paths(schemaPath, schemaEntityPath)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.schemaDir, ignore_errors=True)
+
+    def setUp(self):
+        self.projectDir = tempfile.mkdtemp()
+        self.core = FakeCore(os.path.join(self.projectDir, "00_Pipeline", "pipeline.yml"))
+        self.sg = RecordingMockgun("https://mockgun.example.com")
+        self.sgPrjId = self.sg.create("Project", {"name": "test"})["id"]
+
+    def tearDown(self):
+        shutil.rmtree(self.projectDir, ignore_errors=True)
+
+    def getSync(self, batchSize=100):
+        return ShotgunSync.ShotgunSync(FakePlugin(self.core), self.sg, self.sgPrjId, batchSize=batchSize)
+
+    def getSgShots(self):
+        fields = ["code", "sg_cut_in", "sg_cut_out", "sg_sequence.Sequence.code"]
+        shots = self.sg.find("Shot", [], fields)
+        return dict((x["code"], x) for x in shots)
+
+    def test_syncShotsCreates(self):
+        self.core.shotRanges = {"sq01-sh010": [1001, 1050]}
+        localShots = [
+            ["sq01-sh010", "sq01", "sh010"],
+            ["sq01-sh020", "sq01", "sh020"],
+            ["sq02-sh010", "sq02", "sh010"],
+            ["intro", None, "intro"],
+        ]
+        result = self.getSync().syncShots(localShots)
+
+        self.assertEqual(result["created"], [x[0] for x in localShots])
+        self.assertEqual(result["updated"], [])
+        self.assertEqual(result["errors"], [])
+
+        sequences = sorted(x["code"] for x in self.sg.find("Sequence", [], ["code"]))
+        self.assertEqual(sequences, ["sq01", "sq02"])
+
+        shots = self.sg.find("Shot", [], ["code", "sg_cut_in", "sg_cut_out", "sg_sequence.Sequence.code"])
+        names = sorted(
+            (x["sg_sequence.Sequence.code"] or "", x["code"], x["sg_cut_in"], x["sg_cut_out"])
+            for x in shots
+        )
+        self.assertEqual(names, [
+            ("", "intro", None, None),
+            ("sq01", "sh010", 1001, 1050),
+            ("sq01", "sh020", None, None),
+            ("sq02", "sh010", None, None),
+        ])
+
+    def test_syncShotsUpdates(self):
+        localShots = [["sq01-sh010", "sq01", "sh010"], ["sq01-sh020", "sq01", "sh020"]]
+        self.core.shotRanges = {"sq01-sh010": [1001, 1050], "sq01-sh020": [1001, 1020]}
+        self.getSync().syncShots(localShots)
+
+        self.core.shotRanges["sq01-sh010"] = [1001, 1080]
+        result = self.getSync().syncShots(localShots)
+
+        self.assertEqual(result["created"], [])
+        self.assertEqual(result["updated"], ["sq01-sh010"])
+        self.assertEqual(self.getSgShots()["sh010"]["sg_cut_out"], 1080)
+        self.assertEqual(self.getSgShots()["sh020"]["sg_cut_out"], 1020)
+
+    def test_syncShotsNoop(self):
+        localShots = [["sq01-sh010", "sq01", "sh010"], ["sq01-sh020", "sq01", "sh020"]]
+        self.core.shotRanges = {"sq01-sh010": [1001, 1050]}
+        self.getSync().syncShots(localShots)
+
+        self.sg.batches = []
+        result = self.getSync().syncShots(localShots)
+        self.assertEqual(result["created"], [])
+        self.assertEqual(result["updated"], [])
+        self.assertEqual(self.sg.batches, [])
+        self.assertEqual(len(self.sg.find("Shot", [], ["code"])), 2)
+        self.assertEqual(len(self.sg.find("Sequence", [], ["code"])), 1)
+
+    def test_syncShotsChunks(self):
+        localShots = [["sq01-sh%03d" % idx, "sq01", "sh%03d" % idx] for idx in range(5)]
+        result = self.getSync(batchSize=2).syncShots(localShots)
+
+        # one request for the sequence, then the shots in chunks of two
+        self.assertEqual(self.sg.batches, [1, 2, 2, 1])
+        self.assertEqual(len(result["created"]), 5)
+        self.assertEqual(len(self.getSgShots()), 5)
+
+    def test_syncShotsFailedChunk(self):
+        localShots = [["sh%03d" % idx, None, "sh%03d" % idx] for idx in range(4)]
+        batch = self.sg.batch
+        calls = []
+
+        def failSecondChunk(requests):
+            calls.append(len(requests))
+            if len(calls) == 2:
+                raise Exception("chunk failed")
+
+            return batch(requests)
+
+        self.sg.batch = failSecondChunk
+        result = self.getSync(batchSize=2).syncShots(localShots)
+        self.assertEqual(result["created"], ["sh000", "sh001"])
+        self.assertEqual(result["errors"], ["chunk failed"])
+
+    def test_syncAssets(self):
+        localAssets = [["chair", "props/chair"], ["table", "props/table"]]
+        result = self.getSync().syncAssets(localAssets)
+        self.assertEqual(sorted(result["created"]), ["chair", "table"])
+
+        assets = self.sg.find("Asset", [], ["code", "sg_localhierarchy"])
+        self.assertEqual(
+            sorted((x["code"], x["sg_localhierarchy"]) for x in assets),
+            [("chair", "props/chair"), ("table", "props/table")],
+        )
+
+    def test_syncAssetsNoop(self):
+        localAssets = [["chair", "props/chair"]]
+        self.getSync().syncAssets(localAssets)
+
+        self.sg.batches = []
+        result = self.getSync().syncAssets(localAssets + [["chair", "props/chair"]])
+        self.assertEqual(result["created"], [])
+        self.assertEqual(self.sg.batches, [])
+        self.assertEqual(len(self.sg.find("Asset", [], ["code"])), 1)
+
+    def test_syncAssetsChunks(self):
+        localAssets = [["asset%s" % idx, "props/asset%s" % idx] for idx in range(7)]
+        result = self.getSync(batchSize=3).syncAssets(localAssets)
+        self.assertEqual(self.sg.batches, [3, 3, 1])
+        self.assertEqual(len(result["created"]), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+import threading
+
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
+
+try:
+    from urllib.parse import urlparse, urlencode
+except ImportError:
+    from urlparse import urlparse
+    from urllib import urlencode
+
+from PrismUtils.Decorators import err_catcher_plugin as err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineTransport(object):
+    """
+    Base class of the transports, which are used to communicate with
+    Deadline. Group, pool and worker lists are cached for "cacheTimeout"
+    seconds.
+    """
+
+    def __init__(self, plugin, cacheTimeout=300):
+        self.plugin = plugin
+        self.core = plugin.core
+        self.cacheTimeout = cacheTimeout
+        self.cache = {}
+
+    @err_catcher(name=__name__)
+    def getCached(self, key, getter):
+        if key in self.cache:
+            cacheTime, value = self.cache[key]
+            if (time.time() - cacheTime) < self.cacheTimeout:
+                return value
+
+        value = getter()
+        if value is not None:
+            self.cache[key] = [time.time(), value]
+
+        return value or []
+
+    @err_catcher(name=__name__)
+    def clearCache(self):
+        self.cache = {}
+
+    @err_catcher(name=__name__)
+    def getGroups(self):
+        return self.getCached("groups", lambda: self.getList("groups"))
+
+    @err_catcher(name=__name__)
+    def getPools(self):
+        return self.getCached("pools", lambda: self.getList("pools"))
+
+    @err_catcher(name=__name__)
+    def getWorkers(self):
+        return self.getCached("workers", lambda: self.getList("workers"))
+
+    @err_catcher(name=__name__)
+    def formatResult(self, jobId):
+        if jobId:
+            return "Result=Success\nJobID=%s\n" % jobId
+        else:
+            return "Result=Failed\n"
+
+    @err_catcher(name=__name__)
+    def submitJobs(self, jobs):
+        """
+        Submits a list of jobs. Each job is a dict with the keys "jobInfos",
+        "pluginInfos", "auxFiles" and optionally "dependsOn", which is a list
+        of indices of earlier jobs in the list. Returns a list of submit
+        results in the format of deadlinecommand.
+        """
+        results = []
+        jobIds = []
+        for job in jobs:
+            if any(not jobIds[idx] for idx in job.get("dependsOn", [])):
+                # a job is never submitted without the jobs it depends on
+                results.append(self.formatResult(None))
+                jobIds.append(None)
+                continue
+
+            jobInfos = self.addJobDependencies(job, jobIds)
+            result = self.submitJob(jobInfos, job["pluginInfos"], job.get("auxFiles", []))
+            results.append(result)
+            jobIds.append(self.plugin.getJobIdFromSubmitResult(result))
+
+        return results
+
+    @err_catcher(name=__name__)
+    def addJobDependencies(self, job, jobIds):
+        jobInfos = dict(job["jobInfos"])
+        depIds = [jobIds[idx] for idx in job.get("dependsOn", []) if jobIds[idx]]
+        if depIds:
+            existing = [x for x in str(jobInfos.get("JobDependencies", "")).split(",") if x]
+            jobInfos["JobDependencies"] = ",".join(existing + depIds)
+
+        return jobInfos
+
+
+class DeadlineCLITransport(DeadlineTransport):
+    """
+    Uses deadlinecommand. Every call starts a new process, so multiple jobs
+    are submitted with a single "-SubmitMultipleJobs" call where possible.
+    """
+
+    @err_catcher(name=__name__)
+    def isAvailable(self):
+        return bool(os.getenv("DEADLINE_PATH"))
+
+    @err_catcher(name=__name__)
+    def command(self, arguments):
+        output = self.plugin.deadlineCommand(arguments, background=False)
+        if output is False or output is None:
+            return
+
+        if not isinstance(output, str):
+            output = output.decode("utf-8")
+
+        return output
+
+    @err_catcher(name=__name__)
+    def getList(self, listType):
+        flags = {"groups": "-groups", "pools": "-pools", "workers": "-GetSlaveNames"}
+        output = self.command([flags[listType]])
+        if output is None or "Error" in output:
+            return
+
+        return [x for x in output.splitlines() if x]
+
+    @err_catcher(name=__name__)
+    def getHomeDirectory(self):
+        output = self.command(["-GetCurrentUserHomeDirectory"])
+        if not output:
+            return
+
+        return output.replace("\r", "").replace("\n", "")
+
+    @err_catcher(name=__name__)
+    def writeInfoFile(self, path, infos):
+        with open(path, "w") as fileHandle:
+            for i in infos:
+                fileHandle.write("%s=%s\n" % (i, infos[i]))
+
+    @err_catcher(name=__name__)
+    def submitJob(self, jobInfos, pluginInfos, auxFiles, jobInfoFile=None, pluginInfoFile=None):
+        tmpDir = None
+        if not jobInfoFile or not pluginInfoFile:
+            tmpDir = tempfile.mkdtemp(prefix="prism_deadline_")
+            jobInfoFile = os.path.join(tmpDir, "job_info.job")
+            pluginInfoFile = os.path.join(tmpDir, "plugin_info.job")
+
+        try:
+            self.writeInfoFile(jobInfoFile, jobInfos)
+            self.writeInfoFile(pluginInfoFile, pluginInfos)
+            return self.command([jobInfoFile, pluginInfoFile] + list(auxFiles))
+        finally:
+            if tmpDir:
+                shutil.rmtree(tmpDir, ignore_errors=True)
+
+    @err_catcher(name=__name__)
+    def submitJobs(self, jobs):
+        """
+        Jobs without dependencies or where every job depends only on the
+        previous job are submitted with one process. Other dependency
+        graphs need the ids of the earlier jobs and are submitted one by one.
+        """
+        if len(jobs) < 2:
+            return super(DeadlineCLITransport, self).submitJobs(jobs)
+
+        deps = [job.get("dependsOn", []) for job in jobs]
+        independent = not any(deps)
+        chained = all(dep == [idx - 1] for idx, dep in enumerate(deps) if idx) and not deps[0]
+        if not independent and not chained:
+            return super(DeadlineCLITransport, self).submitJobs(jobs)
+
+        tmpDir = tempfile.mkdtemp(prefix="prism_deadline_")
+        try:
+            args = ["-SubmitMultipleJobs"]
+            if chained:
+                args.append("-dependent")
+
+            for idx, job in enumerate(jobs):
+                jobInfoFile = os.path.join(tmpDir, "job_info_%s.job" % idx)
+                pluginInfoFile = os.path.join(tmpDir, "plugin_info_%s.job" % idx)
+                self.writeInfoFile(jobInfoFile, job["jobInfos"])
+                self.writeInfoFile(pluginInfoFile, job["pluginInfos"])
+                args += ["-job", jobInfoFile, pluginInfoFile] + list(job.get("auxFiles", []))
+
+            output = self.command(args) or ""
+        finally:
+            shutil.rmtree(tmpDir, ignore_errors=True)
+
+        jobIds = [
+            line.split("=", 1)[1].strip()
+            for line in output.splitlines()
+            if line.startswith("JobID")
+        ]
+        if len(jobIds) != len(jobs):
+            logger.warning("unexpected output of deadlinecommand: %s" % output)
+            jobIds += [None] * (len(jobs) - len(jobIds))
+
+        return [self.formatResult(jobId) for jobId in jobIds]
+
+
+class DeadlineWebServiceTransport(DeadlineTransport):
+    """
+    Uses the REST API of the Deadline Web Service and keeps the HTTP
+    connection open between requests. Auxiliary files are passed as paths,
+    so they have to be reachable from the Web Service.
+    """
+
+    def __init__(self, plugin, url, cacheTimeout=300, timeout=30):
+        super(DeadlineWebServiceTransport, self).__init__(plugin, cacheTimeout=cacheTimeout)
+        if "://" not in url:
+            url = "http://" + url
+
+        parsed = urlparse(url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port or 8082
+        self.timeout = timeout
+        self.connection = None
+        self.lock = threading.Lock()
+
+    @err_catcher(name=__name__)
+    def isAvailable(self):
+        return self.request("GET", "/api/groups") is not None
+
+    @err_catcher(name=__name__)
+    def getConnection(self):
+        if self.connection is None:
+            if self.scheme == "https":
+                connectionClass = httplib.HTTPSConnection
+            else:
+                connectionClass = httplib.HTTPConnection
+
+            self.connection = connectionClass(self.host, self.port, timeout=self.timeout)
+
+        return self.connection
+
+    @err_catcher(name=__name__)
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    @err_catcher(name=__name__)
+    def request(self, method, path, data=None):
+        """
+        Sends a request over the persistent connection and returns the
+        decoded JSON response. A dropped connection is reopened once.
+        """
+        body = None
+        headers = {}
+        if data is not None:
+            body = json.dumps(data)
+            headers["Content-Type"] = "application/json"
+
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    connection = self.getConnection()
+                    connection.request(method, path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    content = response.read()
+                    break
+                except (httplib.HTTPException, IOError) as e:
+                    self.close()
+                    if attempt:
+                        logger.warning("Deadline Web Service request failed: %s" % e)
+                        return
+
+        if response.status >= 400:
+            logger.warning(
+                "Deadline Web Service returned %s for %s %s: %s"
+                % (response.status, method, path, content)
+            )
+            return
+
+        if not isinstance(content, str):
+            content = content.decode("utf-8")
+
+        try:
+            return json.loads(content)
+        except ValueError:
+            return content
+
+    @err_catcher(name=__name__)
+    def getList(self, listType):
+        paths = {
+            "groups": "/api/groups",
+            "pools": "/api/pools",
+            "workers": "/api/slaves?" + urlencode({"NamesOnly": "true"}),
+        }
+        return self.request("GET", paths[listType])
+
+    @err_catcher(name=__name__)
+    def getHomeDirectory(self):
+        return
+
+    @err_catcher(name=__name__)
+    def submitJob(self, jobInfos, pluginInfos, auxFiles, jobInfoFile=None, pluginInfoFile=None):
+        data = {
+            "JobInfo": {str(k): str(v) for k, v in jobInfos.items()},
+            "PluginInfo": {str(k): str(v) for k, v in pluginInfos.items()},
+            "AuxFiles": list(auxFiles),
+            "IdOnly": True,
+        }
+        result = self.request("POST", "/api/jobs", data)
+        jobId = result.get("_id") if isinstance(result, dict) else None
+        return self.formatResult(jobId)
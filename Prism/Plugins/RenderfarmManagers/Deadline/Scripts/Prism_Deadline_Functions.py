@@ -33,8 +33,11 @@
 
 import os
 import sys
+import shutil
 import subprocess
+import tempfile
 import time
+import logging
 
 try:
     import hou
@@ -52,10 +55,14 @@ except:
 from PrismUtils.Decorators import err_catcher as err_catcher
 
 
+logger = logging.getLogger(__name__)
+
+
 class Prism_Deadline_Functions(object):
     def __init__(self, core, plugin):
         self.core = core
         self.plugin = plugin
+        self.publishBatch = None
 
     @err_catcher(name=__name__)
     def isActive(self):
@@ -78,7 +85,9 @@ class Prism_Deadline_Functions(object):
         creationflags = 0
         if background:
             startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess._subprocess.STARTF_USESHOWWINDOW
+            startupinfo.dwFlags |= getattr(
+                subprocess, "STARTF_USESHOWWINDOW", None
+            ) or subprocess._subprocess.STARTF_USESHOWWINDOW
         else:
             # still show top-level windows, but don't show a console window
             CREATE_NO_WINDOW = 0x08000000  # MSDN process creation flag
@@ -127,45 +136,70 @@ class Prism_Deadline_Functions(object):
         return deadlineCommand
 
     @err_catcher(name=__name__)
-    def getDeadlineGroups(self, subdir=None):
-        if not hasattr(self, "deadlineGroups"):
-            if sys.version[0] == "3":
-                deadlineCommand = self.blenderDeadlineCommand()
-
-                if deadlineCommand is None:
-                    return []
-
-                startupinfo = None
-
-                args = [deadlineCommand, "-groups"]
-                if subdir != None and subdir != "":
-                    args.append(subdir)
+    def getTransport(self):
+        """
+        Returns the transport, which is used to communicate with Deadline.
+        The Deadline Web Service is used when its url is set in the project
+        config or in the PRISM_DEADLINE_WEBSERVICE environment variable.
+        Otherwise deadlinecommand is used.
+        """
+        url = os.getenv("PRISM_DEADLINE_WEBSERVICE") or self.core.getConfig(
+            "deadline", "webserviceurl", configPath=self.core.prismIni
+        )
+        key = url or "cli"
+        if getattr(self, "transport", None) and self.transportKey == key:
+            return self.transport
 
-                # Specifying PIPE for all handles to workaround a Python bug on Windows. The unused handles are then closed immediatley afterwards.
-                proc = subprocess.Popen(
-                    args,
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    startupinfo=startupinfo,
-                )
+        import DeadlineTransport
 
-                proc.stdin.close()
-                proc.stderr.close()
+        if url:
+            self.transport = DeadlineTransport.DeadlineWebServiceTransport(self, url)
+        else:
+            self.transport = DeadlineTransport.DeadlineCLITransport(self)
 
-                output = proc.stdout.read()
+        self.transportKey = key
+        return self.transport
 
-                output = output.decode("utf_8")
+    @err_catcher(name=__name__)
+    def getDeadlineHomeDir(self):
+        """
+        The home directory contains the temp folder for the job and
+        dependency files. It is queried once per session.
+        """
+        if not getattr(self, "deadlineHomeDir", None):
+            homeDir = self.getTransport().getHomeDirectory()
+            if not homeDir and self.transportKey != "cli":
+                if os.getenv("DEADLINE_PATH"):
+                    import DeadlineTransport
+                    homeDir = DeadlineTransport.DeadlineCLITransport(self).getHomeDirectory()
+
+                homeDir = homeDir or os.path.join(tempfile.gettempdir(), "PrismDeadline")
+
+            if not homeDir:
+                return
+
+            tempDir = os.path.join(homeDir, "temp")
+            if not os.path.exists(tempDir):
+                try:
+                    os.makedirs(tempDir)
+                except Exception:
+                    pass
+
+            self.deadlineHomeDir = homeDir
+
+        return self.deadlineHomeDir
 
-            else:
-                output = self.deadlineCommand(["-groups"])
+    @err_catcher(name=__name__)
+    def getDeadlineGroups(self):
+        return self.getTransport().getGroups()
 
-            if output != False and not "Error" in output:
-                self.deadlineGroups = output.splitlines()
-            else:
-                self.deadlineGroups = []
+    @err_catcher(name=__name__)
+    def getDeadlinePools(self):
+        return self.getTransport().getPools()
 
-        return self.deadlineGroups
+    @err_catcher(name=__name__)
+    def getDeadlineWorkers(self):
+        return self.getTransport().getWorkers()
 
     @err_catcher(name=__name__)
     def sm_dep_startup(self, origin):
@@ -434,15 +468,10 @@ class Prism_Deadline_Functions(object):
             if jobOutputFile.startswith("\\") and not jobOutputFile.startswith("\\\\"):
                 jobOutputFile = "\\" + jobOutputFile
 
-        homeDir = (
-            self.deadlineCommand(["-GetCurrentUserHomeDirectory"], background=False)
-        ).decode("utf-8")
-
-        if homeDir is False:
+        homeDir = self.getDeadlineHomeDir()
+        if homeDir is None:
             return "Execute Canceled: Deadline is not installed"
 
-        homeDir = homeDir.replace("\r", "").replace("\n", "")
-
         dependencies = parent.dependencies
 
         if hasattr(origin, "w_renderNSIs") and not origin.w_renderNSIs.isHidden() and origin.chb_rjNSIs.isChecked():
@@ -550,14 +579,7 @@ class Prism_Deadline_Functions(object):
         self.core.appPlugin.sm_render_getDeadlineParams(origin, dlParams, homeDir)
 
         if len(dependencies) > 0:
-            dependencyFile = os.path.join(homeDir, "temp", "dependencies.txt")
-            fileHandle = open(dependencyFile, "w")
-
-            for i in dependencies:
-                fileHandle.write(str(i[0]) + "\n")
-                fileHandle.write(str(i[1]) + "\n")
-
-            fileHandle.close()
+            dependencyFile = self.writeDependencyFile(homeDir, dependencies)
 
         arguments = []
         arguments.append(dlParams["jobInfoFile"])
@@ -568,7 +590,9 @@ class Prism_Deadline_Functions(object):
         if "dependencyFile" in locals():
             arguments.append(dependencyFile)
 
-        result = self.deadlineSubmitJob(jobInfos, pluginInfos, arguments)
+        # the render and cleanup jobs of NSI and Redshift archives are
+        # submitted together with the export job in one batch
+        jobs = [{"jobInfos": jobInfos, "pluginInfos": pluginInfos, "arguments": arguments}]
         if renderNSIs:
             code = origin.curRenderer.getNsiRenderScript()
             nsiDep = [[0, jobOutputFile]]
@@ -576,7 +600,7 @@ class Prism_Deadline_Functions(object):
             environment = [["DELIGHT", dlpath]]
             args = [jobOutputFile, jobOutputFileOrig]
 
-            result = self.submitPythonJob(
+            renderJob = self.getPythonJob(
                 code=code,
                 jobName=jobName + "_render",
                 jobOutput=jobOutputFileOrig,
@@ -593,6 +617,8 @@ class Prism_Deadline_Functions(object):
                 environment=environment,
                 args=args,
             )
+            renderJob["dependsOn"] = [0]
+            jobs.append(renderJob)
 
             if self.core.getConfig("render", "3DelightCleanupJob", dft=True, config="project"):
                 cleanupScript = origin.curRenderer.getCleanupScript()
@@ -600,10 +626,7 @@ class Prism_Deadline_Functions(object):
                 cleanupScript = None
 
             if cleanupScript:
-                arguments = [args[0]]
-                depId = self.getJobIdFromSubmitResult(result)
-                cleanupDep = [depId]
-                self.submitCleanupScript(
+                cleanupJob = self.getCleanupJob(
                     jobName=jobName,
                     jobGroup=jobGroup,
                     jobPrio=jobPrio,
@@ -611,11 +634,12 @@ class Prism_Deadline_Functions(object):
                     jobMachineLimit=jobMachineLimit,
                     jobBatchName=jobBatchName,
                     suspended=suspended,
-                    jobDependencies=cleanupDep,
                     environment=environment,
                     cleanupScript=cleanupScript,
-                    arguments=arguments,
+                    arguments=[args[0]],
                 )
+                cleanupJob["dependsOn"] = [1]
+                jobs.append(cleanupJob)
 
         elif renderRS:
             rsDep = [[0, jobOutputFile]]
@@ -627,7 +651,7 @@ class Prism_Deadline_Functions(object):
             else:
                 cleanupScript = None
 
-            self.submitRedshiftJob(
+            rsJobs = self.getRedshiftJobs(
                 jobName=jobName + "_render",
                 jobOutput=jobOutputFileOrig,
                 jobPrio=jobPrio,
@@ -646,11 +670,160 @@ class Prism_Deadline_Functions(object):
                 args=args,
                 cleanupScript=cleanupScript,
             )
+            for job in rsJobs:
+                job["dependsOn"] = [idx + 1 for idx in job.get("dependsOn", [])] or [0]
+
+            jobs += rsJobs
+
+        if self.publishBatch is not None:
+            return self.queuePublishJobs(origin, jobs, homeDir)
+
+        results = self.deadlineSubmitJobs(jobs)
+        if renderNSIs:
+            return results[1]
 
-        return result
+        return results[0]
 
     @err_catcher(name=__name__)
-    def submitPythonJob(
+    def sm_publish_start(self, origin):
+        """
+        The render states of a publish queue their jobs, which get submitted
+        together in sm_publish_submitJobs, when the publish pauses or ends.
+        States, which are executed on their own, are submitted directly.
+        """
+        if self.publishBatch:
+            logger.warning(
+                "discarding %s Deadline jobs of an unfinished publish"
+                % len(self.publishBatch["jobs"])
+            )
+            self.removeBatchFolders(self.publishBatch["jobs"])
+
+        batchSubmissions = self.core.getConfig(
+            "deadline", "batchSubmissions", dft=True, config="project"
+        )
+        if origin.publishType == "publish" and batchSubmissions:
+            self.publishBatch = {"jobs": [], "states": []}
+        else:
+            self.publishBatch = None
+
+    @err_catcher(name=__name__)
+    def queuePublishJobs(self, origin, jobs, homeDir):
+        """
+        Adds the jobs of a state to the publish batch. The indices in
+        "dependsOn" are offset to the position of the jobs in the batch.
+        The scenefiles are copied, because the scene gets saved again by the
+        following states before the batch is submitted.
+        """
+        offset = len(self.publishBatch["jobs"])
+        sceneFiles = [os.path.normpath(x) for x in self.core.appPlugin.getCurrentSceneFiles(origin)]
+        snapshotFolder = tempfile.mkdtemp(prefix="scene_", dir=os.path.join(homeDir, "temp"))
+        snapshots = {}
+        for job in jobs:
+            job["dependsOn"] = [idx + offset for idx in job.get("dependsOn", [])]
+            job["tempFolders"] = [snapshotFolder]
+            arguments = job["arguments"]
+            for idx in range(2, len(arguments)):
+                path = os.path.normpath(arguments[idx])
+                if path not in sceneFiles:
+                    continue
+
+                if path not in snapshots:
+                    snapshots[path] = os.path.join(snapshotFolder, os.path.basename(path))
+                    shutil.copy2(path, snapshots[path])
+
+                arguments[idx] = snapshots[path]
+
+        self.publishBatch["jobs"] += jobs
+        self.publishBatch["states"].append(
+            {"state": origin, "jobs": list(range(offset, offset + len(jobs)))}
+        )
+        logger.debug("queued %s Deadline jobs of state %s" % (len(jobs), origin.state.text(0)))
+        return "Result=Success\nQueued=%s\n" % len(jobs)
+
+    @err_catcher(name=__name__)
+    def sm_publish_submitJobs(self, origin):
+        """
+        Submits the queued jobs of the publish in one batch and adds an error
+        to the publish result for every state with jobs, which couldn't be
+        submitted. Batching stays enabled, if the publish is only paused.
+        """
+        batch = self.publishBatch
+        if batch is None:
+            return
+
+        if not origin.publishPaused:
+            self.publishBatch = None
+        else:
+            self.publishBatch = {"jobs": [], "states": []}
+
+        if not batch["jobs"]:
+            return
+
+        results = self.deadlineSubmitJobs(batch["jobs"])
+        logger.debug(
+            "submitted %s Deadline jobs of %s states in one batch"
+            % (len(batch["jobs"]), len(batch["states"]))
+        )
+        for stateData in batch["states"]:
+            failed = [idx for idx in stateData["jobs"] if "Result=Success" not in str(results[idx])]
+            if not failed:
+                continue
+
+            state = stateData["state"]
+            origin.publishResult.append({
+                "state": state,
+                "result": [
+                    "%s - error - %s of %s Deadline jobs couldn't be submitted: %s"
+                    % (state.state.text(0), len(failed), len(stateData["jobs"]), str(results[failed[0]]).strip())
+                ],
+            })
+
+    @err_catcher(name=__name__)
+    def removeBatchFolders(self, jobs):
+        for job in jobs:
+            for folder in job.get("tempFolders", []):
+                shutil.rmtree(folder, ignore_errors=True)
+
+            self.removeDependencyFiles(job["arguments"][2:])
+
+    @err_catcher(name=__name__)
+    def writeDependencyFile(self, homeDir, dependencies):
+        """
+        Writes the frame dependencies of a job. The dependency script of the
+        job reads them from "dependencies.txt" in the auxiliary folder, so
+        every file gets its own folder, which is removed after the submission.
+        """
+        depFolder = tempfile.mkdtemp(prefix="dependencies_", dir=os.path.join(homeDir, "temp"))
+        dependencyFile = os.path.join(depFolder, "dependencies.txt")
+        with open(dependencyFile, "w") as fileHandle:
+            for i in dependencies:
+                fileHandle.write(str(i[0]) + "\n")
+                fileHandle.write(str(i[1]) + "\n")
+
+        return dependencyFile
+
+    @err_catcher(name=__name__)
+    def removeDependencyFiles(self, files):
+        for path in files:
+            folder = os.path.dirname(path)
+            if os.path.basename(path) != "dependencies.txt":
+                continue
+
+            if not os.path.basename(folder).startswith("dependencies_"):
+                continue
+
+            shutil.rmtree(folder, ignore_errors=True)
+
+    @err_catcher(name=__name__)
+    def submitPythonJob(self, **kwargs):
+        job = self.getPythonJob(**kwargs)
+        if job is None:
+            return "Execute Canceled: Deadline is not installed"
+
+        return self.deadlineSubmitJobs([job])[0]
+
+    @err_catcher(name=__name__)
+    def getPythonJob(
             self,
             code="",
             version="3.7",
@@ -671,14 +844,9 @@ class Prism_Deadline_Functions(object):
             environment=None,
             args=None,
     ):
-        homeDir = (
-            self.deadlineCommand(["-GetCurrentUserHomeDirectory"], background=False)
-        ).decode("utf-8")
-
-        if homeDir is False:
-            return "Execute Canceled: Deadline is not installed"
-
-        homeDir = homeDir.replace("\r", "").replace("\n", "")
+        homeDir = self.getDeadlineHomeDir()
+        if homeDir is None:
+            return
 
         if not jobName:
             jobName = os.path.splitext(self.core.getCurrentFileName(path=False))[0].strip("_")
@@ -687,7 +855,7 @@ class Prism_Deadline_Functions(object):
         with open(scriptFile, "w") as f:
             f.write(code)
 
-        environment = environment or []
+        environment = list(environment or [])
         environment.insert(0, ["prism_project", self.core.prismIni.replace("\\", "/")])
 
         # Create submission info file
@@ -743,14 +911,7 @@ class Prism_Deadline_Functions(object):
         }
 
         if dependencies:
-            dependencyFile = os.path.join(homeDir, "temp", "dependencies.txt")
-            fileHandle = open(dependencyFile, "w")
-
-            for i in dependencies:
-                fileHandle.write(str(i[0]) + "\n")
-                fileHandle.write(str(i[1]) + "\n")
-
-            fileHandle.close()
+            dependencyFile = self.writeDependencyFile(homeDir, dependencies)
 
         arguments = []
         arguments.append(dlParams["jobInfoFile"])
@@ -762,11 +923,18 @@ class Prism_Deadline_Functions(object):
         if "dependencyFile" in locals():
             arguments.append(dependencyFile)
 
-        result = self.deadlineSubmitJob(jobInfos, pluginInfos, arguments)
-        return result
+        return {"jobInfos": jobInfos, "pluginInfos": pluginInfos, "arguments": arguments}
+
+    @err_catcher(name=__name__)
+    def submitRedshiftJob(self, **kwargs):
+        jobs = self.getRedshiftJobs(**kwargs)
+        if not jobs:
+            return "Execute Canceled: Deadline is not installed"
+
+        return self.deadlineSubmitJobs(jobs)[0]
 
     @err_catcher(name=__name__)
-    def submitRedshiftJob(
+    def getRedshiftJobs(
             self,
             jobName=None,
             jobOutput=None,
@@ -788,19 +956,17 @@ class Prism_Deadline_Functions(object):
             args=None,
             cleanupScript=None
     ):
-        homeDir = (
-            self.deadlineCommand(["-GetCurrentUserHomeDirectory"], background=False)
-        ).decode("utf-8")
-
-        if homeDir is False:
-            return "Execute Canceled: Deadline is not installed"
-
-        homeDir = homeDir.replace("\r", "").replace("\n", "")
+        """
+        Returns the Redshift job and its cleanup job, which depends on it.
+        """
+        homeDir = self.getDeadlineHomeDir()
+        if homeDir is None:
+            return []
 
         if not jobName:
             jobName = os.path.splitext(self.core.getCurrentFileName(path=False))[0].strip("_")
 
-        environment = environment or []
+        environment = list(environment or [])
         environment.insert(0, ["prism_project", self.core.prismIni.replace("\\", "/")])
 
         # Create submission info file
@@ -854,14 +1020,7 @@ class Prism_Deadline_Functions(object):
         }
 
         if dependencies:
-            dependencyFile = os.path.join(homeDir, "temp", "dependencies.txt")
-            fileHandle = open(dependencyFile, "w")
-
-            for i in dependencies:
-                fileHandle.write(str(i[0]) + "\n")
-                fileHandle.write(str(i[1]) + "\n")
-
-            fileHandle.close()
+            dependencyFile = self.writeDependencyFile(homeDir, dependencies)
 
         arguments = []
         arguments.append(dlParams["jobInfoFile"])
@@ -873,15 +1032,11 @@ class Prism_Deadline_Functions(object):
         if "dependencyFile" in locals():
             arguments.append(dependencyFile)
 
-        result = self.deadlineSubmitJob(jobInfos, pluginInfos, arguments)
+        jobs = [{"jobInfos": jobInfos, "pluginInfos": pluginInfos, "arguments": arguments}]
 
         if cleanupScript:
-            jobName = jobName.rsplit("_", 1)[0]
-            arguments = [args[0]]
-            depId = self.getJobIdFromSubmitResult(result)
-            cleanupDep = [depId]
-            self.submitCleanupScript(
-                jobName=jobName,
+            cleanupJob = self.getCleanupJob(
+                jobName=jobName.rsplit("_", 1)[0],
                 jobGroup=jobGroup,
                 jobPrio=jobPrio,
                 jobTimeOut=jobTimeOut,
@@ -889,13 +1044,14 @@ class Prism_Deadline_Functions(object):
                 jobComment=jobComment,
                 jobBatchName=jobBatchName,
                 suspended=suspended,
-                jobDependencies=cleanupDep,
-                environment=environment,
+                environment=environment[1:],
                 cleanupScript=cleanupScript,
-                arguments=arguments,
+                arguments=[args[0]],
             )
+            cleanupJob["dependsOn"] = [0]
+            jobs.append(cleanupJob)
 
-        return result
+        return jobs
 
     @err_catcher(name=__name__)
     def getJobIdFromSubmitResult(self, result):
@@ -907,7 +1063,15 @@ class Prism_Deadline_Functions(object):
                 return jobId
 
     @err_catcher(name=__name__)
-    def submitCleanupScript(
+    def submitCleanupScript(self, **kwargs):
+        job = self.getCleanupJob(**kwargs)
+        if job is None:
+            return "Execute Canceled: Deadline is not installed"
+
+        return self.deadlineSubmitJobs([job])[0]
+
+    @err_catcher(name=__name__)
+    def getCleanupJob(
             self,
             jobName=None,
             jobOutput=None,
@@ -923,7 +1087,7 @@ class Prism_Deadline_Functions(object):
             cleanupScript=None,
             arguments=None,
     ):
-        self.submitPythonJob(
+        return self.getPythonJob(
             code=cleanupScript,
             jobName=jobName + "_cleanup",
             jobPrio=jobPrio,
@@ -947,18 +1111,44 @@ class Prism_Deadline_Functions(object):
             args=[self, jobInfos, pluginInfos, arguments],
         )
 
-        with open(arguments[0], "w") as fileHandle:
-            for i in jobInfos:
-                fileHandle.write("%s=%s\n" % (i, jobInfos[i]))
-
-        with open(arguments[1], "w") as fileHandle:
-            for i in pluginInfos:
-                fileHandle.write("%s=%s\n" % (i, pluginInfos[i]))
-
-        jobResult = self.deadlineCommand(arguments, background=False).decode("utf-8")
+        jobResult = self.getTransport().submitJob(
+            jobInfos,
+            pluginInfos,
+            arguments[2:],
+            jobInfoFile=arguments[0],
+            pluginInfoFile=arguments[1],
+        )
 
         self.core.callback(
             name="postSubmit_Deadline", types=["custom"], args=[self, jobResult]
         )
 
         return jobResult
+
+    @err_catcher(name=__name__)
+    def deadlineSubmitJobs(self, jobs):
+        """
+        Submits multiple jobs in one batch. Each job is a dict with the keys
+        "jobInfos", "pluginInfos", "arguments" like in deadlineSubmitJob and
+        optionally "dependsOn", a list of indices of earlier jobs in the
+        batch, which the job depends on.
+        """
+        for job in jobs:
+            self.core.callback(
+                name="preSubmit_Deadline",
+                types=["custom"],
+                args=[self, job["jobInfos"], job["pluginInfos"], job["arguments"]],
+            )
+            job["auxFiles"] = job["arguments"][2:]
+
+        try:
+            results = self.getTransport().submitJobs(jobs)
+        finally:
+            self.removeBatchFolders(jobs)
+
+        for result in results:
+            self.core.callback(
+                name="postSubmit_Deadline", types=["custom"], args=[self, result]
+            )
+
+        return results
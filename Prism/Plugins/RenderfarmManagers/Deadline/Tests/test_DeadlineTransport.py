@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+testDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(testDir, "..", "..", "..", "..", "Scripts"))
+sys.path.insert(0, os.path.join(testDir, "..", "Scripts"))
+
+import DeadlineTransport
+import Prism_Deadline_Functions
+
+
+class MockWebServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def sendJson(self, data, status=200, close=False):
+        content = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self.server.requests.append(["GET", self.path, None])
+        lists = {
+            "/api/groups": ["none", "gpu"],
+            "/api/pools": ["none", "lighting"],
+            "/api/slaves?NamesOnly=true": ["worker01", "worker02"],
+        }
+        if self.path not in lists:
+            self.sendJson("not found", status=404)
+            return
+
+        self.sendJson(lists[self.path], close=self.server.closeAfterResponse)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length).decode("utf-8"))
+        self.server.requests.append(["POST", self.path, data])
+        if data["JobInfo"].get("Name") == "fail":
+            self.sendJson("submission failed", status=500)
+            return
+
+        jobId = "job%s" % len([r for r in self.server.requests if r[0] == "POST"])
+        self.sendJson({"_id": jobId})
+
+
+class MockWebService(HTTPServer):
+    def __init__(self):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), MockWebServiceHandler)
+        self.requests = []
+        self.connections = 0
+        self.closeAfterResponse = False
+
+
+class FakeAppPlugin(object):
+    def __init__(self):
+        self.sceneFiles = []
+
+    def getCurrentSceneFiles(self, origin):
+        return self.sceneFiles
+
+
+class FakeCore(object):
+    def __init__(self, url):
+        self.url = url
+        self.callbacks = []
+        self.appPlugin = FakeAppPlugin()
+
+    def getConfig(self, *args, **kwargs):
+        return self.url
+
+    def callback(self, name="", types=None, args=None):
+        self.callbacks.append(name)
+
+
+class DeadlineFunctions(Prism_Deadline_Functions.Prism_Deadline_Functions):
+    def __init__(self, core):
+        self.core = core
+        self.plugin = None
+        self.publishBatch = None
+
+    def getTransport(self):
+        if not getattr(self, "transport", None):
+            self.transport = DeadlineTransport.DeadlineWebServiceTransport(self, self.core.url)
+
+        return self.transport
+
+
+class FakeStateItem(object):
+    def __init__(self, name):
+        self.name = name
+
+    def text(self, column):
+        return self.name
+
+
+class FakeState(object):
+    def __init__(self, name):
+        self.state = FakeStateItem(name)
+
+
+class FakeStateManager(object):
+    def __init__(self):
+        self.publishType = "publish"
+        self.publishPaused = False
+        self.publishResult = []
+
+
+class TestDeadlineWebService(unittest.TestCase):
+    def setUp(self):
+        self.server = MockWebService()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = "http://127.0.0.1:%s" % self.server.server_address[1]
+        self.plugin = DeadlineFunctions(FakeCore(self.url))
+        self.transport = self.plugin.getTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def getJob(self, name, dependsOn=None, auxFiles=None):
+        job = {
+            "jobInfos": {"Name": name, "Priority": 50},
+            "pluginInfos": {"Build": "64bit"},
+            "arguments": ["", ""] + list(auxFiles or []),
+        }
+        if dependsOn is not None:
+            job["dependsOn"] = dependsOn
+
+        return job
+
+    def test_lists(self):
+        self.assertEqual(self.transport.getGroups(), ["none", "gpu"])
+        self.assertEqual(self.transport.getPools(), ["none", "lighting"])
+        self.assertEqual(self.transport.getWorkers(), ["worker01", "worker02"])
+
+    def test_listsAreCached(self):
+        self.transport.getGroups()
+        self.transport.getGroups()
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.transport.cacheTimeout = 0
+        self.transport.getGroups()
+        self.assertEqual(len(self.server.requests), 2)
+
+        self.transport.cacheTimeout = 300
+        self.transport.clearCache()
+        self.transport.getGroups()
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_connectionIsReused(self):
+        self.transport.getGroups()
+        self.transport.getPools()
+        self.transport.getWorkers()
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_closedConnectionIsReopened(self):
+        self.server.closeAfterResponse = True
+        self.assertEqual(self.transport.getGroups(), ["none", "gpu"])
+        self.assertEqual(self.transport.getPools(), ["none", "lighting"])
+        self.assertEqual(self.server.connections, 2)
+
+    def test_submitJobsWithDependencies(self):
+        jobs = [
+            self.getJob("export"),
+            self.getJob("render", dependsOn=[0]),
+            self.getJob("cleanup", dependsOn=[1]),
+        ]
+        results = self.plugin.deadlineSubmitJobs(jobs)
+        jobIds = [self.plugin.getJobIdFromSubmitResult(result) for result in results]
+        self.assertEqual(jobIds, ["job1", "job2", "job3"])
+
+        posts = [r[2] for r in self.server.requests if r[0] == "POST"]
+        self.assertNotIn("JobDependencies", posts[0]["JobInfo"])
+        self.assertEqual(posts[1]["JobInfo"]["JobDependencies"], "job1")
+        self.assertEqual(posts[2]["JobInfo"]["JobDependencies"], "job2")
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(
+            self.plugin.core.callbacks,
+            ["preSubmit_Deadline"] * 3 + ["postSubmit_Deadline"] * 3,
+        )
+
+    def test_dependentsOfFailedJobsAreSkipped(self):
+        jobs = [
+            self.getJob("fail"),
+            self.getJob("render", dependsOn=[0]),
+            self.getJob("independent"),
+        ]
+        results = self.plugin.deadlineSubmitJobs(jobs)
+        self.assertIn("Result=Failed", results[0])
+        self.assertIn("Result=Failed", results[1])
+        self.assertIn("Result=Success", results[2])
+
+        names = [r[2]["JobInfo"]["Name"] for r in self.server.requests if r[0] == "POST"]
+        self.assertEqual(names, ["fail", "independent"])
+
+    def test_dependencyFilesAreRemoved(self):
+        tmpDir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(tmpDir, "temp"))
+            depFile = self.plugin.writeDependencyFile(tmpDir, [[0, "/render/shot_####.exr"]])
+            self.assertEqual(os.path.basename(depFile), "dependencies.txt")
+
+            with open(depFile) as f:
+                self.assertEqual(f.read(), "0\n/render/shot_####.exr\n")
+
+            self.plugin.deadlineSubmitJobs([self.getJob("render", auxFiles=[depFile])])
+            post = [r[2] for r in self.server.requests if r[0] == "POST"][0]
+            self.assertEqual(post["AuxFiles"], [depFile])
+            self.assertFalse(os.path.exists(os.path.dirname(depFile)))
+        finally:
+            shutil.rmtree(tmpDir, ignore_errors=True)
+
+    def test_publishBatch(self):
+        homeDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, homeDir, True)
+        os.makedirs(os.path.join(homeDir, "temp"))
+        scenePath = os.path.join(homeDir, "shot_v0001.hip")
+        with open(scenePath, "w") as f:
+            f.write("state1")
+
+        self.plugin.core.appPlugin.sceneFiles = [scenePath]
+        sm = FakeStateManager()
+        self.plugin.sm_publish_start(sm)
+
+        states = [FakeState("render1"), FakeState("render2"), FakeState("render3")]
+        stateJobs = [
+            [self.getJob("render1", auxFiles=[scenePath])],
+            [
+                self.getJob("export2", auxFiles=[scenePath]),
+                self.getJob("render2", dependsOn=[0]),
+                self.getJob("fail", dependsOn=[1]),
+            ],
+            [self.getJob("render3")],
+        ]
+        for state, jobs in zip(states, stateJobs):
+            result = self.plugin.queuePublishJobs(state, jobs, homeDir)
+            self.assertIn("Result=Success", result)
+
+            # the following states save the scene again
+            with open(scenePath, "w") as f:
+                f.write("changed")
+
+        self.assertEqual(self.server.requests, [])
+        self.plugin.sm_publish_submitJobs(sm)
+        self.assertIsNone(self.plugin.publishBatch)
+
+        posts = [r[2] for r in self.server.requests if r[0] == "POST"]
+        self.assertEqual(
+            [x["JobInfo"]["Name"] for x in posts],
+            ["render1", "export2", "render2", "fail", "render3"],
+        )
+        self.assertEqual(posts[2]["JobInfo"]["JobDependencies"], "job2")
+        self.assertEqual(os.path.basename(posts[0]["AuxFiles"][0]), "shot_v0001.hip")
+        self.assertNotEqual(posts[0]["AuxFiles"][0], scenePath)
+        self.assertEqual(os.listdir(os.path.join(homeDir, "temp")), [])
+
+        self.assertEqual(len(sm.publishResult), 1)
+        self.assertIs(sm.publishResult[0]["state"], states[1])
+        self.assertIn("error", sm.publishResult[0]["result"][0])
+
+    def test_executeIsNotBatched(self):
+        sm = FakeStateManager()
+        sm.publishType = "execute"
+        self.plugin.sm_publish_start(sm)
+        self.assertIsNone(self.plugin.publishBatch)
+
+
+if __name__ == "__main__":
+    unittest.main()
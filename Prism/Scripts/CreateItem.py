@@ -123,7 +123,7 @@ class CreateItem(QDialog, CreateItem_ui.Ui_dlg_CreateItem):
 
         if showType:
             for i in self.core.prjManagers.values():
-                i.createAsset_open(self)
+                self.core.callbacks.getPluginCallback(i, "createAsset_open")(self)
         else:
             self.w_type.setVisible(False)
 
@@ -193,7 +193,7 @@ class CreateItem(QDialog, CreateItem_ui.Ui_dlg_CreateItem):
     @err_catcher(name=__name__)
     def typeChanged(self, state):
         for i in self.core.prjManagers.values():
-            i.createAsset_typeChanged(self, state)
+            self.core.callbacks.getPluginCallback(i, "createAsset_typeChanged")(self, state)
 
     @err_catcher(name=__name__)
     def enableOk(self, widget):
@@ -47,6 +47,7 @@ import subprocess
 import logging
 import tempfile
 import hashlib
+import contextlib
 from datetime import datetime
 
 # check if python 2 or python 3 is used
@@ -88,6 +89,11 @@ guiPath = os.path.join(prismRoot, "Scripts", "UserInterfacesPrism")
 if guiPath not in sys.path:
     sys.path.append(guiPath)
 
+moduleStartTime = time.time()
+if os.getenv("PRISM_TRACE_IMPORTS"):
+    from PrismUtils import StartupTracer
+    StartupTracer.installImportTracer()
+
 try:
     from PySide2.QtCore import *
     from PySide2.QtGui import *
@@ -122,18 +128,30 @@ import PrismUtils
 from PrismUtils import (
     Callbacks,
     ConfigManager,
+    DependencyIndex,
+    EntityIndex,
+    FileCopy,
     Integration,
+    MasterVersions,
     MediaManager,
     MediaProducts,
     PathManager,
     PluginManager,
     Products,
+    Profiler,
     ProjectEntities,
+    PublishScheduler,
     Projects,
     SanityChecks,
+    Sequences,
+    StartupTracer,
+    ThumbnailCache,
     Users,
+    Versions,
 )
 
+moduleImportDuration = time.time() - moduleStartTime
+
 
 logger = logging.getLogger(__name__)
 
@@ -188,6 +206,8 @@ class PrismCore:
             self.core = self
 
             startTime = datetime.now()
+            self.startupTracer = StartupTracer.StartupTracer(self)
+            self.startupTracer.addPhase("import modules", moduleImportDuration)
 
             self.prismRoot = prismRoot.replace("\\", "/")
             self.prismLibs = prismLibs.replace("\\", "/")
@@ -270,15 +290,18 @@ class PrismCore:
                     sys.path.remove(val)
 
             # if no user ini exists, it will be created with default values
-            self.configs = ConfigManager.ConfigManager(self)
-            self.users = Users.Users(self)
-            if not os.path.exists(self.userini):
-                self.configs.createUserPrefs()
+            with self.startupTracer.phase("user preferences"):
+                self.configs = ConfigManager.ConfigManager(self)
+                self.users = Users.Users(self)
+                if not os.path.exists(self.userini):
+                    self.configs.createUserPrefs()
 
             logging.basicConfig()
             self.debugMode = self.getConfig("globals", "debug_mode")
             self.updateLogging()
             logger.debug("Initializing Prism " + self.version)
+            if Profiler.active or self.getConfig("globals", "profiling"):
+                self.setProfiling(True)
 
             self.useOnTop = self.getConfig("globals", "use_always_on_top")
             if self.useOnTop is None:
@@ -287,19 +310,31 @@ class PrismCore:
             if sys.argv and sys.argv[-1] in ["setupStartMenu", "refreshIntegrations"]:
                 self.prismArgs.pop(self.prismArgs.index("loadProject"))
 
-            self.callbacks = Callbacks.Callbacks(self)
-            self.projects = Projects.Projects(self)
-            self.plugins = PluginManager.PluginManager(self)
-            self.paths = PathManager.PathManager(self)
-            self.integration = Integration.Ingegration(self)
-            self.entities = ProjectEntities.ProjectEntities(self)
-            self.mediaProducts = MediaProducts.MediaProducts(self)
-            self.products = Products.Products(self)
-            self.media = MediaManager.MediaManager(self)
-            self.sanities = SanityChecks.SanityChecks(self)
-
-            self.getUIscale()
-            self.initializePlugins(app)
+            with self.startupTracer.phase("managers"):
+                self.callbacks = Callbacks.Callbacks(self)
+                self.projects = Projects.Projects(self)
+                self.plugins = PluginManager.PluginManager(self)
+                self.paths = PathManager.PathManager(self)
+                self.integration = Integration.Ingegration(self)
+                self.entityIndex = EntityIndex.EntityIndex(self)
+                self.entities = ProjectEntities.ProjectEntities(self)
+                self.mediaProducts = MediaProducts.MediaProducts(self)
+                self.products = Products.Products(self)
+                self.media = MediaManager.MediaManager(self)
+                self.thumbnails = ThumbnailCache.ThumbnailCache(self)
+                self.fileCopy = FileCopy.FileCopy(self)
+                self.sequences = Sequences.Sequences(self)
+                self.masterVersions = MasterVersions.MasterVersions(self)
+                self.versions = Versions.Versions(self)
+                self.dependencies = DependencyIndex.DependencyIndex(self)
+                self.publishScheduler = PublishScheduler.PublishScheduler(self)
+                self.sanities = SanityChecks.SanityChecks(self)
+
+            with self.startupTracer.phase("getUIscale"):
+                self.getUIscale()
+
+            with self.startupTracer.phase("initializePlugins"):
+                self.initializePlugins(app)
 
             if sys.argv and sys.argv[-1] == "setupStartMenu":
                 self.setupStartMenu()
@@ -310,6 +345,9 @@ class PrismCore:
 
             endTime = datetime.now()
             logger.debug("startup duration: %s" % (endTime - startTime))
+            self.startupTracer.finish()
+            if os.getenv("PRISM_TRACE_IMPORTS"):
+                StartupTracer.uninstallImportTracer()
 
         except Exception:
             exc_type, exc_obj, exc_tb = sys.exc_info()
@@ -404,7 +442,8 @@ class PrismCore:
             curPrj = self.getConfig("globals", "current project")
 
         if curPrj:
-            self.changeProject(curPrj)
+            with self.startupTracer.phase("changeProject"):
+                self.changeProject(curPrj)
 
         if (
             "silent" not in self.prismArgs
@@ -496,6 +535,13 @@ class PrismCore:
         logLevel = "DEBUG" if enabled else "WARNING"
         self.core.updateLogging(level=logLevel)
 
+    @err_catcher(name=__name__)
+    def setProfiling(self, enabled):
+        if enabled:
+            Profiler.profiler.enable(outputDir=os.path.dirname(self.userini))
+        else:
+            Profiler.profiler.disable()
+
     @err_catcher(name=__name__)
     def updateLogging(self, level=None):
         if not level:
@@ -1316,29 +1362,11 @@ License: GNU GPL-3.0-or-later<br>
 
     @err_catcher(name=__name__)
     def detectFileSequence(self, path):
-        pathDir = os.path.dirname(path)
-        regName = ""
-        seqFiles = []
-
-        for root, folders, files in os.walk(pathDir):
-            siblings = [os.path.join(root, f) for f in files]
+        sequence = self.sequences.getSequenceFromFile(path)
+        if not sequence:
+            return []
 
-        for ch in re.escape(os.path.basename(path)):
-            if sys.version[0] == "2":
-                ch = unicode(ch)
-
-            if ch.isnumeric():
-                regName += "."
-            else:
-                regName += ch
-
-        r = re.compile(regName)
-
-        for sibling in siblings:
-            if r.match(os.path.basename(sibling)):
-                seqFiles.append(sibling)
-
-        return seqFiles
+        return sequence["files"]
 
     @err_catcher(name=__name__)
     def getFilesFromFolder(self, path, recursive=True):
@@ -1511,6 +1539,7 @@ License: GNU GPL-3.0-or-later<br>
         else:
             versionUp = False
 
+        reservation = None
         if prismReq:
             if not self.projects.ensureProject():
                 return False
@@ -1551,97 +1580,110 @@ License: GNU GPL-3.0-or-later<br>
                 dstname = os.path.dirname(filepath)
 
                 if fnameData["entity"] == "asset":
-                    fVersion = self.getHighestVersion(dstname, "asset")
+                    fVersion = self.getHighestVersion(dstname, "asset", reserve=True)
+                    reservation = [self.convertPath(dstname, "global"), fVersion, "asset"]
                     filepath = self.generateScenePath(
                         entity="asset",
                         entityName=fnameData["entityName"],
                         step=fnameData["step"],
                         category=fnameData["category"],
                         comment=comment,
-                        # version=fVersion,
+                        version=fVersion,
                         basePath=dstname,
                         extension=self.appPlugin.getSceneExtension(self),
                     )
 
                 elif fnameData["entity"] == "shot":
-                    fVersion = self.getHighestVersion(dstname, "shot")
+                    fVersion = self.getHighestVersion(dstname, "shot", reserve=True)
+                    reservation = [self.convertPath(dstname, "global"), fVersion, "shot"]
                     filepath = self.generateScenePath(
                         entity="shot",
                         entityName=fnameData["entityName"],
                         step=fnameData["step"],
                         category=fnameData["category"],
                         comment=comment,
-                        # version=fVersion,
+                        version=fVersion,
                         basePath=dstname,
                         extension=self.appPlugin.getSceneExtension(self),
                     )
 
-        filepath = filepath.replace("\\", "/")
-        outLength = len(filepath)
-        if platform.system() == "Windows" and outLength > 255:
-            msg = "The filepath is longer than 255 characters (%s), which is not supported on Windows." % outLength
-            self.popup(msg)
-            return False
+        try:
+            filepath = filepath.replace("\\", "/")
+            outLength = len(filepath)
+            if platform.system() == "Windows" and outLength > 255:
+                msg = "The filepath is longer than 255 characters (%s), which is not supported on Windows." % outLength
+                self.popup(msg)
+                return False
 
-        self.callback(
-            name="preSaveScene",
-            types=["custom"],
-            args=[self, filepath, versionUp, comment, publish, details],
-        )
+            self.callback(
+                name="preSaveScene",
+                types=["custom"],
+                args=[self, filepath, versionUp, comment, publish, details],
+            )
 
-        result = self.appPlugin.saveScene(self, filepath, details)
-        if result is False:
-            return False
+            result = self.appPlugin.saveScene(self, filepath, details)
+            if result is False:
+                return False
 
-        if prismReq:
-            self.saveSceneInfo(filepath, details, preview=preview)
+            if prismReq:
+                self.saveSceneInfo(filepath, details, preview=preview)
+                self.entityIndex.invalidate(os.path.dirname(filepath), parents=1)
 
-        self.callback(
-            name="postSaveScene",
-            types=["curApp", "custom"],
-            args=[self, filepath, versionUp, comment, publish, details],
-        )
+            self.callback(
+                name="postSaveScene",
+                types=["curApp", "custom"],
+                args=[self, filepath, versionUp, comment, publish, details],
+            )
 
-        if not prismReq:
-            return filepath
+            if not prismReq:
+                return filepath
 
-        if (
-            not os.path.exists(filepath)
-            and os.path.splitext(self.fixPath(self.getCurrentFileName()))[0]
-            != os.path.splitext(self.fixPath(filepath))[0]
-        ):
-            return False
+            if (
+                not os.path.exists(filepath)
+                and os.path.splitext(self.fixPath(self.getCurrentFileName()))[0]
+                != os.path.splitext(self.fixPath(filepath))[0]
+            ):
+                return False
 
-        self.addToRecent(filepath)
+            self.addToRecent(filepath)
 
-        if publish:
-            pubFile = filepath
-            if self.useLocalFiles and location != "global":
-                pubFile = self.fixPath(filepath).replace(
-                    self.localProjectPath, self.projectPath
+            if publish:
+                pubFile = filepath
+                if self.useLocalFiles and location != "global":
+                    pubFile = self.fixPath(filepath).replace(
+                        self.localProjectPath, self.projectPath
+                    )
+                    self.copySceneFile(filepath, pubFile)
+                    self.entityIndex.invalidate(os.path.dirname(pubFile), parents=1)
+
+                fBase = os.path.splitext(os.path.basename(pubFile))[0]
+
+                infoData = {"filename": os.path.basename(pubFile)}
+                self.saveVersionInfo(
+                    location=os.path.dirname(pubFile),
+                    version=fVersion,
+                    fps=True,
+                    filenameBase=fBase,
+                    data=infoData,
                 )
-                self.copySceneFile(filepath, pubFile)
 
-            fBase = os.path.splitext(os.path.basename(pubFile))[0]
+            if getattr(self, "sm", None):
+                self.sm.scenename = self.getCurrentFileName()
 
-            infoData = {"filename": os.path.basename(pubFile)}
-            self.saveVersionInfo(
-                location=os.path.dirname(pubFile),
-                version=fVersion,
-                fps=True,
-                filenameBase=fBase,
-                data=infoData,
-            )
-
-        if getattr(self, "sm", None):
-            self.sm.scenename = self.getCurrentFileName()
-
-        try:
-            self.pb.refreshCurrent()
-        except Exception:
-            pass
+            try:
+                self.pb.refreshCurrent()
+            except Exception:
+                pass
 
-        return filepath
+            return filepath
+        finally:
+            # a version, which wasn't saved, must not leave a gap
+            if reservation and not os.path.exists(filepath):
+                self.versions.releaseVersion(
+                    reservation[0],
+                    int(reservation[1][-self.versionPadding:]),
+                    key=reservation[2],
+                )
 
     @err_catcher(name=__name__)
     def getVersioninfoPath(self, scenepath):
@@ -1814,6 +1856,10 @@ License: GNU GPL-3.0-or-later<br>
 
         return path
 
+    @err_catcher(name=__name__)
+    def getTaskLoader(self, parent=None, maxThreads=4):
+        return TaskLoader(self, parent=parent, maxThreads=maxThreads)
+
     @err_catcher(name=__name__)
     def getFileModificationDate(self, path, validate=False):
         if validate:
@@ -1903,10 +1949,11 @@ License: GNU GPL-3.0-or-later<br>
         cb.setText(text)
 
     @err_catcher(name=__name__)
-    def copyfile(self, src, dst, thread=None, follow_symlinks=True):
+    def copyfile(self, src, dst, thread=None, follow_symlinks=True, hashMode=None, bufferSize=None):
         """Copy data from src to dst.
         If follow_symlinks is not set and src is a symbolic link, a new
         symlink will be created instead of copying the file it points to.
+        The data is streamed and validated by self.fileCopy.
         """
         if shutil._samefile(src, dst):
             raise shutil.SameFileError("{!r} and {!r} are the same file".format(src, dst))
@@ -1925,46 +1972,17 @@ License: GNU GPL-3.0-or-later<br>
         if not follow_symlinks and os.path.islink(src):
             os.symlink(os.readlink(src), dst)
         else:
-            size = os.stat(src).st_size
-            thread.updated.emit("Getting source hash")
-            vSourceHash = hashlib.md5(open(src, 'rb').read()).hexdigest()
-            vDestinationHash = ""
-            while vSourceHash != vDestinationHash:
-                with open(src, 'rb') as fsrc:
-                    with open(dst, 'wb') as fdst:
-                        self.copyfileobj(fsrc, fdst, total=size, thread=thread)
-
-                if thread and thread.canceled:
-                    try:
-                        os.remove(dst)
-                    except Exception:
-                        pass
-                    return
-
-                thread.updated.emit("Validating copied file")
-                vDestinationHash = hashlib.md5(open(dst, 'rb').read()).hexdigest()
+            result = self.fileCopy.copyFile(src, dst, thread=thread, hashMode=hashMode, bufferSize=bufferSize)
+            if not result:
+                return
 
         shutil.copymode(src, dst)
         return dst
 
     @err_catcher(name=__name__)
     def copyfileobj(self, fsrc, fdst, total, thread=None, length=16 * 1024):
-        copied = 0
-        prevPrc = -1
-        while True:
-            if thread and thread.canceled:
-                break
-
-            buf = fsrc.read(length)
-            if not buf:
-                break
-            fdst.write(buf)
-            copied += len(buf)
-            if thread:
-                prc = int((copied / total) * 100)
-                if prc != prevPrc:
-                    prevPrc = prc
-                    thread.updated.emit("Progress: %s%%" % prc)
+        progress = self.fileCopy.getProgressCallback(thread, total)
+        self.fileCopy.streamCopy(fsrc, fdst, thread=thread, progress=progress, bufferSize=length)
 
     @err_catcher(name=__name__)
     def copyWithProgress(self, src, dst, follow_symlinks=True):
@@ -2059,17 +2077,16 @@ License: GNU GPL-3.0-or-later<br>
 
     @err_catcher(name=__name__)
     def createSymlink(self, link, target):
-        link = link.replace("/", "\\")
-        target = target.replace("/", "\\")
-
         if os.path.exists(link):
             os.remove(link)
 
+        logger.debug("creating hardlink from: %s to %s" % (target, link))
         if platform.system() == "Windows":
-            logger.debug("creating hardlink from: %s to %s" % (target, link))
+            link = link.replace("/", "\\")
+            target = target.replace("/", "\\")
             subprocess.call(['mklink', "/H", link, target], shell=True)
         else:
-            logger.warning("not implemented")
+            os.link(target, link)
 
     @property
     @err_catcher(name=__name__)
@@ -2137,7 +2154,7 @@ License: GNU GPL-3.0-or-later<br>
         if os.path.exists(self.prismIni):
             self.stateManager(openUi=openSm, reload_module=True)
 
-        self.sanities.checkImportVersions()
+        self.sanities.checkImportVersions(background=True)
         self.sanities.checkFramerange()
         self.sanities.checkFPS()
         self.sanities.checkResolution()
@@ -2266,7 +2283,17 @@ License: GNU GPL-3.0-or-later<br>
         for i in data:
             cData["information"][i] = data[i]
 
-        self.setConfig(data=cData, configPath=infoFilePath)
+        # the data is collected on the calling thread, because it can come
+        # from the host app, but the file can be written in the background
+        self.publishScheduler.runInBackground(
+            self.writeVersionInfo, args=[infoFilePath, cData], key="versionInfo"
+        )
+
+    @err_catcher(name=__name__)
+    def writeVersionInfo(self, infoFilePath, data):
+        self.setConfig(data=data, configPath=infoFilePath)
+        if data["information"].get("Dependencies") or data["information"].get("External files"):
+            self.dependencies.addVersionInfo(infoFilePath)
 
     @err_catcher(name=__name__)
     def getPythonPath(self, executable=None):
@@ -2471,9 +2498,7 @@ License: GNU GPL-3.0-or-later<br>
             if not isinstance(title, basestring):
                 title = unicode(title)
 
-        isGuiThread = QApplication.instance().thread() == QThread.currentThread()
-
-        if "silent" not in self.prismArgs and self.uiAvailable and isGuiThread:
+        if "silent" not in self.prismArgs and self.uiAvailable and self.isGuiThread():
             parent = parent or getattr(self, "messageParent", None)
             msg = QMessageBox(parent)
             if self.isPopupTooLong(text):
@@ -2509,6 +2534,11 @@ License: GNU GPL-3.0-or-later<br>
             else:
                 logger.error(msg)
 
+    @err_catcher(name=__name__)
+    def isGuiThread(self):
+        app = QApplication.instance()
+        return bool(app) and app.thread() == QThread.currentThread()
+
     @err_catcher(name=__name__)
     def popupQuestion(self, text, title=None, buttons=None, default=None, icon=None, widget=None, parent=None, escapeButton=None):
         text = str(text)
@@ -2517,7 +2547,7 @@ License: GNU GPL-3.0-or-later<br>
         icon = QMessageBox.Question if icon is None else icon
         parent = parent or getattr(self, "messageParent", None)
 
-        if "silent" in self.prismArgs or not self.uiAvailable:
+        if "silent" in self.prismArgs or not self.uiAvailable or not self.isGuiThread():
             logger.info("%s - %s - %s" % (title, text, default))
             return default
 
@@ -3032,6 +3062,111 @@ class Worker(QThread):
         self.canceled = True
 
 
+class TaskSignals(QObject):
+    finished = Signal(object)
+    errored = Signal(object)
+
+
+class Task(QRunnable):
+    def __init__(self, core, function, args=None, kwargs=None, callback=None):
+        super(Task, self).__init__()
+        self.core = core
+        self.function = function
+        self.args = args or []
+        self.kwargs = kwargs or {}
+        self.callback = callback
+        self.canceled = False
+        self.signals = TaskSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        if self.canceled:
+            return
+
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.canceled:
+                self.signals.errored.emit(str(e))
+
+            return
+
+        if not self.canceled:
+            self.signals.finished.emit(result)
+
+    def runSynchronous(self):
+        self.canceled = True
+        result = self.function(*self.args, **self.kwargs)
+        if self.callback:
+            self.callback(result)
+
+    def cancel(self):
+        self.canceled = True
+
+
+class TaskLoader(QObject):
+    def __init__(self, core, parent=None, maxThreads=4):
+        super(TaskLoader, self).__init__(parent)
+        self.core = core
+        self.tasks = {}
+        self.blockingCount = 0
+        self.threadPool = QThreadPool(self)
+        self.threadPool.setMaxThreadCount(maxThreads)
+
+    def load(self, key, function, callback, args=None, kwargs=None):
+        self.cancel(key)
+        task = Task(self.core, function, args=args, kwargs=kwargs, callback=callback)
+        if self.blockingCount:
+            task.runSynchronous()
+            return
+
+        task.signals.finished.connect(lambda x, k=key, t=task: self.onTaskFinished(k, t, x))
+        task.signals.errored.connect(lambda x, k=key, t=task: self.onTaskErrored(k, t, x))
+        self.tasks[key] = task
+        self.threadPool.start(task)
+
+    def onTaskFinished(self, key, task, result):
+        if task.canceled or self.tasks.get(key) is not task:
+            return
+
+        del self.tasks[key]
+        task.callback(result)
+
+    def onTaskErrored(self, key, task, error):
+        if task.canceled or self.tasks.get(key) is not task:
+            return
+
+        del self.tasks[key]
+        self.core.writeErrorLog(error)
+
+    def cancel(self, key=None):
+        keys = [key] if key else list(self.tasks.keys())
+        for taskKey in keys:
+            task = self.tasks.pop(taskKey, None)
+            if task:
+                task.cancel()
+
+    def isLoading(self, key):
+        return key in self.tasks
+
+    def flush(self, key=None):
+        keys = [key] if key else list(self.tasks.keys())
+        for taskKey in keys:
+            task = self.tasks.pop(taskKey, None)
+            if task:
+                task.runSynchronous()
+
+    @contextlib.contextmanager
+    def blocking(self):
+        # code which selects items after a refresh needs the data right away
+        self.flush()
+        self.blockingCount += 1
+        try:
+            yield
+        finally:
+            self.blockingCount -= 1
+
+
 def create(prismArgs=None):
     prismArgs = prismArgs or []
 
@@ -82,6 +82,7 @@ else:
 
 from UserInterfacesPrism import qdarkstyle
 from PrismUtils.Decorators import err_catcher
+from PrismUtils import Profiler
 
 
 logger = logging.getLogger(__name__)
@@ -372,6 +373,7 @@ class PrismSettings(QDialog, PrismSettings_ui.Ui_dlg_PrismSettings):
         cData["globals"]["highdpi"] = self.chb_highDPI.isChecked()
         cData["globals"]["send_error_reports"] = self.chb_errorReports.isChecked()
         cData["globals"]["debug_mode"] = self.chb_debug.isChecked()
+        cData["globals"]["profiling"] = self.chb_profiling.isChecked()
 
         for i in self.exOverridePlugins:
             c = self.exOverridePlugins[i]["chb"].isChecked()
@@ -394,6 +396,7 @@ class PrismSettings(QDialog, PrismSettings_ui.Ui_dlg_PrismSettings):
         self.core.setConfig(data=cData)
 
         self.core.setDebugMode(self.chb_debug.isChecked())
+        self.core.setProfiling(self.chb_profiling.isChecked())
 
         if os.path.exists(self.core.prismIni):
             cData = {"globals": {}}
@@ -646,6 +649,9 @@ class PrismSettings(QDialog, PrismSettings_ui.Ui_dlg_PrismSettings):
             if "debug_mode" in gblData:
                 self.chb_debug.setChecked(gblData["debug_mode"])
 
+            if "profiling" in gblData:
+                self.chb_profiling.setChecked(gblData["profiling"] or Profiler.active)
+
             if "rvpath" in gblData:
                 self.e_rvPath.setText(gblData["rvpath"])
 
@@ -880,11 +886,45 @@ class PrismSettings(QDialog, PrismSettings_ui.Ui_dlg_PrismSettings):
         if platform.system() in ["Linux", "Darwin"]:
             self.chb_trayStartup.setText(self.chb_trayStartup.text() + " (change requires root permissions)")
 
+        self.w_profiling = QWidget()
+        lo_profiling = QHBoxLayout()
+        lo_profiling.setContentsMargins(0, 0, 0, 0)
+        self.w_profiling.setLayout(lo_profiling)
+        self.chb_profiling = QCheckBox("Profiling")
+        self.chb_profiling.setChecked(Profiler.active)
+        self.chb_profiling.setToolTip("Records call counts, durations and filesystem calls of all Prism functions.\nThe reports are saved in the Prism user folder when Prism closes.")
+        self.b_profileReport = QPushButton("Save profile report")
+        self.b_profileTrace = QPushButton("Save Chrome trace")
+        lo_profiling.addWidget(self.chb_profiling)
+        lo_profiling.addWidget(self.b_profileReport)
+        lo_profiling.addWidget(self.b_profileTrace)
+        lo_profiling.addStretch()
+        self.chb_debug.parentWidget().layout().addWidget(self.w_profiling)
+        self.b_profileReport.clicked.connect(lambda: self.saveProfile("report"))
+        self.b_profileTrace.clicked.connect(lambda: self.saveProfile("trace"))
+
         if not self.core.debugMode:
             self.w_useMasterRender.setVisible(False)
 
         self.core.callback(name="prismSettings_loadUI", types=["custom", "prjManagers"], args=[self])
 
+    @err_catcher(name=__name__)
+    def saveProfile(self, reportType):
+        if not Profiler.profiler.stats:
+            self.core.popup("No profiling data was recorded yet. Enable profiling and save the settings first.")
+            return
+
+        outputDir = os.path.dirname(self.core.userini)
+        if reportType == "trace":
+            path = Profiler.profiler.writeChromeTrace(os.path.join(outputDir, "profile_trace.json"))
+        else:
+            path = Profiler.profiler.writeReport(os.path.join(outputDir, "profile_report.txt"))
+
+        msg = "The profile was saved:\n\n%s" % path
+        result = self.core.popupQuestion(msg, buttons=["Open folder", "Close"], icon=QMessageBox.Information)
+        if result == "Open folder":
+            self.core.openFolder(path)
+
     @err_catcher(name=__name__)
     def refreshExportPaths(self):
         exportPaths = self.core.paths.getExportProductBasePaths()
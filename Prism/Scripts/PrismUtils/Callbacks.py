@@ -33,6 +33,8 @@
 
 import os
 import sys
+import time
+import types
 import logging
 import traceback
 import glob
@@ -59,6 +61,9 @@ class Callbacks(object):
         self.registeredHooks = {}
         self.callbackNum = 0
         self.hookNum = 0
+        self.compiledHooks = {}
+        self.hookTimings = {}
+        self.slowHookThreshold = 1
 
     @err_catcher(name=__name__)
     def registerCallback(self, callbackName, function, priority=50, plugin=None):
@@ -108,6 +113,7 @@ class Callbacks(object):
     @err_catcher(name=__name__)
     def registerProjectHooks(self):
         self.registeredHooks = {}
+        self.compiledHooks = {}
         hooks = self.getProjectHooks()
         for hook in hooks:
             self.registerHook(hook["name"], hook["path"])
@@ -130,6 +136,15 @@ class Callbacks(object):
 
         return hooks
 
+    @err_catcher(name=__name__)
+    def getPluginCallback(self, plugin, name):
+        noop = lambda *args, **kwargs: None
+        requiresImport = getattr(type(plugin), "requiresImport", None)
+        if requiresImport and not plugin.requiresImport(name):
+            return noop
+
+        return getattr(plugin, name, noop)
+
     @err_catcher(name=__name__)
     def callback(self, name="", types=["custom"], *args, **kwargs):
         if "args" in kwargs:
@@ -149,14 +164,14 @@ class Callbacks(object):
         if "unloadedApps" in types:
             for i in self.core.unloadedAppPlugins.values():
                 self.currentCallback["plugin"] = i.pluginName
-                res = getattr(i, name, lambda *args, **kwargs: None)(*args, **kwargs)
+                res = self.getPluginCallback(i, name)(*args, **kwargs)
                 result.append(res)
 
         if "custom" in types:
             for i in self.core.customPlugins.values():
                 try:
                     self.currentCallback["plugin"] = i.pluginName
-                    res = getattr(i, name, lambda *args, **kwargs: None)(*args, **kwargs)
+                    res = self.getPluginCallback(i, name)(*args, **kwargs)
                     result.append(res)
                 except:
                     logger.warning("error: %s" % traceback.format_exc())
@@ -164,24 +179,25 @@ class Callbacks(object):
         if "prjManagers" in types:
             for i in self.core.prjManagers.values():
                 self.currentCallback["plugin"] = i.pluginName
-                res = getattr(i, name, lambda *args, **kwargs: None)(*args, **kwargs)
+                res = self.getPluginCallback(i, name)(*args, **kwargs)
                 result.append(res)
 
         if "rfManagers" in types:
             for i in self.core.rfManagers.values():
                 self.currentCallback["plugin"] = i.pluginName
-                res = getattr(i, name, lambda *args, **kwargs: None)(*args, **kwargs)
+                res = self.getPluginCallback(i, name)(*args, **kwargs)
                 result.append(res)
 
         if name in self.registeredCallbacks:
-            for cb in self.registeredCallbacks[name]:
+            # callbacks can get unregistered while they are called
+            for cb in list(self.registeredCallbacks[name]):
                 self.currentCallback["plugin"] = getattr(cb["plugin"], "pluginName", "")
                 res = cb["function"](*args, **kwargs)
                 result.append(res)
 
         if name in self.registeredHooks:
             for cb in self.registeredHooks[name]:
-                self.callHook(name, *args, **kwargs)
+                self.executeHook(cb["filepath"], name, *args, **kwargs)
 
         self.core.catchTypeErrors = False
 
@@ -195,28 +211,89 @@ class Callbacks(object):
         hookPath = os.path.join(
             self.core.projectPath, "00_Pipeline", "Hooks", hookName + ".py"
         )
-        if os.path.exists(os.path.dirname(hookPath)) and os.path.basename(
-            hookPath
-        ) in os.listdir(os.path.dirname(hookPath)):
-            hookDir = os.path.dirname(hookPath)
-            if hookDir not in sys.path:
-                sys.path.append(os.path.dirname(hookPath))
-
-            if kwargs:
-                kwargs["core"] = self.core
-
-            try:
-                hook = __import__(hookName)
-                getattr(hook, "main", lambda *args, **kwargs: None)(*args, **kwargs)
-            except:
-                msg = "An Error occuredwhile calling the %s hook:\n\n%s" % (hookName, traceback.format_exc())
-                self.core.popup(msg)
-
-            if hookName in sys.modules:
-                del sys.modules[hookName]
-
-            if os.path.exists(hookPath + "c"):
-                try:
-                    os.remove(hookPath + "c")
-                except:
-                    pass
+        return self.executeHook(hookPath, hookName, *args, **kwargs)
+
+    @err_catcher(name=__name__)
+    def getHookCode(self, hookPath):
+        """
+        Returns the compiled code of a hook. The code is cached and only
+        compiled again, when the mtime or size of the hookfile changes.
+        """
+        try:
+            stat = os.stat(hookPath)
+        except OSError:
+            self.compiledHooks.pop(hookPath, None)
+            return
+
+        fileStat = (stat.st_mtime, stat.st_size)
+        cached = self.compiledHooks.get(hookPath)
+        if cached and cached["stat"] == fileStat:
+            return cached["code"]
+
+        with open(hookPath, "rb") as f:
+            source = f.read()
+
+        code = compile(source, hookPath, "exec")
+        self.compiledHooks[hookPath] = {"stat": fileStat, "code": code}
+        logger.debug("compiled hook: %s" % hookPath)
+        return code
+
+    @err_catcher(name=__name__)
+    def executeHook(self, hookPath, hookName, *args, **kwargs):
+        hookDir = os.path.dirname(hookPath)
+        if hookDir not in sys.path:
+            sys.path.append(hookDir)
+
+        if kwargs:
+            kwargs = dict(kwargs)
+            kwargs["core"] = self.core
+
+        start = time.time()
+        try:
+            code = self.getHookCode(hookPath)
+            if not code:
+                return
+
+            # every call gets a fresh module like an import of the hookfile
+            hook = types.ModuleType(hookName)
+            hook.__file__ = hookPath
+            exec(code, hook.__dict__)
+            result = getattr(hook, "main", lambda *args, **kwargs: None)(*args, **kwargs)
+        except:
+            msg = "An Error occuredwhile calling the %s hook:\n\n%s" % (hookName, traceback.format_exc())
+            self.core.popup(msg)
+            return
+
+        self.addHookTiming(hookPath, time.time() - start)
+        return result
+
+    @err_catcher(name=__name__)
+    def addHookTiming(self, hookPath, duration):
+        if hookPath not in self.hookTimings:
+            self.hookTimings[hookPath] = {"calls": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+
+        timing = self.hookTimings[hookPath]
+        timing["calls"] += 1
+        timing["total"] += duration
+        timing["max"] = max(timing["max"], duration)
+        timing["last"] = duration
+        if duration > self.slowHookThreshold:
+            logger.warning("hook %s took %.2fs" % (hookPath, duration))
+        else:
+            logger.debug("hook %s took %.3fs" % (hookPath, duration))
+
+    @err_catcher(name=__name__)
+    def getHookTimings(self):
+        """
+        Returns a list of the called hooks with their number of calls and
+        their total, average, maximum and last duration in seconds, sorted
+        by the total duration.
+        """
+        timings = []
+        for hookPath in self.hookTimings:
+            timing = dict(self.hookTimings[hookPath])
+            timing["path"] = hookPath
+            timing["average"] = timing["total"] / timing["calls"]
+            timings.append(timing)
+
+        return sorted(timings, key=lambda x: x["total"], reverse=True)
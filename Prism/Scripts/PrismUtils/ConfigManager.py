@@ -36,6 +36,13 @@ import sys
 import platform
 import logging
 import time
+import errno
+import socket
+import threading
+import contextlib
+import json
+import hashlib
+import shutil
 
 from collections import OrderedDict
 
@@ -48,6 +55,11 @@ else:
     from ConfigParser import ConfigParser
     from StringIO import StringIO
 
+try:
+    import cPickle as pickle
+except:
+    import pickle
+
 try:
     from PySide2.QtCore import *
     from PySide2.QtGui import *
@@ -67,12 +79,83 @@ from PrismUtils import Lockfile
 logger = logging.getLogger(__name__)
 
 
+class ConfigCache(object):
+    def __init__(self, maxSize=None):
+        self.maxSize = maxSize or 64 * 1024 * 1024
+        self.entries = OrderedDict([])
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @err_catcher(name=__name__)
+    def getFileStat(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+
+        return stat.st_mtime, stat.st_size
+
+    @err_catcher(name=__name__)
+    def get(self, path):
+        with self.lock:
+            if path not in self.entries:
+                return
+
+        fileStat = self.getFileStat(path)
+        with self.lock:
+            entry = self.entries.pop(path, None)
+            if not entry:
+                return
+
+            if fileStat != (entry[0], entry[1]):
+                logger.debug("config changed on disk: %s" % path)
+                self.size -= entry[1]
+                return
+
+            self.entries[path] = entry
+            return entry[2]
+
+    @err_catcher(name=__name__)
+    def set(self, path, data, fileStat=None):
+        fileStat = fileStat or self.getFileStat(path)
+        with self.lock:
+            entry = self.entries.pop(path, None)
+            if entry:
+                self.size -= entry[1]
+
+            if not fileStat:
+                return
+
+            self.entries[path] = (fileStat[0], fileStat[1], data)
+            self.size += fileStat[1]
+            while self.size > self.maxSize and len(self.entries) > 1:
+                oldPath, oldEntry = self.entries.popitem(last=False)
+                self.size -= oldEntry[1]
+
+    @err_catcher(name=__name__)
+    def pop(self, path):
+        with self.lock:
+            entry = self.entries.pop(path, None)
+            if entry:
+                self.size -= entry[1]
+
+    @err_catcher(name=__name__)
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict([])
+            self.size = 0
+
+
 class ConfigManager(object):
     def __init__(self, core):
         self.core = core
-        self.cachedConfigs = {}
+        self.cachedConfigs = ConfigCache()
+        self.yamlInstances = threading.local()
+        self.useBinaryCache = True
+        self.binaryCacheConfigs = ["shotinfo", "assetinfo"]
         self.preferredExtension = ".yml"
         self.configItems = {}
+        self.lastLockWait = 0
 
         dprConfig = os.path.splitext(self.core.userini)[0] + ".ini"
         if not os.path.exists(self.core.userini) and os.path.exists(dprConfig):
@@ -120,9 +203,9 @@ class ConfigManager(object):
     def clearCache(self, path=None):
         if path:
             path = os.path.normpath(path)
-            self.cachedConfigs.pop(path, None)
+            self.cachedConfigs.pop(path)
         else:
-            self.cachedConfigs = {}
+            self.cachedConfigs.clear()
 
     @err_catcher(name=__name__)
     def createUserPrefs(self):
@@ -214,12 +297,12 @@ class ConfigManager(object):
         elif configPath is None:
             configPath = self.core.userini
 
+        configData = None
         if configPath:
             configPath = os.path.normpath(configPath)
+            configData = self.cachedConfigs.get(configPath)
 
-        if configPath and os.path.normpath(configPath) in self.cachedConfigs:
-            configData = self.cachedConfigs[os.path.normpath(configPath)]
-        else:
+        if configData is None:
             if not configPath:
                 if dft is not None:
                     self.setConfig(cat=cat, param=param, val=dft, configPath=configPath, config=config)
@@ -239,11 +322,16 @@ class ConfigManager(object):
             if os.path.splitext(configPath)[1] == ".ini":
                 configPath = self.convertDeprecatedConfig(configPath)
 
-            configData = self.readYaml(configPath)
+            fileStat = self.cachedConfigs.getFileStat(configPath)
+            configData = self.readConfigFile(
+                configPath,
+                fileStat=fileStat,
+                useBinaryCache=config in self.binaryCacheConfigs,
+            )
             if configData is None:
                 return dft
 
-            self.cachedConfigs[configPath] = configData
+            self.cachedConfigs.set(configPath, configData, fileStat=fileStat)
 
         if param and not cat:
             cat = param
@@ -274,6 +362,29 @@ class ConfigManager(object):
         if not configPath:
             return
 
+        if not os.path.exists(os.path.dirname(configPath)):
+            os.makedirs(os.path.dirname(configPath))
+
+        # the config is read inside of the lock, so that concurrent writes
+        # from other processes don't get lost
+        lf = Lockfile.Lockfile(self.core, configPath)
+        try:
+            with lf:
+                configData = self.getUpdatedConfigData(
+                    configPath, cat=cat, param=param, val=val, data=data, delete=delete
+                )
+                if configData is None:
+                    return
+
+                self.writeYaml(path=configPath, data=configData)
+        except Lockfile.LockfileException:
+            pass
+        else:
+            self.lastLockWait = lf.waitDuration
+            self.cachedConfigs.set(os.path.normpath(configPath), configData)
+
+    @err_catcher(name=__name__)
+    def getUpdatedConfigData(self, configPath, cat=None, param=None, val=None, data=None, delete=False):
         isUserConfig = configPath == self.core.userini
 
         configData = self.readYaml(configPath)
@@ -315,17 +426,7 @@ class ConfigManager(object):
                     else:
                         configData = val
 
-        if not os.path.exists(os.path.dirname(configPath)):
-            os.makedirs(os.path.dirname(configPath))
-
-        lf = Lockfile.Lockfile(self.core, configPath)
-        try:
-            with lf:
-                self.writeYaml(path=configPath, data=configData)
-        except Lockfile.LockfileException:
-            pass
-        else:
-            self.cachedConfigs[os.path.normpath(configPath)] = configData
+        return configData
 
     @err_catcher(name=__name__)
     def updateNestedDicts(self, d, u):
@@ -337,16 +438,115 @@ class ConfigManager(object):
         return d
 
     @err_catcher(name=__name__)
-    def readYaml(self, path=None, data=None, stream=None, retry=True):
-        logger.debug("read from config: %s" % path)
+    def getYaml(self, typ="rt"):
+        # python 2 dicts are unordered, so the safe loader would shuffle the
+        # config content there
+        if typ == "safe" and sys.version[0] != "3":
+            typ = "rt"
+
+        instances = getattr(self.yamlInstances, "instances", None)
+        if instances is None:
+            instances = self.yamlInstances.instances = {}
+
+        if typ not in instances:
+            try:
+                from ruamel.yaml import YAML
+            except:
+                self.core.missingModule("ruamel.yaml")
+                return
+
+            # the safe loader uses the C parser of ruamel.yaml if it is available
+            instances[typ] = YAML(typ=typ)
+
+        return instances[typ]
+
+    @err_catcher(name=__name__)
+    def readConfigFile(self, path, fileStat=None, useBinaryCache=False):
+        useBinaryCache = useBinaryCache and self.useBinaryCache
+        if useBinaryCache:
+            fileStat = fileStat or self.cachedConfigs.getFileStat(path)
+            configData = self.readBinaryCache(path, fileStat)
+            if configData is not None:
+                return configData
+
+        configData = self.readYaml(path, typ="safe")
+        if useBinaryCache and configData:
+            self.writeBinaryCache(path, configData, fileStat)
+
+        return configData
+
+    @err_catcher(name=__name__)
+    def getBinaryCachePath(self, path):
+        if not isinstance(path, bytes):
+            path = path.encode("utf-8")
+
+        cacheName = hashlib.md5(path).hexdigest() + ".pickle"
+        cachePath = os.path.join(
+            os.path.dirname(self.core.userini), "Cache", "Configs", cacheName
+        )
+        return cachePath
+
+    @err_catcher(name=__name__)
+    def readBinaryCache(self, path, fileStat):
+        if not fileStat:
+            return
+
+        cachePath = self.getBinaryCachePath(path)
+        if not os.path.exists(cachePath):
+            return
 
         try:
-            from ruamel.yaml import YAML
-        except:
-            self.core.missingModule("ruamel.yaml")
+            with open(cachePath, "rb") as f:
+                cacheData = pickle.load(f)
+        except Exception as e:
+            logger.debug("failed to read config cache %s: %s" % (cachePath, e))
+            return
+
+        if (
+            not isinstance(cacheData, dict)
+            or cacheData.get("path") != path
+            or cacheData.get("stat") != tuple(fileStat)
+        ):
+            return
+
+        logger.debug("read from config cache: %s" % path)
+        return cacheData.get("data")
+
+    @err_catcher(name=__name__)
+    def writeBinaryCache(self, path, data, fileStat):
+        if not fileStat:
+            return
+
+        cachePath = self.getBinaryCachePath(path)
+        cacheData = {"path": path, "stat": tuple(fileStat), "data": data}
+        tmpPath = "%s.%s.tmp" % (cachePath, os.getpid())
+        try:
+            if not os.path.exists(os.path.dirname(cachePath)):
+                os.makedirs(os.path.dirname(cachePath))
+
+            with open(tmpPath, "wb") as f:
+                pickle.dump(cacheData, f, protocol=2)
+
+            if os.path.exists(cachePath) and not hasattr(os, "replace"):
+                os.remove(cachePath)
+
+            getattr(os, "replace", os.rename)(tmpPath, cachePath)
+        except Exception as e:
+            logger.debug("failed to write config cache %s: %s" % (cachePath, e))
+            if os.path.exists(tmpPath):
+                try:
+                    os.remove(tmpPath)
+                except:
+                    pass
+
+    @err_catcher(name=__name__)
+    def readYaml(self, path=None, data=None, stream=None, retry=True, typ="rt"):
+        logger.debug("read from config: %s" % path)
+
+        yaml = self.getYaml(typ=typ)
+        if not yaml:
             return
 
-        yaml = YAML()
         yamlData = OrderedDict([])
         if path:
             if not os.path.exists(path):
@@ -359,7 +559,7 @@ class ConfigManager(object):
                 msg = "The following file is locked. It might be used by another process:\n\n%s\n\nReading from this file in a locked state can result in data loss." % path
                 result = self.core.popupQuestion(msg, buttons=["Retry", "Continue", "Cancel"], default="Cancel", icon=QMessageBox.Warning)
                 if result == "Retry":
-                    return self.readYaml(path=path, data=data, stream=stream)
+                    return self.readYaml(path=path, data=data, stream=stream, typ=typ)
                 elif result == "Continue":
                     try:
                         lf.forceRelease()
@@ -377,7 +577,7 @@ class ConfigManager(object):
                 except Exception as e:
                     if retry:
                         time.sleep(0.5)
-                        return self.readYaml(path=path, data=data, stream=stream, retry=False)
+                        return self.readYaml(path=path, data=data, stream=stream, retry=False, typ=typ)
                     else:
                         if os.path.exists(path):
                             msg = "Cannot read the content of this file:\n\n%s\n\nThe file exists, but the content is not in a valid yaml format." % path
@@ -386,21 +586,21 @@ class ConfigManager(object):
 
                         result = self.core.popupQuestion(msg, icon=QMessageBox.Warning, buttons=["Retry", "Reset File", "Cancel"], default="Cancel")
                         if result == "Retry":
-                            return self.readYaml(path=path, data=data, stream=stream, retry=False)
+                            return self.readYaml(path=path, data=data, stream=stream, retry=False, typ=typ)
                         elif result == "Reset File":
                             if path == self.core.userini:
                                 self.createUserPrefs()
                             else:
                                 open(path, "w").close()
 
-                            yamlData = self.readYaml(path)
+                            yamlData = self.readYaml(path, typ=typ)
                         elif result == "Cancel":
                             return
                         else:
                             print(result)
 
             if lf.isLocked():
-                yamlData = self.readYaml(path=path, data=data, stream=stream)
+                yamlData = self.readYaml(path=path, data=data, stream=stream, typ=typ)
 
             if not yamlData:
                 logger.warning("empty config: %s" % path)
@@ -423,20 +623,16 @@ class ConfigManager(object):
         if not data:
             return
 
-        try:
-            from ruamel.yaml import YAML
-        except:
-            self.core.missingModule("ruamel.yaml")
+        yaml = self.getYaml()
+        if not yaml:
             return
 
-        yaml = YAML()
-
         if path:
             if not os.path.exists(os.path.dirname(path)):
                 os.makedirs(os.path.dirname(path))
 
             try:
-                with open(path, "w") as config:
+                with self.atomicWrite(path) as config:
                     yaml.dump(data, config)
             except Exception as e:
                 if getattr(e, "errno", None) == 28:
@@ -458,6 +654,55 @@ class ConfigManager(object):
             yaml.dump(data, stream)
             return stream.getvalue()
 
+    @contextlib.contextmanager
+    def atomicWrite(self, path, mode="w"):
+        """
+        Writes to a temporary file next to path and renames it to path
+        afterwards, so that readers never see partially written files.
+        """
+        tmpPath = "%s.%s.%s.%s.tmp" % (
+            path,
+            socket.gethostname(),
+            os.getpid(),
+            threading.current_thread().ident,
+        )
+        try:
+            with open(tmpPath, mode) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+
+            if os.path.exists(path):
+                try:
+                    shutil.copymode(path, tmpPath)
+                except OSError:
+                    pass
+
+            self.replaceFile(tmpPath, path)
+        except:
+            if os.path.exists(tmpPath):
+                try:
+                    os.remove(tmpPath)
+                except OSError:
+                    pass
+
+            raise
+
+    def replaceFile(self, src, dst, retries=20):
+        # on Windows files can't be replaced while another process reads them
+        for idx in range(retries):
+            try:
+                if not hasattr(os, "replace") and os.path.exists(dst):
+                    os.remove(dst)
+
+                getattr(os, "replace", os.rename)(src, dst)
+                return
+            except OSError as e:
+                if e.errno != errno.EACCES or idx == retries - 1:
+                    raise
+
+                time.sleep(0.05)
+
     @err_catcher(name=__name__)
     def readJson(self, path=None, stream=None, data=None, ignoreErrors=False):
         logger.debug("read from config: %s" % path)
@@ -501,7 +746,7 @@ class ConfigManager(object):
             if not os.path.exists(os.path.dirname(path)):
                 os.makedirs(os.path.dirname(path))
 
-            with open(path, "w") as config:
+            with self.atomicWrite(path) as config:
                 json.dump(data, config, indent=indent)
         else:
             if not stream:
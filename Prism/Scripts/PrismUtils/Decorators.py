@@ -47,13 +47,21 @@ except:
     from PySide.QtGui import *
 
 
+from PrismUtils import Profiler
+
+
 logger = logging.getLogger(__name__)
 
 
 def err_handler(func, name="", plugin=False):
+    funcId = "%s.%s" % (name, getattr(func, "__qualname__", func.__name__))
+
     @wraps(func)
     def func_wrapper(*args, **kwargs):
         try:
+            if Profiler.active:
+                return Profiler.profiler.callFunction(funcId, func, args, kwargs)
+
             return func(*args, **kwargs)
         except Exception as e:
             exc_type, exc_obj, exc_tb = sys.exc_info()
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import json
+import time
+import hashlib
+import logging
+import datetime
+import threading
+
+from PrismUtils.Decorators import err_catcher
+from PrismUtils import Lockfile
+
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyIndex(object):
+    """
+    Persistent index of the dependencies of published versions.
+
+    The dependencies of a versioninfo file are read once and stored with the
+    mtime and size of the file, so they are only read again, when the file
+    changes. The index is saved per project in the user Prism folder and
+    merged with the records of other processes on save. It
+    also keeps the reverse edges, which allows to query the versions using
+    a file without scanning the project. Versions get indexed when they are
+    published or shown in the DependencyViewer.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.settleTime = 2
+        self.version = 1
+        self.records = {}
+        self.dependents = {}
+        self.lock = threading.Lock()
+        self.loadedIndexPath = None
+        self.dirty = False
+
+    @err_catcher(name=__name__)
+    def getIndexPath(self):
+        if not self.core.prismIni:
+            return
+
+        key = os.path.normpath(self.core.prismIni)
+        if not isinstance(key, bytes):
+            key = key.encode("utf-8")
+
+        return os.path.join(
+            os.path.dirname(self.core.userini),
+            "Cache",
+            "DependencyIndex",
+            hashlib.md5(key).hexdigest() + ".json",
+        )
+
+    @err_catcher(name=__name__)
+    def ensureLoaded(self):
+        indexPath = self.getIndexPath()
+        if indexPath == self.loadedIndexPath:
+            return
+
+        records = self.readIndex(indexPath)
+        with self.lock:
+            self.records = records
+            self.dependents = {}
+            for infoPath, record in records.items():
+                self.addReverseEdges(infoPath, record)
+
+            self.loadedIndexPath = indexPath
+            self.dirty = False
+
+    @err_catcher(name=__name__)
+    def readIndex(self, indexPath):
+        if not indexPath or not os.path.exists(indexPath):
+            return {}
+
+        try:
+            with open(indexPath, "r") as f:
+                indexData = json.load(f)
+        except Exception as e:
+            logger.debug("failed to read dependency index %s: %s" % (indexPath, e))
+            return {}
+
+        if indexData.get("version") != self.version:
+            return {}
+
+        return indexData.get("records", {})
+
+    @err_catcher(name=__name__)
+    def save(self):
+        """
+        Merges the index file, which other processes might have written since
+        it was loaded, into the records and writes the records. The record
+        of a versioninfo file with the newer mtime wins.
+        """
+        indexPath = self.loadedIndexPath
+        if not self.dirty or not indexPath:
+            return
+
+        try:
+            if not os.path.exists(os.path.dirname(indexPath)):
+                os.makedirs(os.path.dirname(indexPath))
+
+            with Lockfile.Lockfile(self.core, indexPath):
+                storedRecords = self.readIndex(indexPath)
+                with self.lock:
+                    if indexPath != self.loadedIndexPath:
+                        return
+
+                    self.mergeRecords(storedRecords)
+                    indexData = {"version": self.version, "records": dict(self.records)}
+                    self.dirty = False
+
+                with self.core.configs.atomicWrite(indexPath) as f:
+                    json.dump(indexData, f)
+        except Lockfile.LockfileException:
+            logger.debug("dependency index is locked, saving it later: %s" % indexPath)
+        except Exception as e:
+            logger.debug("failed to write dependency index %s: %s" % (indexPath, e))
+
+    def mergeRecords(self, records):
+        for infoPath, record in records.items():
+            current = self.records.get(infoPath)
+            if current and current["stat"][0] >= record["stat"][0]:
+                continue
+
+            if current:
+                self.removeReverseEdges(infoPath, current)
+
+            self.records[infoPath] = record
+            self.addReverseEdges(infoPath, record)
+
+    def normPath(self, path):
+        return os.path.normcase(os.path.normpath(path))
+
+    def addReverseEdges(self, infoPath, record):
+        for path in record["dependencies"] + record["externalFiles"]:
+            self.dependents.setdefault(self.normPath(path), set()).add(infoPath)
+
+    def removeReverseEdges(self, infoPath, record):
+        for path in record["dependencies"] + record["externalFiles"]:
+            key = self.normPath(path)
+            if key in self.dependents:
+                self.dependents[key].discard(infoPath)
+                if not self.dependents[key]:
+                    del self.dependents[key]
+
+    @err_catcher(name=__name__)
+    def getRecord(self, infoPath, force=False):
+        """
+        Returns the source scene, dependencies and external files of a
+        versioninfo file. Use force to index files, which were just written.
+        """
+        self.ensureLoaded()
+        infoPath = os.path.normpath(infoPath)
+        try:
+            infoStat = os.stat(infoPath)
+        except OSError:
+            return
+
+        stat = [infoStat.st_mtime, infoStat.st_size]
+        with self.lock:
+            record = self.records.get(infoPath)
+
+        if record and record["stat"] == stat:
+            return record
+
+        source = self.core.getConfig("information", "source scene", configPath=infoPath)
+        deps = self.core.getConfig("information", "Dependencies", configPath=infoPath) or []
+        extFiles = self.core.getConfig("information", "External files", configPath=infoPath) or []
+        newRecord = {
+            "stat": stat,
+            "source": source,
+            "dependencies": list(deps) + ([source] if source is not None else []),
+            "externalFiles": [x for x in extFiles if x not in deps],
+        }
+
+        # files modified within the mtime resolution could change unnoticed
+        if force or infoStat.st_mtime < (time.time() - self.settleTime):
+            with self.lock:
+                if record:
+                    self.removeReverseEdges(infoPath, record)
+
+                self.records[infoPath] = newRecord
+                self.addReverseEdges(infoPath, newRecord)
+                self.dirty = True
+
+        return newRecord
+
+    @err_catcher(name=__name__)
+    def addVersionInfo(self, infoPath):
+        if self.getRecord(infoPath, force=True):
+            self.save()
+
+    @err_catcher(name=__name__)
+    def getVersionInfoPath(self, path):
+        for infoPath in [
+            os.path.join(os.path.dirname(path), "versioninfo.yml"),
+            os.path.join(os.path.dirname(os.path.dirname(path)), "versioninfo.yml"),
+        ]:
+            self.core.configs.findDeprecatedConfig(infoPath)
+            if os.path.exists(infoPath):
+                return infoPath
+
+    @err_catcher(name=__name__)
+    def getDependencyEntries(self, infoPath):
+        """
+        Returns the dependencies of a versioninfo file with the information,
+        which the DependencyViewer displays. Can be called from any thread.
+        """
+        record = self.getRecord(infoPath)
+        if not record:
+            return []
+
+        entries = []
+        for path in record["dependencies"]:
+            depPath = path
+            if not os.path.exists(path):
+                depDir = os.path.dirname(path)
+                if os.path.exists(depDir) and len(os.listdir(depDir)) > 0:
+                    depPath = depDir
+
+            entry = self.getFileEntry(path, depPath)
+            entry["type"] = "Source Scene" if path == record["source"] else "Export"
+            entry["versionInfo"] = self.getVersionInfoPath(path)
+            entries.append(entry)
+
+        for path in record["externalFiles"]:
+            entry = self.getFileEntry(path, path)
+            entry["type"] = "File"
+            entry["versionInfo"] = None
+            entries.append(entry)
+
+        return entries
+
+    def getFileEntry(self, path, statPath):
+        entry = {"path": path, "exists": False, "date": ""}
+        try:
+            mtime = os.path.getmtime(statPath)
+        except OSError:
+            return entry
+
+        cdate = datetime.datetime.fromtimestamp(mtime).replace(microsecond=0)
+        entry["exists"] = True
+        entry["date"] = cdate.strftime("%d.%m.%y,  %X")
+        return entry
+
+    @err_catcher(name=__name__)
+    def getDependencyGraph(self, infoPath):
+        """
+        Returns the entries of all versioninfo files, which can be reached
+        from infoPath. Every versioninfo file is read only once, even if it
+        is used in several places or in a cycle.
+        """
+        graph = {}
+        pending = [os.path.normpath(infoPath)]
+        while pending:
+            curPath = pending.pop()
+            if curPath in graph:
+                continue
+
+            graph[curPath] = self.getDependencyEntries(curPath)
+            for entry in graph[curPath]:
+                if entry["versionInfo"]:
+                    pending.append(os.path.normpath(entry["versionInfo"]))
+
+        self.save()
+        return graph
+
+    @err_catcher(name=__name__)
+    def getDependents(self, path):
+        """
+        Returns the indexed versioninfo files, which depend on path or on a
+        file inside of path. For versioninfo files the files of the version
+        are used.
+        """
+        self.ensureLoaded()
+        if os.path.basename(path).startswith("versioninfo"):
+            path = os.path.dirname(path)
+
+        key = self.normPath(path)
+        prefix = key.rstrip(os.sep) + os.sep
+        dependents = set()
+        with self.lock:
+            for depPath, infoPaths in self.dependents.items():
+                if depPath == key or depPath.startswith(prefix):
+                    dependents.update(infoPaths)
+
+        return sorted(dependents)
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import time
+import json
+import logging
+import threading
+
+try:
+    import sqlite3
+except:
+    sqlite3 = None
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class EntityIndex(object):
+    """
+    Persistent index of the folder listings in the project.
+
+    Every listing is stored together with the mtime of the folder it was
+    read from. A listing is only read from disk again if the mtime of the
+    folder changed, so a lookup costs one stat instead of a directory scan.
+    The index is kept in memory and in a SQLite database in the
+    00_Pipeline folder of the project, which is shared with all users.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.listings = {}
+        self.connection = None
+        self.dbPath = None
+        self.lock = threading.RLock()
+        # increased on every refresh, so crawls of a previous project stop
+        self.generation = 0
+
+        # folders, which were modified very recently, aren't stored, because
+        # a second change in the same mtime interval wouldn't be detected
+        self.settleTime = 2
+
+    @err_catcher(name=__name__)
+    def isEnabled(self):
+        if not getattr(self.core, "projectPath", None):
+            return False
+
+        return self.core.getConfig("globals", "useEntityIndex", config="project") is not False
+
+    @err_catcher(name=__name__)
+    def getDatabasePath(self):
+        if not self.core.prismIni:
+            return
+
+        return os.path.join(os.path.dirname(self.core.prismIni), "Cache", "entityIndex.db")
+
+    @err_catcher(name=__name__)
+    def getConnection(self):
+        if self.connection:
+            return self.connection
+
+        if sqlite3 is None:
+            return
+
+        dbPath = self.getDatabasePath()
+        if not dbPath:
+            return
+
+        try:
+            if not os.path.exists(os.path.dirname(dbPath)):
+                os.makedirs(os.path.dirname(dbPath))
+
+            connection = sqlite3.connect(dbPath, timeout=5, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS listings "
+                "(path TEXT PRIMARY KEY, mtime REAL, folders TEXT, files TEXT)"
+            )
+            connection.commit()
+        except Exception as e:
+            logger.debug("failed to open entity index %s: %s" % (dbPath, e))
+            return
+
+        self.connection = connection
+        self.dbPath = dbPath
+        logger.debug("opened entity index: %s" % dbPath)
+        return self.connection
+
+    @err_catcher(name=__name__)
+    def refresh(self):
+        with self.lock:
+            if self.connection:
+                try:
+                    self.connection.close()
+                except Exception:
+                    pass
+
+            self.connection = None
+            self.dbPath = None
+            self.listings = {}
+            self.generation += 1
+
+    @err_catcher(name=__name__)
+    def invalidate(self, path=None, parents=0):
+        """
+        Removes the listing of "path" and of "parents" levels of its parent
+        folders from the index. Invalidates the whole index if no path is
+        given.
+        """
+        with self.lock:
+            if path is None:
+                self.listings = {}
+                paths = None
+            else:
+                paths = [os.path.normpath(path)]
+                for idx in range(parents):
+                    paths.append(os.path.dirname(paths[-1]))
+
+                for invalidPath in paths:
+                    self.listings.pop(invalidPath, None)
+
+            connection = self.getConnection()
+            if not connection:
+                return
+
+            try:
+                if paths is None:
+                    connection.execute("DELETE FROM listings")
+                else:
+                    connection.executemany("DELETE FROM listings WHERE path=?", [(x,) for x in paths])
+                connection.commit()
+            except Exception as e:
+                logger.debug("failed to invalidate entity index: %s" % e)
+
+    @err_catcher(name=__name__)
+    def listDir(self, path):
+        """
+        Returns a tuple of the folder names and file names in "path".
+        Returns None if the path doesn't exist.
+        """
+        path = os.path.normpath(path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            with self.lock:
+                self.listings.pop(path, None)
+            return
+
+        if not self.isEnabled():
+            return self.scanDir(path)
+
+        with self.lock:
+            cached = self.listings.get(path)
+            if cached and cached[0] == mtime:
+                return list(cached[1]), list(cached[2])
+
+            stored = self.getStoredListing(path)
+            if stored and stored[0] == mtime:
+                self.listings[path] = stored
+                return list(stored[1]), list(stored[2])
+
+        listing = self.scanDir(path)
+        if listing is None:
+            return
+
+        if (time.time() - mtime) > self.settleTime:
+            with self.lock:
+                self.listings[path] = [mtime, listing[0], listing[1]]
+                self.storeListings([[path, mtime, listing[0], listing[1]]])
+
+        return list(listing[0]), list(listing[1])
+
+    @err_catcher(name=__name__)
+    def scanDir(self, path):
+        for root, folders, files in os.walk(path):
+            return sorted(folders), sorted(files)
+
+    @err_catcher(name=__name__)
+    def getFileRecords(self, path):
+        """
+        Returns a list of [filename, mtime, size] for the files in "path".
+        File stats aren't cached, because editing a file doesn't change the
+        mtime of its folder. scandir reuses the data of the directory listing,
+        which makes the stats free on Windows and saves a path lookup per
+        file on Linux.
+        """
+        records = []
+        if scandir is None:
+            for filename in self.scanDir(path)[1] if os.path.isdir(path) else []:
+                try:
+                    fileStat = os.stat(os.path.join(path, filename))
+                except OSError:
+                    continue
+
+                records.append([filename, fileStat.st_mtime, fileStat.st_size])
+
+            return records
+
+        try:
+            entries = list(scandir(path))
+        except OSError:
+            return records
+
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+
+                fileStat = entry.stat()
+            except OSError:
+                continue
+
+            records.append([entry.name, fileStat.st_mtime, fileStat.st_size])
+
+        records.sort(key=lambda x: x[0])
+        return records
+
+    @err_catcher(name=__name__)
+    def getStoredListing(self, path):
+        connection = self.getConnection()
+        if not connection:
+            return
+
+        try:
+            row = connection.execute(
+                "SELECT mtime, folders, files FROM listings WHERE path=?", (path,)
+            ).fetchone()
+        except Exception as e:
+            logger.debug("failed to read from entity index: %s" % e)
+            return
+
+        if not row:
+            return
+
+        return [row[0], json.loads(row[1]), json.loads(row[2])]
+
+    @err_catcher(name=__name__)
+    def storeListings(self, listings):
+        connection = self.getConnection()
+        if not connection:
+            return
+
+        rows = [
+            (x[0], x[1], json.dumps(x[2]), json.dumps(x[3])) for x in listings
+        ]
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO listings (path, mtime, folders, files) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            connection.commit()
+        except Exception as e:
+            logger.debug("failed to write to entity index: %s" % e)
+
+    @err_catcher(name=__name__)
+    def getFolders(self, path):
+        listing = self.listDir(path)
+        if not listing:
+            return []
+
+        return listing[0]
+
+    @err_catcher(name=__name__)
+    def getFiles(self, path):
+        listing = self.listDir(path)
+        if not listing:
+            return []
+
+        return listing[1]
+
+    @err_catcher(name=__name__)
+    def crawlInBackground(self):
+        if not self.isEnabled():
+            return
+
+        thread = threading.Thread(target=self.runCrawl, args=[self.generation])
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def runCrawl(self, generation):
+        try:
+            self.crawl(generation=generation)
+        except Exception as e:
+            logger.warning("failed to crawl entity index: %s" % e)
+
+    @err_catcher(name=__name__)
+    def crawl(self, paths=None, maxDepth=6, generation=None):
+        """
+        Reads the folder structure below the asset and shot folders into the
+        index in one pass. Folders which didn't change since the last crawl
+        are skipped, so repeated crawls only cost one stat per folder.
+        The crawl stops, if the index gets refreshed while it is running.
+        """
+        if not self.isEnabled():
+            return
+
+        if paths is None:
+            paths = [self.core.getAssetPath(), self.core.getShotPath()]
+            if self.core.useLocalFiles:
+                paths += [
+                    self.core.getAssetPath(location="local"),
+                    self.core.getShotPath(location="local"),
+                ]
+
+        startTime = time.time()
+        scanned = 0
+        stack = [[os.path.normpath(x), 0] for x in paths]
+        newListings = []
+        while stack:
+            path, depth = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+
+            with self.lock:
+                if generation is not None and generation != self.generation:
+                    logger.debug("entity index crawl stopped, because the index was refreshed")
+                    return
+
+                cached = self.listings.get(path) or self.getStoredListing(path)
+
+            if cached and cached[0] == mtime:
+                listing = [cached[1], cached[2]]
+            else:
+                listing = self.scanDir(path)
+                if listing is None:
+                    continue
+
+                scanned += 1
+                if (time.time() - mtime) > self.settleTime:
+                    newListings.append([path, mtime, listing[0], listing[1]])
+
+            with self.lock:
+                if generation is not None and generation != self.generation:
+                    return
+
+                self.listings[path] = [mtime, listing[0], listing[1]]
+
+            if depth < maxDepth:
+                for folder in listing[0]:
+                    if folder.startswith("_"):
+                        continue
+
+                    stack.append([os.path.join(path, folder), depth + 1])
+
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self.storeListings(newListings)
+
+        logger.debug(
+            "crawled entity index in %.2fs (%s folders scanned)"
+            % (time.time() - startTime, scanned)
+        )
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import io
+import time
+import zlib
+import errno
+import hashlib
+import logging
+import platform
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class Crc32Hash(object):
+    """Fallback for the "fast" hash mode, if xxhash isn't installed."""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return "%08x" % (self.value & 0xffffffff)
+
+
+class FileCopy(object):
+    """
+    Streaming file copy with incremental hashing.
+
+    The source is read once in chunks of "bufferSize" and every chunk is
+    hashed before it gets written, so files are never loaded into memory as
+    a whole. On Linux the data is copied by the kernel (copy_file_range or
+    sendfile) when possible. In that case the data doesn't pass through
+    Python and the source and destination are hashed together afterwards.
+    The hash mode "fast" uses xxhash if it is available and crc32 otherwise.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.bufferSize = 8 * 1024 * 1024
+        self.hashMode = "md5"
+        self.maxRetries = 3
+        self.useKernelCopy = platform.system() == "Linux"
+        self.fallbackErrnos = [
+            errno.EXDEV,
+            errno.EINVAL,
+            errno.ENOSYS,
+            errno.EBADF,
+            getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+            getattr(errno, "ENOTSUP", errno.EINVAL),
+        ]
+        self.xxhash = None
+
+    @err_catcher(name=__name__)
+    def getHasher(self, hashMode=None):
+        hashMode = hashMode or self.hashMode
+        if hashMode == "fast":
+            if self.xxhash is None:
+                try:
+                    import xxhash
+                    self.xxhash = xxhash
+                except ImportError:
+                    self.xxhash = False
+
+            if not self.xxhash:
+                return Crc32Hash()
+
+            if hasattr(self.xxhash, "xxh3_64"):
+                return self.xxhash.xxh3_64()
+
+            return self.xxhash.xxh64()
+
+        return hashlib.new(hashMode)
+
+    @err_catcher(name=__name__)
+    def getKernelCopyFunctions(self):
+        if not self.useKernelCopy:
+            return []
+
+        functions = []
+        if hasattr(os, "copy_file_range"):
+            functions.append(("copy_file_range", self.copyFileRange))
+
+        if hasattr(os, "sendfile"):
+            functions.append(("sendfile", self.sendfile))
+
+        return functions
+
+    def copyFileRange(self, srcFd, dstFd, offset, count):
+        return os.copy_file_range(srcFd, dstFd, count, offset, offset)
+
+    def sendfile(self, srcFd, dstFd, offset, count):
+        os.lseek(dstFd, offset, os.SEEK_SET)
+        return os.sendfile(dstFd, srcFd, offset, count)
+
+    def isCanceled(self, thread):
+        return bool(thread and thread.canceled)
+
+    def getProgressCallback(self, thread, total, label="Progress"):
+        if not thread:
+            return lambda copied: None
+
+        data = {"prevPrc": -1, "startTime": time.time()}
+
+        def callback(copied):
+            prc = int((copied / float(total)) * 100) if total else 100
+            if prc == data["prevPrc"]:
+                return
+
+            data["prevPrc"] = prc
+            duration = time.time() - data["startTime"]
+            speed = (copied / (1024.0 * 1024.0)) / duration if duration else 0
+            thread.updated.emit("%s: %s%% (%.1f MB/s)" % (label, prc, speed))
+
+        return callback
+
+    @err_catcher(name=__name__)
+    def copyFile(self, src, dst, thread=None, hashMode=None, validate=True, bufferSize=None):
+        bufferSize = bufferSize or self.bufferSize
+        for attempt in range(self.maxRetries):
+            result = self.copyData(src, dst, thread=thread, hashMode=hashMode, bufferSize=bufferSize)
+            if self.isCanceled(thread):
+                self.removeFile(dst)
+                return
+
+            if not validate:
+                return dst
+
+            if thread:
+                thread.updated.emit("Validating copied file")
+
+            if result["hash"]:
+                srcHash = result["hash"]
+                dstHash = self.hashFiles([dst], thread=thread, hashMode=hashMode, bufferSize=bufferSize)[0]
+            else:
+                srcHash, dstHash = self.hashFiles([src, dst], thread=thread, hashMode=hashMode, bufferSize=bufferSize)
+
+            if self.isCanceled(thread):
+                self.removeFile(dst)
+                return
+
+            if srcHash == dstHash:
+                return dst
+
+            logger.warning("copied file doesn't match the source (attempt %s): %s" % (attempt + 1, dst))
+
+        raise IOError("Copied file doesn't match the source: %s" % dst)
+
+    @err_catcher(name=__name__)
+    def copyData(self, src, dst, thread=None, hashMode=None, bufferSize=None):
+        """
+        Copies the content of src to dst and returns the number of copied
+        bytes and the hash of the source. The hash is None, if the data was
+        copied by the kernel.
+        """
+        bufferSize = bufferSize or self.bufferSize
+        total = os.stat(src).st_size
+        progress = self.getProgressCallback(thread, total)
+        result = {"copied": 0, "hash": None, "method": None}
+        with io.open(src, "rb") as fsrc:
+            with io.open(dst, "wb") as fdst:
+                copied = 0
+                if total:
+                    copied, result["method"] = self.kernelCopy(fsrc, fdst, total, thread=thread, progress=progress, bufferSize=bufferSize)
+
+                if copied < total and not self.isCanceled(thread):
+                    hasher = None
+                    if not copied:
+                        hasher = self.getHasher(hashMode)
+                        result["method"] = "stream"
+
+                    fsrc.seek(copied)
+                    fdst.seek(copied)
+                    copied = self.streamCopy(fsrc, fdst, copied=copied, thread=thread, progress=progress, hasher=hasher, bufferSize=bufferSize)
+                    if hasher:
+                        result["hash"] = hasher.hexdigest()
+                elif not total:
+                    result["hash"] = self.getHasher(hashMode).hexdigest()
+
+        result["copied"] = copied
+        return result
+
+    @err_catcher(name=__name__)
+    def kernelCopy(self, fsrc, fdst, total, thread=None, progress=None, bufferSize=None):
+        bufferSize = bufferSize or self.bufferSize
+        srcFd = fsrc.fileno()
+        dstFd = fdst.fileno()
+        copied = 0
+        for name, function in self.getKernelCopyFunctions():
+            try:
+                while copied < total:
+                    if self.isCanceled(thread):
+                        break
+
+                    sent = function(srcFd, dstFd, copied, min(bufferSize, total - copied))
+                    if not sent:
+                        break
+
+                    copied += sent
+                    if progress:
+                        progress(copied)
+
+                return copied, name
+            except OSError as e:
+                if e.errno not in self.fallbackErrnos:
+                    raise
+
+                logger.debug("%s isn't supported for this file (%s). Falling back." % (name, e))
+
+        return copied, None
+
+    @err_catcher(name=__name__)
+    def streamCopy(self, fsrc, fdst, copied=0, thread=None, progress=None, hasher=None, bufferSize=None):
+        buf = bytearray(bufferSize or self.bufferSize)
+        view = memoryview(buf)
+        while not self.isCanceled(thread):
+            size = fsrc.readinto(buf)
+            if not size:
+                break
+
+            chunk = view[:size]
+            if hasher:
+                hasher.update(chunk)
+
+            fdst.write(chunk)
+            copied += size
+            if progress:
+                progress(copied)
+
+        return copied
+
+    @err_catcher(name=__name__)
+    def hashFiles(self, paths, thread=None, hashMode=None, bufferSize=None):
+        """
+        Hashes all paths in one pass. Chunks of all files are read in turn,
+        which keeps reads of the same region close together.
+        """
+        bufferSize = bufferSize or self.bufferSize
+        total = sum([os.stat(path).st_size for path in paths])
+        progress = self.getProgressCallback(thread, total, label="Validating")
+        hashers = [self.getHasher(hashMode) for path in paths]
+        files = [io.open(path, "rb") for path in paths]
+        buf = bytearray(bufferSize)
+        view = memoryview(buf)
+        read = 0
+        try:
+            active = list(range(len(files)))
+            while active and not self.isCanceled(thread):
+                for idx in list(active):
+                    size = files[idx].readinto(buf)
+                    if not size:
+                        active.remove(idx)
+                        continue
+
+                    hashers[idx].update(view[:size])
+                    read += size
+
+                progress(read)
+        finally:
+            for fileObj in files:
+                fileObj.close()
+
+        return [hasher.hexdigest() for hasher in hashers]
+
+    @err_catcher(name=__name__)
+    def hashFile(self, path, hashMode=None, bufferSize=None):
+        return self.hashFiles([path], hashMode=hashMode, bufferSize=bufferSize)[0]
+
+    @err_catcher(name=__name__)
+    def removeFile(self, path):
+        try:
+            os.remove(path)
+        except Exception:
+            pass
@@ -31,10 +31,21 @@
 # along with Prism.  If not, see <https://www.gnu.org/licenses/>.
 
 
+
+
 import os
+import json
 import time
 import errno
+import socket
 import logging
+import platform
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 logger = logging.getLogger(__name__)
@@ -45,56 +56,344 @@ class LockfileException(Exception):
 
 
 class Lockfile(object):
-    def __init__(self, core, fileName, timeout=10, delay=0.05):
+    """
+    Lock for files, which are shared between processes and hosts.
+
+    Where flock is available, the lockfile is locked with flock and the
+    kernel releases the lock, when the owning process dies. Otherwise the
+    lockfile is created exclusively. In both cases the lockfile contains a
+    lease with the pid and host of the owner and is touched every
+    "leaseInterval" seconds while it is held, so lockfiles of crashed
+    processes are detected and removed by the next process. flock clients
+    also respect exclusive lockfiles of clients without flock.
+    A thread, which already holds a lock, can acquire it again.
+    """
+
+    heldLocks = {}
+    heldLocksLock = threading.Lock()
+    flockFallbackErrnos = [
+        errno.ENOLCK,
+        errno.EINVAL,
+        errno.ENOSYS,
+        getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+        getattr(errno, "ENOTSUP", errno.EINVAL),
+    ]
+
+    def __init__(self, core, fileName, timeout=10, delay=0.05, leaseInterval=2, leaseTimeout=30):
         self.core = core
         self._fileLocked = False
+        self._reentrant = False
         self.lockPath = fileName + ".lock"
+        self.lockKey = os.path.normcase(os.path.abspath(self.lockPath))
         self.fileName = fileName
         self.timeout = timeout
         self.delay = delay
+        self.leaseInterval = leaseInterval
+        self.leaseTimeout = leaseTimeout
+        self.lockFile = None
+        self.useFlock = fcntl is not None
+        self.heartbeatStop = None
+        self.waitDuration = 0
 
     def acquire(self):
+        threadId = threading.current_thread().ident
+        with self.heldLocksLock:
+            if self.heldLocks.get(self.lockKey) == threadId:
+                self._reentrant = True
+                self._fileLocked = True
+                return
+
         startTime = time.time()
+        if self.useFlock:
+            try:
+                self.acquireFlock(startTime)
+            except (IOError, OSError) as e:
+                if e.errno not in self.flockFallbackErrnos:
+                    raise
+
+                logger.debug("flock isn't supported for %s (%s). Using a lease instead." % (self.lockPath, e))
+                self.closeLockFile()
+                self.useFlock = False
+                self.acquireLease(startTime)
+        else:
+            self.acquireLease(startTime)
+
+        self.waitDuration = time.time() - startTime
+        with self.heldLocksLock:
+            self.heldLocks[self.lockKey] = threadId
+
+        self._fileLocked = True
+
+    def openLockFile(self, flags):
+        try:
+            return os.open(self.lockPath, flags)
+        except OSError as e:
+            if e.errno == errno.EACCES:
+                msg = "Permission denied to create file:\n\n%s" % self.lockPath
+                self.core.popup(msg)
+                raise LockfileException(msg)
+
+            raise
+
+    def acquireFlock(self, startTime):
+        delay = 0.001
         while True:
+            created = True
             try:
-                self.lockFile = os.open(self.lockPath, os.O_CREAT|os.O_EXCL|os.O_RDWR)
-                self._fileLocked = True
-                break
+                fd = self.openLockFile(os.O_CREAT | os.O_EXCL | os.O_RDWR)
             except OSError as e:
-                if e.errno == errno.EACCES:
-                    msg = "Permission denied to create file:\n\n%s" % self.lockPath
-                    self.core.popup(msg)
-                    raise LockfileException(msg)
-                elif e.errno != errno.EEXIST:
+                if e.errno != errno.EEXIST:
                     raise
-                elif time.time() - startTime >= self.timeout:
-                    msg = "This config seems to be in use by another process:\n\n%s\n\nForcing to write to this file while another process is writing to it could result in data loss.\n\nDo you want to force writing to this file?" % self.fileName
-                    result = self.core.popupQuestion(msg)
-                    if result == "Yes":
-                        if os.path.exists(self.lockPath):
-                            os.remove(self.lockPath)
+
+                created = False
+                try:
+                    fd = self.openLockFile(os.O_RDWR)
+                except OSError as e:
+                    if e.errno == errno.ENOENT:
+                        continue
+
+                    raise
+
+            try:
+                while True:
+                    try:
+                        if self.timeout is None:
+                            fcntl.flock(fd, fcntl.LOCK_EX)
+                        else:
+                            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+                        break
+                    except (IOError, OSError) as e:
+                        if e.errno not in [errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK]:
+                            raise
+
+                    self.checkTimeout(startTime)
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.delay)
+            except:
+                os.close(fd)
+                raise
+
+            # the previous owner removes the lockfile on release, so the
+            # lock is only valid, if the file wasn't replaced in the meantime
+            try:
+                fileStat = os.fstat(fd)
+                pathStat = os.stat(self.lockPath)
+                valid = (fileStat.st_dev, fileStat.st_ino) == (pathStat.st_dev, pathStat.st_ino)
+            except OSError:
+                valid = False
+
+            if valid and not created:
+                # lockfiles created exclusively by Windows clients or older
+                # Prism versions are held without flock
+                staleStat = self.getForeignLockStat()
+                if staleStat is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
+                    if staleStat:
+                        self.breakLease(staleStat)
                     else:
-                        raise LockfileException("Timeout occurred while writing to file: %s" % self.fileName)
+                        self.checkTimeout(startTime)
+                        time.sleep(self.delay)
+
+                    continue
+
+            if valid:
+                break
+
+            os.close(fd)
+
+        self.lockFile = fd
+        self.writeLease()
+        self.startHeartbeat()
+
+    def getForeignLockStat(self):
+        """
+        Returns None, if an existing lockfile isn't held by a client without
+        flock, False if it is held and the stat of the file, if it is stale.
+        """
+        lease = self.readLease()
+        if lease and lease.get("flock") and lease.get("host") == socket.gethostname():
+            # the previous flock owner died before removing the file
+            return
+
+        # flock leases of other hosts are only valid, if the filesystem
+        # doesn't share flocks between hosts, so they are handled like leases
+        return self.getStaleLeaseStat() or False
+
+    def checkTimeout(self, startTime):
+        if self.timeout is None or time.time() - startTime < self.timeout:
+            return
+
+        lease = self.readLease() or {}
+        msg = "This config is in use by another process (pid %s on %s):\n\n%s" % (
+            lease.get("pid", "?"),
+            lease.get("host", "?"),
+            self.fileName,
+        )
+        self.core.popup(msg)
+        raise LockfileException("Timeout occurred while writing to file: %s" % self.fileName)
+
+    def acquireLease(self, startTime):
+        while True:
+            try:
+                self.lockFile = self.openLockFile(os.O_CREAT | os.O_EXCL | os.O_RDWR)
+                break
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+            staleStat = self.getStaleLeaseStat()
+            if staleStat:
+                self.breakLease(staleStat)
+                continue
 
-                time.sleep(self.delay)
+            if self.timeout is not None and time.time() - startTime >= self.timeout:
+                msg = "This config seems to be in use by another process:\n\n%s\n\nForcing to write to this file while another process is writing to it could result in data loss.\n\nDo you want to force writing to this file?" % self.fileName
+                result = self.core.popupQuestion(msg)
+                if result == "Yes":
+                    self.forceRelease()
+                else:
+                    raise LockfileException("Timeout occurred while writing to file: %s" % self.fileName)
+
+            time.sleep(self.delay)
+
+        self.writeLease()
+        self.startHeartbeat()
+
+    def writeLease(self):
+        lease = {
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "time": time.time(),
+            "flock": self.useFlock,
+        }
+        try:
+            os.ftruncate(self.lockFile, 0)
+            os.lseek(self.lockFile, 0, os.SEEK_SET)
+            os.write(self.lockFile, json.dumps(lease).encode("utf-8"))
+        except OSError as e:
+            logger.debug("failed to write lease %s: %s" % (self.lockPath, e))
+
+    def readLease(self, path=None):
+        try:
+            with open(path or self.lockPath, "r") as f:
+                lease = json.loads(f.read())
+        except Exception:
+            return
+
+        if isinstance(lease, dict):
+            return lease
+
+    def getStaleLeaseStat(self):
+        try:
+            lockStat = os.stat(self.lockPath)
+        except OSError:
+            return
+
+        lease = self.readLease()
+        if lease and lease.get("host") == socket.gethostname() and platform.system() != "Windows":
+            if not self.isProcessRunning(lease.get("pid")):
+                return lockStat
+
+        # lockfiles of older Prism versions are empty, so the age is the only indicator
+        if time.time() - lockStat.st_mtime > self.leaseTimeout:
+            return lockStat
+
+    def isProcessRunning(self, pid):
+        try:
+            os.kill(int(pid), 0)
+        except (TypeError, ValueError):
+            return True
+        except OSError as e:
+            return e.errno == errno.EPERM
+
+        return True
+
+    def breakLease(self, staleStat):
+        lease = self.readLease()
+        stalePath = "%s.%s.%s.stale" % (self.lockPath, socket.gethostname(), os.getpid())
+        try:
+            os.rename(self.lockPath, stalePath)
+        except OSError:
+            return
+
+        # another process might have replaced the stale lockfile in the meantime
+        try:
+            renamedStat = os.stat(stalePath)
+            if (renamedStat.st_dev, renamedStat.st_ino) != (staleStat.st_dev, staleStat.st_ino):
+                if not os.path.exists(self.lockPath):
+                    os.rename(stalePath, self.lockPath)
+                    return
+
+            os.remove(stalePath)
+        except OSError:
+            pass
+
+        logger.warning("removed stale lockfile: %s (%s)" % (self.lockPath, lease))
+
+    def startHeartbeat(self):
+        self.heartbeatStop = threading.Event()
+        heartbeat = threading.Thread(target=self.runHeartbeat, args=(self.heartbeatStop,))
+        heartbeat.daemon = True
+        heartbeat.start()
+
+    def runHeartbeat(self, stopEvent):
+        while not stopEvent.wait(self.leaseInterval):
+            try:
+                os.utime(self.lockPath, None)
+            except OSError:
+                pass
+
+    def closeLockFile(self):
+        if self.lockFile is not None:
+            try:
+                os.close(self.lockFile)
+            except OSError:
+                pass
+
+            self.lockFile = None
 
     def release(self):
-        if self._fileLocked:
-            os.close(self.lockFile)
-            startTime = time.time()
-            while True:
-                try:
-                    if os.path.exists(self.lockPath):
-                        os.remove(self.lockPath)
-                    break
-                except:
-                    if time.time() - startTime >= self.timeout:
-                        self.core.popup("Couldn't remove lockfile:\n\n%s\n\nIt might be used by another process. Prism won't be able to write to this file as long as it's lockfile exists." % self.lockPath)
-                        break
+        if not self._fileLocked:
+            return
+
+        self._fileLocked = False
+        if self._reentrant:
+            self._reentrant = False
+            return
+
+        with self.heldLocksLock:
+            self.heldLocks.pop(self.lockKey, None)
 
-                time.sleep(self.delay)
+        if self.heartbeatStop:
+            self.heartbeatStop.set()
+            self.heartbeatStop = None
+
+        if self.useFlock:
+            # removed while it is still locked. Waiting processes notice the
+            # replaced file and lock the new one.
+            try:
+                os.remove(self.lockPath)
+            except OSError:
+                pass
+
+            self.closeLockFile()
+            return
+
+        self.closeLockFile()
+        startTime = time.time()
+        while True:
+            try:
+                if os.path.exists(self.lockPath):
+                    os.remove(self.lockPath)
+                break
+            except:
+                if time.time() - startTime >= self.timeout:
+                    self.core.popup("Couldn't remove lockfile:\n\n%s\n\nIt might be used by another process. Prism won't be able to write to this file as long as it's lockfile exists." % self.lockPath)
+                    break
 
-            self._fileLocked = False
+            time.sleep(self.delay)
 
     def forceRelease(self):
         if os.path.exists(self.lockPath):
@@ -104,7 +403,7 @@ class Lockfile(object):
         startTime = time.time()
         timeout = timeout or self.timeout
         while True:
-            if not os.path.exists(self.lockPath):
+            if not self.isLocked():
                 break
 
             logger.debug("waiting for config to unlock before reading")
@@ -115,7 +414,30 @@ class Lockfile(object):
             time.sleep(self.delay)
 
     def isLocked(self):
-        return os.path.exists(self.lockPath)
+        # configs are written atomically, so locks of this process don't block reading
+        if self.lockKey in self.heldLocks:
+            return False
+
+        if not os.path.exists(self.lockPath):
+            return False
+
+        if self.useFlock:
+            try:
+                fd = os.open(self.lockPath, os.O_RDONLY)
+            except OSError:
+                return False
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                return bool(self.getForeignLockStat() is False)
+            except (IOError, OSError) as e:
+                if e.errno in [errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK]:
+                    return True
+            finally:
+                os.close(fd)
+
+        return not self.getStaleLeaseStat()
 
     def __enter__(self):
         if not self._fileLocked:
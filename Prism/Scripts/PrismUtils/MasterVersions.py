@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+import os
+import time
+import shutil
+import logging
+import platform
+import threading
+from multiprocessing.pool import ThreadPool
+
+try:
+    from PySide2.QtCore import *
+except:
+    from PySide.QtCore import *
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+# ioctl request to clone the extents of a file on copy-on-write filesystems
+# like btrfs and xfs (see "man ioctl_ficlone")
+FICLONE = 0x40049409
+
+
+class MasterVersionError(Exception):
+    pass
+
+
+class MasterVersions(object):
+    """
+    Builds master versions in a staging folder next to the master folder and
+    swaps the staging folder in, when all files are transferred. The old
+    master stays available until the swap, which is two renames.
+
+    Files are hardlinked (if enabled in the project), reflinked (Linux) or
+    copied in parallel. A staging folder of an interrupted update is reused:
+    files with matching size and mtime are not transferred again.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.maxThreads = 8
+        self.stagingSuffix = ".staging"
+        self.backupSuffix = ".old"
+        self.noReflinkDevices = set()
+        self.lock = threading.Lock()
+
+    @err_catcher(name=__name__)
+    def getStagingFolder(self, folder):
+        return os.path.normpath(folder) + self.stagingSuffix
+
+    @err_catcher(name=__name__)
+    def getBackupFolder(self, folder):
+        return os.path.normpath(folder) + self.backupSuffix
+
+    @err_catcher(name=__name__)
+    def isTransientFolder(self, name):
+        """
+        Returns whether "name" is a staging or backup folder, which must not
+        be listed as a version.
+        """
+        return name.endswith(self.stagingSuffix) or name.endswith(self.backupSuffix)
+
+    def raiseInBackground(self, msg):
+        """
+        Raises a MasterVersionError with "msg" off the GUI thread, where
+        popups aren't shown. Master versions are updated in background tasks
+        during a publish, so the PublishScheduler records the error and the
+        publish reports it.
+        """
+        if not self.core.isGuiThread():
+            raise MasterVersionError(msg)
+
+    @err_catcher(name=__name__)
+    def useHardlinks(self):
+        return self.core.getConfig(
+            "globals", "useHardLinksForMasterVersions", config="project"
+        ) or False
+
+    @err_catcher(name=__name__)
+    def publish(self, folder, files, progressCallback=None):
+        """
+        Replaces "folder" with a folder containing "files", which is a list
+        of (sourcePath, relativeTargetPath) tuples.
+        Returns True on success.
+        """
+        staging = self.stageFiles(folder, files, progressCallback=progressCallback)
+        if not staging:
+            return False
+
+        return self.commitStaging(staging, folder)
+
+    @err_catcher(name=__name__)
+    def stageFiles(self, folder, files, progressCallback=None):
+        """
+        Transfers "files" into the staging folder of "folder" and returns the
+        path of the staging folder. Existing files in the staging folder,
+        which match their source, are kept, all other files are removed.
+        """
+        self.recoverFolder(folder)
+        staging = self.getStagingFolder(folder)
+        jobs = []
+        targets = set()
+        for source, relPath in files:
+            target = os.path.normpath(os.path.join(staging, relPath))
+            targets.add(os.path.normcase(target))
+            jobs.append([source, target])
+
+        if os.path.exists(staging):
+            self.removeUnusedFiles(staging, targets)
+
+        pending = [job for job in jobs if not self.isUpToDate(job[0], job[1])]
+        if len(pending) != len(jobs):
+            logger.debug(
+                "resuming master version: %s of %s files already staged"
+                % (len(jobs) - len(pending), len(jobs))
+            )
+
+        for folderPath in set(os.path.dirname(job[1]) for job in pending):
+            if not os.path.exists(folderPath):
+                os.makedirs(folderPath)
+
+        if not os.path.exists(staging):
+            os.makedirs(staging)
+
+        useHardlinks = self.useHardlinks()
+        folderPrefix = os.path.normcase(os.path.normpath(folder)) + os.sep
+        for job in pending:
+            # files of the current master version are about to be removed,
+            # so linking them can't affect any other version
+            isOwnFile = os.path.normcase(os.path.normpath(job[0])).startswith(folderPrefix)
+            job.append(useHardlinks or isOwnFile)
+
+        total = len(jobs)
+        done = total - len(pending)
+        popup = None
+        if (
+            not progressCallback
+            and self.core.uiAvailable
+            and self.core.isGuiThread()
+            and len(pending) > 1
+        ):
+            popup = self.core.waitPopup(self.core, "Updating master version - please wait..\n\n\n")
+            popup.show()
+            progressCallback = lambda d, t, p: self.updateProgressPopup(popup, d, t)
+
+        start = time.time()
+        methods = {}
+        pool = ThreadPool(max(1, min(self.maxThreads, len(pending))))
+        try:
+            for result in pool.imap_unordered(self.transferJob, pending):
+                done += 1
+                methods[result] = methods.get(result, 0) + 1
+                if progressCallback:
+                    progressCallback(done, total, folder)
+        finally:
+            pool.close()
+            pool.join()
+            if popup:
+                popup.close()
+
+        logger.debug(
+            "staged %s files for %s in %.2fs: %s"
+            % (len(pending), folder, time.time() - start, methods)
+        )
+        return staging
+
+    @err_catcher(name=__name__)
+    def updateProgressPopup(self, popup, done, total):
+        if not popup.msg:
+            return
+
+        text = popup.msg.text()
+        updatedText = text.rsplit("\n", 2)[0] + "\n%s / %s files\n" % (done, total)
+        popup.msg.setText(updatedText)
+        QCoreApplication.processEvents()
+
+    @err_catcher(name=__name__)
+    def commitStaging(self, staging, folder):
+        """
+        Swaps the staging folder in. The previous master is renamed to a
+        backup folder first, which gets removed after the swap.
+        """
+        backup = self.getBackupFolder(folder)
+        if os.path.exists(backup):
+            self.removeFolder(backup)
+
+        if os.path.exists(folder):
+            try:
+                os.rename(folder, backup)
+            except Exception as e:
+                logger.warning("failed to move the current master version: %s" % e)
+                return False
+
+        try:
+            os.rename(staging, folder)
+        except Exception as e:
+            logger.warning("failed to move the staged master version: %s" % e)
+            if os.path.exists(backup) and not os.path.exists(folder):
+                os.rename(backup, folder)
+
+            return False
+
+        if os.path.exists(backup):
+            self.removeFolder(backup)
+
+        logger.debug("master version updated: %s" % folder)
+        return True
+
+    @err_catcher(name=__name__)
+    def recoverFolder(self, folder):
+        """
+        Restores the backup of an update, which got interrupted between the
+        two renames in commitStaging.
+        """
+        backup = self.getBackupFolder(folder)
+        if not os.path.exists(backup):
+            return
+
+        if os.path.exists(folder):
+            self.removeFolder(backup)
+        else:
+            logger.debug("restoring master version from backup: %s" % backup)
+            os.rename(backup, folder)
+
+    @err_catcher(name=__name__)
+    def removeFolder(self, folder):
+        try:
+            shutil.rmtree(folder)
+        except Exception as e:
+            # gets removed with the next update of the master version
+            logger.warning("failed to remove folder %s: %s" % (folder, e))
+            return False
+
+        return True
+
+    @err_catcher(name=__name__)
+    def removeUnusedFiles(self, staging, targets):
+        for root, folders, files in os.walk(staging):
+            for filename in files:
+                path = os.path.normpath(os.path.join(root, filename))
+                if os.path.normcase(path) not in targets:
+                    os.remove(path)
+
+    def isUpToDate(self, source, target):
+        try:
+            sourceStat = os.stat(source)
+            targetStat = os.stat(target)
+        except OSError:
+            return False
+
+        return (
+            sourceStat.st_size == targetStat.st_size
+            and int(sourceStat.st_mtime) == int(targetStat.st_mtime)
+        )
+
+    def transferJob(self, job):
+        return self.transferFile(*job)
+
+    def transferFile(self, source, target, allowHardlink=False):
+        """
+        Links or copies "source" to "target" and returns the method, which
+        was used. Runs in worker threads, so errors are raised to the caller.
+        """
+        if os.path.exists(target):
+            os.remove(target)
+
+        sameDevice = self.isSameDevice(source, os.path.dirname(target))
+        if sameDevice and allowHardlink and self.createHardlink(source, target):
+            return "hardlink"
+
+        if sameDevice and platform.system() == "Linux" and self.createReflink(source, target):
+            return "reflink"
+
+        shutil.copy2(source, target)
+        return "copy"
+
+    def isSameDevice(self, path, folder):
+        if platform.system() == "Windows":
+            drive = os.path.splitdrive(path)[0]
+            folderDrive = os.path.splitdrive(folder)[0]
+            return bool(drive) and drive.lower() == folderDrive.lower() and not drive.startswith("\\")
+
+        try:
+            return os.stat(path).st_dev == os.stat(folder).st_dev
+        except OSError:
+            return False
+
+    def createHardlink(self, source, target):
+        if not hasattr(os, "link"):
+            self.core.createSymlink(target, source)
+            return os.path.exists(target)
+
+        try:
+            os.link(source, target)
+        except OSError as e:
+            logger.debug("failed to create hardlink %s: %s" % (target, e))
+            return False
+
+        return True
+
+    def createReflink(self, source, target):
+        device = os.stat(source).st_dev
+        if device in self.noReflinkDevices:
+            return False
+
+        try:
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except (IOError, OSError):
+            with self.lock:
+                self.noReflinkDevices.add(device)
+
+            if os.path.exists(target):
+                os.remove(target)
+
+            return False
+
+        shutil.copystat(source, target)
+        return True
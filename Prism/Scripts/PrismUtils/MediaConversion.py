@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionJob(object):
+    def __init__(self, args, outputpath, totalFrames=None, callback=None):
+        self.args = args
+        self.outputpath = outputpath
+        self.totalFrames = totalFrames
+        self.callbacks = [callback] if callback else []
+        self.status = "queued"
+        self.frame = 0
+        self.progress = 0.0
+        self.result = ("", "")
+        self.returncode = None
+        self.duration = None
+        self.process = None
+        self.canceled = False
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        self.event.wait(timeout)
+        return self.result
+
+    def isDone(self):
+        return self.event.is_set()
+
+    def isSuccessful(self):
+        return self.status == "finished"
+
+    def cancel(self):
+        with self.lock:
+            self.canceled = True
+            if self.process and self.process.poll() is None:
+                try:
+                    self.process.terminate()
+                except OSError:
+                    pass
+
+    def updateProgress(self, key, value):
+        if key == "frame":
+            try:
+                self.frame = int(value)
+            except ValueError:
+                return
+
+            if self.totalFrames:
+                self.progress = min(1.0, self.frame / float(self.totalFrames))
+        elif key == "progress" and value == "end":
+            self.progress = 1.0
+
+
+class ConversionQueue(object):
+    """
+    Runs ffmpeg conversions in a bounded pool of worker threads.
+
+    Jobs are run in the order they were submitted. The progress of a job is
+    read from ffmpeg's "-progress" output. Callbacks are called from the
+    worker thread, when a job is done. Use the TaskLoader of the core to get
+    the result on the GUI thread.
+    """
+
+    def __init__(self, core, maxWorkers=None):
+        self.core = core
+        self.maxWorkers = maxWorkers or max(1, min(4, (self.getCpuCount() // 2)))
+        self.jobs = queue.Queue()
+        self.workers = []
+        self.activeJobs = []
+        self.lock = threading.Lock()
+
+    def getCpuCount(self):
+        try:
+            import multiprocessing
+            return multiprocessing.cpu_count()
+        except Exception:
+            return 2
+
+    @err_catcher(name=__name__)
+    def submit(self, args, outputpath, totalFrames=None, callback=None):
+        job = ConversionJob(args, outputpath, totalFrames=totalFrames, callback=callback)
+        with self.lock:
+            self.activeJobs.append(job)
+            self.jobs.put(job)
+            if len(self.workers) < self.maxWorkers:
+                worker = threading.Thread(target=self.runWorker)
+                worker.daemon = True
+                self.workers.append(worker)
+                worker.start()
+
+        return job
+
+    def runWorker(self):
+        while True:
+            try:
+                job = self.jobs.get(timeout=5)
+            except queue.Empty:
+                with self.lock:
+                    if self.jobs.empty():
+                        self.workers.remove(threading.current_thread())
+                        return
+
+                continue
+
+            try:
+                self.runJob(job)
+            except Exception as e:
+                logger.warning("media conversion failed: %s" % e)
+                job.status = "failed"
+                job.result = ("", str(e))
+            finally:
+                with self.lock:
+                    if job in self.activeJobs:
+                        self.activeJobs.remove(job)
+
+                job.event.set()
+                for callback in job.callbacks:
+                    try:
+                        callback(job)
+                    except Exception as e:
+                        logger.warning("media conversion callback failed: %s" % e)
+
+    def runJob(self, job):
+        if job.canceled:
+            job.status = "canceled"
+            return
+
+        args = [job.args[0], "-progress", "pipe:1", "-nostats"] + job.args[1:]
+        logger.debug("Run ffmpeg with this settings: " + str(args))
+        startTime = time.time()
+        # stderr goes to a file, so that a full pipe can't block ffmpeg while
+        # the progress is read from stdout
+        with tempfile.TemporaryFile() as errFile:
+            with job.lock:
+                if job.canceled:
+                    job.status = "canceled"
+                    return
+
+                job.process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=errFile)
+                job.status = "running"
+
+            output = []
+            for line in iter(job.process.stdout.readline, b""):
+                line = line.decode("utf-8", "ignore").strip()
+                output.append(line)
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    job.updateProgress(key, value)
+
+            job.process.wait()
+            errFile.seek(0)
+            stderr = errFile.read().decode("utf-8", "ignore")
+
+        job.returncode = job.process.returncode
+        job.duration = time.time() - startTime
+        job.result = ("\n".join(output), stderr)
+        if job.canceled:
+            job.status = "canceled"
+        elif job.returncode == 0:
+            job.status = "finished"
+        else:
+            job.status = "failed"
+
+        logger.debug("conversion %s in %.2fs: %s" % (job.status, job.duration, job.outputpath))
+
+    @err_catcher(name=__name__)
+    def wait(self, jobs=None, timeout=None):
+        jobs = jobs if jobs is not None else list(self.activeJobs)
+        endTime = time.time() + timeout if timeout is not None else None
+        for job in jobs:
+            remaining = None
+            if endTime is not None:
+                remaining = max(0, endTime - time.time())
+
+            job.wait(remaining)
+
+        return jobs
+
+    @err_catcher(name=__name__)
+    def cancel(self, jobs=None):
+        jobs = jobs if jobs is not None else list(self.activeJobs)
+        for job in jobs:
+            job.cancel()
+
+    @err_catcher(name=__name__)
+    def getActiveJobs(self):
+        return list(self.activeJobs)
@@ -33,11 +33,14 @@
 
 import os
 import sys
+import time
 import logging
 import platform
 import subprocess
 import traceback
-import glob
+import fnmatch
+import json
+import threading
 
 from collections import OrderedDict
 
@@ -62,6 +65,12 @@ except:
     from PySide.QtGui import *
     psVersion = 1
 
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
+
+from PrismUtils import MediaConversion
 from PrismUtils.Decorators import err_catcher
 
 
@@ -84,6 +93,10 @@ class MediaManager(object):
             ".mov",
             ".dpx",
         ]
+        self.mediaInfoCache = {}
+        self.mediaInfoLock = threading.Lock()
+        self.ffmpegInfo = None
+        self.conversionQueue = None
 
     @err_catcher(name=__name__)
     def getOIIO(self):
@@ -116,58 +129,75 @@ class MediaManager(object):
         return imageio
 
     @err_catcher(name=__name__)
-    def getFFmpeg(self):
+    def getFFmpeg(self, validate=False):
+        # the lookup result doesn't change during a session
+        if self.ffmpegInfo is None:
+            self.ffmpegInfo = self.findFFmpeg()
+
+        ffmpegPath, found = self.ffmpegInfo
+        if validate and not found:
+            return
+
+        return ffmpegPath
+
+    @err_catcher(name=__name__)
+    def findFFmpeg(self):
         if platform.system() == "Windows":
             ffmpegPath = os.path.join(
                 self.core.prismLibs, "Tools", "FFmpeg", "bin", "ffmpeg.exe"
             )
-        elif platform.system() == "Linux":
-            ffmpegPath = "ffmpeg"
-            try:
-                subprocess.Popen([ffmpegPath])
-            except Exception:
-                pass
-        elif platform.system() == "Darwin":
+            return ffmpegPath, os.path.exists(ffmpegPath)
+
+        ffmpegPath = "ffmpeg"
+        if platform.system() == "Darwin":
             ffmpegPath = os.path.join(self.core.prismLibs, "Tools", "ffmpeg")
-        return ffmpegPath
+            if os.path.exists(ffmpegPath):
+                return ffmpegPath, True
 
-    @err_catcher(name=__name__)
-    def convertMedia(self, inputpath, startNum, outputpath, settings=None):
-        inputpath = inputpath.replace("\\", "/")
-        inputExt = os.path.splitext(inputpath)[1]
-        outputExt = os.path.splitext(outputpath)[1]
-        videoInput = inputExt in [".mp4", ".mov"]
-        startNum = str(startNum) if startNum is not None else None
+        systemPath = which("ffmpeg")
+        if systemPath:
+            return systemPath, True
 
-        ffmpegIsInstalled = False
-        if platform.system() == "Windows":
-            ffmpegPath = self.getFFmpeg()
-            if os.path.exists(ffmpegPath):
-                ffmpegIsInstalled = True
-        elif platform.system() == "Linux":
-            ffmpegPath = "ffmpeg"
-            try:
-                subprocess.Popen([ffmpegPath])
-                ffmpegIsInstalled = True
-            except:
-                pass
+        return ffmpegPath, False
 
-        elif platform.system() == "Darwin":
-            ffmpegPath = "ffmpeg"
-            try:
-                subprocess.Popen([ffmpegPath])
-                ffmpegIsInstalled = True
-            except:
-                pass
+    @err_catcher(name=__name__)
+    def getConversionQueue(self):
+        if not self.conversionQueue:
+            self.conversionQueue = MediaConversion.ConversionQueue(self.core)
+
+        return self.conversionQueue
 
-        if not ffmpegIsInstalled:
-            msg = "Could not find %s" % ffmpegPath
+    @err_catcher(name=__name__)
+    def convertMedia(self, inputpath, startNum, outputpath, settings=None, wait=True, totalFrames=None, callback=None):
+        """
+        Converts media with ffmpeg in the conversion queue. Returns the
+        stdout and stderr of ffmpeg or the ConversionJob, if wait is False.
+        """
+        ffmpegPath = self.getFFmpeg(validate=True)
+        if not ffmpegPath:
+            msg = "Could not find %s" % self.getFFmpeg()
             if platform.system() == "Darwin":
                 msg += "\n\nYou can install it with this command:\n\"brew install ffmpeg\""
 
             self.core.popup(msg, severity="critical")
             return
 
+        argList = self.getConversionArgs(inputpath, startNum, outputpath, settings=settings, ffmpegPath=ffmpegPath)
+        job = self.getConversionQueue().submit(argList, outputpath, totalFrames=totalFrames, callback=callback)
+        if not wait:
+            return job
+
+        return job.wait()
+
+    @err_catcher(name=__name__)
+    def getConversionArgs(self, inputpath, startNum, outputpath, settings=None, ffmpegPath=None):
+        ffmpegPath = ffmpegPath or self.getFFmpeg()
+        inputpath = inputpath.replace("\\", "/")
+        inputExt = os.path.splitext(inputpath)[1]
+        outputExt = os.path.splitext(outputpath)[1]
+        videoInput = inputExt in [".mp4", ".mov"]
+        startNum = str(startNum) if startNum is not None else None
+
         if not os.path.exists(os.path.dirname(outputpath)):
             os.makedirs(os.path.dirname(outputpath))
 
@@ -180,13 +210,9 @@ class MediaManager(object):
             ])
 
         else:
-            fps = "24"
-            if self.core.getConfig("globals", "forcefps", configPath=self.core.prismIni):
-                fps = self.core.getConfig("globals", "fps", configPath=self.core.prismIni)
-
             args = OrderedDict([
                 ("-start_number", startNum),
-                ("-framerate", fps),
+                ("-framerate", self.getProjectFps()),
                 ("-apply_trc", "iec61966_2_1"),
                 ("-i", inputpath),
                 ("-pix_fmt", "yuva420p"),
@@ -226,29 +252,247 @@ class MediaManager(object):
             argList += al
 
         argList += [outputpath, "-y"]
-        logger.debug("Run ffmpeg with this settings: " + str(argList))
-        nProc = subprocess.Popen(argList, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        result = nProc.communicate()
+        return argList
+
+    @err_catcher(name=__name__)
+    def getProjectFps(self):
+        fps = "24"
+        if self.core.getConfig("globals", "forcefps", configPath=self.core.prismIni):
+            fps = str(self.core.getConfig("globals", "fps", configPath=self.core.prismIni))
+
+        return fps
+
+    @err_catcher(name=__name__)
+    def getCombineArgs(self, sources, outputpath, ffmpegPath=None, fps=None):
+        """
+        Returns the arguments of a single ffmpeg call, which scales and pads
+        all sources to the largest resolution and concatenates them.
+        Sources are dicts with "path", "width", "height" and for image
+        sequences "startNum", where "path" contains the frame pattern.
+        """
+        ffmpegPath = ffmpegPath or self.getFFmpeg()
+        fps = fps or self.getProjectFps()
+        tw = max([source["width"] for source in sources])
+        th = max([source["height"] for source in sources])
+        # yuv420p requires even dimensions
+        tw += tw % 2
+        th += th % 2
+
+        args = [ffmpegPath]
+        filters = []
+        for idx, source in enumerate(sources):
+            if source.get("startNum") is not None:
+                args += [
+                    "-start_number",
+                    str(source["startNum"]),
+                    "-framerate",
+                    fps,
+                    "-apply_trc",
+                    "iec61966_2_1",
+                ]
+
+            args += ["-i", source["path"]]
+
+            factor = min(tw / float(source["width"]), th / float(source["height"]))
+            newW = int(source["width"] * factor) // 2 * 2
+            newH = int(source["height"] * factor) // 2 * 2
+            filters.append(
+                "[%s:v:0]scale=%s:%s,pad=%s:%s:%s:%s,setsar=1,fps=%s,format=yuv420p[v%s]"
+                % (idx, newW, newH, tw, th, (tw - newW) // 2, (th - newH) // 2, fps, idx)
+            )
+
+        concatInputs = "".join(["[v%s]" % idx for idx in range(len(sources))])
+        filters.append("%sconcat=n=%s:v=1:a=0[v]" % (concatInputs, len(sources)))
+        quality = self.core.getConfig("media", "mp4Compression", dft=18, config="project")
+        args += [
+            "-filter_complex",
+            ";".join(filters),
+            "-map",
+            "[v]",
+            "-pix_fmt",
+            "yuv420p",
+            "-crf",
+            str(quality),
+            outputpath,
+            "-y",
+        ]
+        return args
+
+    @err_catcher(name=__name__)
+    def combineMedia(self, sources, outputpath, ffmpegPath=None, fps=None):
+        """
+        Combines the sources into one video in a single ffmpeg pass without
+        intermediate files. Returns a dict with the ffmpeg output and the
+        durations of the stages.
+        """
+        result = {"output": None, "stdout": "", "stderr": "", "timings": OrderedDict([])}
+        if not sources:
+            return result
+
+        startTime = time.time()
+        args = self.getCombineArgs(sources, outputpath, ffmpegPath=ffmpegPath, fps=fps)
+        result["timings"]["buildGraph"] = time.time() - startTime
+
+        if not os.path.exists(os.path.dirname(outputpath)):
+            os.makedirs(os.path.dirname(outputpath))
 
+        logger.debug("Run ffmpeg with this settings: " + str(args))
+        startTime = time.time()
+        nProc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = nProc.communicate()
+        result["timings"]["encode"] = time.time() - startTime
+        result["stdout"] = stdout.decode("utf-8", "ignore")
+        result["stderr"] = stderr.decode("utf-8", "ignore")
+
+        if nProc.returncode == 0 and os.path.exists(outputpath) and os.stat(outputpath).st_size:
+            result["output"] = outputpath
+
+        logger.debug(
+            "combined %s sources: %s"
+            % (len(sources), ", ".join(["%s %.2fs" % (k, v) for k, v in result["timings"].items()]))
+        )
         return result
 
+    @err_catcher(name=__name__)
+    def getCombineSource(self, path, width, height):
+        """
+        Returns the source of getCombineArgs for a video or for an image of
+        a sequence. The path of a sequence gets a frame pattern with the
+        padding of the sequence.
+        """
+        source = {"path": path, "width": width, "height": height}
+        if os.path.splitext(path)[1].lower() in [".mp4", ".mov", ".avi"]:
+            return source
+
+        sequence = self.core.sequences.getSequenceFromFile(path)
+        if sequence and sequence["frames"]:
+            filename = "%s%%0%sd%s" % (sequence["prefix"], sequence["padding"], sequence["extension"])
+            source["path"] = os.path.join(os.path.dirname(path), filename)
+            source["startNum"] = sequence["start"]
+
+        return source
+
     @err_catcher(name=__name__)
     def getPixmapFromPath(self, path):
+        image = self.getImageFromPath(path)
+        if not image:
+            return QPixmap()
+
+        return QPixmap.fromImage(image)
+
+    @err_catcher(name=__name__)
+    def getImageFromPath(self, path, width=None, height=None):
+        if os.path.splitext(path)[1].lower() in [".exr", ".dpx"]:
+            return self.getImageFromExrPath(path, width=width, height=height)
+
         if platform.system() == "Windows":
-            return QPixmap(path)
+            return QImage(path)
         else:
             try:
                 im = Image.open(path)
                 im = im.convert("RGBA")
-                r, g, b, a = im.split()
-                im = Image.merge("RGBA", (b, g, r, a))
-                data = im.tobytes("raw", "RGBA")
-
+                # let PIL write the bytes in the order Qt expects instead of
+                # splitting and merging the channels
+                data = im.tobytes("raw", "BGRA")
                 qimg = QImage(data, im.size[0], im.size[1], QImage.Format_ARGB32)
 
-                return QPixmap(qimg)
+                return qimg.copy()
             except:
-                return QPixmap(path)
+                return QImage(path)
+
+    @err_catcher(name=__name__)
+    def getPixmapFromExrPath(self, path, width=None, height=None, channels=None, gamma=2.2):
+        image = self.getImageFromExrPath(path, width=width, height=height, channels=channels, gamma=gamma)
+        if not image:
+            return
+
+        return QPixmap.fromImage(image)
+
+    @err_catcher(name=__name__)
+    def getImageFromExrPath(self, path, width=None, height=None, channels=None, gamma=2.2):
+        oiio = self.getOIIO()
+        if not oiio:
+            logger.debug("no image loader available to read: %s" % path)
+            return
+
+        imgSrc = oiio.ImageBuf(str(path))
+        spec = imgSrc.spec()
+        imgWidth = spec.full_width
+        imgHeight = spec.full_height
+        if not imgWidth or not imgHeight:
+            return
+
+        if width and height:
+            if (imgWidth / float(imgHeight)) > (width / float(height)):
+                newImgWidth = width
+                newImgHeight = width / float(imgWidth) * imgHeight
+            else:
+                newImgHeight = height
+                newImgWidth = height / float(imgHeight) * imgWidth
+        else:
+            newImgWidth = imgWidth
+            newImgHeight = imgHeight
+
+        newImgWidth = max(int(newImgWidth), 1)
+        newImgHeight = max(int(newImgHeight), 1)
+        channels = list(channels or [0, 1, 2])
+        numChannels = max(channels) + 1
+        if spec.nchannels < numChannels:
+            channels = [min(x, spec.nchannels - 1) for x in channels]
+            numChannels = spec.nchannels
+
+        imgDst = oiio.ImageBuf(
+            oiio.ImageSpec(newImgWidth, newImgHeight, numChannels, oiio.FLOAT)
+        )
+        if spec.nchannels == numChannels:
+            oiio.ImageBufAlgo.resample(imgDst, imgSrc)
+        else:
+            firstChannels = oiio.ImageBuf()
+            oiio.ImageBufAlgo.channels(firstChannels, imgSrc, tuple(range(numChannels)))
+            oiio.ImageBufAlgo.resample(imgDst, firstChannels)
+
+        data = self.getRGBBytesFromImageBuf(imgDst, channels, gamma=gamma)
+        if data is None:
+            return
+
+        qimg = QImage(data, newImgWidth, newImgHeight, newImgWidth * 3, QImage.Format_RGB888)
+        return qimg.copy()
+
+    @err_catcher(name=__name__)
+    def getRGBBytesFromImageBuf(self, imgBuf, channels, gamma=2.2):
+        oiio = self.getOIIO()
+        spec = imgBuf.spec()
+        try:
+            import numpy
+        except:
+            numpy = None
+
+        if numpy is not None:
+            pixels = numpy.asarray(imgBuf.get_pixels(oiio.FLOAT), dtype=numpy.float32)
+            pixels = pixels.reshape(spec.height, spec.width, spec.nchannels)
+            pixels = pixels[:, :, channels]
+            numpy.clip(pixels, 0.0, 1.0, out=pixels)
+            if gamma:
+                numpy.power(pixels, 1.0 / gamma, out=pixels)
+
+            pixels = (pixels * 255.0 + 0.5).astype(numpy.uint8)
+            return numpy.ascontiguousarray(pixels).tobytes()
+
+        # numpy isn't available in all DCCs. OIIO can still do the channel
+        # selection and gamma correction, only the conversion is different.
+        rgbBuf = oiio.ImageBuf()
+        oiio.ImageBufAlgo.channels(rgbBuf, imgBuf, tuple(channels))
+        if gamma:
+            gammaBuf = oiio.ImageBuf()
+            oiio.ImageBufAlgo.clamp(gammaBuf, rgbBuf, (0.0, 0.0, 0.0), (1.0, 1.0, 1.0))
+            rgbBuf = oiio.ImageBuf()
+            oiio.ImageBufAlgo.pow(rgbBuf, gammaBuf, (1.0 / gamma, 1.0 / gamma, 1.0 / gamma))
+
+        pixels = rgbBuf.get_pixels(oiio.UINT8)
+        if hasattr(pixels, "tobytes"):
+            return pixels.tobytes()
+        else:
+            return pixels.tostring()
 
     @err_catcher(name=__name__)
     def savePixmap(self, pmap, path):
@@ -332,44 +576,150 @@ class MediaManager(object):
 
     @err_catcher(name=__name__)
     def getMediaResolution(self, path):
-        pwidth = None
-        pheight = None
-        base, ext = os.path.splitext(path)
+        mediaInfo = self.probeMedia(path) or {}
+        return {"width": mediaInfo.get("width"), "height": mediaInfo.get("height")}
 
-        if ext in [
-            ".jpg",
-            ".jpeg",
-            ".JPG",
-            ".png",
-            ".PNG",
-            ".tif",
-            ".tiff",
-        ]:
-            size = self.getPixmapFromPath(path).size()
-            pwidth = size.width()
-            pheight = size.height()
+    @err_catcher(name=__name__)
+    def probeMedia(self, path):
+        # reads only the file headers. The results are cached until the file changes
+        path = os.path.normpath(path)
+        try:
+            fileStat = os.stat(path)
+        except OSError:
+            return
+
+        with self.mediaInfoLock:
+            cached = self.mediaInfoCache.get(path)
+
+        if cached and cached[0] == fileStat.st_mtime and cached[1] == fileStat.st_size:
+            return dict(cached[2])
+
+        ext = os.path.splitext(path)[1].lower()
+        mediaInfo = {"width": None, "height": None}
+        if ext in [".jpg", ".jpeg", ".png", ".tif", ".tiff"]:
+            mediaInfo.update(self.probeImage(path))
         elif ext in [".exr", ".dpx"]:
-            oiio = self.getOIIO()
-            if oiio:
-                imgSpecs = oiio.ImageBuf(path).spec()
-                pwidth = imgSpecs.full_width
-                pheight = imgSpecs.full_height
-        elif ext in [".mp4", ".mov"]:
-            if os.stat(path).st_size == 0:
-                vidReader = "Error"
-            else:
-                imageio = self.getImageIO()
+            mediaInfo.update(self.probeImageOIIO(path))
+        elif ext in [".mp4", ".mov", ".avi"]:
+            if fileStat.st_size > 0:
+                mediaInfo.update(self.probeVideo(path))
+
+        with self.mediaInfoLock:
+            self.mediaInfoCache[path] = [fileStat.st_mtime, fileStat.st_size, mediaInfo]
+
+        return dict(mediaInfo)
+
+    @err_catcher(name=__name__)
+    def probeImage(self, path):
+        size = QImageReader(path).size()
+        if size.isValid():
+            return {"width": size.width(), "height": size.height()}
+
+        if "Image" in globals():
+            try:
+                # PIL reads the pixels lazily
+                width, height = Image.open(path).size
+                return {"width": width, "height": height}
+            except:
+                pass
+
+        size = self.getImageFromPath(path).size()
+        return {"width": size.width(), "height": size.height()}
+
+    @err_catcher(name=__name__)
+    def probeImageOIIO(self, path):
+        oiio = self.getOIIO()
+        if not oiio:
+            return {}
+
+        imgInput = oiio.ImageInput.open(str(path))
+        if not imgInput:
+            return {}
+
+        try:
+            imgSpecs = imgInput.spec()
+            mediaInfo = {"width": imgSpecs.full_width, "height": imgSpecs.full_height}
+        finally:
+            imgInput.close()
+
+        return mediaInfo
+
+    @err_catcher(name=__name__)
+    def getFFprobe(self):
+        ffmpegPath = self.getFFmpeg()
+        ffprobePath = os.path.join(
+            os.path.dirname(ffmpegPath),
+            os.path.basename(ffmpegPath).replace("ffmpeg", "ffprobe"),
+        )
+        if os.path.dirname(ffprobePath) and not os.path.exists(ffprobePath):
+            return
+
+        return ffprobePath
+
+    @err_catcher(name=__name__)
+    def probeVideo(self, path):
+        ffprobePath = self.getFFprobe()
+        if ffprobePath:
+            args = [
+                ffprobePath,
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "stream=width,height,nb_frames,r_frame_rate,duration",
+                "-of",
+                "json",
+                path,
+            ]
+            try:
+                proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                stdout, stderr = proc.communicate()
+                streams = json.loads(stdout.decode("utf-8", "ignore")).get("streams", [])
+            except Exception as e:
+                logger.debug("ffprobe failed for %s: %s" % (path, e))
+                streams = []
+
+            if streams:
+                stream = streams[0]
+                mediaInfo = {
+                    "width": stream.get("width"),
+                    "height": stream.get("height"),
+                }
+                fps = None
                 try:
-                    vidReader = imageio.get_reader(path, "ffmpeg")
-                except:
-                    vidReader = "Error"
-                    logger.debug("failed to read videofile: %s" % traceback.format_exc())
+                    num, den = stream["r_frame_rate"].split("/")
+                    fps = float(num) / float(den)
+                except Exception:
+                    pass
+
+                if stream.get("nb_frames", "N/A") != "N/A":
+                    mediaInfo["frames"] = int(stream["nb_frames"])
+                elif fps and stream.get("duration", "N/A") != "N/A":
+                    mediaInfo["frames"] = int(round(fps * float(stream["duration"])))
+
+                mediaInfo["fps"] = fps
+                return mediaInfo
+
+        imageio = self.getImageIO()
+        try:
+            vidReader = imageio.get_reader(path, "ffmpeg")
+        except:
+            logger.debug("failed to read videofile: %s" % traceback.format_exc())
+            return {}
 
-            if vidReader != "Error":
-                pwidth = vidReader._meta["size"][0]
-                pheight = vidReader._meta["size"][1]
+        mediaInfo = {
+            "width": vidReader._meta["size"][0],
+            "height": vidReader._meta["size"][1],
+            "fps": vidReader._meta.get("fps"),
+        }
+        nframes = vidReader._meta.get("nframes")
+        if str(nframes) == "inf":
+            nframes = int(round(vidReader._meta["fps"] * vidReader._meta["duration"]))
 
-        return {"width": pwidth, "height": pheight}
+        mediaInfo["frames"] = nframes
+        vidReader.close()
+        return mediaInfo
 
     @err_catcher(name=__name__)
     def getMediaSequence(self, path):
@@ -377,21 +727,26 @@ class MediaManager(object):
         end = None
         isSequence = None
 
-        matchingFiles = glob.glob(path)
-        isSequence = len(matchingFiles) > 1
-
+        folder, filename = os.path.split(os.path.normpath(path))
+        matchingFiles = []
         frames = []
-        for file in matchingFiles:
-            base, ext = os.path.splitext(file)
-            if len(base) < self.core.framePadding:
+        for sequence in self.core.sequences.getSequences(folder):
+            files = [
+                x for x in sequence["files"]
+                if fnmatch.fnmatch(os.path.basename(x), filename)
+            ]
+            if not files:
                 continue
 
-            try:
-                frame = int(base[-self.core.framePadding:])
-            except:
-                continue
+            matchingFiles += files
+            if sequence["frames"]:
+                fileSet = set(files)
+                frames += [
+                    frame for frame, filepath in zip(sequence["frames"], sequence["files"])
+                    if filepath in fileSet
+                ]
 
-            frames.append(frame)
+        isSequence = len(matchingFiles) > 1
 
         if frames:
             start = min(frames)
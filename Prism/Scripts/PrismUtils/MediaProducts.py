@@ -32,9 +32,7 @@
 
 
 import os
-import sys
 import logging
-import platform
 import shutil
 
 try:
@@ -183,6 +181,9 @@ class MediaProducts(object):
                     if folder == "master" and not useMaster:
                         continue
 
+                    if self.core.masterVersions.isTransientFolder(folder):
+                        continue
+
                     versionPath = os.path.join(root, folder)
                     versionData = {"label": folder + basepathData["suffix"], "path": versionPath, "location": basepathData["type"]}
                     versions.append(versionData)
@@ -626,47 +627,54 @@ class MediaProducts(object):
         )
         logger.debug("updating master render version: %s" % masterPath)
 
-        if not add:
-            result = self.deleteMasterVersion(masterPath, isFilepath=True)
-            if not result:
-                return
-
-            masterVersions = []
-        else:
-            masterVersions = self.getVersionPathsFromMaster(masterPath, isFilepath=True)
-
-        masterDrive = os.path.splitdrive(masterPath)[0]
-        drive = os.path.splitdrive(path)[0]
-
         masterBase = self.getVersionPathFromMediaFilePath(masterPath)
         if isFilepath:
             originBase = self.getVersionPathFromMediaFilePath(path)
         else:
             originBase = path
 
-        files = self.core.getFilesFromFolder(originBase, recursive=True)
-        for file in files:
-            frameStr = os.path.splitext(file)[0][-self.core.framePadding:]
-            if sys.version[0] == "2":
-                frameStr = unicode(frameStr)
+        # the versioninfo gets modified, so it's never linked to the source version
+        ext = self.core.configs.preferredExtension
+        infoName = "versioninfo" + ext
+        files = {}
+        if add:
+            masterVersions = self.getVersionPathsFromMaster(masterPath, isFilepath=True)
+            if os.path.exists(masterBase):
+                for file in self.core.getFilesFromFolder(masterBase, recursive=True):
+                    relPath = os.path.relpath(file, masterBase)
+                    if relPath != infoName:
+                        files[relPath] = file
+        else:
+            masterVersions = []
+
+        for file in self.core.getFilesFromFolder(originBase, recursive=True):
+            relPath = os.path.relpath(file, originBase)
+            if relPath == infoName:
+                continue
 
             masterFilename = self.core.paths.replaceVersionInStr(os.path.basename(file), "master")
-            masterFile = file.replace(originBase, masterBase)
-            masterFile = os.path.join(os.path.dirname(masterFile), masterFilename)
+            files[os.path.join(os.path.dirname(relPath), masterFilename)] = file
 
-            if not os.path.exists(os.path.dirname(masterFile)):
-                os.makedirs(os.path.dirname(masterFile))
+        files = [[files[relPath], relPath] for relPath in sorted(files)]
+        masterVersions.append(originBase)
+        infoPath = os.path.join(originBase, infoName)
+        while True:
+            staging = self.core.masterVersions.stageFiles(masterBase, files)
+            if staging:
+                masterInfoPath = os.path.join(staging, infoName)
+                if os.path.exists(infoPath):
+                    shutil.copy2(infoPath, masterInfoPath)
+
+                self.core.setConfig("versionpaths", val=masterVersions, configPath=masterInfoPath)
+                if self.core.masterVersions.commitStaging(staging, masterBase):
+                    break
 
-            useHL = self.core.getConfig("globals", "useHardLinksForMasterVersions", config="project", dft=False)
-            if platform.system() == "Windows" and drive == masterDrive and useHL:
-                self.core.createSymlink(masterFile, file)
-            else:
-                shutil.copy2(file, masterFile)
+            msg = "Couldn't replace the existing master version:\n\n%s" % masterBase
+            self.core.masterVersions.raiseInBackground(msg)
+            result = self.core.popupQuestion(msg, buttons=["Retry", "Don't update master version"], icon=QMessageBox.Warning)
+            if result != "Retry":
+                return
 
-        masterVersions.append(originBase)
-        ext = self.core.configs.preferredExtension
-        masterInfoPath = os.path.join(masterBase, "versioninfo" + ext)
-        self.core.setConfig("versionpaths", val=masterVersions, configPath=masterInfoPath)
         return masterPath
 
     @err_catcher(name=__name__)
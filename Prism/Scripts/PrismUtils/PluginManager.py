@@ -33,10 +33,12 @@
 
 import os
 import sys
+import time
 import shutil
 import platform
 import logging
 import traceback
+from datetime import datetime
 
 try:
     from PySide2.QtCore import *
@@ -47,6 +49,7 @@ except:
     from PySide.QtGui import *
 
 from PrismUtils.Decorators import err_catcher
+from PrismUtils.PluginManifest import PluginManifest, LazyPlugin
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +59,10 @@ class PluginManager(object):
         super(PluginManager, self).__init__()
         self.core = core
         self.monkeyPatchedFunctions = {}
+        self.manifest = PluginManifest(core)
+
+        # these plugin types get represented by a LazyPlugin until they are used
+        self.lazyPluginTypes = ["App", "ProjectManager"]
 
     @err_catcher(name=__name__)
     def initializePlugins(self, appPlugin):
@@ -65,8 +72,12 @@ class PluginManager(object):
         self.core.prjManagers = {}
         self.core.inactivePlugins = {}
 
+        startTime = datetime.now()
         pluginDirs = self.getPluginDirs()
-        appPlugs = self.searchPlugins(pluginPaths=pluginDirs["pluginPaths"], directories=pluginDirs["searchPaths"], pluginNames=[appPlugin])
+        appPlugs = self.searchPluginFolders(pluginPaths=pluginDirs["pluginPaths"], directories=pluginDirs["searchPaths"], pluginNames=[appPlugin])
+        if not appPlugs:
+            appPlugs = self.searchPlugins(pluginPaths=pluginDirs["pluginPaths"], directories=pluginDirs["searchPaths"], pluginNames=[appPlugin])
+
         if not appPlugs:
             return
 
@@ -74,7 +85,13 @@ class PluginManager(object):
         if not appPlug:
             return
 
-        self.loadPlugins(pluginPaths=pluginDirs["pluginPaths"], directories=pluginDirs["searchPaths"], force=False)
+        plugins = self.loadPlugins(pluginPaths=pluginDirs["pluginPaths"], directories=pluginDirs["searchPaths"], force=False, lazy=True)
+        self.manifest.saveManifest()
+        lazyPlugins = [plugin for plugin in plugins if isinstance(plugin, LazyPlugin)]
+        logger.debug(
+            "plugin loading duration: %s (%s plugins deferred)"
+            % (datetime.now() - startTime, len(lazyPlugins))
+        )
         self.core.callback("onPluginsLoaded")
 
         if self.core.appPlugin and self.core.appPlugin.pluginName != "Standalone":
@@ -146,9 +163,13 @@ class PluginManager(object):
 
         sys.path.append(pluginPath)
         self.core.appPlugin = None
-        appPlug = getattr(
+        startTime = time.time()
+        pluginClass = getattr(
             __import__("Prism_%s_init" % pluginName), "Prism_Plugin_%s" % pluginName
-        )(self.core)
+        )
+        importTime = time.time()
+        appPlug = pluginClass(self.core)
+        self.core.startupTracer.addPluginTiming(pluginName, importTime - startTime, time.time() - importTime)
         if not getattr(appPlug, "isActive", lambda: True)():
             logger.debug("no appPlugin loaded")
             return
@@ -186,11 +207,11 @@ class PluginManager(object):
         return self.core.appPlugin
 
     @err_catcher(name=__name__)
-    def loadPlugins(self, pluginPaths=None, directory=None, directories=None, recursive=False, force=True):
+    def loadPlugins(self, pluginPaths=None, directory=None, directories=None, recursive=False, force=True, lazy=False):
         result = []
         if pluginPaths:
             for pPath in pluginPaths:
-                result.append(self.loadPlugin(pPath, force=force))
+                result.append(self.loadPlugin(pPath, force=force, lazy=lazy))
 
         directories = directories or []
         if directory:
@@ -206,7 +227,7 @@ class PluginManager(object):
                         for f in files:
                             if f.endswith("_init.py"):
                                 path = os.path.dirname(root)
-                                result.append(self.loadPlugin(path, force=force))
+                                result.append(self.loadPlugin(path, force=force, lazy=lazy))
                                 break
                 else:
                     for root, dirs, files in os.walk(dr):
@@ -218,7 +239,7 @@ class PluginManager(object):
                                 continue
 
                             path = os.path.join(dr, pDir)
-                            result.append(self.loadPlugin(path, force=force))
+                            result.append(self.loadPlugin(path, force=force, lazy=lazy))
                         break
 
         return result
@@ -266,6 +287,34 @@ class PluginManager(object):
 
         return result
 
+    @err_catcher(name=__name__)
+    def searchPluginFolders(self, pluginPaths=None, directories=None, pluginNames=None):
+        """
+        Like searchPlugins, but only checks the direct subfolders of the
+        directories instead of walking them, which is much faster for plugins
+        with bundled modules.
+        """
+        result = []
+        for pPath in pluginPaths or []:
+            pluginName = os.path.basename(pPath)
+            if pluginNames and pluginName not in pluginNames:
+                continue
+
+            if os.path.exists(pPath):
+                result.append({"name": pluginName, "path": pPath})
+
+        for dr in directories or []:
+            if not os.path.exists(dr):
+                continue
+
+            for pluginName in pluginNames or sorted(os.listdir(dr)):
+                path = os.path.join(dr, pluginName)
+                initPath = os.path.join(path, "Scripts", "Prism_%s_init.py" % pluginName)
+                if os.path.exists(initPath):
+                    result.append({"name": pluginName, "path": path})
+
+        return result
+
     @err_catcher(name=__name__)
     def activatePlugin(self, path):
         if os.path.basename(path) == "Scripts":
@@ -285,7 +334,7 @@ class PluginManager(object):
         return self.loadPlugin(path)
 
     @err_catcher(name=__name__)
-    def loadPlugin(self, path, force=True, activate=None):
+    def loadPlugin(self, path, force=True, activate=None, lazy=False):
         if not path:
             logger.debug("invalid pluginpath: \"%s\"" % path)
             return
@@ -344,24 +393,17 @@ class PluginManager(object):
             logger.warning("skipped loading plugin %s - plugin has no init script" % pluginName)
             return
 
-        sys.path.append(os.path.dirname(initPath))
-        try:
-            if os.path.exists(initPath.replace("_init", "_init_unloaded")):
-                pPlug = getattr(
-                    __import__("Prism_%s_init_unloaded" % (pluginName)),
-                    "Prism_%s_unloaded" % pluginName,
-                )(self.core)
-            else:
-                pPlug = getattr(__import__("Prism_%s_init" % (pluginName)), "Prism_%s" % pluginName)(
-                    self.core
-                )
-        except:
-            msg = "Failed to load plugin: %s" % pluginName
-            result = self.core.popupQuestion(msg, buttons=["Details", "Close"], icon=QMessageBox.Warning, default="Details")
-            if result == "Details":
-                detailMsg = msg + "\n\n" + traceback.format_exc()
-                self.core.showErrorDetailPopup(detailMsg)
-            self.core.inactivePlugins[pluginName] = pluginPath
+        if lazy:
+            entry = self.manifest.getEntry(path)
+            if self.canBeLazy(entry):
+                if platform.system() not in entry["variables"]["platforms"]:
+                    logger.debug("skipped loading plugin %s - plugin doesn't support this OS" % pluginName)
+                    return
+
+                return self.createLazyPlugin(entry)
+
+        pPlug = self.importPlugin(path, unloaded=os.path.exists(initPath.replace("_init", "_init_unloaded")))
+        if not pPlug:
             return
 
         if platform.system() not in pPlug.platforms:
@@ -394,6 +436,93 @@ class PluginManager(object):
         logger.debug("loaded plugin %s" % pPlug.pluginName)
         return pPlug
 
+    @err_catcher(name=__name__)
+    def importPlugin(self, path, unloaded=False):
+        pluginName = os.path.basename(path)
+        pluginPath = os.path.join(path, "Scripts")
+        sys.path.append(pluginPath)
+        try:
+            startTime = time.time()
+            if unloaded:
+                pluginClass = getattr(
+                    __import__("Prism_%s_init_unloaded" % (pluginName)),
+                    "Prism_%s_unloaded" % pluginName,
+                )
+            else:
+                pluginClass = getattr(__import__("Prism_%s_init" % (pluginName)), "Prism_%s" % pluginName)
+
+            importTime = time.time()
+            pPlug = pluginClass(self.core)
+            self.core.startupTracer.addPluginTiming(pluginName, importTime - startTime, time.time() - importTime)
+        except:
+            msg = "Failed to load plugin: %s" % pluginName
+            result = self.core.popupQuestion(msg, buttons=["Details", "Close"], icon=QMessageBox.Warning, default="Details")
+            if result == "Details":
+                detailMsg = msg + "\n\n" + traceback.format_exc()
+                self.core.showErrorDetailPopup(detailMsg)
+            self.core.inactivePlugins[pluginName] = pluginPath
+            return
+
+        return pPlug
+
+    @err_catcher(name=__name__)
+    def canBeLazy(self, entry):
+        if not entry:
+            return False
+
+        variables = entry["variables"]
+        return (
+            variables.get("pluginType") in self.lazyPluginTypes
+            and variables.get("pluginName") == entry["name"]
+            and variables.get("platforms")
+        )
+
+    @err_catcher(name=__name__)
+    def createLazyPlugin(self, entry):
+        path = entry["path"]
+        pPlug = LazyPlugin(self.core, entry)
+        if os.path.normpath(path).startswith(os.path.normpath(self.core.prismRoot)):
+            pPlug.location = "prismRoot"
+        elif path.startswith(getattr(self.core, "projectPath", ())):
+            pPlug.location = "prismProject"
+        else:
+            pPlug.location = "custom"
+
+        pPlug.pluginPath = os.path.join(path, "Scripts")
+        sys.path.append(pPlug.pluginPath)
+        if pPlug.pluginType in ["App"]:
+            self.core.unloadedAppPlugins[pPlug.pluginName] = pPlug
+        elif pPlug.pluginType in ["ProjectManager"]:
+            self.core.prjManagers[pPlug.pluginName] = pPlug
+
+        logger.debug("registered plugin %s from manifest" % pPlug.pluginName)
+        return pPlug
+
+    @err_catcher(name=__name__)
+    def getDeferredPlugins(self):
+        plugins = list(self.core.unloadedAppPlugins.values()) + list(
+            self.core.prjManagers.values()
+        )
+        return [plugin for plugin in plugins if isinstance(plugin, LazyPlugin)]
+
+    @err_catcher(name=__name__)
+    def replaceLazyPlugin(self, lazyPlugin, plugin):
+        if lazyPlugin.pluginType in ["App"]:
+            pluginDict = self.core.unloadedAppPlugins
+        else:
+            pluginDict = self.core.prjManagers
+
+        if pluginDict.get(lazyPlugin.pluginName) is not lazyPlugin:
+            return
+
+        if lazyPlugin.pluginType not in ["App"] and not plugin.isActive():
+            logger.debug("plugin \"%s\" is inactive" % plugin.pluginName)
+            pluginDict.pop(lazyPlugin.pluginName)
+            return
+
+        pluginDict[lazyPlugin.pluginName] = plugin
+        logger.debug("loaded plugin %s" % plugin.pluginName)
+
     @err_catcher(name=__name__)
     def reloadPlugins(self, plugins=None):
         appPlug = self.core.appPlugin.pluginName
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+import os
+import ast
+import copy
+import json
+import logging
+import threading
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class PluginManifest(object):
+    """
+    Stores metadata of the plugins in a json file in the user folder, so
+    plugins can be represented by a LazyPlugin without being imported.
+
+    The metadata is parsed from the sourcefiles of a plugin and is updated,
+    when the mtime of one of the files or of the scripts folder changes.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.entries = None
+        self.modified = False
+        self.lock = threading.Lock()
+
+    @err_catcher(name=__name__)
+    def getManifestPath(self):
+        return os.path.join(os.path.dirname(self.core.userini), "Cache", "plugin_manifest.json")
+
+    @err_catcher(name=__name__)
+    def loadManifest(self):
+        path = self.getManifestPath()
+        self.entries = {}
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            logger.debug("failed to read plugin manifest: %s" % e)
+
+    @err_catcher(name=__name__)
+    def saveManifest(self):
+        if not self.modified:
+            return
+
+        path = self.getManifestPath()
+        try:
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+
+            tmpPath = path + ".%s.tmp" % os.getpid()
+            with open(tmpPath, "w") as f:
+                json.dump(self.entries, f)
+
+            if os.path.exists(path):
+                os.remove(path)
+
+            os.rename(tmpPath, path)
+        except Exception as e:
+            logger.debug("failed to write plugin manifest: %s" % e)
+            return
+
+        self.modified = False
+
+    @err_catcher(name=__name__)
+    def getInitFile(self, pluginPath, unloaded=False):
+        pluginName = os.path.basename(pluginPath)
+        initName = "Prism_%s_init_unloaded.py" if unloaded else "Prism_%s_init.py"
+        return os.path.join(pluginPath, "Scripts", initName % pluginName)
+
+    @err_catcher(name=__name__)
+    def getFileStats(self, pluginPath):
+        scriptPath = os.path.join(pluginPath, "Scripts")
+        try:
+            stats = {"": os.stat(scriptPath).st_mtime}
+            prefix = "Prism_%s_" % os.path.basename(pluginPath)
+            for filename in os.listdir(scriptPath):
+                if filename.startswith(prefix) and filename.endswith(".py"):
+                    stats[filename] = os.stat(os.path.join(scriptPath, filename)).st_mtime
+        except OSError:
+            return
+
+        return stats
+
+    @err_catcher(name=__name__)
+    def getEntry(self, pluginPath):
+        """
+        Returns the manifest entry of a plugin or None, if the plugin can't
+        be parsed.
+        """
+        pluginPath = os.path.normpath(pluginPath)
+        with self.lock:
+            if self.entries is None:
+                self.loadManifest()
+
+        stats = self.getFileStats(pluginPath)
+        if not stats:
+            return
+
+        entry = self.entries.get(pluginPath)
+        if entry and entry["stats"] == stats:
+            return entry
+
+        try:
+            entry = self.parsePlugin(pluginPath)
+        except Exception as e:
+            logger.debug("failed to parse plugin %s: %s" % (pluginPath, e))
+            entry = None
+
+        if entry:
+            entry["stats"] = stats
+
+        with self.lock:
+            self.entries[pluginPath] = entry
+            self.modified = True
+
+        return entry
+
+    @err_catcher(name=__name__)
+    def parsePlugin(self, pluginPath):
+        unloadedInit = self.getInitFile(pluginPath, unloaded=True)
+        initFile = unloadedInit if os.path.exists(unloadedInit) else self.getInitFile(pluginPath)
+        if not os.path.exists(initFile):
+            return
+
+        entry = {
+            "name": os.path.basename(pluginPath),
+            "path": pluginPath,
+            "initFile": initFile,
+            "unloaded": initFile == unloadedInit,
+            "variables": {},
+            "attributes": [],
+            "callbacks": [],
+        }
+
+        # only the modules, which get imported by the init script, are part of the plugin
+        modules = self.parseFile(initFile, entry)
+        for module in modules:
+            path = os.path.join(os.path.dirname(initFile), module + ".py")
+            if os.path.exists(path):
+                self.parseFile(path, entry)
+
+        entry["attributes"] = sorted(set(entry["attributes"]))
+        return entry
+
+    def parseFile(self, path, entry):
+        """
+        Adds the literal variables, the attributes and the registered
+        callbacks of the classes in a sourcefile to the entry and returns
+        the names of the imported modules.
+        """
+        with open(path, "r") as f:
+            tree = ast.parse(f.read(), path)
+
+        modules = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                modules.append(node.module)
+            elif isinstance(node, ast.FunctionDef):
+                entry["attributes"].append(node.name)
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if not (isinstance(target, ast.Attribute) and getattr(target.value, "id", None) == "self"):
+                        continue
+
+                    entry["attributes"].append(target.attr)
+                    if not os.path.basename(path).endswith("_Variables.py"):
+                        continue
+
+                    value = node.value
+                    if isinstance(value, ast.Attribute) and getattr(value.value, "id", None) == "self":
+                        if value.attr in entry["variables"]:
+                            entry["variables"][target.attr] = entry["variables"][value.attr]
+
+                        continue
+
+                    try:
+                        entry["variables"][target.attr] = ast.literal_eval(value)
+                    except Exception:
+                        pass
+            elif isinstance(node, ast.Call):
+                if getattr(node.func, "attr", None) != "registerCallback" or not node.args:
+                    continue
+
+                try:
+                    entry["callbacks"].append(ast.literal_eval(node.args[0]))
+                except Exception:
+                    pass
+
+        return modules
+
+
+class LazyPlugin(object):
+    """
+    Stands in for a plugin, which wasn't imported yet. The variables from the
+    manifest are available without importing the plugin. Accessing any
+    other attribute of the plugin imports it. Callbacks, which the plugin
+    registers, are registered as proxies, which import the plugin first, if
+    requiresImport() allows it.
+    """
+
+    # method callbacks, which import the plugin even if it isn't used by the
+    # current project
+    importCallbackPrefixes = ["prismSettings_"]
+
+    def __init__(self, core, entry):
+        self.core = core
+        self.manifestEntry = entry
+        self.plugin = None
+        self.loadFailed = False
+        self.proxyCallbacks = []
+        for key in entry["variables"]:
+            setattr(self, key, copy.deepcopy(entry["variables"][key]))
+
+        for callbackName in sorted(set(entry["callbacks"])):
+            cb = self.core.callbacks.registerCallback(callbackName, self.createProxyCallback(callbackName))
+            self.proxyCallbacks.append(cb)
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("manifestEntry")
+        if not entry or name.startswith("__") or name not in entry["attributes"]:
+            raise AttributeError(name)
+
+        plugin = self.loadPlugin()
+        if not plugin:
+            raise AttributeError(name)
+
+        return getattr(plugin, name)
+
+    def createProxyCallback(self, callbackName):
+        return lambda *args, **kwargs: self.callProxyCallback(callbackName, *args, **kwargs)
+
+    @err_catcher(name=__name__)
+    def callProxyCallback(self, callbackName, *args, **kwargs):
+        if not self.requiresImport(callbackName):
+            return
+
+        lastCallbackId = self.core.callbacks.callbackNum
+        plugin = self.loadPlugin()
+        if not plugin:
+            return
+
+        result = None
+        for cb in list(self.core.callbacks.registeredCallbacks.get(callbackName, [])):
+            if cb["id"] > lastCallbackId:
+                result = cb["function"](*args, **kwargs)
+
+        return result
+
+    @err_catcher(name=__name__)
+    def requiresImport(self, callbackName):
+        if self.plugin:
+            return True
+
+        entry = self.manifestEntry
+        if callbackName not in entry["attributes"] and callbackName not in entry["callbacks"]:
+            return False
+
+        for prefix in self.importCallbackPrefixes:
+            if callbackName.startswith(prefix):
+                return True
+
+        if self.pluginType != "ProjectManager":
+            return True
+
+        # project managers are only imported, when the current project uses them
+        if not getattr(self.core, "prismIni", None):
+            return False
+
+        active = self.core.getConfig(
+            self.pluginName.lower(), "active", configPath=self.core.prismIni
+        )
+        return bool(active)
+
+    @err_catcher(name=__name__)
+    def loadPlugin(self):
+        if self.plugin or self.loadFailed:
+            return self.plugin
+
+        self.loadFailed = True
+        self.unregisterProxyCallbacks()
+        logger.debug("importing plugin on first use: %s" % self.pluginName)
+        plugin = self.core.plugins.importPlugin(self.manifestEntry["path"], unloaded=self.manifestEntry["unloaded"])
+        if not plugin:
+            return
+
+        plugin.location = self.location
+        plugin.pluginPath = self.pluginPath
+        self.plugin = plugin
+        self.loadFailed = False
+        self.core.plugins.replaceLazyPlugin(self, plugin)
+        return plugin
+
+    @err_catcher(name=__name__)
+    def unregisterProxyCallbacks(self):
+        for cb in self.proxyCallbacks:
+            self.core.callbacks.unregisterCallback(cb["id"])
+
+        self.proxyCallbacks = []
+
+    @err_catcher(name=__name__)
+    def unregister(self):
+        self.unregisterProxyCallbacks()
+        if self.plugin:
+            getattr(self.plugin, "unregister", lambda: None)()
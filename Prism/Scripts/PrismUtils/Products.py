@@ -32,9 +32,11 @@
 
 
 import os
+import time
 import logging
 import shutil
-import platform
+import threading
+from multiprocessing.pool import ThreadPool
 
 try:
     from PySide2.QtCore import *
@@ -56,6 +58,13 @@ class Products(object):
     def __init__(self, core):
         self.core = core
         self.videoFormats = [".mp4", ".mov"]
+        self.latestVersionCache = {}
+        self.latestVersionLock = threading.Lock()
+        self.maxThreads = 8
+
+        # folders, which were modified very recently, aren't cached, because
+        # a second change in the same mtime interval wouldn't be detected
+        self.settleTime = 2
 
     @err_catcher(name=__name__)
     def getProductsFromPaths(self, paths):
@@ -197,6 +206,15 @@ class Products(object):
     @err_catcher(name=__name__)
     def getVersionsFromPath(self, path):
         versions = {}
+        for versionPath in self.getVersionFoldersFromPath(path):
+            version = self.getVersionFromFolder(versionPath)
+            if version:
+                versions[version["name"]] = version
+
+        return versions
+
+    @err_catcher(name=__name__)
+    def getVersionFoldersFromPath(self, path):
         versionPaths = []
         for root, folders, files in os.walk(path):
             for folder in folders:
@@ -205,57 +223,61 @@ class Products(object):
                 if not isVersion and not isMaster:
                     continue
 
+                if self.core.masterVersions.isTransientFolder(folder):
+                    continue
+
                 versionPath = os.path.join(root, folder)
                 versionPaths.append(versionPath)
             break
 
+        return versionPaths
+
+    @err_catcher(name=__name__)
+    def getVersionFromFolder(self, versionPath):
         units = ["centimeter", "meter", ""]
         blacklistExtensions = [".txt", ".ini", ".yml", ".xgen"]
-        for versionPath in versionPaths:
-            name = os.path.basename(versionPath)
-            productName = os.path.basename(os.path.dirname(versionPath))
-            version = {"type": "productVersion", "name": name, "locations": {versionPath: {}}}
-            for unit in units:
-
-                unitPath = os.path.join(versionPath, unit)
-                filepath = None
-                for root, folders, files in os.walk(unitPath):
-                    if not files:
-                        break
-
-                    for file in files:
-                        ext = os.path.splitext(file)[1]
-                        if ext in blacklistExtensions or file[0] == ".":
-                            continue
-
-                        filepath = os.path.join(root, file)
-                        filepath = getattr(self.core.appPlugin, "overrideImportpath", lambda x: x)(filepath)
-                        shotCamFormat = getattr(self.core.appPlugin, "shotcamFormat", ".abc")
-                        if (
-                            shotCamFormat == ".fbx"
-                            and productName == "_ShotCam"
-                            and filepath.endswith(".abc")
-                            and os.path.exists(filepath[:-3] + "fbx")
-                        ):
-                            filepath = filepath[:-3] + "fbx"
-
-                        objPath = filepath[:-3] + "obj"
-                        if filepath.endswith(".mtl") and os.path.exists(objPath):
-                            filepath = objPath
-                        break
+        name = os.path.basename(versionPath)
+        productName = os.path.basename(os.path.dirname(versionPath))
+        version = {"type": "productVersion", "name": name, "locations": {versionPath: {}}}
+        for unit in units:
+
+            unitPath = os.path.join(versionPath, unit)
+            filepath = None
+            for root, folders, files in os.walk(unitPath):
+                if not files:
                     break
 
-                if not filepath:
-                    continue
-
-                version["locations"][versionPath][unit] = filepath
+                for file in files:
+                    ext = os.path.splitext(file)[1]
+                    if ext in blacklistExtensions or file[0] == ".":
+                        continue
+
+                    filepath = os.path.join(root, file)
+                    filepath = getattr(self.core.appPlugin, "overrideImportpath", lambda x: x)(filepath)
+                    shotCamFormat = getattr(self.core.appPlugin, "shotcamFormat", ".abc")
+                    if (
+                        shotCamFormat == ".fbx"
+                        and productName == "_ShotCam"
+                        and filepath.endswith(".abc")
+                        and os.path.exists(filepath[:-3] + "fbx")
+                    ):
+                        filepath = filepath[:-3] + "fbx"
+
+                    objPath = filepath[:-3] + "obj"
+                    if filepath.endswith(".mtl") and os.path.exists(objPath):
+                        filepath = objPath
+                    break
+                break
 
-            if not version["locations"][versionPath]:
+            if not filepath:
                 continue
 
-            versions[name] = version
+            version["locations"][versionPath][unit] = filepath
 
-        return versions
+        if not version["locations"][versionPath]:
+            return
+
+        return version
 
     @err_catcher(name=__name__)
     def getVersionFromFilepath(self, path, num=False):
@@ -323,24 +345,88 @@ class Products(object):
 
     @err_catcher(name=__name__)
     def getLatestVersionFromProductPath(self, productPath):
+        """
+        The result is cached until the product folder or one of the version
+        folders, which were checked, changes.
+        """
+        with self.latestVersionLock:
+            cached = self.latestVersionCache.get(productPath)
+
+        if cached and self.getFolderStats(cached["paths"]) == cached["stats"]:
+            return cached["version"]
+
+        # only the folders from the newest version to the first version
+        # with files have to be checked
         latestVersion = None
-        versions = self.getVersionsFromPath(productPath)
-        latestVersion = self.getLatestVersionFromVersions(versions)
+        paths = [productPath]
+        versionPaths = self.getVersionFoldersFromPath(productPath)
+        for versionPath in sorted(versionPaths, key=os.path.basename, reverse=True):
+            paths += [
+                versionPath,
+                os.path.join(versionPath, "centimeter"),
+                os.path.join(versionPath, "meter"),
+            ]
+            latestVersion = self.getVersionFromFolder(versionPath)
+            if latestVersion:
+                break
+
+        stats = self.getFolderStats(paths)
+        if stats and max(stats) < (time.time() - self.settleTime):
+            with self.latestVersionLock:
+                self.latestVersionCache[productPath] = {
+                    "version": latestVersion,
+                    "paths": paths,
+                    "stats": stats,
+                }
 
         return latestVersion
 
     @err_catcher(name=__name__)
-    def getLatestVersionFromPath(self, path):
-        latestVersion = None
+    def getFolderStats(self, paths):
+        stats = []
+        for path in paths:
+            try:
+                stats.append(os.stat(path).st_mtime)
+            except OSError:
+                stats.append(0)
+
+        return stats
 
+    @err_catcher(name=__name__)
+    def getLatestVersionsFromProductPaths(self, productPaths):
+        """
+        Resolves the latest versions of multiple products in parallel.
+        Returns a dict with the product paths as keys.
+        """
+        productPaths = list(set(productPaths))
+        if len(productPaths) < 2:
+            return {path: self.getLatestVersionFromProductPath(path) for path in productPaths}
+
+        pool = ThreadPool(min(self.maxThreads, len(productPaths)))
+        try:
+            versions = pool.map(self.getLatestVersionFromProductPath, productPaths)
+        finally:
+            pool.close()
+            pool.join()
+
+        return dict(zip(productPaths, versions))
+
+    @err_catcher(name=__name__)
+    def getProductPathFromFilepath(self, path):
         versionDir = os.path.dirname(path)
         if os.path.basename(versionDir) in ["centimeter", "meter"]:
             versionDir = os.path.dirname(versionDir)
 
-        versionName = self.getVersionNameFromFilepath(path)
+        if not self.getVersionNameFromFilepath(path):
+            return
 
-        if versionName:
-            productPath = os.path.dirname(versionDir)
+        return os.path.dirname(versionDir)
+
+    @err_catcher(name=__name__)
+    def getLatestVersionFromPath(self, path):
+        latestVersion = None
+        productPath = self.getProductPathFromFilepath(path)
+        if productPath:
             latestVersion = self.getLatestVersionFromProductPath(productPath)
 
         return latestVersion
@@ -547,19 +633,9 @@ class Products(object):
         )
         logger.debug("updating master version: %s" % masterPath)
 
-        result = self.deleteMasterVersion(masterPath)
-        if not result:
-            self.core.popup("Failed to update master version. Couldn't remove old master version.")
-            return
-
-        if not os.path.exists(os.path.dirname(masterPath)):
-            os.makedirs(os.path.dirname(masterPath))
-
-        masterDrive = os.path.splitdrive(masterPath)[0]
-        drive = os.path.splitdrive(path)[0]
-
+        masterFolder = os.path.dirname(os.path.dirname(masterPath))
         seqFiles = self.core.detectFileSequence(path)
-        useHL = self.core.getConfig("globals", "useHardLinksForMasterVersions", config="project", dft=False)
+        files = []
         for seqFile in seqFiles:
             if len(seqFiles) > 1:
                 frameStr = "." + os.path.splitext(seqFile)[0][-self.core.framePadding:]
@@ -568,19 +644,30 @@ class Products(object):
             else:
                 masterPathPadded = masterPath
 
-            if platform.system() == "Windows" and drive == masterDrive and useHL and not masterDrive.startswith("\\"):
-                self.core.createSymlink(masterPathPadded, seqFile)
-            else:
-                shutil.copy2(seqFile, masterPathPadded)
+            files.append([seqFile, os.path.relpath(masterPathPadded, masterFolder)])
+
+        staging = self.core.masterVersions.stageFiles(masterFolder, files)
+        if not staging:
+            msg = "Failed to update master version. Couldn't transfer the files."
+            self.core.masterVersions.raiseInBackground(msg)
+            self.core.popup(msg)
+            return
 
+        # the versioninfo gets modified, so it's never linked to the source version
         ext = self.core.configs.preferredExtension
         infoPath = os.path.join(os.path.dirname(os.path.dirname(path)), "versioninfo" + ext)
-        masterInfoPath = os.path.join(os.path.dirname(os.path.dirname(masterPath)), "versioninfo" + ext)
-        if platform.system() == "Windows" and drive == masterDrive and useHL and not masterDrive.startswith("\\"):
-            self.core.createSymlink(masterInfoPath, infoPath)
-        else:
+        masterInfoPath = os.path.join(staging, "versioninfo" + ext)
+        if os.path.exists(infoPath):
             shutil.copy2(infoPath, masterInfoPath)
+
         self.core.setConfig("filename", val=path, configPath=masterInfoPath)
+        result = self.core.masterVersions.commitStaging(staging, masterFolder)
+        if not result:
+            msg = "Failed to update master version. Couldn't replace old master version."
+            self.core.masterVersions.raiseInBackground(msg)
+            self.core.popup(msg)
+            return
+
         return masterPath
 
     @err_catcher(name=__name__)
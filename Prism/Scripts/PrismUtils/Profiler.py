@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+import os
+import sys
+import time
+import json
+import atexit
+import logging
+import tempfile
+import threading
+
+if sys.version[0] == "3":
+    import builtins
+else:
+    import __builtin__ as builtins
+
+
+logger = logging.getLogger(__name__)
+
+# checked by the err_catcher decorators on every call, so that a disabled
+# profiler costs a single global lookup
+active = False
+
+
+class Profiler(object):
+    """
+    Collects call counts, cumulative and self times and the number of
+    filesystem calls of all functions, which are decorated with err_catcher.
+
+    Gets enabled with the environment variable PRISM_PROFILE=1 or with the
+    "profiling" setting in the user preferences.
+    """
+
+    # filesystem functions, which get counted while the profiler is active.
+    # os.path.exists/isfile/getmtime etc. call os.stat internally
+    fsFunctions = [
+        (os, "stat"),
+        (os, "lstat"),
+        (os, "listdir"),
+        (os, "scandir"),
+        (os, "mkdir"),
+        (os, "remove"),
+        (os, "rename"),
+        (builtins, "open"),
+    ]
+
+    def __init__(self):
+        self.stats = {}
+        self.events = []
+        self.maxEvents = 200000
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.origFsFunctions = {}
+        self.outputDir = tempfile.gettempdir()
+        self.startTime = time.time()
+        self.exitHandlerRegistered = False
+
+    def getStack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+
+        return stack
+
+    def getStat(self, funcId):
+        stat = self.stats.get(funcId)
+        if stat is None:
+            with self.lock:
+                stat = self.stats.setdefault(funcId, {"calls": 0, "cumulative": 0.0, "self": 0.0, "fsCalls": 0})
+
+        return stat
+
+    def callFunction(self, funcId, func, args, kwargs):
+        stack = self.getStack()
+        isRecursive = any(frame[0] == funcId for frame in stack)
+        frame = [funcId, 0.0]
+        stack.append(frame)
+        startTime = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.time() - startTime
+            stack.pop()
+            if stack:
+                stack[-1][1] += duration
+
+            stat = self.getStat(funcId)
+            stat["calls"] += 1
+            stat["self"] += duration - frame[1]
+            if not isRecursive:
+                stat["cumulative"] += duration
+
+            if len(self.events) < self.maxEvents:
+                self.events.append((funcId, startTime, duration, threading.current_thread().ident))
+
+    def createFsWrapper(self, function):
+        def fsWrapper(*args, **kwargs):
+            stack = getattr(self.local, "stack", None)
+            if stack:
+                self.getStat(stack[-1][0])["fsCalls"] += 1
+
+            return function(*args, **kwargs)
+
+        return fsWrapper
+
+    def patchFsFunctions(self):
+        for module, name in self.fsFunctions:
+            function = getattr(module, name, None)
+            if not function or (module, name) in self.origFsFunctions:
+                continue
+
+            self.origFsFunctions[(module, name)] = function
+            setattr(module, name, self.createFsWrapper(function))
+
+    def unpatchFsFunctions(self):
+        for module, name in self.origFsFunctions:
+            setattr(module, name, self.origFsFunctions[(module, name)])
+
+        self.origFsFunctions = {}
+
+    def enable(self, outputDir=None):
+        global active
+        if outputDir:
+            self.outputDir = outputDir
+
+        if active:
+            return
+
+        self.patchFsFunctions()
+        active = True
+        if not self.exitHandlerRegistered:
+            atexit.register(self.writeReports)
+            self.exitHandlerRegistered = True
+
+        logger.debug("profiling enabled")
+
+    def disable(self):
+        global active
+        if not active:
+            return
+
+        active = False
+        self.unpatchFsFunctions()
+        logger.debug("profiling disabled")
+
+    def clear(self):
+        with self.lock:
+            self.stats = {}
+            self.events = []
+            self.startTime = time.time()
+
+    def getReport(self, sortKey="cumulative", limit=None):
+        """
+        Returns a list of (function, stats) tuples sorted by "sortKey", which
+        can be "calls", "cumulative", "self" or "fsCalls".
+        """
+        with self.lock:
+            stats = [(funcId, dict(self.stats[funcId])) for funcId in self.stats]
+
+        stats = sorted(stats, key=lambda x: x[1][sortKey], reverse=True)
+        if limit:
+            stats = stats[:limit]
+
+        return stats
+
+    def getReportText(self, sortKey="cumulative", limit=None):
+        lines = ["%10s %12s %12s %10s  %s" % ("calls", "cumulative", "self", "fs calls", "function")]
+        for funcId, stat in self.getReport(sortKey=sortKey, limit=limit):
+            lines.append(
+                "%10s %12.4f %12.4f %10s  %s"
+                % (stat["calls"], stat["cumulative"], stat["self"], stat["fsCalls"], funcId)
+            )
+
+        return "\n".join(lines)
+
+    def getChromeTrace(self):
+        pid = os.getpid()
+        events = []
+        for funcId, startTime, duration, tid in list(self.events):
+            events.append({
+                "name": funcId,
+                "ph": "X",
+                "ts": int((startTime - self.startTime) * 1000000),
+                "dur": int(duration * 1000000),
+                "pid": pid,
+                "tid": tid,
+            })
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def writeReport(self, path=None, sortKey="cumulative"):
+        path = path or os.path.join(self.outputDir, "profile_report.txt")
+        with open(path, "w") as f:
+            f.write(self.getReportText(sortKey=sortKey))
+
+        logger.debug("wrote profile report: %s" % path)
+        return path
+
+    def writeChromeTrace(self, path=None):
+        """
+        Writes the calls in the Chrome trace format, which can be opened in
+        chrome://tracing or https://ui.perfetto.dev
+        """
+        path = path or os.path.join(self.outputDir, "profile_trace.json")
+        with open(path, "w") as f:
+            json.dump(self.getChromeTrace(), f)
+
+        logger.debug("wrote profile trace: %s" % path)
+        return path
+
+    def writeReports(self):
+        if not self.stats:
+            return
+
+        try:
+            self.writeReport()
+            self.writeChromeTrace()
+        except Exception as e:
+            logger.warning("failed to write profile reports: %s" % e)
+
+
+profiler = Profiler()
+
+if os.getenv("PRISM_PROFILE", "0") not in ["", "0"]:
+    profiler.enable()
@@ -36,6 +36,8 @@ import sys
 import logging
 import shutil
 
+from collections import OrderedDict
+
 try:
     from PySide2.QtCore import *
     from PySide2.QtGui import *
@@ -121,15 +123,13 @@ class ProjectEntities(object):
 
         shotDirs = []
         for seqDir in seqDirs:
-            for root, folders, files in os.walk(seqDir["path"]):
-                for f in folders:
-                    if f.startswith("_"):
-                        continue
+            for f in self.core.entityIndex.getFolders(seqDir["path"]):
+                if f.startswith("_"):
+                    continue
 
-                    sPath = os.path.join(root, f)
-                    data = {"location": seqDir["location"], "path": sPath}
-                    shotDirs.append(data)
-                break
+                sPath = os.path.join(seqDir["path"], f)
+                data = {"location": seqDir["location"], "path": sPath}
+                shotDirs.append(data)
 
         for shotDir in sorted(shotDirs, key=lambda x: x["path"]):
             path = shotDir["path"]
@@ -183,15 +183,14 @@ class ProjectEntities(object):
         dirContent = []
 
         for sDir in stepDirs:
-            if os.path.exists(sDir):
-                dirContent += [os.path.join(sDir, x) for x in os.listdir(sDir)]
+            dirContent += [os.path.join(sDir, x) for x in self.core.entityIndex.getFolders(sDir)]
 
         for i in sorted(dirContent, key=lambda x: os.path.basename(x)):
             stepName = os.path.basename(i)
             if stepName.startswith("_"):
                 continue
 
-            if os.path.isdir(i) and stepName not in steps:
+            if stepName not in steps:
                 steps.append(stepName)
 
         return steps
@@ -215,24 +214,20 @@ class ProjectEntities(object):
         dirContent = []
 
         for cDir in catDirs:
-            if os.path.exists(cDir):
-                dirContent += [os.path.join(cDir, x) for x in os.listdir(cDir)]
+            dirContent += [os.path.join(cDir, x) for x in self.core.entityIndex.getFolders(cDir)]
 
         for i in sorted(dirContent, key=lambda x: os.path.basename(x)):
             catName = os.path.basename(i)
             if catName.startswith("_"):
                 continue
 
-            if os.path.isdir(i) and catName not in cats:
+            if catName not in cats:
                 cats.append(catName)
 
         return cats
 
     @err_catcher(name=__name__)
-    def getScenefiles(self, asset=None, shot=None, step=None, category=None, extensions=None):
-        extensions = extensions or "*"
-        scenefiles = []
-
+    def getScenefileFolders(self, asset=None, shot=None, step=None, category=None):
         if asset:
             if (
                 self.core.compareVersions(self.core.projectVersion, "v1.2.1.6")
@@ -255,25 +250,57 @@ class ProjectEntities(object):
             lpath = self.core.convertPath(path, target="local")
             sceneDirs = [path, lpath]
 
+        return sceneDirs
+
+    @err_catcher(name=__name__)
+    def getScenefiles(self, asset=None, shot=None, step=None, category=None, extensions=None):
+        extensions = extensions or "*"
+        scenefiles = []
+
+        sceneDirs = self.getScenefileFolders(asset=asset, shot=shot, step=step, category=category)
         sfiles = {}
         for sDir in sceneDirs:
-            for root, dirs, files in os.walk(sDir):
-                for f in files:
-                    if f in sfiles:
-                        continue
+            for f in self.core.entityIndex.getFiles(sDir):
+                if f in sfiles:
+                    continue
 
-                    if self.isValidScenefilename(f, extensions=extensions):
-                        sfiles[f] = os.path.join(root, f)
-                break
+                if self.isValidScenefilename(f, extensions=extensions):
+                    sfiles[f] = os.path.join(sDir, f)
 
         scenefiles = sfiles.values()
 
         return scenefiles
 
     @err_catcher(name=__name__)
-    def isValidScenefilename(self, filename, extensions=None):
+    def getScenefileRecords(self, asset=None, shot=None, step=None, category=None, extensions=None):
+        # the stats are read together with the folder listing, so displaying
+        # the scenefiles doesn't require further filesystem calls
+        extensions = extensions or "*"
+        sceneDirs = self.getScenefileFolders(asset=asset, shot=shot, step=step, category=category)
+        records = OrderedDict([])
+        for sDir in sceneDirs:
+            for filename, mtime, size in self.core.entityIndex.getFileRecords(sDir):
+                if filename in records:
+                    continue
+
+                path = os.path.join(sDir, filename)
+                sData = self.core.getScenefileData(path)
+                if not self.isValidScenefilename(filename, extensions=extensions, sData=sData):
+                    continue
+
+                records[filename] = {
+                    "path": path,
+                    "data": sData,
+                    "mtime": mtime,
+                    "size": size,
+                }
+
+        return list(records.values())
+
+    @err_catcher(name=__name__)
+    def isValidScenefilename(self, filename, extensions=None, sData=None):
         extensions = extensions or "*"
-        sData = self.core.getScenefileData(filename)
+        sData = sData or self.core.getScenefileData(filename)
 
         if sData["entity"] not in ["asset", "shot"]:
             return False
@@ -351,6 +378,11 @@ class ProjectEntities(object):
         else:
             return {}
 
+        if result.get("entityPath"):
+            # the folder might have been created within the mtime resolution
+            # of a listing, which is already in the index
+            self.core.entityIndex.invalidate(result["entityPath"], parents=2)
+
         if result.get("existed"):
             eName = self.getAssetRelPathFromPath(entityName)
             if eName in self.omittedEntities[entityType] and self.core.uiAvailable:
@@ -419,7 +451,7 @@ class ProjectEntities(object):
                 args=[self, assetName, assetPath, dialog],
             )
             for i in self.core.prjManagers.values():
-                i.assetCreated(self, dialog, assetPath)
+                self.core.callbacks.getPluginCallback(i, "assetCreated")(self, dialog, assetPath)
 
         result = {
             "entity": "asset",
@@ -491,6 +523,8 @@ class ProjectEntities(object):
             except:
                 self.core.popup("The directory %s could not be created" % stepName)
                 return False
+
+            self.core.entityIndex.invalidate(stepPath, parents=1)
         else:
             existed = True
             logger.debug("step already exists: %s" % stepPath)
@@ -553,6 +587,7 @@ class ProjectEntities(object):
                 self.core.popup("The directory %s could not be created" % catPath)
                 return
             else:
+                self.core.entityIndex.invalidate(catPath, parents=1)
                 self.core.callback(
                     name="onCategoryCreated",
                     types=["custom"],
@@ -582,6 +617,12 @@ class ProjectEntities(object):
             self.core.setConfig(entityType, entityName, config="omit", delete=True)
             logger.debug("restored %s %s" % (entityType, entityName))
 
+        if entityType == "asset":
+            entityPath = os.path.join(self.core.assetPath, entityName)
+        else:
+            entityPath = self.core.getEntityPath(shot=entityName)
+
+        self.core.entityIndex.invalidate(entityPath, parents=1)
         self.refreshOmittedEntities()
 
     @err_catcher(name=__name__)
@@ -707,10 +748,11 @@ class ProjectEntities(object):
 
     @err_catcher(name=__name__)
     def getTypeFromPath(self, path):
-        if not os.path.exists(path):
+        listing = self.core.entityIndex.listDir(path)
+        if listing is None:
             return
 
-        dirContent = os.listdir(path)
+        dirContent = listing[0] + listing[1]
 
         if self.core.getConfig("globals", "useStrictAssetDetection", dft=False, config="project"):
             isAsset = (
@@ -738,23 +780,21 @@ class ProjectEntities(object):
         assets = []
         assetFolders = []
 
-        for root, folders, files in os.walk(aBasePath):
-            for folder in folders:
-                folderPath = os.path.join(root, folder)
-                if self.getTypeFromPath(folderPath) == "asset":
-                    assets.append(folderPath)
+        for folder in self.core.entityIndex.getFolders(aBasePath):
+            folderPath = os.path.join(aBasePath, folder)
+            if self.getTypeFromPath(folderPath) == "asset":
+                assets.append(folderPath)
+            else:
+                if depth == 1:
+                    assetFolders.append(folderPath)
                 else:
-                    if depth == 1:
-                        assetFolders.append(folderPath)
+                    nextDepth = 0 if depth == 0 else (depth-1)
+                    childAssets, childFolders = self.getAssetPaths(path=folderPath, returnFolders=True, depth=nextDepth)
+                    if childAssets or childFolders:
+                        assets += childAssets
+                        assetFolders += childFolders
                     else:
-                        nextDepth = 0 if depth == 0 else (depth-1)
-                        childAssets, childFolders = self.getAssetPaths(path=folderPath, returnFolders=True, depth=nextDepth)
-                        if childAssets or childFolders:
-                            assets += childAssets
-                            assetFolders += childFolders
-                        else:
-                            assetFolders.append(folderPath)
-            break
+                        assetFolders.append(folderPath)
 
         if returnFolders:
             return assets, assetFolders
@@ -832,11 +872,7 @@ class ProjectEntities(object):
     @err_catcher(name=__name__)
     def getExportProductNamesFromAsset(self, assetPath):
         productPath = self.core.products.getProductPathFromEntityPath(assetPath)
-        pnames = []
-        for root, folders, files in os.walk(productPath):
-            pnames += folders
-            break
-
+        pnames = self.core.entityIndex.getFolders(productPath)
         return pnames
 
     @err_catcher(name=__name__)
@@ -928,6 +964,7 @@ class ProjectEntities(object):
         fileTypes="*",
         localVersions=True,
         getExistingVersion=False,
+        reserve=False,
     ):
         if not scenetype:
             glbDstname = dstname
@@ -944,47 +981,54 @@ class ProjectEntities(object):
             else:
                 return
 
-        files = []
         if self.core.useLocalFiles and localVersions:
             dstname = self.core.convertPath(dstname, "global")
 
-        for i in os.walk(dstname):
-            files += [os.path.join(i[0], x) for x in i[2]]
-            break
-
+        folders = [dstname]
         if self.core.useLocalFiles and localVersions:
-            for i in os.walk(self.core.convertPath(dstname, "local")):
-                files += [os.path.join(i[0], x) for x in i[2]]
-                break
-
-        highversion = [0, ""]
-        for i in files:
-            if fileTypes != "*" and os.path.splitext(i)[1] not in fileTypes:
-                continue
+            folders.append(self.core.convertPath(dstname, "local"))
 
-            fname = self.core.getScenefileData(i)
+        if getExistingVersion or getExistingPath:
+            highversion = self.core.versions.getHighestScenefileVersion(folders, scenetype, fileTypes=fileTypes)
+            if getExistingVersion:
+                return highversion
+            else:
+                return highversion[1]
+        elif reserve:
+            version = self.core.versions.reserveNextScenefileVersion(folders, scenetype, fileTypes=fileTypes)
+        else:
+            version = self.core.versions.getNextScenefileVersion(folders, scenetype, fileTypes=fileTypes)
 
-            if fname["entity"] != scenetype.lower():
-                continue
+        return self.core.versionFormat % version
 
-            try:
-                version = int(fname["version"][-self.core.versionPadding:])
-            except:
-                continue
+    @err_catcher(name=__name__)
+    def getHighestTaskVersion(self, dstname, getExisting=False, ignoreEmpty=False, reserve=False):
+        if not getExisting and not self.core.separateOutputVersionStack:
+            fileName = self.core.getCurrentFileName()
+            fnameData = self.core.getScenefileData(fileName)
+            if fnameData["entity"] != "invalid":
+                hVersion = fnameData["version"]
+            else:
+                hVersion = self.core.versionFormat % 1
 
-            if version > highversion[0]:
-                highversion = [version, i]
+            return hVersion
 
-        if getExistingVersion:
-            return highversion
-        elif getExistingPath:
-            return highversion[1]
+        folders = self.getTaskVersionFolders(dstname)
+        if getExisting:
+            highversion = self.core.versions.getHighestTaskVersion(folders, ignoreEmpty=ignoreEmpty)
+            if highversion != 0:
+                return self.core.versionFormat % (highversion)
+            else:
+                return self.core.versionFormat % (highversion + 1)
+        elif reserve:
+            version = self.core.versions.reserveNextTaskVersion(folders, ignoreEmpty=ignoreEmpty)
         else:
-            return self.core.versionFormat % (highversion[0] + 1)
+            version = self.core.versions.getNextTaskVersion(folders, ignoreEmpty=ignoreEmpty)
+
+        return self.core.versionFormat % version
 
     @err_catcher(name=__name__)
-    def getHighestTaskVersion(self, dstname, getExisting=False, ignoreEmpty=False):
-        taskDirs = []
+    def getTaskVersionFolders(self, dstname):
         dstname = os.path.normpath(dstname)
         if os.path.normpath("Rendering/3dRender") in dstname or os.path.normpath("Rendering/2dRender") in dstname:
             outPaths = self.core.paths.getRenderProductBasePaths().values()
@@ -994,47 +1038,20 @@ class ProjectEntities(object):
         for path in outPaths:
             dstname = dstname.replace(path, self.core.projectPath)
 
-        for path in outPaths:
-            opath = dstname.replace(self.core.projectPath, path)
-            for i in os.walk(opath):
-                if ignoreEmpty:
-                    for k in i[1]:
-                        exFiles = os.listdir(os.path.join(i[0], k))
-                        if len(exFiles) > 1 or (
-                            len(exFiles) == 1 and not exFiles[0].startswith("versioninfo")
-                        ):
-                            taskDirs.append(k)
-                else:
-                    taskDirs += i[1]
-                break
-
-        highversion = 0
-        for i in taskDirs:
-            fname = i.split(self.core.filenameSeparator)
-
-            if len(fname) in [1, 2, 3]:
-                try:
-                    version = int(fname[0][1:(1+self.core.versionPadding)])
-                except:
-                    continue
-
-                if version > highversion:
-                    highversion = version
+        return [dstname.replace(self.core.projectPath, path) for path in outPaths]
 
-        if not getExisting and not self.core.separateOutputVersionStack:
-            fileName = self.core.getCurrentFileName()
-            fnameData = self.core.getScenefileData(fileName)
-            if fnameData["entity"] != "invalid":
-                hVersion = fnameData["version"]
-            else:
-                hVersion = self.core.versionFormat % 1
-
-            return hVersion
+    @err_catcher(name=__name__)
+    def releaseTaskVersion(self, dstname, version):
+        """
+        Removes the reservation of a version, which was returned by
+        getHighestTaskVersion with reserve=True.
+        """
+        if not self.core.separateOutputVersionStack:
+            return
 
-        if getExisting and highversion != 0:
-            return self.core.versionFormat % (highversion)
-        else:
-            return self.core.versionFormat % (highversion + 1)
+        folders = self.getTaskVersionFolders(dstname)
+        version = int(version[-self.core.versionPadding:])
+        self.core.versions.releaseVersion(folders[0], version)
 
     @err_catcher(name=__name__)
     def getLatestCompositingVersion(self, curPath):
@@ -234,6 +234,7 @@ class Projects(object):
             if hasattr(self.core, "projectVersion"):
                 del self.core.projectVersion
             self.core.useLocalFiles = False
+            self.core.entityIndex.refresh()
             return
 
         self.core.prismIni = configPath
@@ -242,6 +243,7 @@ class Projects(object):
         self.core.projectVersion = projectVersion
 
         self.core.configs.clearCache()
+        self.core.entityIndex.refresh()
 
         self.core.useLocalFiles = self.getUseLocalFiles()
         if self.core.useLocalFiles:
@@ -313,11 +315,16 @@ class Projects(object):
         self.core.sanities.checkAppVersion()
         self.core.checkCommands()
         self.core.updateProjectEnvironment()
+        self.core.entityIndex.crawlInBackground()
         self.core.callback(
             name="onProjectChanged",
             types=["curApp", "custom", "prjManagers"],
             args=[self.core],
         )
+        logger.debug(
+            "%s plugins still deferred after changing the project"
+            % len(self.core.plugins.getDeferredPlugins())
+        )
 
         if self.core.uiAvailable:
             if openPb or openUi == "projectBrowser":
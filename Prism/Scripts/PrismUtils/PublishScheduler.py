@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import time
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class PublishTask(object):
+    def __init__(self, state, func, args, kwargs, key, dependencies):
+        self.state = state
+        self.func = func
+        self.args = args or []
+        self.kwargs = kwargs or {}
+        self.key = key
+        self.dependencies = dependencies
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.duration = 0
+
+    @property
+    def name(self):
+        return getattr(self.func, "__name__", str(self.func))
+
+
+class PublishScheduler(object):
+    """
+    Runs the thread-safe parts of a publish in a worker pool.
+
+    The states are still executed one after another on the main thread,
+    because they use the API of the host app. Work, which doesn't touch the
+    host app, like versioninfo writes and master version updates, can be
+    passed to runInBackground while a publish is running and continues,
+    while the next states are executed.
+
+    A background task waits for the tasks of the states, which its state
+    depends on, for the earlier tasks of its own state and for the earlier
+    tasks with the same key.
+
+    The states wait for their versioninfo writes (key "versionInfo") before
+    they call the postExport and postRender callbacks, but master version
+    updates (key "masterVersions") can still be running at that point.
+    Callbacks, which need them, call waitForTasks(key="masterVersions").
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.maxThreads = 4
+        self.pool = None
+        self.tasks = []
+        self.graph = {}
+        self.stateStack = []
+        self.stateTimings = {}
+        self.lock = threading.Lock()
+
+    @err_catcher(name=__name__)
+    def isActive(self):
+        return self.pool is not None
+
+    @err_catcher(name=__name__)
+    def isEnabled(self):
+        return self.core.getConfig("globals", "parallelPublish") is not False
+
+    @err_catcher(name=__name__)
+    def getStateGraph(self, items):
+        """
+        Returns a dict, which maps every state item to the list of state
+        items it depends on. States depend on the Dependency states before
+        them in the same folder or in a parent folder. Dependency states
+        depend on all states before them.
+        """
+        graph = {}
+
+        def walk(items, inherited):
+            scopeDeps = list(inherited)
+            previous = []
+            for item in items:
+                className = getattr(getattr(item, "ui", None), "className", "")
+                if className == "Dependency":
+                    graph[item] = scopeDeps + previous
+                    scopeDeps = scopeDeps + [item]
+                else:
+                    graph[item] = list(scopeDeps)
+
+                previous.append(item)
+                if className == "Folder":
+                    children = [item.child(idx) for idx in range(item.childCount())]
+                    previous += walk(children, graph[item])
+
+            return previous
+
+        walk(items, [])
+        return graph
+
+    @err_catcher(name=__name__)
+    def start(self, items):
+        if self.isActive():
+            # a publish, which was paused and not continued
+            for stat in self.finish().values():
+                for error in stat["errors"]:
+                    logger.warning(error)
+
+        self.graph = self.getStateGraph(items)
+        self.tasks = []
+        self.stateTimings = {}
+        if self.isEnabled():
+            self.pool = ThreadPool(self.maxThreads)
+
+    @contextmanager
+    def executingState(self, state):
+        """
+        Marks "state" as the current state, so tasks, which are passed to
+        runInBackground, get assigned to it, and records the execution time.
+        """
+        self.stateStack.append(state)
+        startTime = time.time()
+        try:
+            yield
+        finally:
+            duration = time.time() - startTime
+            self.stateStack.pop()
+            if self.stateStack:
+                # the duration of a folder only includes its own overhead
+                parent = self.stateStack[-1]
+                self.stateTimings[parent] = self.stateTimings.get(parent, 0) - duration
+
+            self.stateTimings[state] = self.stateTimings.get(state, 0) + duration
+
+    @err_catcher(name=__name__)
+    def runInBackground(self, func, args=None, kwargs=None, key=None):
+        """
+        Runs "func" in the worker pool, if a publish is running. Otherwise
+        it is called directly. Returns the PublishTask.
+        """
+        state = self.stateStack[-1] if self.stateStack else None
+        with self.lock:
+            dependencies = []
+            depStates = self.graph.get(getattr(state, "state", None), [])
+            for task in self.tasks:
+                if (
+                    (state and task.state is state)
+                    or (key and task.key == key)
+                    or getattr(task.state, "state", None) in depStates
+                ):
+                    dependencies.append(task)
+
+            task = PublishTask(state, func, args, kwargs, key, dependencies)
+            # tasks outside of a state, e.g. while a publish is paused, don't
+            # belong to the publish
+            if self.isActive() and state:
+                self.tasks.append(task)
+                self.pool.apply_async(self.runTask, [task])
+                return task
+
+        self.runTask(task)
+        if task.error:
+            logger.warning(task.error)
+
+        return task
+
+    def runTask(self, task):
+        # tasks only wait for tasks, which were submitted before them. They
+        # are started first, so waiting can't exhaust the pool
+        for dependency in task.dependencies:
+            dependency.done.wait()
+
+        startTime = time.time()
+        try:
+            task.result = task.func(*task.args, **task.kwargs)
+        except Exception:
+            task.error = "%s failed:\n%s" % (task.name, traceback.format_exc())
+        finally:
+            task.duration = time.time() - startTime
+            task.done.set()
+
+    @err_catcher(name=__name__)
+    def hasPendingTasks(self):
+        return any(not task.done.is_set() for task in self.tasks)
+
+    @err_catcher(name=__name__)
+    def waitForTasks(self, key=None, state=None):
+        """
+        Waits for the background tasks of "state", which defaults to the
+        current state. If "key" is given, only the tasks with this key are
+        waited for.
+        """
+        state = state or (self.stateStack[-1] if self.stateStack else None)
+        with self.lock:
+            tasks = [
+                task for task in self.tasks
+                if task.state is state and (not key or task.key == key)
+            ]
+
+        for task in tasks:
+            task.done.wait()
+
+    @err_catcher(name=__name__)
+    def wait(self):
+        for task in list(self.tasks):
+            task.done.wait()
+
+    @err_catcher(name=__name__)
+    def finish(self):
+        """
+        Waits for all background tasks and stops the worker pool. Returns a
+        dict, which maps every state to its execution time, its background
+        time and the errors of its background tasks.
+        """
+        self.wait()
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+        stats = {}
+        for state, duration in self.stateTimings.items():
+            stats[state] = {"duration": duration, "backgroundDuration": 0, "errors": []}
+
+        for task in self.tasks:
+            stat = stats.setdefault(
+                task.state, {"duration": 0, "backgroundDuration": 0, "errors": []}
+            )
+            stat["backgroundDuration"] += task.duration
+            if task.error:
+                stat["errors"].append(task.error)
+
+        self.tasks = []
+        self.graph = {}
+        self.stateTimings = {}
+        return stats
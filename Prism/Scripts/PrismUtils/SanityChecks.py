@@ -32,6 +32,7 @@
 
 
 import os
+import ast
 import logging
 
 try:
@@ -53,6 +54,7 @@ logger = logging.getLogger(__name__)
 class SanityChecks(object):
     def __init__(self, core):
         self.core = core
+        self.taskLoader = None
         self.checksToRun = {
             "onOpenProjectBrowser": [
                 {"name": "restartRequired", "function": self.checkRestartRequired}
@@ -89,7 +91,12 @@ class SanityChecks(object):
         return (not self.core.restartRequired)
 
     @err_catcher(name=__name__)
-    def checkImportVersions(self):
+    def checkImportVersions(self, background=False):
+        """
+        Shows a message, if newer versions of the imported products exist.
+        The import paths are queried from the app, but the versions can be
+        resolved in the background, so opening a scene doesn't block the UI.
+        """
         checkImpVersions = self.core.getConfig("globals", "check_import_versions")
         if checkImpVersions is None:
             self.core.setConfig("globals", "check_import_versions", True)
@@ -106,69 +113,74 @@ class SanityChecks(object):
         if not paths:
             return
 
-        paths = eval(paths.replace("\\", "/"))
+        paths = ast.literal_eval(paths.replace("\\", "/"))
         paths = [[self.core.fixPath(str(x[0])), self.core.fixPath(str(x[1]))] for x in paths]
 
         if len(paths) == 0:
             return
 
-        msgString = "For the following imports there is a newer version available:\n\n"
-        updates = 0
-
-        for i in paths:
-            if not os.path.exists(os.path.dirname(i[0])):
-                continue
+        if background and self.core.uiAvailable:
+            if not self.taskLoader:
+                self.taskLoader = self.core.getTaskLoader()
 
-            versionData = (
-                os.path.dirname(os.path.dirname(i[0]))
-                .rsplit(os.sep, 1)[1]
-                .split(self.core.filenameSeparator)
+            self.taskLoader.load(
+                "importVersions",
+                self.getOutdatedImports,
+                self.showOutdatedImports,
+                args=[paths],
             )
+        else:
+            self.showOutdatedImports(self.getOutdatedImports(paths))
 
-            if (
-                len(versionData) != 3
-                or not self.core.core.getScenePath().replace(self.core.projectPath, "")
-                in i[0]
-            ):
+    @err_catcher(name=__name__)
+    def getOutdatedImports(self, paths):
+        """
+        Returns a list of [name, currentVersion, latestVersion] for every
+        import, which isn't the latest version. Imports are grouped by their
+        product folder, so every product is resolved only once.
+        """
+        scenePath = self.core.getScenePath().replace(self.core.projectPath, "")
+        imports = []
+        for path, name in paths:
+            if scenePath not in path or not os.path.exists(os.path.dirname(path)):
                 continue
 
-            curVersion = (
-                versionData[0]
-                + self.core.filenameSeparator
-                + versionData[1]
-                + self.core.filenameSeparator
-                + versionData[2]
-            )
-            latestVersion = None
-            for m in os.walk(os.path.dirname(os.path.dirname(os.path.dirname(i[0])))):
-                folders = m[1]
-                folders.sort()
-                for k in reversed(folders):
-                    if (
-                        len(k.split(self.core.filenameSeparator)) == 3
-                        and k[0] == "v"
-                        and len(k.split(self.core.filenameSeparator)[0]) == 5
-                        and len(os.listdir(os.path.join(m[0], k))) > 0
-                    ):
-                        latestVersion = k
-                        break
-                break
-
-            if latestVersion is None or curVersion == latestVersion:
+            versionDir = os.path.dirname(os.path.dirname(path))
+            curVersion = os.path.basename(versionDir)
+            if not self.core.products.isVersionFolderName(curVersion):
                 continue
 
+            imports.append([name, curVersion, os.path.dirname(versionDir)])
+
+        productPaths = [x[2] for x in imports]
+        latestVersions = self.core.products.getLatestVersionsFromProductPaths(productPaths)
+        outdated = []
+        for name, curVersion, productPath in imports:
+            latestVersion = latestVersions.get(productPath)
+            if not latestVersion or latestVersion["name"] in [curVersion, "master"]:
+                continue
+
+            outdated.append([name, curVersion, latestVersion["name"]])
+
+        return outdated
+
+    @err_catcher(name=__name__)
+    def showOutdatedImports(self, outdated):
+        if not outdated:
+            return
+
+        msgString = "For the following imports there is a newer version available:\n\n"
+        for name, curVersion, latestVersion in outdated:
             msgString += "%s\n    current: %s\n    latest: %s\n\n" % (
-                i[1],
+                name,
                 curVersion,
                 latestVersion,
             )
-            updates += 1
 
         msgString += "Please update the imports in the State Manager."
 
-        if updates > 0:
-            if self.core.uiAvailable:
-                QMessageBox.information(self.core.messageParent, "State updates", msgString)
+        if self.core.uiAvailable:
+            QMessageBox.information(self.core.messageParent, "State updates", msgString)
 
     @err_catcher(name=__name__)
     def checkFramerange(self):
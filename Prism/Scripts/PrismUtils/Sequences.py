@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import re
+import time
+import logging
+import threading
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class Sequences(object):
+    """
+    Groups the files of a folder into file sequences.
+
+    A file is part of a sequence, if its name ends with a frame number
+    before the extension, e.g. "shot_beauty.1001.exr". The frame number
+    has to follow a "." or "_" and has at least the project frame padding,
+    so version suffixes like "_v001" aren't frames. Files with the same
+    prefix and extension belong to the same sequence. The groups are cached
+    per folder and are only rebuilt when the mtime of the folder changes.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.frameExpressions = {}
+
+        # folders, which were modified very recently, aren't cached, because
+        # a second change in the same mtime interval wouldn't be detected
+        self.settleTime = 2
+
+    @err_catcher(name=__name__)
+    def getFrameExpression(self):
+        padding = self.core.framePadding
+        if padding not in self.frameExpressions:
+            self.frameExpressions[padding] = re.compile(
+                r"^(.*[._])(\d{%s,})$" % padding
+            )
+
+        return self.frameExpressions[padding]
+
+    @err_catcher(name=__name__)
+    def parseFilename(self, filename):
+        """
+        Returns a tuple of prefix, frame string and extension.
+        The frame string is None if the filename doesn't end with a frame
+        number.
+        """
+        base, ext = os.path.splitext(filename)
+        match = self.getFrameExpression().match(base)
+        if not match:
+            return base, None, ext
+
+        return match.group(1), match.group(2), ext
+
+    @err_catcher(name=__name__)
+    def groupFiles(self, filenames, folder=""):
+        groups = {}
+        for filename in filenames:
+            prefix, frameStr, ext = self.parseFilename(filename)
+            if frameStr is None:
+                key = (filename, None, "")
+            else:
+                key = (prefix, True, ext)
+
+            if key not in groups:
+                groups[key] = {"prefix": prefix, "extension": ext, "frameFiles": [], "padding": None}
+
+            group = groups[key]
+            frame = int(frameStr) if frameStr is not None else None
+            group["frameFiles"].append([frame, filename])
+            if frameStr is not None:
+                if group["padding"] is None or len(frameStr) < group["padding"]:
+                    group["padding"] = len(frameStr)
+
+        sequences = []
+        for group in groups.values():
+            frameFiles = sorted(group.pop("frameFiles"), key=lambda x: (x[0], x[1]))
+            frames = [x[0] for x in frameFiles if x[0] is not None]
+            group["filenames"] = [x[1] for x in frameFiles]
+            group["files"] = [os.path.join(folder, x) for x in group["filenames"]]
+            group["frames"] = frames
+            group["isSequence"] = len(frames) > 1
+            if frames:
+                group["start"] = frames[0]
+                group["end"] = frames[-1]
+                group["range"] = self.compressFrames(frames)
+                group["missing"] = self.getMissingFrames(frames)
+                group["pattern"] = group["prefix"] + "#" * group["padding"] + group["extension"]
+            else:
+                group["start"] = None
+                group["end"] = None
+                group["range"] = ""
+                group["missing"] = []
+                group["pattern"] = group["filenames"][0]
+
+            sequences.append(group)
+
+        sequences.sort(key=lambda x: x["filenames"][0])
+        return sequences
+
+    @err_catcher(name=__name__)
+    def getSequences(self, folder, extensions=None):
+        folder = os.path.normpath(folder)
+        try:
+            mtime = os.stat(folder).st_mtime
+        except OSError:
+            return []
+
+        with self.lock:
+            cached = self.cache.get(folder)
+
+        padding = self.core.framePadding
+        if cached and cached[0] == mtime and cached[1] == padding:
+            sequences = cached[2]
+        else:
+            filenames = []
+            for root, folders, files in os.walk(folder):
+                filenames = files
+                break
+
+            sequences = self.groupFiles(filenames, folder=folder)
+            if (time.time() - mtime) > self.settleTime:
+                with self.lock:
+                    self.cache[folder] = [mtime, padding, sequences]
+
+        if extensions:
+            sequences = [x for x in sequences if x["extension"] in extensions]
+
+        return [self.copySequence(x) for x in sequences]
+
+    @err_catcher(name=__name__)
+    def copySequence(self, sequence):
+        # the cached sequences must not be modified by the caller
+        sequence = dict(sequence)
+        for key in ["filenames", "files", "frames", "missing"]:
+            sequence[key] = list(sequence[key])
+
+        return sequence
+
+    @err_catcher(name=__name__)
+    def getSequenceFromFile(self, path):
+        folder, filename = os.path.split(os.path.normpath(path))
+        for sequence in self.getSequences(folder):
+            if filename in sequence["filenames"]:
+                return sequence
+
+    @err_catcher(name=__name__)
+    def compressFrames(self, frames):
+        """
+        Returns a string like "1001-1100x1" or "1001-1010x1,1012,1020-1040x2"
+        for a list of frame numbers.
+        """
+        frames = sorted(set(frames))
+        parts = []
+        idx = 0
+        while idx < len(frames):
+            if idx + 1 < len(frames):
+                step = frames[idx + 1] - frames[idx]
+                endIdx = idx + 1
+                while endIdx + 1 < len(frames) and frames[endIdx + 1] - frames[endIdx] == step:
+                    endIdx += 1
+
+                if step == 1 or (endIdx - idx) > 1:
+                    parts.append("%s-%sx%s" % (frames[idx], frames[endIdx], step))
+                    idx = endIdx + 1
+                    continue
+
+            parts.append(str(frames[idx]))
+            idx += 1
+
+        return ",".join(parts)
+
+    @err_catcher(name=__name__)
+    def getMissingFrames(self, frames):
+        if len(frames) < 2:
+            return []
+
+        existing = set(frames)
+        return [x for x in range(frames[0], frames[-1] + 1) if x not in existing]
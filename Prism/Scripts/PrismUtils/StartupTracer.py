@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+import os
+import sys
+import time
+import json
+import logging
+import platform
+import contextlib
+from collections import OrderedDict
+
+if sys.version[0] == "3":
+    import builtins
+else:
+    import __builtin__ as builtins
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+# timings of the traced imports: module name -> [cumulative time, self time]
+importTimings = OrderedDict([])
+importStack = []
+originalImport = None
+
+
+def tracedImport(name, *args, **kwargs):
+    if name in sys.modules or importStack and importStack[-1][0] == name:
+        return originalImport(name, *args, **kwargs)
+
+    importStack.append([name, 0.0])
+    startTime = time.time()
+    try:
+        return originalImport(name, *args, **kwargs)
+    finally:
+        duration = time.time() - startTime
+        childDuration = importStack.pop()[1]
+        if importStack:
+            importStack[-1][1] += duration
+
+        if name not in importTimings:
+            importTimings[name] = [duration, duration - childDuration]
+
+
+def installImportTracer():
+    """
+    Measures the time of every first import of a module, similar to
+    "python -X importtime". Gets installed by PrismCore, if the
+    environment variable PRISM_TRACE_IMPORTS is set.
+    """
+    global originalImport
+    if originalImport:
+        return
+
+    originalImport = builtins.__import__
+    builtins.__import__ = tracedImport
+
+
+def uninstallImportTracer():
+    global originalImport
+    if not originalImport:
+        return
+
+    builtins.__import__ = originalImport
+    originalImport = None
+
+
+class StartupTracer(object):
+    """
+    Records the durations of the startup phases of PrismCore and of the
+    plugin imports and writes them as a json report to the Prism user
+    folder.
+
+    with self.core.startupTracer.phase("name"):
+    """
+
+    def __init__(self, core, startTime=None):
+        self.core = core
+        self.startTime = startTime or time.time()
+        self.endTime = None
+        self.phases = []
+        self.plugins = []
+        self.depth = 0
+        self.maxImports = 50
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        phaseData = OrderedDict([
+            ("name", name),
+            ("start", time.time() - self.startTime),
+            ("duration", None),
+            ("depth", self.depth),
+        ])
+        self.phases.append(phaseData)
+        self.depth += 1
+        startTime = time.time()
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            phaseData["duration"] = time.time() - startTime
+
+    @err_catcher(name=__name__)
+    def addPhase(self, name, duration):
+        phaseData = OrderedDict([
+            ("name", name),
+            ("start", None),
+            ("duration", duration),
+            ("depth", self.depth),
+        ])
+        self.phases.append(phaseData)
+
+    @err_catcher(name=__name__)
+    def addPluginTiming(self, pluginName, importDuration, initDuration):
+        pluginData = OrderedDict([
+            ("name", pluginName),
+            ("import", importDuration),
+            ("init", initDuration),
+            ("duringStartup", self.endTime is None),
+        ])
+        self.plugins.append(pluginData)
+
+    @err_catcher(name=__name__)
+    def getImportTimings(self):
+        imports = sorted(importTimings.items(), key=lambda x: x[1][1], reverse=True)
+        return [
+            OrderedDict([("module", name), ("cumulative", data[0]), ("self", data[1])])
+            for name, data in imports[:self.maxImports]
+        ]
+
+    @err_catcher(name=__name__)
+    def getReport(self):
+        endTime = self.endTime or time.time()
+        report = OrderedDict([
+            ("version", getattr(self.core, "version", "")),
+            ("app", getattr(getattr(self.core, "appPlugin", None), "pluginName", "")),
+            ("python", sys.version.split()[0]),
+            ("platform", platform.system()),
+            ("date", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.startTime))),
+            ("total", endTime - self.startTime),
+            ("phases", self.phases),
+            ("plugins", self.plugins),
+            ("imports", self.getImportTimings()),
+        ])
+        return report
+
+    @err_catcher(name=__name__)
+    def getReportPath(self):
+        path = os.getenv("PRISM_STARTUP_REPORT")
+        if not path:
+            path = os.path.join(os.path.dirname(self.core.userini), "startup_report.json")
+
+        return path
+
+    @err_catcher(name=__name__)
+    def finish(self):
+        self.endTime = time.time()
+        report = self.getReport()
+        for phaseData in report["phases"]:
+            logger.debug(
+                "startup phase: %s%s: %.3fs"
+                % ("  " * phaseData["depth"], phaseData["name"], phaseData["duration"] or 0)
+            )
+
+        slowPlugins = sorted(self.plugins, key=lambda x: x["import"] + x["init"], reverse=True)
+        for pluginData in slowPlugins[:5]:
+            logger.debug(
+                "plugin %s: import %.3fs, init %.3fs"
+                % (pluginData["name"], pluginData["import"], pluginData["init"])
+            )
+
+        self.writeReport(report)
+        return report
+
+    @err_catcher(name=__name__)
+    def writeReport(self, report=None):
+        report = report or self.getReport()
+        path = self.getReportPath()
+        try:
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+
+            with open(path, "w") as f:
+                json.dump(report, f, indent=4)
+        except Exception as e:
+            logger.debug("failed to write startup report: %s" % e)
+            return
+
+        return path
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import os
+import time
+import hashlib
+import logging
+import threading
+
+try:
+    from PySide2.QtCore import *
+    from PySide2.QtGui import *
+    from PySide2.QtWidgets import *
+except:
+    from PySide.QtCore import *
+    from PySide.QtGui import *
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailCache(object):
+    """
+    Persistent cache of scaled down preview images.
+
+    Thumbnails are stored as jpgs in the user Prism folder. The filename is
+    a hash of the source path, mtime, size and the requested resolution, so
+    a changed source file never returns an outdated thumbnail. Reading a
+    thumbnail updates its mtime and the least recently used thumbnails are
+    removed, when the cache exceeds "maxSize".
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.maxSize = 1024 * 1024 * 1024
+        self.cleanupInterval = 100
+        self.writeCount = 0
+        self.lock = threading.Lock()
+        self.prefetchQueue = []
+        self.prefetchThread = None
+
+    @err_catcher(name=__name__)
+    def getCacheDir(self):
+        return os.path.join(os.path.dirname(self.core.userini), "Cache", "Thumbnails")
+
+    @err_catcher(name=__name__)
+    def getCachePath(self, path, width, height):
+        try:
+            fileStat = os.stat(path)
+        except OSError:
+            return
+
+        key = "%s|%s|%s|%sx%s" % (
+            os.path.normpath(path),
+            fileStat.st_mtime,
+            fileStat.st_size,
+            width,
+            height,
+        )
+        if not isinstance(key, bytes):
+            key = key.encode("utf-8")
+
+        key = hashlib.md5(key).hexdigest()
+        return os.path.join(self.getCacheDir(), key[:2], key + ".jpg")
+
+    @err_catcher(name=__name__)
+    def getPixmap(self, path, width, height):
+        cachePath = self.getCachePath(path, width, height)
+        if not cachePath:
+            return
+
+        pmap = QPixmap()
+        if QPixmapCache.find(cachePath, pmap):
+            return pmap
+
+        image = self.getImage(path, width, height, cachePath=cachePath)
+        if not image or image.isNull():
+            return
+
+        pmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(cachePath, pmap)
+        return pmap
+
+    @err_catcher(name=__name__)
+    def getImage(self, path, width, height, cachePath=None):
+        # QImage can be used outside of the GUI thread, which allows prefetching
+        cachePath = cachePath or self.getCachePath(path, width, height)
+        if not cachePath:
+            return
+
+        if os.path.exists(cachePath):
+            image = QImage(cachePath)
+            if not image.isNull():
+                try:
+                    os.utime(cachePath, None)
+                except OSError:
+                    pass
+
+                return image
+
+        image = self.core.media.getImageFromPath(path, width=width, height=height)
+        if not image or image.isNull():
+            return
+
+        if image.width() > width or image.height() > height:
+            image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        self.saveImage(image, cachePath)
+        return image
+
+    @err_catcher(name=__name__)
+    def saveImage(self, image, cachePath):
+        tmpPath = "%s.%s_%s.tmp" % (cachePath, os.getpid(), threading.current_thread().ident)
+        try:
+            if not os.path.exists(os.path.dirname(cachePath)):
+                os.makedirs(os.path.dirname(cachePath))
+
+            if not image.save(tmpPath, "JPG", 90):
+                return
+
+            if os.path.exists(cachePath):
+                os.remove(tmpPath)
+            else:
+                os.rename(tmpPath, cachePath)
+        except Exception as e:
+            logger.debug("failed to write thumbnail %s: %s" % (cachePath, e))
+            return
+
+        with self.lock:
+            self.writeCount += 1
+            cleanup = self.writeCount >= self.cleanupInterval
+            if cleanup:
+                self.writeCount = 0
+
+        if cleanup:
+            self.evict()
+
+    @err_catcher(name=__name__)
+    def evict(self):
+        cacheDir = self.getCacheDir()
+        thumbnails = []
+        totalSize = 0
+        for root, folders, files in os.walk(cacheDir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    fileStat = os.stat(path)
+                except OSError:
+                    continue
+
+                thumbnails.append([fileStat.st_mtime, fileStat.st_size, path])
+                totalSize += fileStat.st_size
+
+        if totalSize <= self.maxSize:
+            return
+
+        # remove more than necessary, so that eviction doesn't run on every write
+        targetSize = self.maxSize * 0.8
+        removed = 0
+        for mtime, size, path in sorted(thumbnails):
+            if totalSize <= targetSize:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            totalSize -= size
+            removed += 1
+
+        logger.debug("removed %s thumbnails from the cache" % removed)
+
+    @err_catcher(name=__name__)
+    def prefetch(self, paths, width, height):
+        with self.lock:
+            self.prefetchQueue = [[x, width, height] for x in paths]
+            if self.prefetchThread and self.prefetchThread.is_alive():
+                return
+
+            self.prefetchThread = threading.Thread(target=self.runPrefetch)
+            self.prefetchThread.daemon = True
+            self.prefetchThread.start()
+
+    @err_catcher(name=__name__)
+    def cancelPrefetch(self):
+        with self.lock:
+            self.prefetchQueue = []
+
+    def runPrefetch(self):
+        startTime = time.time()
+        count = 0
+        while True:
+            with self.lock:
+                if not self.prefetchQueue:
+                    self.prefetchThread = None
+                    break
+
+                path, width, height = self.prefetchQueue.pop(0)
+
+            try:
+                self.getImage(path, width, height)
+            except Exception as e:
+                logger.debug("failed to prefetch thumbnail for %s: %s" % (path, e))
+
+            count += 1
+
+        logger.debug("prefetched %s thumbnails in %.2fs" % (count, time.time() - startTime))
@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+import os
+import time
+import uuid
+import errno
+import logging
+import threading
+
+from PrismUtils.Decorators import err_catcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class Versions(object):
+    """
+    Caches the version tables of scenefile and output folders.
+
+    A table is rebuilt only when the mtime of its folder changes, so
+    querying the latest or next version of a folder costs a single stat.
+    Versions can be reserved with a marker file, which is created with
+    O_EXCL, so two processes can't allocate the same version.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.scenefileTables = {}
+        self.taskTables = {}
+        self.lock = threading.Lock()
+        self.reservationPrefix = ".reserved_"
+        self.expiredPrefix = ".expired_"
+
+        # folders, which were modified very recently, aren't cached, because
+        # a second change in the same mtime interval wouldn't be detected
+        self.settleTime = 2
+
+        # reservations are ignored after this time in seconds, in case the
+        # process, which reserved the version, didn't create it
+        self.reservationTimeout = 600
+
+    @err_catcher(name=__name__)
+    def clearCache(self):
+        with self.lock:
+            self.scenefileTables = {}
+            self.taskTables = {}
+
+    @err_catcher(name=__name__)
+    def getFolderMtime(self, folder):
+        try:
+            return os.stat(folder).st_mtime
+        except OSError:
+            return None
+
+    @err_catcher(name=__name__)
+    def getCachedTable(self, cache, folder, buildFunction):
+        folder = os.path.normpath(folder)
+        mtime = self.getFolderMtime(folder)
+        if mtime is None:
+            return buildFunction(folder, [])
+
+        with self.lock:
+            cached = cache.get(folder)
+
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            entries = list(os.listdir(folder))
+        except OSError:
+            entries = []
+
+        table = buildFunction(folder, entries)
+        if (time.time() - mtime) > self.settleTime:
+            with self.lock:
+                cache[folder] = [mtime, table]
+
+        return table
+
+    @err_catcher(name=__name__)
+    def getReservations(self, folder, entries):
+        """
+        Returns a dict of the reserved version numbers and the timestamps of
+        their reservations.
+        """
+        reservations = {}
+        for entry in entries:
+            if not entry.startswith(self.reservationPrefix):
+                continue
+
+            versionName = entry.split(self.core.filenameSeparator)[-1]
+            try:
+                version = int("".join([c for c in versionName if c.isdigit()]))
+            except ValueError:
+                continue
+
+            path = os.path.join(folder, entry)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+
+            if (time.time() - mtime) > self.reservationTimeout:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+                continue
+
+            reservations[version] = mtime
+
+        return reservations
+
+    @err_catcher(name=__name__)
+    def getReservedVersion(self, reservations):
+        highVersion = 0
+        now = time.time()
+        for version in reservations:
+            if (now - reservations[version]) > self.reservationTimeout:
+                continue
+
+            highVersion = max(highVersion, version)
+
+        return highVersion
+
+    @err_catcher(name=__name__)
+    def removeFulfilledReservations(self, folder, reservations, highVersion, key=None):
+        """
+        Removes the markers of reserved versions, which exist by now.
+        """
+        for version in list(reservations):
+            if version <= highVersion:
+                self.releaseVersion(folder, version, key=key)
+                reservations.pop(version)
+
+    @err_catcher(name=__name__)
+    def buildScenefileTable(self, folder, entries):
+        """
+        Returns the highest version and its path per scene type and extension
+        and the reservations of the folder.
+        """
+        table = {"versions": {}, "reservations": {}}
+        for entry in entries:
+            if entry.startswith((self.reservationPrefix, self.expiredPrefix)):
+                continue
+
+            path = os.path.join(folder, entry)
+            if not os.path.isfile(path):
+                continue
+
+            data = self.core.getScenefileData(path)
+            try:
+                version = int(data["version"][-self.core.versionPadding:])
+            except Exception:
+                continue
+
+            key = (data["entity"], os.path.splitext(entry)[1])
+            if version > table["versions"].get(key, [0])[0]:
+                table["versions"][key] = [version, path]
+
+        for sceneType in ["asset", "shot"]:
+            reservations = self.getReservations(folder, [
+                e for e in entries if e.startswith(self.reservationPrefix + sceneType)
+            ])
+            existing = [
+                table["versions"][key][0] for key in table["versions"] if key[0] == sceneType
+            ]
+            self.removeFulfilledReservations(folder, reservations, max(existing or [0]), key=sceneType)
+            table["reservations"][sceneType] = reservations
+
+        return table
+
+    @err_catcher(name=__name__)
+    def getScenefileTable(self, folder):
+        return self.getCachedTable(self.scenefileTables, folder, self.buildScenefileTable)
+
+    @err_catcher(name=__name__)
+    def getHighestScenefileVersion(self, folders, scenetype, fileTypes="*"):
+        """
+        Returns [version, path] of the highest existing scenefile version.
+        """
+        highversion = [0, ""]
+        for folder in folders:
+            table = self.getScenefileTable(folder)
+            for key in table["versions"]:
+                entity, ext = key
+                if entity != scenetype.lower():
+                    continue
+
+                if fileTypes != "*" and ext not in fileTypes:
+                    continue
+
+                if table["versions"][key][0] > highversion[0]:
+                    highversion = table["versions"][key]
+
+        return list(highversion)
+
+    @err_catcher(name=__name__)
+    def getNextScenefileVersion(self, folders, scenetype, fileTypes="*"):
+        highVersion = self.getHighestScenefileVersion(folders, scenetype, fileTypes=fileTypes)[0]
+        for folder in folders:
+            table = self.getScenefileTable(folder)
+            reservations = table["reservations"].get(scenetype.lower(), {})
+            highVersion = max(highVersion, self.getReservedVersion(reservations))
+
+        return highVersion + 1
+
+    @err_catcher(name=__name__)
+    def isEmptyVersionFolder(self, path):
+        try:
+            files = os.listdir(path)
+        except OSError:
+            return True
+
+        return not files or (len(files) == 1 and files[0].startswith("versioninfo"))
+
+    @err_catcher(name=__name__)
+    def buildTaskTable(self, folder, entries):
+        """
+        Returns the version numbers of the version folders in a task folder.
+        Version folders, which are empty, are stored separately with their
+        mtime, because adding files to them doesn't change the mtime of the
+        task folder.
+        """
+        table = {"versions": {}, "empty": {}, "reservations": {}}
+        for entry in entries:
+            if entry.startswith((self.reservationPrefix, self.expiredPrefix)):
+                continue
+
+            fname = entry.split(self.core.filenameSeparator)
+            if len(fname) not in [1, 2, 3]:
+                continue
+
+            try:
+                version = int(fname[0][1:(1+self.core.versionPadding)])
+            except Exception:
+                continue
+
+            path = os.path.join(folder, entry)
+            if not os.path.isdir(path):
+                continue
+
+            if self.isEmptyVersionFolder(path):
+                table["empty"][path] = [version, self.getFolderMtime(path)]
+            else:
+                table["versions"][version] = entry
+
+        table["reservations"] = self.getReservations(folder, entries)
+        existing = list(table["versions"]) + [data[0] for data in table["empty"].values()]
+        self.removeFulfilledReservations(folder, table["reservations"], max(existing or [0]))
+        return table
+
+    @err_catcher(name=__name__)
+    def getTaskTable(self, folder):
+        table = self.getCachedTable(self.taskTables, folder, self.buildTaskTable)
+        for path in list(table["empty"]):
+            version, mtime = table["empty"][path]
+            if self.getFolderMtime(path) == mtime:
+                continue
+
+            with self.lock:
+                if self.isEmptyVersionFolder(path):
+                    table["empty"][path] = [version, self.getFolderMtime(path)]
+                else:
+                    table["empty"].pop(path, None)
+                    table["versions"][version] = os.path.basename(path)
+
+        return table
+
+    @err_catcher(name=__name__)
+    def getHighestTaskVersion(self, folders, ignoreEmpty=False):
+        highVersion = 0
+        for folder in folders:
+            table = self.getTaskTable(folder)
+            versions = list(table["versions"])
+            if not ignoreEmpty:
+                versions += [data[0] for data in table["empty"].values()]
+
+            if versions:
+                highVersion = max(highVersion, max(versions))
+
+        return highVersion
+
+    @err_catcher(name=__name__)
+    def getNextTaskVersion(self, folders, ignoreEmpty=False):
+        highVersion = self.getHighestTaskVersion(folders, ignoreEmpty=ignoreEmpty)
+        for folder in folders:
+            reservations = self.getTaskTable(folder)["reservations"]
+            highVersion = max(highVersion, self.getReservedVersion(reservations))
+
+        return highVersion + 1
+
+    @err_catcher(name=__name__)
+    def reserveVersion(self, folder, version, key=None):
+        """
+        Creates the reservation marker of a version in "folder".
+        Returns False, if the version is already reserved.
+        """
+        name = self.reservationPrefix
+        if key:
+            name += key + self.core.filenameSeparator
+
+        name += self.core.versionFormat % version
+        path = os.path.join(folder, name)
+        if not os.path.exists(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                pass
+
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+                if not self.removeExpiredReservation(path):
+                    return False
+            else:
+                break
+
+        try:
+            os.write(fd, ("%s\n" % self.core.user).encode("utf-8"))
+        finally:
+            os.close(fd)
+
+        logger.debug("reserved version %s in %s" % (version, folder))
+        return True
+
+    @err_catcher(name=__name__)
+    def removeExpiredReservation(self, path):
+        """
+        Removes the marker at "path", if it is expired. The marker is renamed
+        to a unique name first, so only one process can remove it. Returns
+        False, if the marker is still valid.
+        """
+        try:
+            if (time.time() - os.stat(path).st_mtime) <= self.reservationTimeout:
+                return False
+        except OSError:
+            return True
+
+        expiredPath = os.path.join(os.path.dirname(path), self.expiredPrefix + uuid.uuid4().hex)
+        try:
+            os.rename(path, expiredPath)
+        except OSError:
+            # another process removed the marker already
+            return True
+
+        try:
+            expired = (time.time() - os.stat(expiredPath).st_mtime) > self.reservationTimeout
+            if not expired:
+                # another process took the marker over in the meantime
+                try:
+                    if hasattr(os, "link"):
+                        os.link(expiredPath, path)
+                    else:
+                        os.rename(expiredPath, path)
+                except OSError:
+                    pass
+        finally:
+            if os.path.exists(expiredPath):
+                os.remove(expiredPath)
+
+        return expired
+
+    @err_catcher(name=__name__)
+    def reserveNextScenefileVersion(self, folders, scenetype, fileTypes="*"):
+        """
+        Reserves and returns the next scenefile version number. The marker is
+        created in the first folder, which has to be the global folder.
+        """
+        version = self.getNextScenefileVersion(folders, scenetype, fileTypes=fileTypes)
+        while not self.reserveVersion(folders[0], version, key=scenetype.lower()):
+            version += 1
+
+        return version
+
+    @err_catcher(name=__name__)
+    def reserveNextTaskVersion(self, folders, ignoreEmpty=False):
+        version = self.getNextTaskVersion(folders, ignoreEmpty=ignoreEmpty)
+        while not self.reserveVersion(folders[0], version):
+            version += 1
+
+        return version
+
+    @err_catcher(name=__name__)
+    def releaseVersion(self, folder, version, key=None):
+        name = self.reservationPrefix
+        if key:
+            name += key + self.core.filenameSeparator
+
+        path = os.path.join(folder, name + self.core.versionFormat % version)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -33,8 +33,7 @@
 
 import os
 import time
-import platform
-import subprocess
+import logging
 
 try:
     from PySide2.QtCore import *
@@ -56,6 +55,9 @@ else:
 from PrismUtils.Decorators import err_catcher
 
 
+logger = logging.getLogger(__name__)
+
+
 class CombineMedia(QDialog, CombineMedia_ui.Ui_dlg_CombineMedia):
     def __init__(self, core, ctype):
         QDialog.__init__(self)
@@ -133,30 +135,12 @@ class CombineMedia(QDialog, CombineMedia_ui.Ui_dlg_CombineMedia):
                 )
                 return
 
-        ffmpegIsInstalled = False
-        if platform.system() == "Windows":
-            ffmpegPath = os.path.join(
-                self.core.prismLibs, "Tools", "FFmpeg", "bin", "ffmpeg.exe"
-            )
-            if os.path.exists(ffmpegPath):
-                ffmpegIsInstalled = True
-        elif platform.system() == "Linux":
-            ffmpegPath = "ffmpeg"
-            try:
-                subprocess.Popen([ffmpegPath])
-                ffmpegIsInstalled = True
-            except:
-                pass
-        elif platform.system() == "Darwin":
-            ffmpegPath = os.path.join(self.core.prismLibs, "Tools", "ffmpeg")
-            if os.path.exists(ffmpegPath):
-                ffmpegIsInstalled = True
-
-        if not ffmpegIsInstalled:
+        ffmpegPath = self.core.media.getFFmpeg(validate=True)
+        if not ffmpegPath:
             QMessageBox.critical(
                 self.core.messageParent,
                 "Video combine",
-                "Could not find %s" % ffmpegPath,
+                "Could not find %s" % self.core.media.getFFmpeg(),
             )
             return
 
@@ -168,171 +152,37 @@ class CombineMedia(QDialog, CombineMedia_ui.Ui_dlg_CombineMedia):
         if self.ctype in ["layout", "sequence"]:
             cStates = reversed(cStates)
 
-        tmpFiles = []
-        sources = []
-        combineInputs = []
-        tw = th = 0
-        stdout = ""
-        stderr = ""
-
-        for i in cStates:
-            if os.path.isfile(i):
-                inputpath = i
-            else:
-                inputpath = self.core.pb.getImgSources(i, getFirstFile=True)
-                if len(inputpath) == 0:
-                    continue
-
-                inputpath = inputpath[0]
-
-            iw, ih = self.core.pb.getMediaResolution(inputpath)
-            if iw == "?" or ih == "?":
-                continue
-
-            if iw > tw:
-                tw = iw
-            if ih > th:
-                th = ih
-
-            inputExt = os.path.splitext(inputpath)[1]
-
-            isSequence = not inputExt in [".mp4", ".mov"]
-
-            if isSequence:
-                outputpath = os.path.splitext(inputpath)[0][:-(self.core.framePadding+1)] + ".mp4"
-                if not os.path.exists(os.path.dirname(outputpath)):
-                    os.makedirs(os.path.dirname(outputpath))
-
-                startNum = os.path.splitext(inputpath)[0][-self.core.framePadding:]
-                inputpath = os.path.splitext(inputpath)[0][:-self.core.framePadding] + "%04d".replace("4", str(self.core.framePadding)) + inputExt
-                nProc = subprocess.Popen(
-                    [
-                        ffmpegPath,
-                        "-start_number",
-                        startNum,
-                        "-framerate",
-                        "24",
-                        "-apply_trc",
-                        "iec61966_2_1",
-                        "-i",
-                        inputpath,
-                        "-pix_fmt",
-                        "yuva420p",
-                        "-start_number",
-                        startNum,
-                        outputpath,
-                        "-y",
-                    ],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                )
-                result = nProc.communicate()
-                stdout += str(result[0])
-                stderr += str(result[1])
-                if not os.path.exists(outputpath) or os.stat(outputpath).st_size == 0:
-                    continue
-
-                tmpFiles.append(outputpath)
-                inputpath = outputpath
-
-            sources.append([inputpath, iw, ih])
-
-        for i in sources:
-            inputpath = i[0]
-
-            outputpath = os.path.splitext(inputpath)[0] + "_converted.mp4"
-            outputpathts = os.path.splitext(inputpath)[0] + "_converted.ts"
-
-            iw = i[1]
-            ih = i[2]
-
-            newW = iw * min(tw / iw, th / ih)
-            newH = ih * min(tw / iw, th / ih)
-
-            pad = "%s:%s:%s:%s" % (
-                tw,
-                th,
-                (tw - iw * min(tw / iw, th / ih)) / 2,
-                (th - ih * min(tw / iw, th / ih)) / 2,
-            )
-
-            nProc = subprocess.Popen(
-                [
-                    ffmpegPath,
-                    "-i",
-                    inputpath,
-                    "-pix_fmt",
-                    "yuv420p",
-                    "-vf",
-                    "scale=%s:%s, pad=%s" % (newW, newH, pad),
-                    outputpath,
-                    "-y",
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            result = nProc.communicate()
-            stdout += str(result[0])
-            stderr += str(result[1])
-            nProc = subprocess.Popen(
-                [
-                    ffmpegPath,
-                    "-i",
-                    outputpath,
-                    "-pix_fmt",
-                    "yuv420p",
-                    "-c",
-                    "copy",
-                    "-bsf:v",
-                    "h264_mp4toannexb",
-                    outputpathts,
-                    "-y",
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            result = nProc.communicate()
-            stdout += str(result[0])
-            stderr += str(result[1])
-
-            tmpFiles.append(outputpath)
-            tmpFiles.append(outputpathts)
-
-            if os.path.exists(outputpathts):
-                combineInputs.append(outputpathts)
+        startTime = time.time()
+        sources = self.getSources(cStates)
+        prepareDuration = time.time() - startTime
 
+        result = {"output": None, "stdout": "", "stderr": "", "timings": {}}
         if self.ctype == "sequence":
-            args = [ffmpegPath]
-            filterStr = ""
-            for idx, i in enumerate(combineInputs):
-                args += ["-i", i]
-                filterStr += "[%s:0]" % idx
-            args += ["-filter_complex"]
-            filterStr += "concat=n=%s:v=1:a=0 [v]" % len(combineInputs)
-            args += [filterStr, "-map", "[v]", "-pix_fmt", "yuv420p", output, "-y"]
-            nProc = subprocess.call(args)
+            result = self.core.media.combineMedia(sources, output, ffmpegPath=ffmpegPath)
         # 	elif self.ctype == "layout":
         # 	elif self.ctype == "stack":
         # 	elif self.ctype == "stackDif":
 
+        logger.debug(
+            "combine timings: prepare sources %.2fs, %s"
+            % (prepareDuration, ", ".join(["%s %.2fs" % (k, v) for k, v in result["timings"].items()]))
+        )
+
         if self.chb_task.isChecked() and self.e_task.text() != "":
             versionBase = os.path.join(
                 self.core.pb.renderBasePath, "Rendering", "external", self.e_task.text()
             )
-            newVersion = self.core.getHighestTaskVersion(versionBase)
-            self.core.pb.createExternalTask(
-                data={
-                    "taskName": self.e_task.text(),
-                    "versionName": newVersion,
-                    "targetPath": output,
-                }
-            )
-
-        for k in tmpFiles:
+            newVersion = self.core.getHighestTaskVersion(versionBase, reserve=True)
             try:
-                os.remove(k)
-            except:
-                pass
+                self.core.pb.createExternalTask(
+                    data={
+                        "taskName": self.e_task.text(),
+                        "versionName": newVersion,
+                        "targetPath": output,
+                    }
+                )
+            finally:
+                self.core.entities.releaseTaskVersion(versionBase, newVersion)
 
         if os.path.exists(output):
             self.core.copyToClipboard(output)
@@ -343,9 +193,33 @@ class CombineMedia(QDialog, CombineMedia_ui.Ui_dlg_CombineMedia):
             )
         else:
             self.core.ffmpegError(
-                "Media combine", "The video could not be created.", [stdout, stderr]
+                "Media combine",
+                "The video could not be created.",
+                [result["stdout"], result["stderr"]],
             )
 
+    @err_catcher(name=__name__)
+    def getSources(self, cStates):
+        sources = []
+        for i in cStates:
+            if os.path.isfile(i):
+                inputpath = i
+            else:
+                inputpath = self.core.pb.getImgSources(i, getFirstFile=True)
+                if len(inputpath) == 0:
+                    continue
+
+                inputpath = inputpath[0]
+
+            iw, ih = self.core.pb.getMediaResolution(inputpath)
+            if iw == "?" or ih == "?":
+                continue
+
+            # image sequences are read by ffmpeg directly
+            sources.append(self.core.media.getCombineSource(inputpath, iw, ih))
+
+        return sources
+
     @err_catcher(name=__name__)
     def browseCombineOutputFile(self):
         path = QFileDialog.getSaveFileName(
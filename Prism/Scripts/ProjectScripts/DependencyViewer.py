@@ -33,7 +33,6 @@
 
 import os
 import sys
-import datetime
 
 try:
     from PySide2.QtCore import *
@@ -93,7 +92,11 @@ class DependencyViewer(QDialog, DependencyViewer_ui.Ui_dlg_DependencyViewer):
             self.tw_dependencies.header().setSectionResizeMode(1, QHeaderView.Fixed)
 
         self.dependencies = {}
+        self.depData = {}
+        self.shownVersions = {}
+        self.graphLoaded = False
         self.depRoot = depRoot
+        self.taskLoader = self.core.getTaskLoader(parent=self)
 
         self.connectEvents()
         self.updateDependencies("0", depRoot)
@@ -118,6 +121,8 @@ class DependencyViewer(QDialog, DependencyViewer_ui.Ui_dlg_DependencyViewer):
         self.tw_dependencies.customContextMenuRequested.connect(
             lambda x: self.rclList("deps", x)
         )
+        self.tw_dependencies.itemExpanded.connect(self.onItemExpanded)
+        self.finished.connect(self.onFinished)
 
     @err_catcher(name=__name__)
     def mouseClickEvent(self, event, uielement):
@@ -160,132 +165,167 @@ class DependencyViewer(QDialog, DependencyViewer_ui.Ui_dlg_DependencyViewer):
 
         rcmenu.exec_(QCursor.pos())
 
+    @err_catcher(name=__name__)
+    def onFinished(self, result=None):
+        self.taskLoader.cancel()
+        self.core.dependencies.save()
+
     @err_catcher(name=__name__)
     def updateDependencies(self, depID, versionInfo):
-        source = self.core.getConfig(
-            cat="information", param="source scene", configPath=versionInfo
+        if depID == "0":
+            self.depData["0"] = {
+                "versionInfo": versionInfo,
+                "loaded": False,
+                "ancestors": [os.path.normpath(versionInfo)],
+            }
+
+        self.loadDependencies(depID)
+
+    @err_catcher(name=__name__)
+    def loadDependencies(self, depID):
+        data = self.depData[depID]
+        if data["loaded"] or self.taskLoader.isLoading(depID):
+            return
+
+        # versioninfo files are read on a background thread and only the
+        # expanded items get loaded
+        self.taskLoader.load(
+            depID,
+            self.core.dependencies.getDependencyEntries,
+            lambda x, d=depID: self.onDependenciesLoaded(d, x),
+            args=[data["versionInfo"]],
         )
-        deps = self.core.getConfig(
-            cat="information", param="Dependencies", configPath=versionInfo
-        ) or []
-        extFiles = self.core.getConfig(
-            cat="information", param="External files", configPath=versionInfo
-        ) or []
 
-        if source is not None:
-            deps.append(source)
+    @err_catcher(name=__name__)
+    def onItemExpanded(self, item):
+        depID = item.data(0, Qt.UserRole)
+        if depID in self.depData:
+            self.loadDependencies(depID)
 
+    @err_catcher(name=__name__)
+    def onDependenciesLoaded(self, depID, entries):
+        data = self.depData[depID]
+        if data["loaded"]:
+            return
+
+        data["loaded"] = True
         if depID == "0":
             depItem = self.tw_dependencies.invisibleRootItem()
         else:
             depItem = self.dependencies[depID][1]
+            depItem.takeChildren()
 
-        for i in deps:
+        ancestors = data["ancestors"]
+        for entry in entries:
             if pVersion == 2:
                 existText = unicode("█", "utf-8")
             else:
                 existText = "█"
 
-            depPath = i
-
-            if not os.path.exists(i):
-                depDir = os.path.dirname(i)
-                if os.path.exists(depDir) and len(os.listdir(depDir)) > 0:
-                    depPath = depDir
-
-            if os.path.exists(depPath):
-                cdate = datetime.datetime.fromtimestamp(os.path.getmtime(depPath))
-                cdate = cdate.replace(microsecond=0)
-                date = cdate.strftime("%d.%m.%y,  %X")
-                existColor = QColor(0, 255, 0)
-            else:
-                date = ""
-                existColor = QColor(255, 0, 0)
-
-            if i == source:
-                dType = "Source Scene"
-            else:
-                dType = "Export"
-
+            depPath = entry["path"]
             item = QTreeWidgetItem(
-                [os.path.basename(i), existText, dType, date, i.replace("\\", "/")]
+                [
+                    os.path.basename(depPath),
+                    existText,
+                    entry["type"],
+                    entry["date"],
+                    depPath.replace("\\", "/"),
+                ]
             )
 
-            item.setForeground(1, existColor)
+            if entry["exists"]:
+                item.setForeground(1, QColor(0, 255, 0))
+            else:
+                item.setForeground(1, QColor(255, 0, 0))
 
             depItem.addChild(item)
             curID = str(len(self.dependencies) + 1)
+            self.dependencies[curID] = [depPath, item, depID]
+            item.setData(0, Qt.UserRole, curID)
 
-            self.dependencies[curID] = [i, item, depID]
+            if entry["type"] == "File":
+                continue
 
             iFont = item.font(0)
             iFont.setBold(True)
             item.setFont(0, iFont)
 
-            depInfo = os.path.join(os.path.dirname(i), "versioninfo.yml")
-            self.core.configs.findDeprecatedConfig(depInfo)
-            if not os.path.exists(depInfo):
-                depInfo = os.path.join(
-                    os.path.dirname(os.path.dirname(i)), "versioninfo.yml"
-                )
-                self.core.configs.findDeprecatedConfig(depInfo)
-
-            if os.path.exists(depInfo):
-                self.updateDependencies(curID, depInfo)
+            if not entry["versionInfo"]:
+                continue
 
-        for i in extFiles:
-            if i in deps:
+            infoKey = os.path.normpath(entry["versionInfo"])
+            if infoKey in ancestors:
+                item.setText(2, entry["type"] + " (cycle)")
+                item.setToolTip(0, "This version depends on itself. The dependencies are shown above.")
                 continue
 
-            if pVersion == 2:
-                existText = unicode("█", "utf-8")
+            if infoKey in self.shownVersions:
+                iFont.setItalic(True)
+                item.setFont(0, iFont)
+                item.setToolTip(0, "This version is also used by:\n%s" % self.shownVersions[infoKey])
             else:
-                existText = "█"
+                self.shownVersions[infoKey] = self.dependencies.get(depID, [self.l_root.text()])[0]
 
-            if os.path.exists(i):
-                cdate = datetime.datetime.fromtimestamp(os.path.getmtime(i))
-                cdate = cdate.replace(microsecond=0)
-                date = cdate.strftime("%d.%m.%y,  %X")
-                existColor = QColor(0, 255, 0)
-            else:
-                date = ""
-                existColor = QColor(255, 0, 0)
+            self.depData[curID] = {
+                "versionInfo": entry["versionInfo"],
+                "loaded": False,
+                "ancestors": ancestors + [infoKey],
+            }
+            item.addChild(QTreeWidgetItem(["Loading..."]))
 
-            item = QTreeWidgetItem(
-                [os.path.basename(i), existText, "File", date, i.replace("\\", "/")]
-            )
-
-            item.setForeground(1, existColor)
-
-            depItem.addChild(item)
+    @err_catcher(name=__name__)
+    def filterDeps(self, filterStr):
+        if not filterStr or self.graphLoaded:
+            self.applyFilter()
+            return
 
-            curID = str(len(self.dependencies) + 1)
-            self.dependencies[curID] = [i, item, depID]
+        # filtering needs all items, which are loaded at once from the index
+        self.taskLoader.load(
+            "graph",
+            self.core.dependencies.getDependencyGraph,
+            self.onGraphLoaded,
+            args=[self.depRoot],
+        )
 
     @err_catcher(name=__name__)
-    def filterDeps(self, filterStr):
-        self.clearItem(self.tw_dependencies.invisibleRootItem())
+    def onGraphLoaded(self, graph):
+        self.graphLoaded = True
+        while True:
+            pending = [
+                depID
+                for depID, data in self.depData.items()
+                if not data["loaded"] and os.path.normpath(data["versionInfo"]) in graph
+            ]
+            if not pending:
+                break
+
+            for depID in pending:
+                self.taskLoader.cancel(depID)
+                entries = graph[os.path.normpath(self.depData[depID]["versionInfo"])]
+                self.onDependenciesLoaded(depID, entries)
+
+        self.applyFilter()
 
-        if filterStr == "":
-            self.dependencies = {}
-            self.updateDependencies("0", self.depRoot)
-        else:
-            for i in self.dependencies:
-                if filterStr.lower() in self.dependencies[i][0].lower():
-                    depID = i
-                    while depID != "0":
-                        parID = self.dependencies[depID][2]
-                        if parID == "0":
-                            self.tw_dependencies.invisibleRootItem().addChild(
-                                self.dependencies[depID][1]
-                            )
-                        else:
-                            self.dependencies[parID][1].addChild(
-                                self.dependencies[depID][1]
-                            )
-                        depID = parID
+    @err_catcher(name=__name__)
+    def applyFilter(self):
+        filterStr = self.e_search.text().lower()
+        root = self.tw_dependencies.invisibleRootItem()
+        for idx in range(root.childCount()):
+            self.filterItem(root.child(idx), filterStr)
 
-            self.tw_dependencies.expandAll()
+    @err_catcher(name=__name__)
+    def filterItem(self, item, filterStr):
+        childVisible = False
+        for idx in range(item.childCount()):
+            if self.filterItem(item.child(idx), filterStr):
+                childVisible = True
+
+        visible = childVisible or filterStr in (item.text(4) or "").lower()
+        item.setHidden(not visible)
+        if filterStr:
+            item.setExpanded(childVisible)
+
+        return visible
 
     @err_catcher(name=__name__)
     def clearItem(self, item):
@@ -125,60 +125,12 @@ class EditShot(QDialog, EditShot_ui.Ui_dlg_EditShot):
 
         if imgPath != "":
             if os.path.splitext(imgPath)[1] == ".exr":
-                qimg = QImage(
-                    self.core.pb.shotPrvXres,
-                    self.core.pb.shotPrvYres,
-                    QImage.Format_RGB16,
-                )
-
                 if self.oiio:
-                    imgSrc = self.oiio.ImageBuf(str(imgPath))
-                    rgbImgSrc = self.oiio.ImageBuf()
-                    self.oiio.ImageBufAlgo.channels(rgbImgSrc, imgSrc, (0, 1, 2))
-                    imgWidth = rgbImgSrc.spec().full_width
-                    imgHeight = rgbImgSrc.spec().full_height
-                    xOffset = 0
-                    yOffset = 0
-                    if (imgWidth / float(imgHeight)) > 1.7778:
-                        newImgWidth = self.core.pb.shotPrvXres
-                        newImgHeight = (
-                            self.core.pb.shotPrvXres / float(imgWidth) * imgHeight
-                        )
-                    else:
-                        newImgHeight = self.core.pb.shotPrvYres
-                        newImgWidth = (
-                            self.core.pb.shotPrvYres / float(imgHeight) * imgWidth
-                        )
-                    imgDst = self.oiio.ImageBuf(
-                        self.oiio.ImageSpec(
-                            int(newImgWidth), int(newImgHeight), 3, self.oiio.UINT8
-                        )
-                    )
-                    self.oiio.ImageBufAlgo.resample(imgDst, rgbImgSrc)
-                    sRGBimg = self.oiio.ImageBuf()
-                    self.oiio.ImageBufAlgo.pow(
-                        sRGBimg, imgDst, (1.0 / 2.2, 1.0 / 2.2, 1.0 / 2.2)
-                    )
-                    bckImg = self.oiio.ImageBuf(
-                        self.oiio.ImageSpec(
-                            int(newImgWidth), int(newImgHeight), 3, self.oiio.UINT8
-                        )
-                    )
-                    self.oiio.ImageBufAlgo.fill(bckImg, (0.5, 0.5, 0.5))
-                    self.oiio.ImageBufAlgo.paste(bckImg, xOffset, yOffset, 0, 0, sRGBimg)
-                    qimg = QImage(
-                        int(newImgWidth), int(newImgHeight), QImage.Format_RGB16
+                    pmsmall = self.core.media.getPixmapFromExrPath(
+                        imgPath,
+                        width=self.core.pb.shotPrvXres,
+                        height=self.core.pb.shotPrvYres,
                     )
-                    for i in range(int(newImgWidth)):
-                        for k in range(int(newImgHeight)):
-                            rgb = qRgb(
-                                bckImg.getpixel(i, k)[0] * 255,
-                                bckImg.getpixel(i, k)[1] * 255,
-                                bckImg.getpixel(i, k)[2] * 255,
-                            )
-                            qimg.setPixel(i, k, rgb)
-
-                    pmsmall = QPixmap.fromImage(qimg)
                 else:
                     QMessageBox.critical(
                         self.core.messageParent,
@@ -321,7 +273,7 @@ class EditShot(QDialog, EditShot_ui.Ui_dlg_EditShot):
             self.core.media.savePixmap(self.pmap, prvPath)
 
         for i in self.core.prjManagers.values():
-            i.editShot_closed(self, self.shotName)
+            self.core.callbacks.getPluginCallback(i, "editShot_closed")(self, self.shotName)
 
         return True
 
@@ -372,7 +324,7 @@ class EditShot(QDialog, EditShot_ui.Ui_dlg_EditShot):
         self.l_shotPreview.setPixmap(pmap)
 
         for i in self.core.prjManagers.values():
-            i.editShot_open(self, self.shotName)
+            self.core.callbacks.getPluginCallback(i, "editShot_open")(self, self.shotName)
 
     @err_catcher(name=__name__)
     def keyPressEvent(self, event):
@@ -32,6 +32,7 @@
 
 
 import os
+import re
 import sys
 import datetime
 import shutil
@@ -189,8 +190,15 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
 
         self.renderResX = 300
         self.renderResY = 169
+        # decoded preview frames are kept for scrubbing, image sequences are
+        # prefetched in a window ahead of the current frame
+        self.maxCachedFrames = 50
+        self.prefetchWindow = 30
 
         self.renderRefreshEnabled = True
+        self.taskLoader = self.core.getTaskLoader(parent=self)
+        # conversions are awaited separately, so that blocking refreshes don't wait for ffmpeg
+        self.conversionLoader = self.core.getTaskLoader(parent=self, maxThreads=8)
         self.compareStates = []
         self.mediaPlaybacks = {
             "shots": {
@@ -593,7 +601,8 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             self.menuRecentProjects.setEnabled(False)
 
         for i in self.core.prjManagers.values():
-            prjMngMenu = i.pbBrowser_getMenu(self)
+            getMenu = self.core.callbacks.getPluginCallback(i, "pbBrowser_getMenu")
+            prjMngMenu = getMenu(self)
             if prjMngMenu is not None:
                 self.menuTools.addSeparator()
                 self.menuTools.addMenu(prjMngMenu)
@@ -767,6 +776,9 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
 
     @err_catcher(name=__name__)
     def closeEvent(self, event):
+        self.taskLoader.cancel()
+        self.conversionLoader.cancel()
+        self.core.thumbnails.cancelPrefetch()
         tabOrder = []
         for i in range(self.tbw_browser.count()):
             tabOrder.append(self.tbw_browser.widget(i).property("tabType"))
@@ -1246,7 +1258,7 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             winheight = 10
             VBox = QVBoxLayout()
             if os.path.exists(prvPath):
-                imgmap = self.core.media.getPixmapFromPath(prvPath)
+                imgmap = self.core.thumbnails.getPixmap(prvPath, 500, 281) or QPixmap()
                 l_prv = QLabel()
                 l_prv.setPixmap(imgmap)
                 l_prv.setStyleSheet(
@@ -1395,7 +1407,8 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             rcmenu.addMenu(playMenu)
 
         for i in self.core.prjManagers.values():
-            pubAct = i.pbBrowser_getPublishMenu(self)
+            getPublishMenu = self.core.callbacks.getPluginCallback(i, "pbBrowser_getPublishMenu")
+            pubAct = getPublishMenu(self)
             if pubAct is not None:
                 rcmenu.addAction(pubAct)
 
@@ -2445,11 +2458,65 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
 
     @err_catcher(name=__name__)
     def refreshAFile(self, cur=None, prev=None):
+        if self.curAsset and self.curaStep and self.curaCat:
+            appfilter = []
+
+            for i in self.appFilters:
+                chbName = "chb_aShow%s" % self.appFilters[i]["shortName"]
+                if getattr(self, chbName).isChecked():
+                    appfilter += self.appFilters[i]["formats"]
+
+            self.setTablePlaceholder(self.tw_aFiles)
+            self.taskLoader.load(
+                "assetFiles",
+                self.core.entities.getScenefileRecords,
+                lambda x: self.fillScenefileTable(self.tw_aFiles, x, self.aBasePath),
+                kwargs={
+                    "asset": self.curAsset,
+                    "step": self.curaStep,
+                    "category": self.curaCat,
+                    "extensions": appfilter,
+                },
+            )
+        else:
+            self.taskLoader.cancel("assetFiles")
+            self.fillScenefileTable(self.tw_aFiles, [], self.aBasePath)
+
+    @err_catcher(name=__name__)
+    def setTablePlaceholder(self, tw, text="Loading..."):
+        model = tw.model()
+        if isinstance(model, QStandardItemModel) and model.columnCount():
+            labels = [model.horizontalHeaderItem(x).text() for x in range(model.columnCount())]
+        else:
+            labels = [
+                "",
+                self.tableColumnLabels["Version"],
+                self.tableColumnLabels["Comment"],
+                self.tableColumnLabels["Date"],
+                self.tableColumnLabels["User"],
+            ]
+
+        sortingEnabled = tw.isSortingEnabled()
+        tw.setSortingEnabled(False)
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(labels)
+        row = []
+        for idx in range(len(labels)):
+            item = QStandardItem(text if idx == 1 else "")
+            item.setFlags(Qt.NoItemFlags)
+            row.append(item)
+
+        model.appendRow(row)
+        tw.setModel(model)
+        tw.setSortingEnabled(sortingEnabled)
+
+    @err_catcher(name=__name__)
+    def fillScenefileTable(self, tw, records, basePath):
         twSorting = [
-            self.tw_aFiles.horizontalHeader().sortIndicatorSection(),
-            self.tw_aFiles.horizontalHeader().sortIndicatorOrder(),
+            tw.horizontalHeader().sortIndicatorSection(),
+            tw.horizontalHeader().sortIndicatorOrder(),
         ]
-        self.tw_aFiles.setSortingEnabled(False)
+        tw.setSortingEnabled(False)
 
         model = QStandardItemModel()
         model.setHorizontalHeaderLabels(
@@ -2462,90 +2529,77 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             ]
         )
         # example filename: Body_mod_Modelling_v0002_details-added_rfr_.max
+        # example filename: shot_0010_mod_main_v0002_details-added_rfr_.max
 
-        if self.curAsset and self.curaStep and self.curaCat:
-            appfilter = []
-
-            for i in self.appFilters:
-                chbName = "chb_aShow%s" % self.appFilters[i]["shortName"]
-                if getattr(self, chbName).isChecked():
-                    appfilter += self.appFilters[i]["formats"]
-
-            scenefiles = self.core.entities.getScenefiles(asset=self.curAsset, step=self.curaStep, category=self.curaCat, extensions=appfilter)
-
-            for i in scenefiles:
-                row = []
-                fname = self.core.getScenefileData(i)
-
-                publicFile = self.core.useLocalFiles and i.startswith(self.aBasePath)
-
-                if pVersion == 2:
-                    item = QStandardItem(unicode("█", "utf-8"))
-                else:
-                    item = QStandardItem("█")
-                item.setFont(QFont("SansSerif", 100))
-                item.setFlags(~Qt.ItemIsSelectable & ~Qt.ItemIsEnabled)
-                item.setData(i, Qt.UserRole)
-
-                colorVals = [128, 128, 128]
-                if fname["extension"] in self.core.appPlugin.sceneFormats:
-                    colorVals = self.core.appPlugin.appColor
-                else:
-                    for k in self.core.unloadedAppPlugins.values():
-                        if fname["extension"] in k.sceneFormats:
-                            colorVals = k.appColor
-
-                item.setForeground(QColor(colorVals[0], colorVals[1], colorVals[2]))
-
-                row.append(item)
-                item = QStandardItem(fname["version"])
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                row.append(item)
-                if fname["comment"] == "nocomment":
-                    item = QStandardItem("")
-                else:
-                    item = QStandardItem(fname["comment"])
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                row.append(QStandardItem(item))
-                cdate = self.core.getFileModificationDate(i)
-                item = QStandardItem(str(cdate))
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                item.setData(
-                    QDateTime.fromString(cdate, "dd.MM.yy,  hh:mm:ss").addYears(100), 0
-                )
-                #   item.setToolTip(cdate)
-                row.append(item)
-                item = QStandardItem(fname["user"])
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                row.append(item)
-
-                if publicFile:
-                    for k in row[1:]:
-                        iFont = k.font()
-                        iFont.setBold(True)
-                        k.setFont(iFont)
-                        k.setForeground(self.publicColor)
-
-                model.appendRow(row)
+        for record in records:
+            i = record["path"]
+            fname = record["data"]
+            row = []
+            publicFile = self.core.useLocalFiles and i.startswith(basePath)
 
-        self.tw_aFiles.setModel(model)
+            if pVersion == 2:
+                item = QStandardItem(unicode("█", "utf-8"))
+            else:
+                item = QStandardItem("█")
+            item.setFont(QFont("SansSerif", 100))
+            item.setFlags(~Qt.ItemIsSelectable & ~Qt.ItemIsEnabled)
+            item.setData(i, Qt.UserRole)
+
+            colorVals = [128, 128, 128]
+            if fname["extension"] in self.core.appPlugin.sceneFormats:
+                colorVals = self.core.appPlugin.appColor
+            else:
+                for k in self.core.unloadedAppPlugins.values():
+                    if fname["extension"] in k.sceneFormats:
+                        colorVals = k.appColor
+
+            item.setForeground(QColor(colorVals[0], colorVals[1], colorVals[2]))
+
+            row.append(item)
+            item = QStandardItem(fname["version"])
+            item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
+            row.append(item)
+            if fname["comment"] == "nocomment":
+                item = QStandardItem("")
+            else:
+                item = QStandardItem(fname["comment"])
+            item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
+            row.append(item)
+            item = QStandardItem()
+            item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
+            item.setData(QDateTime.fromMSecsSinceEpoch(int(record["mtime"]) * 1000), 0)
+            row.append(item)
+            item = QStandardItem(fname["user"])
+            item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
+            row.append(item)
+
+            if publicFile:
+                for k in row[1:]:
+                    iFont = k.font()
+                    iFont.setBold(True)
+                    k.setFont(iFont)
+                    k.setForeground(self.publicColor)
+
+            model.appendRow(row)
+
+        tw.setModel(model)
         if psVersion == 1:
-            self.tw_aFiles.horizontalHeader().setResizeMode(0, QHeaderView.Fixed)
-            self.tw_aFiles.horizontalHeader().setResizeMode(2, QHeaderView.Stretch)
+            tw.horizontalHeader().setResizeMode(0, QHeaderView.Fixed)
+            tw.horizontalHeader().setResizeMode(2, QHeaderView.Stretch)
         else:
-            self.tw_aFiles.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)
-            self.tw_aFiles.horizontalHeader().setSectionResizeMode(
+            tw.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)
+            tw.horizontalHeader().setSectionResizeMode(
                 2, QHeaderView.Stretch
             )
 
-        self.tw_aFiles.resizeColumnsToContents()
-        self.tw_aFiles.horizontalHeader().setMinimumSectionSize(10)
-        self.tw_aFiles.setColumnWidth(0, 10 * self.core.uiScaleFactor)
-        self.tw_aFiles.setColumnWidth(1, 100 * self.core.uiScaleFactor)
-        self.tw_aFiles.setColumnWidth(3, 200 * self.core.uiScaleFactor)
-        self.tw_aFiles.setColumnWidth(4, 100 * self.core.uiScaleFactor)
-        self.tw_aFiles.sortByColumn(twSorting[0], twSorting[1])
-        self.tw_aFiles.setSortingEnabled(True)
+        tw.resizeColumnsToContents()
+        tw.horizontalHeader().setMinimumSectionSize(10)
+        tw.setColumnWidth(0, 10 * self.core.uiScaleFactor)
+        tw.setColumnWidth(1, 100 * self.core.uiScaleFactor)
+        tw.setColumnWidth(3, 200 * self.core.uiScaleFactor)
+        tw.setColumnWidth(4, 100 * self.core.uiScaleFactor)
+        tw.sortByColumn(twSorting[0], twSorting[1])
+        tw.setSortingEnabled(True)
 
     @err_catcher(name=__name__)
     def Assetclicked(self, item):
@@ -2609,7 +2663,7 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             imgPath = self.core.entities.getEntityPreviewPath("asset", assetName)
 
             if os.path.exists(imgPath):
-                pm = self.core.media.getPixmapFromPath(imgPath)
+                pm = self.core.thumbnails.getPixmap(imgPath, self.shotPrvXres, self.shotPrvYres) or QPixmap()
                 if pm.width() > 0 and pm.height() > 0:
                     if (pm.width() / float(pm.height())) > 1.7778:
                         pmap = pm.scaledToWidth(self.shotPrvXres)
@@ -2639,7 +2693,23 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         if self.e_shotSearch.isVisible():
             searchFilter = self.e_shotSearch.text()
 
-        sequences, shots = self.core.entities.getShots(searchFilter=searchFilter)
+        placeholder = QTreeWidgetItem(["Loading...", ""])
+        placeholder.setFlags(Qt.NoItemFlags)
+        self.tw_sShot.addTopLevelItem(placeholder)
+
+        self.taskLoader.load(
+            "shots",
+            self.core.entities.getShots,
+            self.fillShots,
+            kwargs={"searchFilter": searchFilter},
+        )
+
+    @err_catcher(name=__name__)
+    def fillShots(self, result):
+        sequences, shots = result
+        self.lw_sPipeline.blockSignals(True)
+        self.tw_sShot.clear()
+        self.lw_sPipeline.blockSignals(False)
 
         if "" in sequences and "no sequence" not in sequences:
             sequences.append("no sequence")
@@ -2747,25 +2817,6 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
 
     @err_catcher(name=__name__)
     def refreshSFile(self, parm=None):
-        twSorting = [
-            self.tw_sFiles.horizontalHeader().sortIndicatorSection(),
-            self.tw_sFiles.horizontalHeader().sortIndicatorOrder(),
-        ]
-        self.tw_sFiles.setSortingEnabled(False)
-
-        model = QStandardItemModel()
-
-        model.setHorizontalHeaderLabels(
-            [
-                "",
-                self.tableColumnLabels["Version"],
-                self.tableColumnLabels["Comment"],
-                self.tableColumnLabels["Date"],
-                self.tableColumnLabels["User"],
-            ]
-        )
-        # example filename: shot_0010_mod_main_v0002_details-added_rfr_.max
-
         if self.cursCat is not None:
             appfilter = []
 
@@ -2774,85 +2825,21 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                 if getattr(self, chbName).isChecked():
                     appfilter += self.appFilters[i]["formats"]
 
-            scenefiles = self.core.entities.getScenefiles(shot=self.cursShots, step=self.cursStep, category=self.cursCat, extensions=appfilter)
-
-            for i in scenefiles:
-                row = []
-                fname = self.core.getScenefileData(i)
-
-                publicFile = self.core.useLocalFiles and i.startswith(self.sBasePath)
-
-                if pVersion == 2:
-                    item = QStandardItem(unicode("█", "utf-8"))
-                else:
-                    item = QStandardItem("█")
-                item.setFont(QFont("SansSerif", 100))
-                item.setFlags(~Qt.ItemIsSelectable & ~Qt.ItemIsEnabled)
-                item.setData(i, Qt.UserRole)
-
-                colorVals = [128, 128, 128]
-                if fname["extension"] in self.core.appPlugin.sceneFormats:
-                    colorVals = self.core.appPlugin.appColor
-                else:
-                    for k in self.core.unloadedAppPlugins.values():
-                        if fname["extension"] in k.sceneFormats:
-                            colorVals = k.appColor
-
-                item.setForeground(QColor(colorVals[0], colorVals[1], colorVals[2]))
-
-                row.append(item)
-                item = QStandardItem(fname["version"])
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                row.append(item)
-                if fname["comment"] == "nocomment":
-                    item = QStandardItem("")
-                else:
-                    item = QStandardItem(fname["comment"])
-                #   self.tw_sFiles.setItemDelegate(ColorDelegate(self.tw_sFiles))
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                row.append(item)
-                cdate = self.core.getFileModificationDate(i)
-                item = QStandardItem(str(cdate))
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                item.setData(
-                    QDateTime.fromString(cdate, "dd.MM.yy,  hh:mm:ss").addYears(
-                        100
-                    ),
-                    0,
-                )
-                #   item.setToolTip(cdate)
-                row.append(item)
-                item = QStandardItem(fname["user"])
-                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                row.append(item)
-
-                if publicFile:
-                    for k in row[1:]:
-                        iFont = k.font()
-                        iFont.setBold(True)
-                        k.setFont(iFont)
-                        k.setForeground(self.publicColor)
-
-                model.appendRow(row)
-
-        self.tw_sFiles.setModel(model)
-        if psVersion == 1:
-            self.tw_sFiles.horizontalHeader().setResizeMode(0, QHeaderView.Fixed)
-            self.tw_sFiles.horizontalHeader().setResizeMode(2, QHeaderView.Stretch)
-        else:
-            self.tw_sFiles.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)
-            self.tw_sFiles.horizontalHeader().setSectionResizeMode(
-                2, QHeaderView.Stretch
+            self.setTablePlaceholder(self.tw_sFiles)
+            self.taskLoader.load(
+                "shotFiles",
+                self.core.entities.getScenefileRecords,
+                lambda x: self.fillScenefileTable(self.tw_sFiles, x, self.sBasePath),
+                kwargs={
+                    "shot": self.cursShots,
+                    "step": self.cursStep,
+                    "category": self.cursCat,
+                    "extensions": appfilter,
+                },
             )
-
-        self.tw_sFiles.resizeColumnsToContents()
-        self.tw_sFiles.horizontalHeader().setMinimumSectionSize(10)
-        self.tw_sFiles.setColumnWidth(0, 10 * self.core.uiScaleFactor)
-        self.tw_sFiles.setColumnWidth(1, 100 * self.core.uiScaleFactor)
-        self.tw_sFiles.setColumnWidth(3, 200 * self.core.uiScaleFactor)
-        self.tw_sFiles.setColumnWidth(4, 100 * self.core.uiScaleFactor)
-        self.tw_sFiles.sortByColumn(twSorting[0], twSorting[1])
-        self.tw_sFiles.setSortingEnabled(True)
+        else:
+            self.taskLoader.cancel("shotFiles")
+            self.fillScenefileTable(self.tw_sFiles, [], self.sBasePath)
 
     @err_catcher(name=__name__)
     def sShotclicked(self, item):
@@ -2910,7 +2897,7 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             imgPath = self.core.entities.getEntityPreviewPath(entityType, entityName)
 
             if os.path.exists(imgPath):
-                pm = self.core.media.getPixmapFromPath(imgPath)
+                pm = self.core.thumbnails.getPixmap(imgPath, self.shotPrvXres, self.shotPrvYres) or QPixmap()
                 if pm.width() > 0 and pm.height() > 0:
                     if (pm.width() / float(pm.height())) > 1.7778:
                         pmap = pm.scaledToWidth(self.shotPrvXres)
@@ -3085,31 +3072,10 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         if shotName is None:
             return
 
-        self.refreshShots()
-
-        shotName, seqName = self.core.entities.splitShotname(self.es.shotName)
-        if not seqName:
-            seqName = "no sequence"
-
-        for i in range(self.tw_sShot.topLevelItemCount()):
-            sItem = self.tw_sShot.topLevelItem(i)
-            if sItem.text(0) == seqName:
-                sItem.setExpanded(True)
-                for k in range(sItem.childCount()):
-                    shotItem = sItem.child(k)
-                    if shotItem.text(0) == shotName:
-                        self.tw_sShot.setCurrentItem(shotItem)
-                        break
-                else:
-                    self.tw_sShot.setCurrentItem(sItem)
-
-    @err_catcher(name=__name__)
-    def createShot(self, shotName, frameRange=None):
-        result = self.core.entities.createEntity("shot", shotName, frameRange=frameRange)
-
-        if self.core.uiAvailable:
+        with self.taskLoader.blocking():
             self.refreshShots()
-            shotName, seqName = self.core.entities.splitShotname(shotName)
+
+            shotName, seqName = self.core.entities.splitShotname(self.es.shotName)
             if not seqName:
                 seqName = "no sequence"
 
@@ -3121,11 +3087,62 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                         shotItem = sItem.child(k)
                         if shotItem.text(0) == shotName:
                             self.tw_sShot.setCurrentItem(shotItem)
+                            break
+                    else:
+                        self.tw_sShot.setCurrentItem(sItem)
+
+    @err_catcher(name=__name__)
+    def createShot(self, shotName, frameRange=None):
+        result = self.core.entities.createEntity("shot", shotName, frameRange=frameRange)
+
+        if self.core.uiAvailable:
+            with self.taskLoader.blocking():
+                self.refreshShots()
+                shotName, seqName = self.core.entities.splitShotname(shotName)
+                if not seqName:
+                    seqName = "no sequence"
+
+                for i in range(self.tw_sShot.topLevelItemCount()):
+                    sItem = self.tw_sShot.topLevelItem(i)
+                    if sItem.text(0) == seqName:
+                        sItem.setExpanded(True)
+                        for k in range(sItem.childCount()):
+                            shotItem = sItem.child(k)
+                            if shotItem.text(0) == shotName:
+                                self.tw_sShot.setCurrentItem(shotItem)
 
         return result
 
     @err_catcher(name=__name__)
     def setRecent(self):
+        rSection = "recent_files_" + self.core.projectName
+        recentfiles = self.core.getConfig(cat=rSection) or []
+        self.setTablePlaceholder(self.tw_recent)
+        self.taskLoader.load(
+            "recent", self.getRecentEntries, self.fillRecent, args=[recentfiles]
+        )
+
+    @err_catcher(name=__name__)
+    def getRecentEntries(self, recentfiles):
+        entries = []
+        for i in recentfiles:
+            if not self.core.isStr(i):
+                continue
+
+            fname = self.core.getScenefileData(i)
+            if fname["entity"] == "invalid":
+                continue
+
+            cdate = self.core.getFileModificationDate(i, validate=True)
+            if not cdate:
+                continue
+
+            entries.append([i, fname, cdate])
+
+        return entries
+
+    @err_catcher(name=__name__)
+    def fillRecent(self, entries):
         model = QStandardItemModel()
 
         model.setHorizontalHeaderLabels(
@@ -3142,108 +3159,64 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         )
         # example filename: Body_mod_v0002_details-added_rfr_.max
         # example filename: shot_0010_mod_main_v0002_details-added_rfr_.max
-        rSection = "recent_files_" + self.core.projectName
-        recentfiles = self.core.getConfig(cat=rSection) or []
-
-        for i in recentfiles:
-            if not self.core.isStr(i):
-                continue
 
+        for i, fname, cdate in entries:
             row = []
-            fname = self.core.getScenefileData(i)
-
-            if fname["entity"] == "invalid":
-                continue
-            if os.path.exists(i):
-                if pVersion == 2:
-                    item = QStandardItem(unicode("█", "utf-8"))
-                else:
-                    item = QStandardItem("█")
-                item.setFont(QFont("SansSerif", 100))
-                item.setFlags(~Qt.ItemIsSelectable & ~Qt.ItemIsEnabled)
-                item.setData(i, Qt.UserRole)
-
-                colorVals = [128, 128, 128]
-                if fname["extension"] in self.core.appPlugin.sceneFormats:
-                    colorVals = self.core.appPlugin.appColor
-                else:
-                    for k in self.core.unloadedAppPlugins.values():
-                        if fname["extension"] in k.sceneFormats:
-                            colorVals = k.appColor
+            if pVersion == 2:
+                item = QStandardItem(unicode("█", "utf-8"))
+            else:
+                item = QStandardItem("█")
+            item.setFont(QFont("SansSerif", 100))
+            item.setFlags(~Qt.ItemIsSelectable & ~Qt.ItemIsEnabled)
+            item.setData(i, Qt.UserRole)
+
+            colorVals = [128, 128, 128]
+            if fname["extension"] in self.core.appPlugin.sceneFormats:
+                colorVals = self.core.appPlugin.appColor
+            else:
+                for k in self.core.unloadedAppPlugins.values():
+                    if fname["extension"] in k.sceneFormats:
+                        colorVals = k.appColor
 
-                item.setForeground(QColor(colorVals[0], colorVals[1], colorVals[2]))
+            item.setForeground(QColor(colorVals[0], colorVals[1], colorVals[2]))
 
+            row.append(item)
+            if fname["entity"] in ["asset", "shot"]:
+                item = QStandardItem(fname["entityName"])
+                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
                 row.append(item)
-                if fname["entity"] == "asset":
-                    item = QStandardItem(fname["entityName"])
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
-                    item = QStandardItem(fname.get("step", ""))
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
-                    item = QStandardItem(fname["version"])
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
-                    if fname["comment"] == "nocomment":
-                        item = QStandardItem("")
-                    else:
-                        item = QStandardItem(fname["comment"])
-                    row.append(item)
-                    cdate = datetime.datetime.fromtimestamp(os.path.getmtime(i))
-                    cdate = cdate.replace(microsecond=0)
-                    cdate = cdate.strftime("%d.%m.%y,  %H:%M:%S")
-                    item = QStandardItem(str(cdate))
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    item.setData(
-                        QDateTime.fromString(cdate, "dd.MM.yy,  hh:mm:ss").addYears(
-                            100
-                        ),
-                        0,
-                    )
-                    #   item.setToolTip(cdate)
-                    row.append(item)
-                    item = QStandardItem(fname["user"])
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
-                elif fname["entity"] == "shot":
-                    item = QStandardItem(fname["entityName"])
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
-                    item = QStandardItem(fname.get("step", ""))
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
-                    item = QStandardItem(fname["version"])
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
-                    if fname.get("comment", "nocomment") == "nocomment":
-                        item = QStandardItem("")
-                    else:
-                        item = QStandardItem(fname["comment"])
-                    row.append(item)
-                    cdate = datetime.datetime.fromtimestamp(os.path.getmtime(i))
-                    cdate = cdate.replace(microsecond=0)
-                    cdate = cdate.strftime("%d.%m.%y,  %H:%M:%S")
-                    item = QStandardItem(str(cdate))
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    item.setData(
-                        QDateTime.fromString(cdate, "dd.MM.yy,  hh:mm:ss").addYears(
-                            100
-                        ),
-                        0,
-                    )
-                    #   item.setToolTip(cdate)
-                    row.append(item)
-                    item = QStandardItem(fname["user"])
-                    item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
-                    row.append(item)
+                item = QStandardItem(fname.get("step", ""))
+                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
+                row.append(item)
+                item = QStandardItem(fname["version"])
+                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
+                row.append(item)
+                if fname.get("comment", "nocomment") == "nocomment":
+                    item = QStandardItem("")
                 else:
-                    continue
-
-                item = QStandardItem(i)
-                item.setToolTip(i)
+                    item = QStandardItem(fname["comment"])
+                row.append(item)
+                item = QStandardItem(str(cdate))
+                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
+                item.setData(
+                    QDateTime.fromString(cdate, "dd.MM.yy,  hh:mm:ss").addYears(
+                        100
+                    ),
+                    0,
+                )
+                #   item.setToolTip(cdate)
+                row.append(item)
+                item = QStandardItem(fname["user"])
+                item.setTextAlignment(Qt.Alignment(Qt.AlignCenter))
                 row.append(item)
+            else:
+                continue
 
-                model.appendRow(row)
+            item = QStandardItem(i)
+            item.setToolTip(i)
+            row.append(item)
+
+            model.appendRow(row)
 
         self.tw_recent.setModel(model)
         self.tw_recent.resizeColumnsToContents()
@@ -3604,106 +3577,107 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
     @err_catcher(name=__name__)
     def navigate(self, data):
         # logger.debug("navigate to: %s" % data)
-        if data["entity"] == "asset":
-            self.showTab("Assets")
-
-            itemPath = self.core.entities.getAssetRelPathFromPath(data.get("basePath", ""))
-            hierarchy = itemPath.split(os.sep)
-            hierarchy = [x for x in hierarchy if x != ""]
-            if not hierarchy:
-                return
-            hItem = self.tw_aHierarchy.findItems(hierarchy[0], Qt.MatchExactly, 0)
-            if len(hItem) == 0:
-                return
-            hItem = hItem[-1]
-
-            if len(hierarchy) > 1:
-                hItem.setExpanded(True)
-                if hItem.text(1) not in self.aExpanded:
-                    self.aExpanded.append(hItem.text(1))
-
-                for idx, i in enumerate((hierarchy[1:])):
-                    for k in range(hItem.childCount() - 1, -1, -1):
-                        if hItem.child(k).text(0) == i:
-                            hItem = hItem.child(k)
-                            if len(hierarchy) > (idx + 2):
-                                hItem.setExpanded(True)
-                                if hItem.text(1) not in self.aExpanded:
-                                    self.aExpanded.append(hItem.text(1))
+        with self.taskLoader.blocking():
+            if data["entity"] == "asset":
+                self.showTab("Assets")
+
+                itemPath = self.core.entities.getAssetRelPathFromPath(data.get("basePath", ""))
+                hierarchy = itemPath.split(os.sep)
+                hierarchy = [x for x in hierarchy if x != ""]
+                if not hierarchy:
+                    return
+                hItem = self.tw_aHierarchy.findItems(hierarchy[0], Qt.MatchExactly, 0)
+                if len(hItem) == 0:
+                    return
+                hItem = hItem[-1]
+
+                if len(hierarchy) > 1:
+                    hItem.setExpanded(True)
+                    if hItem.text(1) not in self.aExpanded:
+                        self.aExpanded.append(hItem.text(1))
+
+                    for idx, i in enumerate((hierarchy[1:])):
+                        for k in range(hItem.childCount() - 1, -1, -1):
+                            if hItem.child(k).text(0) == i:
+                                hItem = hItem.child(k)
+                                if len(hierarchy) > (idx + 2):
+                                    hItem.setExpanded(True)
+                                    if hItem.text(1) not in self.aExpanded:
+                                        self.aExpanded.append(hItem.text(1))
+                                break
+                        else:
                             break
-                    else:
-                        break
 
-            self.tw_aHierarchy.setCurrentItem(hItem)
-
-            if "step" in data:
-                fItems = self.lw_aPipeline.findItems(data["step"], Qt.MatchExactly)
-                if len(fItems) > 0:
-                    self.lw_aPipeline.setCurrentItem(fItems[0])
-                    if "category" in data:
-                        fItems = self.lw_aCategory.findItems(data["category"], Qt.MatchExactly)
-                        if len(fItems) > 0:
-                            self.lw_aCategory.setCurrentItem(fItems[0])
-                            if os.path.isabs(data.get("filename", "")):
-                                for i in range(self.tw_aFiles.model().rowCount()):
-                                    if data["filename"] == self.tw_aFiles.model().index(i, 0).data(
-                                        Qt.UserRole
-                                    ):
-                                        idx = self.tw_aFiles.model().index(i, 0)
-                                        self.tw_aFiles.selectRow(idx.row())
-                                        break
-
-        elif data["entity"] == "shot" and self.tw_sShot.topLevelItemCount() > 0:
-            self.showTab("Shots")
-            shotName = data.get("entityName", "")
-            stepName = data.get("step", "")
-            catName = data.get("category", "")
-
-            shotName, seqName = self.core.entities.splitShotname(shotName)
-            if not seqName:
-                seqName = "no sequence"
+                self.tw_aHierarchy.setCurrentItem(hItem)
+
+                if "step" in data:
+                    fItems = self.lw_aPipeline.findItems(data["step"], Qt.MatchExactly)
+                    if len(fItems) > 0:
+                        self.lw_aPipeline.setCurrentItem(fItems[0])
+                        if "category" in data:
+                            fItems = self.lw_aCategory.findItems(data["category"], Qt.MatchExactly)
+                            if len(fItems) > 0:
+                                self.lw_aCategory.setCurrentItem(fItems[0])
+                                if os.path.isabs(data.get("filename", "")):
+                                    for i in range(self.tw_aFiles.model().rowCount()):
+                                        if data["filename"] == self.tw_aFiles.model().index(i, 0).data(
+                                            Qt.UserRole
+                                        ):
+                                            idx = self.tw_aFiles.model().index(i, 0)
+                                            self.tw_aFiles.selectRow(idx.row())
+                                            break
+
+            elif data["entity"] == "shot" and self.tw_sShot.topLevelItemCount() > 0:
+                self.showTab("Shots")
+                shotName = data.get("entityName", "")
+                stepName = data.get("step", "")
+                catName = data.get("category", "")
+
+                shotName, seqName = self.core.entities.splitShotname(shotName)
+                if not seqName:
+                    seqName = "no sequence"
 
-            for i in range(self.tw_sShot.topLevelItemCount()):
-                sItem = self.tw_sShot.topLevelItem(i)
+                for i in range(self.tw_sShot.topLevelItemCount()):
+                    sItem = self.tw_sShot.topLevelItem(i)
 
-                if sItem.text(0) == seqName:
-                    if shotName == "":
-                        self.tw_sShot.setCurrentItem(sItem)
-                    else:
-                        sItem.setExpanded(True)
-                        for k in range(sItem.childCount()):
-                            shotItem = sItem.child(k)
-                            if shotItem.text(0) == shotName:
-                                self.tw_sShot.setCurrentItem(shotItem)
-                                break
-
-            if stepName:
-                for i in range(self.lw_sPipeline.model().rowCount()):
-                    if stepName == self.lw_sPipeline.model().index(i, 0).data():
-                        idx = self.lw_sPipeline.model().index(i, 0)
-                        self.lw_sPipeline.selectionModel().setCurrentIndex(
-                            idx, QItemSelectionModel.ClearAndSelect
-                        )
-                        break
-                if catName:
-                    for i in range(self.lw_sCategory.model().rowCount()):
-                        if catName == self.lw_sCategory.model().index(i, 0).data():
-                            idx = self.lw_sCategory.model().index(i, 0)
-                            self.lw_sCategory.selectionModel().setCurrentIndex(
+                    if sItem.text(0) == seqName:
+                        if shotName == "":
+                            self.tw_sShot.setCurrentItem(sItem)
+                        else:
+                            sItem.setExpanded(True)
+                            for k in range(sItem.childCount()):
+                                shotItem = sItem.child(k)
+                                if shotItem.text(0) == shotName:
+                                    self.tw_sShot.setCurrentItem(shotItem)
+                                    break
+
+                if stepName:
+                    for i in range(self.lw_sPipeline.model().rowCount()):
+                        if stepName == self.lw_sPipeline.model().index(i, 0).data():
+                            idx = self.lw_sPipeline.model().index(i, 0)
+                            self.lw_sPipeline.selectionModel().setCurrentIndex(
                                 idx, QItemSelectionModel.ClearAndSelect
                             )
                             break
+                    if catName:
+                        for i in range(self.lw_sCategory.model().rowCount()):
+                            if catName == self.lw_sCategory.model().index(i, 0).data():
+                                idx = self.lw_sCategory.model().index(i, 0)
+                                self.lw_sCategory.selectionModel().setCurrentIndex(
+                                    idx, QItemSelectionModel.ClearAndSelect
+                                )
+                                break
 
-                    if os.path.isabs(data.get("filename", "")):
-                        for i in range(self.tw_sFiles.model().rowCount()):
-                            curFname = data["filename"]
-                            globalCurFname = self.core.convertPath(curFname, "global")
-                            cmpFname = self.tw_sFiles.model().index(i, 0).data(Qt.UserRole)
+                        if os.path.isabs(data.get("filename", "")):
+                            for i in range(self.tw_sFiles.model().rowCount()):
+                                curFname = data["filename"]
+                                globalCurFname = self.core.convertPath(curFname, "global")
+                                cmpFname = self.tw_sFiles.model().index(i, 0).data(Qt.UserRole)
 
-                            if cmpFname in [curFname, globalCurFname]:
-                                idx = self.tw_sFiles.model().index(i, 0)
-                                self.tw_sFiles.selectRow(idx.row())
-                                break
+                                if cmpFname in [curFname, globalCurFname]:
+                                    idx = self.tw_sFiles.model().index(i, 0)
+                                    self.tw_sFiles.selectRow(idx.row())
+                                    break
 
     @err_catcher(name=__name__)
     def showTab(self, tab):
@@ -3737,40 +3711,60 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         self.showRender(curData[0], curData[1], curData[2], curData[3], curData[4])
 
     @err_catcher(name=__name__)
-    def getMediaTasks(self, entityName=None, entityType=None):
-        mediaTasks = {"3d": [], "2d": [], "playblast": [], "external": []}
-
+    def getMediaTaskEntity(self, entityType=None):
         if entityType is None:
             if not self.tbw_browser.currentWidget():
-                self.renderBasePath = ""
-                return mediaTasks
+                return
 
             entityType = self.tbw_browser.currentWidget().property("tabType")
 
         if entityType == "Assets":
-            entityType = "asset"
-            entityName = self.curAsset
-            step = self.curaStep
-            cat = self.curaCat
+            entity = {
+                "entityType": "asset",
+                "entityName": self.curAsset,
+                "step": self.curaStep,
+                "category": self.curaCat,
+            }
         elif entityType == "Shots":
-            entityType = "shot"
-            entityName = self.cursShots
-            step = self.cursStep
-            cat = self.cursCat
+            entity = {
+                "entityType": "shot",
+                "entityName": self.cursShots,
+                "step": self.cursStep,
+                "category": self.cursCat,
+            }
         else:
-            self.renderBasePath = ""
             return
 
-        self.renderBasePath = self.core.mediaProducts.getMediaProductBase(entityType, entityName, step=step, category=cat)
+        return entity
+
+    @err_catcher(name=__name__)
+    def getMediaTasks(self, entityName=None, entityType=None):
+        entity = self.getMediaTaskEntity(entityType=entityType)
+        if not entity:
+            self.renderBasePath = ""
+            return {"3d": [], "2d": [], "playblast": [], "external": []}
+
+        self.renderBasePath, mediaTasks = self.loadMediaTasks(**entity)
+        return mediaTasks
+
+    @err_catcher(name=__name__)
+    def loadMediaTasks(self, entityType, entityName, step, category):
+        basePath = self.core.mediaProducts.getMediaProductBase(entityType, entityName, step=step, category=category)
         mediaTasks = self.core.mediaProducts.getMediaProductNames(
-            basepath=self.renderBasePath,
+            basepath=basePath,
             entityType=entityType,
             entityName=entityName,
             step=step,
-            category=cat
+            category=category
         )
 
-        return mediaTasks
+        return basePath, mediaTasks
+
+    @err_catcher(name=__name__)
+    def addListPlaceholder(self, lw, text="Loading..."):
+        item = QListWidgetItem(text)
+        item.setFlags(Qt.NoItemFlags)
+        lw.addItem(item)
 
     @err_catcher(name=__name__)
     def updateTasks(self):
@@ -3779,7 +3773,26 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         self.curRTask = ""
         self.lw_task.clear()
 
-        mediaTasks = self.getMediaTasks()
+        entity = self.getMediaTaskEntity()
+        if not entity:
+            self.taskLoader.cancel("mediaTasks")
+            self.renderRefreshEnabled = True
+            self.fillTasks(["", None])
+            return
+
+        self.addListPlaceholder(self.lw_task)
+        self.renderRefreshEnabled = True
+        self.updateVersions()
+        self.taskLoader.load("mediaTasks", self.loadMediaTasks, self.fillTasks, kwargs=entity)
+
+    @err_catcher(name=__name__)
+    def fillTasks(self, result):
+        self.renderBasePath, mediaTasks = result
+        self.renderRefreshEnabled = False
+
+        self.curRTask = ""
+        self.lw_task.clear()
+
         if mediaTasks:
             for pType in ["3d", "2d", "playblast", "external"]:
                 for task in sorted(mediaTasks[pType], key=lambda x: x[0]):
@@ -3815,40 +3828,72 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         self.lw_version.clear()
 
         if len(self.lw_task.selectedItems()) == 1:
-            versions = self.core.mediaProducts.getMediaVersions(basepath=self.renderBasePath, product=self.curRTask)
-            for version in sorted(versions, key=self.sortVersions, reverse=True):
-                if version["label"] == "master":
-                    versionName = "master"
-                    versionData = self.core.paths.getRenderProductData(version["path"])
-                    if "versionpaths" in versionData:
-                        versions = []
-                        for path in versionData["versionpaths"]:
-                            vName = self.core.mediaProducts.getVersionFromVersionFolder(path)
-                            versions.append(vName)
-
-                        versionStr = ", ".join(versions)
-                        versionName = "master (%s)" % versionStr
-
-                    item = QListWidgetItem(versionName)
-                    item.setToolTip(versionName)
-                else:
-                    item = QListWidgetItem(version["label"])
-
-                item.setData(Qt.UserRole, version["path"])
-                versionInfoPath = self.getVersionInfoPath()
-                vData = self.core.getConfig("information", configPath=versionInfoPath)
-                if vData:
-                    prjMngNames = [
-                        [x, x.lower() + "-url"] for x in self.core.prjManagers
-                    ]
-                    for prjMngName in prjMngNames:
-                        if prjMngName[1] in vData:
-                            f = item.font()
-                            f.setBold(True)
-                            item.setFont(f)
-                            break
+            self.addListPlaceholder(self.lw_version)
+            self.taskLoader.load(
+                "mediaVersions",
+                self.loadMediaVersions,
+                self.fillVersions,
+                args=[self.renderBasePath, self.curRTask, self.getVersionInfoPath()],
+            )
+        else:
+            self.taskLoader.cancel("mediaVersions")
+            self.fillVersions([])
 
-                self.lw_version.addItem(item)
+    @err_catcher(name=__name__)
+    def loadMediaVersions(self, basePath, task, versionInfoPath):
+        entries = []
+        isPrjMngVersion = False
+        vData = self.core.getConfig("information", configPath=versionInfoPath)
+        if vData:
+            prjMngNames = [
+                [x, x.lower() + "-url"] for x in self.core.prjManagers
+            ]
+            for prjMngName in prjMngNames:
+                if prjMngName[1] in vData:
+                    isPrjMngVersion = True
+                    break
+
+        versions = self.core.mediaProducts.getMediaVersions(basepath=basePath, product=task)
+        for version in sorted(versions, key=self.sortVersions, reverse=True):
+            entry = {"path": version["path"], "bold": isPrjMngVersion}
+            if version["label"] == "master":
+                versionName = "master"
+                versionData = self.core.paths.getRenderProductData(version["path"])
+                if "versionpaths" in versionData:
+                    vNames = []
+                    for path in versionData["versionpaths"]:
+                        vName = self.core.mediaProducts.getVersionFromVersionFolder(path)
+                        vNames.append(vName)
+
+                    versionStr = ", ".join(vNames)
+                    versionName = "master (%s)" % versionStr
+
+                entry["label"] = versionName
+                entry["toolTip"] = versionName
+            else:
+                entry["label"] = version["label"]
+
+            entries.append(entry)
+
+        return entries
+
+    @err_catcher(name=__name__)
+    def fillVersions(self, entries):
+        self.curRVersion = ""
+        self.lw_version.clear()
+
+        for entry in entries:
+            item = QListWidgetItem(entry["label"])
+            if "toolTip" in entry:
+                item.setToolTip(entry["toolTip"])
+
+            item.setData(Qt.UserRole, entry["path"])
+            if entry["bold"]:
+                f = item.font()
+                f.setBold(True)
+                item.setFont(f)
+
+            self.lw_version.addItem(item)
 
         self.renderRefreshEnabled = False
         self.lw_version.setCurrentRow(0)
@@ -3948,8 +3993,9 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         mediaPlayback["curImg"] = 0
         mediaPlayback["seq"] = []
         mediaPlayback["prvIsSequence"] = False
-
-        QPixmapCache.clear()
+        mediaPlayback["missingFrames"] = []
+        mediaPlayback["cachedFrames"] = OrderedDict()
+        mediaPlayback["prefetchStart"] = None
 
         mediaBase, mediaFolders, mediaFiles = mediaPlayback["getMediaBase"]()
 
@@ -3977,9 +4023,18 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
 
                 if base is not None:
                     baseName, extension = os.path.splitext(base)
-                    for i in sorted(mediaFiles):
-                        if i.startswith(baseName[:-4]) and (i.endswith(extension)):
-                            mediaPlayback["seq"].append(i)
+                    for sequence in self.core.sequences.groupFiles(mediaFiles):
+                        if base in sequence["filenames"]:
+                            break
+                    else:
+                        sequence = {
+                            "filenames": [base],
+                            "start": None,
+                            "end": None,
+                            "missing": [],
+                        }
+
+                    mediaPlayback["seq"] = sequence["filenames"]
 
                     if len(mediaPlayback["seq"]) > 1 and extension not in [
                         ".mp4",
@@ -3987,19 +4042,11 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                         ".avi",
                     ]:
                         mediaPlayback["prvIsSequence"] = True
-                        try:
-                            mediaPlayback["pstart"] = int(baseName[-4:])
-                        except:
-                            mediaPlayback["pstart"] = "?"
-
-                        try:
-                            mediaPlayback["pend"] = int(
-                                os.path.splitext(
-                                    mediaPlayback["seq"][len(mediaPlayback["seq"]) - 1]
-                                )[0][-4:]
-                            )
-                        except:
-                            mediaPlayback["pend"] = "?"
+                        mediaPlayback["pstart"] = sequence["start"]
+                        mediaPlayback["pend"] = sequence["end"]
+                        mediaPlayback["missingFrames"] = sequence["missing"]
+                        if mediaPlayback["pstart"] is None:
+                            mediaPlayback["pstart"] = mediaPlayback["pend"] = "?"
 
                     else:
                         mediaPlayback["prvIsSequence"] = False
@@ -4056,6 +4103,9 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                     else:
                         self.updatePrvInfo(imgPath, mediaPlayback=mediaPlayback)
 
+                    if mediaPlayback["prvIsSequence"]:
+                        self.prefetchFrames(mediaPlayback)
+
                     if os.path.exists(imgPath):
                         mediaPlayback["timeline"] = QTimeLine(
                             mediaPlayback["pduration"] * 40, self
@@ -4126,6 +4176,12 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                 mediaPlayback["pduration"],
                 frStr,
             )
+            missingFrames = mediaPlayback.get("missingFrames")
+            if missingFrames:
+                infoStr += "   %s missing: %s" % (
+                    len(missingFrames),
+                    self.core.sequences.compressFrames(missingFrames),
+                )
         elif len(mediaPlayback["seq"]) > 1:
             infoStr = "%s files %sx%s   %s   %s" % (
                 mediaPlayback["pduration"],
@@ -4181,29 +4237,27 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             ".PNG",
             ".tif",
             ".tiff",
+            ".exr",
+            ".dpx",
         ]:
-            size = self.core.media.getPixmapFromPath(prvFile).size()
-            pwidth = size.width()
-            pheight = size.height()
-        elif os.path.splitext(prvFile)[1] in [".exr", ".dpx"]:
-            pwidth = pheight = "?"
-            if self.oiio:
-                imgSpecs = self.oiio.ImageBuf(str(prvFile)).spec()
-                pwidth = imgSpecs.full_width
-                pheight = imgSpecs.full_height
+            mediaInfo = self.core.media.probeMedia(prvFile) or {}
+            pwidth = mediaInfo.get("width") or 0
+            pheight = mediaInfo.get("height") or 0
 
         elif os.path.splitext(prvFile)[1] in [".mp4", ".mov", ".avi"]:
             if vidReader is None:
-                if os.stat(prvFile).st_size == 0:
-                    vidReader = "Error"
+                mediaInfo = self.core.media.probeMedia(prvFile) or {}
+                if mediaInfo.get("width"):
+                    pwidth = mediaInfo["width"]
+                    pheight = mediaInfo["height"]
+                    if len(mediaPlayback["seq"]) == 1 and setDuration:
+                        mediaPlayback["pduration"] = mediaInfo.get("frames") or 1
                 else:
-                    try:
-                        vidReader = imageio.get_reader(prvFile, "ffmpeg")
-                    except:
-                        vidReader = "Error"
-                        logger.debug("failed to read videofile: %s" % traceback.format_exc())
+                    pwidth = pheight = "?"
+                    if setDuration:
+                        mediaPlayback["pduration"] = 1
 
-            if vidReader == "Error":
+            elif vidReader == "Error":
                 pwidth = pheight = "?"
                 if setDuration:
                     mediaPlayback["pduration"] = 1
@@ -4231,13 +4285,37 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
 
         return self.core.media.getPixmapFromPath(imgFile)
 
+    @err_catcher(name=__name__)
+    def prefetchFrames(self, mediaPlayback):
+        """
+        Prefetches the thumbnails of the frames after the current frame. The
+        window moves on, when half of it was played.
+        """
+        seq = mediaPlayback["seq"]
+        curImg = mediaPlayback["curImg"]
+        start = mediaPlayback.get("prefetchStart")
+        if start is not None and 0 <= (curImg - start) % len(seq) < self.prefetchWindow / 2:
+            return
+
+        mediaPlayback["prefetchStart"] = curImg
+        count = min(self.prefetchWindow, len(seq))
+        frames = [
+            os.path.join(mediaPlayback["basePath"], seq[(curImg + idx) % len(seq)])
+            for idx in range(count)
+        ]
+        self.core.thumbnails.prefetch(frames, self.renderResX, self.renderResY)
+
     @err_catcher(name=__name__)
     def changeImg(self, frame=0, mediaPlayback=None):
         if mediaPlayback is None:
             mediaPlayback = self.mediaPlaybacks["shots"]
 
-        pmsmall = QPixmap()
-        if not QPixmapCache.find(("Frame" + str(mediaPlayback["curImg"])), pmsmall):
+        cachedFrames = mediaPlayback.setdefault("cachedFrames", OrderedDict())
+        pmsmall = cachedFrames.pop(mediaPlayback["curImg"], None)
+        if pmsmall is not None:
+            # reinsert to mark the frame as recently used
+            cachedFrames[mediaPlayback["curImg"]] = pmsmall
+        else:
             if len(mediaPlayback["seq"]) == 1 and os.path.splitext(
                 mediaPlayback["seq"][0]
             )[1] in [".mp4", ".mov", ".avi"]:
@@ -4254,73 +4332,13 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                 ".PNG",
                 ".tif",
                 ".tiff",
+                ".exr",
+                ".dpx",
             ]:
-                pm = self.core.media.getPixmapFromPath(fileName)
-
-                if pm.width() == 0 or pm.height() == 0:
-                    pmsmall = self.core.media.getPixmapFromPath(
-                        os.path.join(
-                            self.core.projectPath,
-                            "00_Pipeline",
-                            "Fallbacks",
-                            "%s.jpg" % os.path.splitext(curFile)[1][1:].lower(),
-                        )
-                    )
-                elif (pm.width() / float(pm.height())) > 1.7778:
-                    pmsmall = pm.scaledToWidth(self.renderResX)
-                else:
-                    pmsmall = pm.scaledToHeight(self.renderResY)
-            elif os.path.splitext(curFile)[1] in [".exr", ".dpx"]:
-                try:
-                    qimg = QImage(self.renderResX, self.renderResY, QImage.Format_RGB16)
-
-                    if self.oiio:
-                        imgSrc = self.oiio.ImageBuf(str(fileName))
-                        rgbImgSrc = self.oiio.ImageBuf()
-                        self.oiio.ImageBufAlgo.channels(rgbImgSrc, imgSrc, (0, 1, 2))
-                        imgWidth = rgbImgSrc.spec().full_width
-                        imgHeight = rgbImgSrc.spec().full_height
-                        xOffset = 0
-                        yOffset = 0
-                        if (imgWidth / float(imgHeight)) > 1.7778:
-                            newImgWidth = self.renderResX
-                            newImgHeight = self.renderResX / float(imgWidth) * imgHeight
-                        else:
-                            newImgHeight = self.renderResY
-                            newImgWidth = self.renderResY / float(imgHeight) * imgWidth
-                        imgDst = self.oiio.ImageBuf(
-                            self.oiio.ImageSpec(
-                                int(newImgWidth), int(newImgHeight), 3, self.oiio.UINT8
-                            )
-                        )
-                        self.oiio.ImageBufAlgo.resample(imgDst, rgbImgSrc)
-                        sRGBimg = self.oiio.ImageBuf()
-                        self.oiio.ImageBufAlgo.pow(
-                            sRGBimg, imgDst, (1.0 / 2.2, 1.0 / 2.2, 1.0 / 2.2)
-                        )
-                        bckImg = self.oiio.ImageBuf(
-                            self.oiio.ImageSpec(
-                                int(newImgWidth), int(newImgHeight), 3, self.oiio.UINT8
-                            )
-                        )
-                        self.oiio.ImageBufAlgo.fill(bckImg, (0.5, 0.5, 0.5))
-                        self.oiio.ImageBufAlgo.paste(bckImg, xOffset, yOffset, 0, 0, sRGBimg)
-                        qimg = QImage(
-                            int(newImgWidth), int(newImgHeight), QImage.Format_RGB16
-                        )
-                        for i in range(int(newImgWidth)):
-                            for k in range(int(newImgHeight)):
-                                rgb = qRgb(
-                                    bckImg.getpixel(i, k)[0] * 255,
-                                    bckImg.getpixel(i, k)[1] * 255,
-                                    bckImg.getpixel(i, k)[2] * 255,
-                                )
-                                qimg.setPixel(i, k, rgb)
-                        pmsmall = QPixmap.fromImage(qimg)
-
-                    else:
-                        raise RuntimeError("no image loader available")
-                except:
+                pmsmall = self.core.thumbnails.getPixmap(
+                    fileName, self.renderResX, self.renderResY
+                )
+                if not pmsmall:
                     pmsmall = self.core.media.getPixmapFromPath(
                         os.path.join(
                             self.core.projectPath,
@@ -4362,7 +4380,12 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
             else:
                 return False
 
-            QPixmapCache.insert(("Frame" + str(mediaPlayback["curImg"])), pmsmall)
+            cachedFrames[mediaPlayback["curImg"]] = pmsmall
+            while len(cachedFrames) > self.maxCachedFrames:
+                cachedFrames.popitem(last=False)
+
+        if mediaPlayback["prvIsSequence"]:
+            self.prefetchFrames(mediaPlayback)
 
         if not mediaPlayback["prvIsSequence"] and len(mediaPlayback["seq"]) > 1:
             curFile = mediaPlayback["seq"][mediaPlayback["curImg"]]
@@ -4500,51 +4523,52 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
 
     @err_catcher(name=__name__)
     def showRender(self, tab, shot, task, version, layer):
-        if tab != self.tbw_browser.currentWidget().property("tabType"):
-            for i in range(self.tbw_browser.count()):
-                if self.tbw_browser.widget(i).property("tabType") == tab:
-                    idx = i
-                    break
-            else:
-                return False
+        with self.taskLoader.blocking():
+            if tab != self.tbw_browser.currentWidget().property("tabType"):
+                for i in range(self.tbw_browser.count()):
+                    if self.tbw_browser.widget(i).property("tabType") == tab:
+                        idx = i
+                        break
+                else:
+                    return False
 
-            self.tbw_browser.setCurrentIndex(idx)
+                self.tbw_browser.setCurrentIndex(idx)
 
-        if tab == "Shots" and self.tw_sShot.currentIndex().data() != shot:
-            for i in range(self.tw_sShot.model().rowCount()):
-                if self.tw_sShot.model().index(i, 0).data() == shot:
-                    self.tw_sShot.selectionModel().setCurrentIndex(
-                        self.tw_sShot.model().index(i, 0),
-                        QItemSelectionModel.ClearAndSelect,
-                    )
-                    break
+            if tab == "Shots" and self.tw_sShot.currentIndex().data() != shot:
+                for i in range(self.tw_sShot.model().rowCount()):
+                    if self.tw_sShot.model().index(i, 0).data() == shot:
+                        self.tw_sShot.selectionModel().setCurrentIndex(
+                            self.tw_sShot.model().index(i, 0),
+                            QItemSelectionModel.ClearAndSelect,
+                        )
+                        break
 
-        self.updateTasks()
-        if (
-            len(self.lw_task.findItems(task, (Qt.MatchExactly & Qt.MatchCaseSensitive)))
-            != 0
-        ):
-            self.lw_task.setCurrentItem(
-                self.lw_task.findItems(task, (Qt.MatchExactly & Qt.MatchCaseSensitive))[
-                    0
-                ]
-            )
+            self.updateTasks()
             if (
-                len(
-                    self.lw_version.findItems(
-                        version, (Qt.MatchExactly & Qt.MatchCaseSensitive)
-                    )
-                )
+                len(self.lw_task.findItems(task, (Qt.MatchExactly & Qt.MatchCaseSensitive)))
                 != 0
             ):
-                self.lw_version.setCurrentItem(
-                    self.lw_version.findItems(
-                        version, (Qt.MatchExactly & Qt.MatchCaseSensitive)
-                    )[0]
+                self.lw_task.setCurrentItem(
+                    self.lw_task.findItems(task, (Qt.MatchExactly & Qt.MatchCaseSensitive))[
+                        0
+                    ]
                 )
-                if self.cb_layer.findText(layer) != -1:
-                    self.cb_layer.setCurrentIndex(self.cb_layer.findText(layer))
-                    self.updatePreview()
+                if (
+                    len(
+                        self.lw_version.findItems(
+                            version, (Qt.MatchExactly & Qt.MatchCaseSensitive)
+                        )
+                    )
+                    != 0
+                ):
+                    self.lw_version.setCurrentItem(
+                        self.lw_version.findItems(
+                            version, (Qt.MatchExactly & Qt.MatchCaseSensitive)
+                        )[0]
+                    )
+                    if self.cb_layer.findText(layer) != -1:
+                        self.cb_layer.setCurrentIndex(self.cb_layer.findText(layer))
+                        self.updatePreview()
 
     @err_catcher(name=__name__)
     def previewClk(self, event, mediaPlayback=None):
@@ -5509,76 +5533,61 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
     @err_catcher(name=__name__)
     def getImgSources(self, path, getFirstFile=False):
         foundSrc = []
-        for k in os.walk(path):
-            sources = []
-            psources = []
-            for m in k[2]:
-                baseName, extension = os.path.splitext(m)
-                if extension in [
-                    ".jpg",
-                    ".jpeg",
-                    ".JPG",
-                    ".png",
-                    ".PNG",
-                    ".tif",
-                    ".tiff",
-                    ".exr",
-                    ".mp4",
-                    ".mov",
-                    ".avi",
-                    ".dpx",
-                ]:
-                    src = [baseName, extension]
-                    if len(baseName) > 3:
-                        endStr = baseName[-4:]
-                        if pVersion == 2:
-                            endStr = unicode(endStr)
-                        if endStr.isnumeric():
-                            src = [baseName[:-4], extension]
-
-                    psources.append(src)
-
-            for m in sorted(k[2]):
-                baseName, extension = os.path.splitext(m)
-                if extension in [
-                    ".jpg",
-                    ".jpeg",
-                    ".JPG",
-                    ".png",
-                    ".PNG",
-                    ".tif",
-                    ".tiff",
-                    ".exr",
-                    ".mp4",
-                    ".mov",
-                    ".avi",
-                    ".dpx",
-                ]:
-                    fname = m
-                    if getFirstFile:
-                        return [os.path.join(path, m)]
-
-                    if len(baseName) > 3:
-                        endStr = baseName[-4:]
-                        if pVersion == 2:
-                            endStr = unicode(endStr)
-                        if (
-                            endStr.isnumeric()
-                            and len(psources) == psources.count(psources[0])
-                            and extension not in [".mp4", ".mov", ".avi"]
-                        ):
-                            fname = "%s@@@@%s" % (baseName[:-4], extension)
-
-                    if fname in sources:
-                        if len(sources) == 1:
-                            break  # sequence detected
-                    else:
-                        foundSrc.append(os.path.join(path, fname))
-                        sources.append(fname)
-            break
+        sequences = self.core.sequences.getSequences(
+            path,
+            extensions=[
+                ".jpg",
+                ".jpeg",
+                ".JPG",
+                ".png",
+                ".PNG",
+                ".tif",
+                ".tiff",
+                ".exr",
+                ".mp4",
+                ".mov",
+                ".avi",
+                ".dpx",
+            ],
+        )
+
+        if getFirstFile:
+            files = sorted([x for seq in sequences for x in seq["filenames"]])
+            if files:
+                return [os.path.join(path, files[0])]
+
+            return foundSrc
+
+        for sequence in sequences:
+            if sequence["frames"] and sequence["extension"] not in [".mp4", ".mov", ".avi"]:
+                fname = "%s%s%s" % (
+                    sequence["prefix"],
+                    "@" * sequence["padding"],
+                    sequence["extension"],
+                )
+                foundSrc.append(os.path.join(path, fname))
+            else:
+                foundSrc += [os.path.join(path, x) for x in sequence["filenames"]]
 
         return foundSrc
 
+    @err_catcher(name=__name__)
+    def getFramePlaceholder(self, path):
+        """
+        Returns the "@" placeholder of the frame number in a sequence path
+        from getImgSources, which has one "@" per digit, or None.
+        """
+        match = re.search("@+", os.path.basename(path))
+        if not match:
+            return
+
+        return match.group(0)
+
+    @err_catcher(name=__name__)
+    def replaceFramePlaceholder(self, path, placeholder, value):
+        base, filename = os.path.split(path)
+        return os.path.join(base, filename.replace(placeholder, value, 1))
+
     @err_catcher(name=__name__)
     def getRVpath(self):
         try:
@@ -5768,11 +5777,34 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                 conversionSettings["-start_number"] = None
                 conversionSettings["-start_number_out"] = None
 
-        result = self.core.media.convertMedia(inputpath, startNum, outputpath, settings=conversionSettings)
+        totalFrames = None
+        try:
+            totalFrames = int(mediaPlayback["pend"]) - int(mediaPlayback["pstart"]) + 1
+        except (KeyError, ValueError, TypeError):
+            pass
+
+        job = self.core.media.convertMedia(
+            inputpath,
+            startNum,
+            outputpath,
+            settings=conversionSettings,
+            wait=False,
+            totalFrames=totalFrames,
+        )
+        if not job:
+            return
 
         if extension not in self.core.mediaProducts.videoFormats:
             outputpath = outputpath % int(startNum)
 
+        self.conversionLoader.load(
+            outputpath,
+            job.wait,
+            lambda x, o=outputpath: self.onMediaConverted(o, x),
+        )
+
+    @err_catcher(name=__name__)
+    def onMediaConverted(self, outputpath, result):
         curTab = self.tbw_browser.currentWidget().property("tabType")
         curData = [
             curTab,
@@ -5804,8 +5836,8 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
         sourceData = []
 
         for curSourcePath in sources:
-
-            if "@@@@" in curSourcePath:
+            placeholder = self.getFramePlaceholder(curSourcePath)
+            if placeholder:
                 if (
                     not "pstart" in mediaPlayback
                     or not "pend" in mediaPlayback
@@ -5818,7 +5850,9 @@ class ProjectBrowser(QMainWindow, ProjectBrowser_ui.Ui_mw_ProjectBrowser):
                     firstFrame = mediaPlayback["pstart"]
                     lastFrame = mediaPlayback["pend"]
 
-                filePath = curSourcePath.replace("@@@@", "####").replace("\\", "/")
+                filePath = self.replaceFramePlaceholder(
+                    curSourcePath, placeholder, "#" * len(placeholder)
+                ).replace("\\", "/")
             else:
                 filePath = curSourcePath.replace("\\", "/")
                 firstFrame = 0
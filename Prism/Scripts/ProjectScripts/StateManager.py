@@ -638,6 +638,9 @@ class %s(QWidget, %s.%s, %s.%sClass):
 
     @err_catcher(name=__name__)
     def closeEvent(self, event):
+        if self.publishPaused:
+            self.abandonPublish()
+
         self.core.callback(name="onStateManagerClose", types=["custom"], args=[self])
         event.accept()
 
@@ -1629,22 +1632,27 @@ class %s(QWidget, %s.%s, %s.%sClass):
 
             getattr(self.core.appPlugin, "sm_preExecute", lambda x: None)(self)
             self.core.callback(name="onPublish", types=["custom"], args=[self])
+            self.core.publishScheduler.start(
+                [self.tw_export.topLevelItem(i) for i in range(self.tw_export.topLevelItemCount())]
+            )
+            self.core.callback(name="sm_publish_start", types=["rfManagers"], args=[self])
 
         if executeState:
             text = "Executing \"%s\" - please wait.." % self.execStates[0].ui.state.text(0)
             self.pubMsg = self.core.waitPopup(self.core, text)
             with self.pubMsg:
-                if self.execStates[0].ui.className in [
-                    "ImageRender",
-                    "Export",
-                    "Playblast",
-                    "Folder",
-                ]:
-                    result = self.execStates[0].ui.executeState(
-                        parent=self, useVersion=useVersion
-                    )
-                else:
-                    result = self.execStates[0].ui.executeState(parent=self)
+                with self.core.publishScheduler.executingState(self.execStates[0].ui):
+                    if self.execStates[0].ui.className in [
+                        "ImageRender",
+                        "Export",
+                        "Playblast",
+                        "Folder",
+                    ]:
+                        result = self.execStates[0].ui.executeState(
+                            parent=self, useVersion=useVersion
+                        )
+                    else:
+                        result = self.execStates[0].ui.executeState(parent=self)
 
                 if self.execStates[0].ui.className == "Folder":
                     self.publishResult += result
@@ -1652,6 +1660,7 @@ class %s(QWidget, %s.%s, %s.%sClass):
                     for k in result:
                         if "publish paused" in k["result"][0]:
                             self.publishPaused = True
+                            self.submitFarmJobs()
                             return
                 else:
                     self.publishResult.append(
@@ -1660,6 +1669,7 @@ class %s(QWidget, %s.%s, %s.%sClass):
 
                     if "publish paused" in result[0]:
                         self.publishPaused = True
+                        self.submitFarmJobs()
                         return
 
         else:
@@ -1671,21 +1681,35 @@ class %s(QWidget, %s.%s, %s.%sClass):
                     text = "Executing \"%s\" - please wait.." % curUi.state.text(0)
                     self.pubMsg = self.core.waitPopup(self.core, text)
                     with self.pubMsg:
-                        exResult = curUi.executeState(parent=self)
+                        with self.core.publishScheduler.executingState(curUi):
+                            exResult = curUi.executeState(parent=self)
+
                         if curUi.className == "Folder":
                             self.publishResult += exResult
 
                             for k in exResult:
                                 if "publish paused" in k["result"][0]:
                                     self.publishPaused = True
+                                    self.submitFarmJobs()
                                     return
                         else:
                             self.publishResult.append({"state": curUi, "result": exResult})
 
                             if exResult and "publish paused" in exResult[0]:
                                 self.publishPaused = True
+                                self.submitFarmJobs()
                                 return
 
+        self.submitFarmJobs()
+        if self.core.publishScheduler.hasPendingTasks():
+            text = "Finishing %s - please wait.." % actionString2
+            self.pubMsg = self.core.waitPopup(self.core, text)
+            with self.pubMsg:
+                stats = self.core.publishScheduler.finish()
+        else:
+            stats = self.core.publishScheduler.finish()
+
+        self.addPublishTimings(stats)
         getattr(self.core.appPlugin, "sm_postExecute", lambda x: None)(self)
         pubType = "stateExecution" if executeState else "publish"
         self.core.callback(name="postPublish", types=["custom"], args=[self, pubType], **{"result": self.publishResult})
@@ -1727,6 +1751,55 @@ class %s(QWidget, %s.%s, %s.%sClass):
                 self, self.core.getCurrentFileName(), force=True
             )
 
+    @err_catcher(name=__name__)
+    def abandonPublish(self):
+        """
+        Ends a paused publish, which won't be continued, and waits for its
+        background tasks.
+        """
+        logger.debug("abandoning the paused publish")
+        self.publishPaused = False
+        self.submitFarmJobs()
+        stats = self.core.publishScheduler.finish()
+        for stat in stats.values():
+            for error in stat["errors"]:
+                logger.warning(error)
+
+        self.publishInfos = {"updatedExports": {}, "backgroundRender": None}
+        self.core.sceneOpenChecksEnabled = True
+
+    @err_catcher(name=__name__)
+    def submitFarmJobs(self):
+        # renderfarm managers can queue the jobs of the states and submit them together
+        self.core.callback(name="sm_publish_submitJobs", types=["rfManagers"], args=[self])
+
+    @err_catcher(name=__name__)
+    def addPublishTimings(self, stats):
+        """
+        Adds the execution time and the time of the background tasks to the
+        entries of the publish result. Failed background tasks are added as
+        errors.
+        """
+        for entry in list(self.publishResult):
+            stat = stats.get(entry["state"])
+            if not stat:
+                continue
+
+            entry["duration"] = stat["duration"]
+            entry["backgroundDuration"] = stat["backgroundDuration"]
+            logger.debug(
+                "state %s: %.2fs, background: %.2fs"
+                % (entry["state"].state.text(0), stat["duration"], stat["backgroundDuration"])
+            )
+            for error in stat["errors"]:
+                logger.warning(error)
+                self.publishResult.append({
+                    "state": entry["state"],
+                    "result": [entry["state"].state.text(0) + " - error - " + error.splitlines()[0]],
+                })
+
+            stat["errors"] = []
+
     @err_catcher(name=__name__)
     def runSantityChecks(self, executeState):
         result = []
@@ -113,17 +113,18 @@ class FolderClass(object):
             if self.state.child(i).checkState(0) == Qt.Checked and curState in set(
                 self.stateManager.execStates
             ):
-                if self.state.child(i).ui.className in [
-                    "ImageRender",
-                    "Export",
-                    "Playblast",
-                    "Folder",
-                ]:
-                    exResult = self.state.child(i).ui.executeState(
-                        parent=self, useVersion=useVersion
-                    )
-                else:
-                    exResult = self.state.child(i).ui.executeState(parent=self)
+                with self.stateManager.core.publishScheduler.executingState(curState.ui):
+                    if self.state.child(i).ui.className in [
+                        "ImageRender",
+                        "Export",
+                        "Playblast",
+                        "Folder",
+                    ]:
+                        exResult = self.state.child(i).ui.executeState(
+                            parent=self, useVersion=useVersion
+                        )
+                    else:
+                        exResult = self.state.child(i).ui.executeState(parent=self)
 
                 if curState.ui.className == "Folder":
                     result += exResult
@@ -673,6 +673,7 @@ class ExportClass(object):
                 "outputpath": outputName,
             }
 
+            self.core.publishScheduler.waitForTasks(key="versionInfo")
             result = self.core.callback("postExport", **kwargs)
 
             for res in result:
@@ -780,7 +781,11 @@ class ExportClass(object):
 
             useMaster = self.core.getConfig("globals", "useMasterVersion", dft=False, config="project")
             if useMaster:
-                self.core.products.updateMasterVersion(outputName)
+                self.core.publishScheduler.runInBackground(
+                    self.core.products.updateMasterVersion,
+                    args=[outputName],
+                    key="masterVersions",
+                )
 
             kwargs = {
                 "state": self,
@@ -790,6 +795,7 @@ class ExportClass(object):
                 "outputpath": outputName,
             }
 
+            self.core.publishScheduler.waitForTasks(key="versionInfo")
             result = self.core.callback("postExport", **kwargs)
 
             for res in result:
@@ -993,6 +993,7 @@ class ImageRenderClass(object):
                 "settings": rSettings,
             }
 
+            self.core.publishScheduler.waitForTasks(key="versionInfo")
             self.core.callback("postRender", **kwargs)
 
             if "Result=Success" in result:
@@ -1025,9 +1026,17 @@ class ImageRenderClass(object):
             return
 
         elif masterAction == "Set as master":
-            self.core.mediaProducts.updateMasterVersion(outputName)
+            self.core.publishScheduler.runInBackground(
+                self.core.mediaProducts.updateMasterVersion,
+                args=[outputName],
+                key="masterVersions",
+            )
         elif masterAction == "Add to master":
-            self.core.mediaProducts.addToMasterVersion(outputName)
+            self.core.publishScheduler.runInBackground(
+                self.core.mediaProducts.addToMasterVersion,
+                args=[outputName],
+                key="masterVersions",
+            )
 
     @err_catcher(name=__name__)
     def setTaskWarn(self, warn):
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+import os
+import re
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+testDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(testDir, "..", "Scripts"))
+
+from PrismUtils import MediaManager
+from PrismUtils import Sequences
+
+
+class FakeCore(object):
+    framePadding = 4
+
+    def __init__(self):
+        self.sequences = Sequences.Sequences(self)
+
+    def getConfig(self, *args, **kwargs):
+        return kwargs.get("dft")
+
+
+class CombineMediaTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media = MediaManager.MediaManager(FakeCore())
+        cls.ffmpeg = cls.media.getFFmpeg(validate=True)
+
+    def setUp(self):
+        if not self.ffmpeg:
+            self.skipTest("ffmpeg not found")
+
+        self.tmpDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpDir)
+
+    def runFFmpeg(self, args):
+        proc = subprocess.Popen(
+            [self.ffmpeg] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        stdout, stderr = proc.communicate()
+        return proc.returncode, stderr.decode("utf-8", "ignore")
+
+    def createTestMedia(self, outputpath, width, height, frames, startNumber=None):
+        args = [
+            "-f", "lavfi",
+            "-i", "testsrc=size=%sx%s:rate=24" % (width, height),
+            "-frames:v", str(frames),
+        ]
+        if startNumber is not None:
+            args += ["-start_number", str(startNumber)]
+        else:
+            args += ["-pix_fmt", "yuv420p"]
+
+        returncode, output = self.runFFmpeg(args + [outputpath, "-y"])
+        self.assertEqual(returncode, 0, output)
+
+    def getVideoInfo(self, path):
+        returncode, output = self.runFFmpeg(["-i", path, "-map", "0:v:0", "-f", "null", "-"])
+        self.assertEqual(returncode, 0, output)
+        resolution = re.search(r"Video: .*?, (\d+)x(\d+)[ ,]", output)
+        hours, minutes, seconds = re.search(r"Duration: (\d+):(\d+):([\d.]+)", output).groups()
+        frames = re.findall(r"frame=\s*(\d+)", output)
+        return {
+            "width": int(resolution.group(1)),
+            "height": int(resolution.group(2)),
+            "duration": int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+            "frames": int(frames[-1]),
+        }
+
+    def test_combineClipsAndSequence(self):
+        clipA = os.path.join(self.tmpDir, "clipA.mp4")
+        clipB = os.path.join(self.tmpDir, "clipB.mov")
+        self.createTestMedia(clipA, 640, 360, 12)
+        self.createTestMedia(clipB, 320, 240, 10)
+
+        # the padding differs from the project padding
+        seqFolder = os.path.join(self.tmpDir, "sequence")
+        os.makedirs(seqFolder)
+        self.createTestMedia(
+            os.path.join(seqFolder, "beauty.%05d.png"), 480, 270, 6, startNumber=10001
+        )
+
+        sources = [
+            self.media.getCombineSource(clipA, 640, 360),
+            self.media.getCombineSource(clipB, 320, 240),
+            self.media.getCombineSource(os.path.join(seqFolder, "beauty.10001.png"), 480, 270),
+        ]
+        self.assertEqual(sources[2]["path"], os.path.join(seqFolder, "beauty.%05d.png"))
+        self.assertEqual(sources[2]["startNum"], 10001)
+
+        output = os.path.join(self.tmpDir, "out", "combined.mp4")
+        result = self.media.combineMedia(sources, output, fps="24")
+        self.assertEqual(result["output"], output, result["stderr"])
+        info = self.getVideoInfo(output)
+        self.assertEqual((info["width"], info["height"]), (640, 360))
+        self.assertEqual(info["frames"], 28)
+        self.assertAlmostEqual(info["duration"], 28 / 24.0, delta=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
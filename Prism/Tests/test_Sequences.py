@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+testDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(testDir, "..", "Scripts"))
+
+from PrismUtils import Sequences
+
+
+class FakeCore(object):
+    framePadding = 4
+
+
+class SequencesTest(unittest.TestCase):
+    def setUp(self):
+        self.sequences = Sequences.Sequences(FakeCore())
+
+    def test_frameSequence(self):
+        filenames = ["shot_beauty.1001.exr", "shot_beauty.1002.exr", "shot_beauty.1004.exr"]
+        groups = self.sequences.groupFiles(filenames)
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0]["pattern"], "shot_beauty.####.exr")
+        self.assertEqual(groups[0]["frames"], [1001, 1002, 1004])
+        self.assertEqual(groups[0]["missing"], [1003])
+
+    def test_underscoreSeparator(self):
+        groups = self.sequences.groupFiles(["comp_0001.png", "comp_0002.png"])
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0]["prefix"], "comp_")
+        self.assertTrue(groups[0]["isSequence"])
+
+    def test_versionSuffixedFiles(self):
+        filenames = ["c_v001.exr", "c_v002.exr", "take1.mov", "take2.mov"]
+        groups = self.sequences.groupFiles(filenames)
+        self.assertEqual(len(groups), 4)
+        for group in groups:
+            self.assertFalse(group["isSequence"])
+            self.assertEqual(group["frames"], [])
+            self.assertEqual(group["pattern"], group["filenames"][0])
+
+    def test_versionedFrameSequence(self):
+        filenames = ["c_v001.1001.exr", "c_v001.1002.exr", "c_v002.1001.exr"]
+        groups = self.sequences.groupFiles(filenames)
+        self.assertEqual([x["prefix"] for x in groups], ["c_v001.", "c_v002."])
+        self.assertEqual(groups[0]["frames"], [1001, 1002])
+
+    def test_framePadding(self):
+        self.sequences.core.framePadding = 6
+        try:
+            groups = self.sequences.groupFiles(["a.1001.exr", "a.1002.exr"])
+        finally:
+            self.sequences.core.framePadding = 4
+
+        self.assertEqual(len(groups), 2)
+
+    def test_getSequenceFromFile(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        for filename in ["a.1001.exr", "a.1002.exr", "a_v001.exr"]:
+            open(os.path.join(folder, filename), "w").close()
+
+        sequence = self.sequences.getSequenceFromFile(os.path.join(folder, "a.1002.exr"))
+        self.assertEqual(sequence["filenames"], ["a.1001.exr", "a.1002.exr"])
+        sequence = self.sequences.getSequenceFromFile(os.path.join(folder, "a_v001.exr"))
+        self.assertEqual(sequence["filenames"], ["a_v001.exr"])
+
+
+if __name__ == "__main__":
+    unittest.main()